@@ -5,6 +5,7 @@ from CommonServerUserPython import *
 ''' IMPORTS '''
 import csv
 import gzip
+import concurrent.futures
 import urllib3
 from dateutil.parser import parse
 from typing import Optional, Pattern, Dict, Any, Tuple, Union, List
@@ -13,6 +14,8 @@ from typing import Optional, Pattern, Dict, Any, Tuple, Union, List
 urllib3.disable_warnings()
 
 # Globals
+ACCEPT_ENCODING = 'gzip, deflate'
+DEFAULT_FETCH_CONCURRENCY = 4
 
 
 class Client(BaseClient):
@@ -20,7 +23,7 @@ class Client(BaseClient):
                  insecure: bool = False, credentials: dict = None, ignore_regex: str = None, encoding: str = 'latin-1',
                  delimiter: str = ',', doublequote: bool = True, escapechar: str = '',
                  quotechar: str = '"', skipinitialspace: bool = False, polling_timeout: int = 20, proxy: bool = False,
-                 feedTags: Optional[str] = None, **kwargs):
+                 feedTags: Optional[str] = None, fetch_concurrency: int = DEFAULT_FETCH_CONCURRENCY, **kwargs):
         """
         :param url: URL of the feed.
         :param feed_url_to_config: for each URL, a configuration of the feed that contains
@@ -31,6 +34,7 @@ class Client(BaseClient):
             {
                 'fieldnames': ['value'],
                 'indicator_type': 'IP',
+                'timeout': 60,
                 'mapping': {
                     'Date': 'date' / 'Date': ('date', r'(regex_string)', 'The date is {}')
                 }
@@ -42,6 +46,7 @@ class Client(BaseClient):
                 * regex_string_extractor will extract the first match from the value_from_feed,
                 Use None to get the full value of the field.
                 * string_formatter will format the data in your preferred way, Use None to get the extracted field.
+         The optional 'timeout' overrides the polling timeout of the URL.
         :param fieldnames: list of field names in the file. If *null* the values in the first row of the file are
             used as names. Default: *null*
         :param insecure: boolean, if *false* feed HTTPS server certificate is verified. Default: *false*
@@ -60,6 +65,7 @@ class Client(BaseClient):
         :param skipinitialspace: see `csv Python module
             <https://docs.python.org/2/library/csv.html#dialects-and-formatting-parameters>`. Default False
         :param polling_timeout: timeout of the polling request in seconds. Default: 20
+        :param fetch_concurrency: the number of feed URLs to fetch at once. Default: 4
         :param proxy: Sets whether use proxy when sending requests
         """
         self.tags: List[str] = argToList(feedTags)
@@ -86,6 +92,14 @@ class Client(BaseClient):
             self.polling_timeout = int(polling_timeout)
         except (ValueError, TypeError):
             return_error('Please provide an integer value for "Request Timeout"')
+        try:
+            self.fetch_concurrency = max(int(fetch_concurrency), 1)
+        except (ValueError, TypeError):
+            return_error('Please provide an integer value for "Fetch Concurrency"')
+        # all the feed URLs are fetched through one session, pooling a connection per concurrent fetch
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.fetch_concurrency)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
         self.encoding = encoding
         self.ignore_regex: Optional[Pattern] = None
         if ignore_regex is not None:
@@ -99,51 +113,89 @@ class Client(BaseClient):
             'quotechar': quotechar,
             'skipinitialspace': skipinitialspace
         }
+        # The validators of the feeds fetched by the client, to be saved once their indicators are submitted
+        self.feed_validators: Dict[str, dict] = {}
+        # The feeds which were not fetched since they did not change since they were last fetched
+        self.not_modified_urls: List[str] = []
 
-    def _build_request(self, url):
+    def _build_request(self, url, headers=None):
         r = requests.Request(
             'GET',
             url,
-            auth=self._auth
+            auth=self._auth,
+            headers=headers
         )
 
         return r.prepare()
 
-    def build_iterator(self, **kwargs):
+    def get_url_timeout(self, url: str) -> int:
+        """
+        Get the timeout of the request for a feed URL
+        :param url: The feed URL
+        :return: The timeout in seconds, from the feed configuration if set there, or the polling timeout
+        """
+        return (self.feed_url_to_config or {}).get(url, {}).get('timeout', self.polling_timeout)
+
+    def fetch_url(self, url: str, headers: dict, **kwargs) -> requests.Response:
+        """
+        Send the HTTP request for a feed URL, so that the requests are sent concurrently
+        :param url: The feed URL
+        :param headers: The headers to send the request with
+        :param kwargs: Arguments to send the request with
+        :return: The feed response
+        """
+        prepreq = self._build_request(url, headers)
+
+        # this is to honour the proxy environment variables
+        kwargs.update(self._session.merge_environment_settings(
+            prepreq.url,
+            {}, None, None, None  # defaults
+        ))
+        kwargs['stream'] = True
+        kwargs['verify'] = self._verify
+        kwargs['timeout'] = self.get_url_timeout(url)
+
+        try:
+            return self._session.send(prepreq, **kwargs)
+        except requests.ConnectionError:
+            raise requests.ConnectionError('Failed to establish a new connection.'
+                                           ' Please make sure your URL is valid.')
+
+    def build_iterator(self, conditional_fetch: bool = False, **kwargs):
+        """
+        For each URL, send an HTTP request to get the feed and return a CSV reader of it.
+        The requests are sent concurrently, and the feeds are returned in the order they responded.
+        :param conditional_fetch: Whether to skip feeds which did not change since they were last fetched
+        :param kwargs: Arguments to send the request with
+        :return: List of CSV readers by the feed URL
+        """
         results = []
         urls = self._base_url
         if not isinstance(urls, list):
             urls = [urls]
-        for url in urls:
-            _session = requests.Session()
-
-            prepreq = self._build_request(url)
-
-            # this is to honour the proxy environment variables
-            kwargs.update(_session.merge_environment_settings(
-                prepreq.url,
-                {}, None, None, None  # defaults
-            ))
-            kwargs['stream'] = True
-            kwargs['verify'] = self._verify
-            kwargs['timeout'] = self.polling_timeout
-
-            if self.headers:
-                if 'headers' in kwargs:
-                    kwargs['headers'].update(self.headers)
-                else:
-                    kwargs['headers'] = self.headers
-
-            try:
-                r = _session.send(prepreq, **kwargs)
-            except requests.ConnectionError:
-                raise requests.ConnectionError('Failed to establish a new connection.'
-                                               ' Please make sure your URL is valid.')
+        headers = {'Accept-Encoding': ACCEPT_ENCODING}
+        headers.update(kwargs.pop('headers', {}))
+        headers.update(self.headers)
+        max_workers = max(min(self.fetch_concurrency, len(urls)), 1)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_url = {}
+            for url in urls:
+                url_headers = dict(headers, **get_conditional_headers(url)) if conditional_fetch else headers
+                future_to_url[executor.submit(self.fetch_url, url, url_headers, **kwargs)] = url
+            url_to_response = [(future_to_url[future], future.result())
+                               for future in concurrent.futures.as_completed(future_to_url)]
+
+        for url, r in url_to_response:
+            if r.status_code == 304:
+                demisto.debug(f'{url} was not modified since it was last fetched')
+                self.not_modified_urls.append(url)
+                continue
             try:
                 r.raise_for_status()
             except Exception:
                 return_error('Exception in request: {} {}'.format(r.status_code, r.content))
                 raise
+            self.feed_validators[url] = get_response_validators(r)
 
             response = self.get_feed_content_divided_to_lines(url, r)
             if self.feed_url_to_config:
@@ -311,11 +363,13 @@ def feed_main(feed_name, params=None, prefix=''):
             indicators = fetch_indicators_command(
                 client,
                 params.get('indicator_type'),
-                params.get('auto_detect_type')
+                params.get('auto_detect_type'),
+                conditional_fetch=is_conditional_fetch_enabled()
             )
             # we submit the indicators in batches
-            for b in batch(indicators, batch_size=2000):
-                demisto.createIndicators(b)  # type: ignore
+            # the indicators of unchanged feeds which were not fetched are missing, so their fingerprints are kept
+            create_indicators_delta(indicators, full_feed=not client.not_modified_urls)
+            save_feed_validators(client.feed_validators)
         else:
             args = demisto.args()
             args['feed_name'] = feed_name
@@ -1,3 +1,4 @@
+import time
 import requests_mock
 from CSVFeedApiModule import *
 
@@ -230,3 +231,74 @@ class TestTagsParam:
             )
             _, _, indicators = get_indicators_command(client, args)
             assert [] == indicators[0]['fields']['tags']
+
+
+def test_build_iterator_not_modified(mocker):
+    """
+    Given
+    - Two feeds which were fetched before, one of them did not change since, and an API key header.
+
+    When
+    - Building the iterator with conditional fetching.
+
+    Then
+    - Ensure the validators of each feed and the API key header are sent with its request.
+    - Ensure only the changed feed is returned, and its new validators are kept.
+    """
+    mocker.patch.object(demisto, 'getIntegrationContext', return_value={'feed_validators': {
+        'https://ipstack.com': {'etag': '"1"'},
+        'https://ipstack.com/changed': {'etag': '"2"'}
+    }})
+
+    with requests_mock.Mocker() as m:
+        m.get('https://ipstack.com', status_code=304)
+        m.get('https://ipstack.com/changed', text='1.1.1.1', headers={'ETag': '"3"'})
+        client = Client(
+            url=['https://ipstack.com', 'https://ipstack.com/changed'],
+            fieldnames='value',
+            credentials={'identifier': '_header:X-Api-Key', 'password': 'key'}
+        )
+        results = client.build_iterator(conditional_fetch=True)
+
+        assert {request.path: request.headers['If-None-Match'] for request in m.request_history} == {
+            '/': '"1"',
+            '/changed': '"2"'
+        }
+        assert all(request.headers['X-Api-Key'] == 'key' for request in m.request_history)
+    assert [list(result.keys()) for result in results] == [['https://ipstack.com/changed']]
+    assert client.feed_validators == {'https://ipstack.com/changed': {'etag': '"3"'}}
+
+
+def test_build_iterator_concurrent_fetch(mocker):
+    """
+    Given
+    - Two feed URLs, the first one slower to respond and configured with its own timeout.
+
+    When
+    - Building the iterator.
+
+    Then
+    - Ensure both URLs are fetched through the client session, each with its timeout.
+    - Ensure the feeds are returned in the order they responded.
+    """
+    feed_url_to_config = {
+        'https://ipstack.com/slow': {'fieldnames': ['value'], 'indicator_type': 'IP', 'timeout': 60},
+        'https://ipstack.com/fast': {'fieldnames': ['value'], 'indicator_type': 'IP'}
+    }
+
+    with requests_mock.Mocker() as m:
+        m.get('https://ipstack.com/slow', text='1.1.1.1')
+        m.get('https://ipstack.com/fast', text='2.2.2.2')
+        client = Client(url=list(feed_url_to_config), feed_url_to_config=feed_url_to_config, polling_timeout=10)
+        fetch_url = client.fetch_url
+
+        def delayed_fetch_url(url, headers, **kwargs):
+            if url.endswith('slow'):
+                time.sleep(0.5)
+            return fetch_url(url, headers, **kwargs)
+
+        mocker.patch.object(client, 'fetch_url', side_effect=delayed_fetch_url)
+        results = client.build_iterator()
+
+        assert {request.path: request.timeout for request in m.request_history} == {'/slow': 60, '/fast': 10}
+    assert [list(result.keys()) for result in results] == [['https://ipstack.com/fast'], ['https://ipstack.com/slow']]
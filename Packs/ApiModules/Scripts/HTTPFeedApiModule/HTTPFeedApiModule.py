@@ -6,26 +6,31 @@ from CommonServerUserPython import *
 import urllib3
 import requests
 import traceback
+import concurrent.futures
 from dateutil.parser import parse
-from typing import Optional, Pattern, List
+from typing import Optional, Pattern, List, Dict
 
 # disable insecure warnings
 urllib3.disable_warnings()
 
 ''' GLOBALS '''
 TAGS = 'feedTags'
+ACCEPT_ENCODING = 'gzip, deflate'
+DEFAULT_FETCH_CONCURRENCY = 4
 
 
 class Client(BaseClient):
     def __init__(self, url: str, feed_name: str = 'http', insecure: bool = False, credentials: dict = None,
                  ignore_regex: str = None, encoding: str = None, indicator_type: str = '',
                  indicator: str = '', fields: str = '{}', feed_url_to_config: dict = None, polling_timeout: int = 20,
-                 headers: dict = None, proxy: bool = False, custom_fields_mapping: dict = None, **kwargs):
+                 headers: dict = None, proxy: bool = False, custom_fields_mapping: dict = None,
+                 fetch_concurrency: int = DEFAULT_FETCH_CONCURRENCY, **kwargs):
         """Implements class for miners of plain text feeds over HTTP.
         **Config parameters**
         :param: url: URL of the feed.
         :param: polling_timeout: timeout of the polling request in seconds.
             Default: 20
+        :param: fetch_concurrency: the number of feed URLs to fetch at once. Default: 4
         :param feed_name: The name of the feed.
         :param: custom_fields_mapping: Dict, the "fields" to be used in the indicator - where the keys
         are the *current* keys of the fields returned feed data and the *values* are the *indicator fields in Demisto*.
@@ -46,6 +51,7 @@ class Client(BaseClient):
         :param: fields: a dictionary of *extraction dictionaries* to extract
             additional attributes from each line. Default: {}
         :param: feed_url_to_config: For each service, a dictionary to process indicators by.
+        A 'timeout' key overrides the polling timeout of the service.
         For example, ASN feed:
         'https://www.spamhaus.org/drop/asndrop.txt': {
             'indicator_type': ASN,
@@ -100,6 +106,14 @@ class Client(BaseClient):
             self.polling_timeout = int(polling_timeout)
         except (ValueError, TypeError):
             raise ValueError('Please provide an integer value for "Request Timeout"')
+        try:
+            self.fetch_concurrency = max(int(fetch_concurrency), 1)
+        except (ValueError, TypeError):
+            raise ValueError('Please provide an integer value for "Fetch Concurrency"')
+        # all the feed URLs are fetched through one session, pooling a connection per concurrent fetch
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=self.fetch_concurrency)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
 
         self.headers = headers
         self.encoding = encoding
@@ -136,6 +150,10 @@ class Client(BaseClient):
         if custom_fields_mapping is None:
             custom_fields_mapping = {}
         self.custom_fields_mapping = custom_fields_mapping
+        # The validators of the feeds fetched by the client, to be saved once their indicators are submitted
+        self.feed_validators: Dict[str, dict] = {}
+        # The feeds which were not fetched since they did not change since they were last fetched
+        self.not_modified_urls: List[str] = []
 
     def get_feed_config(self, fields_json: str = '', indicator_json: str = ''):
         """
@@ -188,38 +206,73 @@ class Client(BaseClient):
 
         return config
 
-    def build_iterator(self, **kwargs):
+    def get_url_timeout(self, url: str) -> int:
+        """
+        Get the timeout of the request for a feed URL
+        :param url: The feed URL
+        :return: The timeout in seconds, from the feed configuration if set there, or the polling timeout
+        """
+        return self.feed_url_to_config.get(url, {}).get('timeout', self.polling_timeout)
+
+    def fetch_url(self, url: str, headers: dict, **kwargs) -> requests.Response:
         """
-        For each URL (service), send an HTTP request to get indicators and return them after filtering by Regex
+        Send the HTTP request for a feed URL, so that the requests are sent concurrently
+        :param url: The feed URL
+        :param headers: The headers to send the request with
+        :param kwargs: Arguments to send to the HTTP API endpoint
+        :return: The feed response
+        """
+        return self._session.get(
+            url,
+            headers=headers,
+            timeout=self.get_url_timeout(url),
+            **kwargs
+        )
+
+    def build_iterator(self, conditional_fetch: bool = False, **kwargs):
+        """
+        For each URL (service), send an HTTP request to get indicators and return them after filtering by Regex.
+        The requests are sent concurrently, and the feeds are returned in the order they responded. The responses are
+        streamed, so each feed is read line by line as it's parsed, rather than held in memory.
+        :param conditional_fetch: Whether to skip feeds which did not change since they were last fetched
         :param kwargs: Arguments to send to the HTTP API endpoint
         :return: List of indicators
         """
         kwargs['stream'] = True
         kwargs['verify'] = self._verify
-        kwargs['timeout'] = self.polling_timeout
 
+        headers = {'Accept-Encoding': ACCEPT_ENCODING}
         if self.headers is not None:
-            kwargs['headers'] = self.headers
+            headers.update(self.headers)
 
         if self.username is not None and self.password is not None:
             kwargs['auth'] = (self.username, self.password)
+        urls = self._base_url
+        url_to_response_list: List[dict] = []
+        if not isinstance(urls, list):
+            urls = [urls]
+        max_workers = max(min(self.fetch_concurrency, len(urls)), 1)
         try:
-            urls = self._base_url
-            url_to_response_list: List[dict] = []
-            if not isinstance(urls, list):
-                urls = [urls]
-            for url in urls:
-                r = requests.get(
-                    url,
-                    **kwargs
-                )
-                try:
-                    r.raise_for_status()
-                except Exception:
-                    LOG(f'{self.feed_name!r} - exception in request:'
-                        f' {r.status_code!r} {r.content!r}')
-                    raise
-                url_to_response_list.append({url: r})
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                future_to_url = {}
+                for url in urls:
+                    url_headers = dict(headers, **get_conditional_headers(url)) if conditional_fetch else headers
+                    future_to_url[executor.submit(self.fetch_url, url, url_headers, **kwargs)] = url
+                for future in concurrent.futures.as_completed(future_to_url):
+                    url = future_to_url[future]
+                    r = future.result()
+                    if r.status_code == 304:
+                        demisto.debug(f'{self.feed_name!r} - {url} was not modified since it was last fetched')
+                        self.not_modified_urls.append(url)
+                        continue
+                    try:
+                        r.raise_for_status()
+                    except Exception:
+                        LOG(f'{self.feed_name!r} - exception in request:'
+                            f' {r.status_code!r} {r.content!r}')
+                        raise
+                    self.feed_validators[url] = get_response_validators(r)
+                    url_to_response_list.append({url: r})
         except requests.ConnectionError:
             raise requests.ConnectionError('Failed to establish a new connection. Please make sure your URL is valid.')
 
@@ -423,10 +476,12 @@ def feed_main(feed_name, params=None, prefix=''):
     try:
         if command == 'fetch-indicators':
             indicators = fetch_indicators_command(client, feed_tags, params.get('indicator_type'),
-                                                  params.get('auto_detect_type'))
+                                                  params.get('auto_detect_type'),
+                                                  conditional_fetch=is_conditional_fetch_enabled())
             # we submit the indicators in batches
-            for b in batch(indicators, batch_size=2000):
-                demisto.createIndicators(b)
+            # the indicators of unchanged feeds which were not fetched are missing, so their fingerprints are kept
+            create_indicators_delta(indicators, full_feed=not client.not_modified_urls)
+            save_feed_validators(client.feed_validators)
         else:
             args = demisto.args()
             args['feed_name'] = feed_name
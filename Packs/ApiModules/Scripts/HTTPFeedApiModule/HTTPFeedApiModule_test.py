@@ -1,4 +1,5 @@
 from HTTPFeedApiModule import get_indicators_command, Client, datestring_to_millisecond_timestamp, feed_main
+import time
 import requests_mock
 import demistomock as demisto
 
@@ -287,3 +288,89 @@ def test_feed_main_test_module(mocker, requests_mock):
     assert demisto.results.call_count == 1
     results = demisto.results.call_args[0][0]
     assert results['HumanReadable'] == 'ok'
+
+
+def test_feed_main_fetch_indicators_not_modified(mocker, requests_mock):
+    """
+    Given
+    - A feed which was fetched before, with an ETag and a Last-Modified header.
+
+    When
+    - Fetching indicators twice, when the feed server responds with 304 Not Modified the second time.
+
+    Then
+    - Ensure the feed validators are saved to the integration context after the first fetch.
+    - Ensure the validators and the accepted encodings are sent with the second request.
+    - Ensure no indicators are submitted by the second fetch, and the fingerprints of the feed indicators are kept.
+    """
+    feed_url = 'https://www.spamhaus.org/drop/asndrop.txt'
+    integration_context: dict = {}
+    mocker.patch.object(demisto, 'params', return_value={'url': feed_url, 'ignore_regex': '^;.*',
+                                                         'indicator_type': 'ASN'})
+    mocker.patch.object(demisto, 'command', return_value='fetch-indicators')
+    mocker.patch.object(demisto, 'createIndicators')
+    mocker.patch.object(demisto, 'getIntegrationContext', side_effect=lambda: integration_context)
+    mocker.patch.object(demisto, 'setIntegrationContext', side_effect=integration_context.update)
+
+    with open('test_data/asn_ranges.txt') as asn_ranges_txt:
+        asn_ranges = asn_ranges_txt.read().encode('utf8')
+
+    validators = {'ETag': '"5f2c4a"', 'Last-Modified': 'Thu, 06 Aug 2020 18:00:00 GMT'}
+    requests_mock.get(feed_url, [{'content': asn_ranges, 'headers': validators}, {'status_code': 304}])
+    feed_main('great_feed_name')
+    fingerprints = dict(integration_context['indicators_delta']['fingerprints'])
+    feed_main('great_feed_name')
+
+    assert fingerprints
+    assert integration_context['indicators_delta']['fingerprints'] == fingerprints
+    assert integration_context['feed_validators'] == {
+        feed_url: {'etag': '"5f2c4a"', 'last_modified': 'Thu, 06 Aug 2020 18:00:00 GMT'}
+    }
+    request_headers = requests_mock.last_request.headers
+    assert request_headers['If-None-Match'] == '"5f2c4a"'
+    assert request_headers['If-Modified-Since'] == 'Thu, 06 Aug 2020 18:00:00 GMT'
+    assert request_headers['Accept-Encoding'] == 'gzip, deflate'
+    assert demisto.createIndicators.call_count == 1
+
+
+def test_build_iterator_concurrent_fetch(mocker, requests_mock):
+    """
+    Given
+    - Two feed URLs, the first one slower to respond and configured with its own timeout.
+
+    When
+    - Building the iterator.
+
+    Then
+    - Ensure both URLs are fetched through the client session, each with its timeout, and streamed.
+    - Ensure the feeds are returned in the order they responded.
+    """
+    feed_url_to_config = {
+        'https://www.spamhaus.org/drop/slow.txt': {'indicator_type': 'IP', 'timeout': 60},
+        'https://www.spamhaus.org/drop/fast.txt': {'indicator_type': 'IP'}
+    }
+
+    requests_mock.get('https://www.spamhaus.org/drop/slow.txt', text='1.1.1.1')
+    requests_mock.get('https://www.spamhaus.org/drop/fast.txt', text='2.2.2.2')
+    client = Client(url=list(feed_url_to_config), feed_url_to_config=feed_url_to_config, polling_timeout=10)
+    fetch_url = client.fetch_url
+
+    def delayed_fetch_url(url, headers, **kwargs):
+        if url.endswith('slow.txt'):
+            time.sleep(0.5)
+        return fetch_url(url, headers, **kwargs)
+
+    mocker.patch.object(client, 'fetch_url', side_effect=delayed_fetch_url)
+    results = client.build_iterator()
+
+    assert all(call[1]['stream'] for call in client.fetch_url.call_args_list)
+
+    assert {request.path: request.timeout for request in requests_mock.request_history} == {
+        '/drop/slow.txt': 60,
+        '/drop/fast.txt': 10
+    }
+    assert [list(result.keys()) for result in results] == [
+        ['https://www.spamhaus.org/drop/fast.txt'],
+        ['https://www.spamhaus.org/drop/slow.txt']
+    ]
+    assert [list(lines) for result in results for lines in result.values()] == [['2.2.2.2'], ['1.1.1.1']]
@@ -8,6 +8,8 @@ from typing import List, Dict, Union, Optional
 # disable insecure warnings
 urllib3.disable_warnings()
 
+ACCEPT_ENCODING = 'gzip, deflate'
+
 
 class Client:
     def __init__(self, url: str = '', credentials: dict = None,
@@ -70,24 +72,43 @@ class Client:
                     self.auth = (username, password)
 
         self.cert = (cert_file, key_file) if cert_file and key_file else None
+        # The validators of the feeds fetched by the client, to be saved once their indicators are submitted
+        self.feed_validators: Dict[str, dict] = {}
+        # The feeds which were not fetched since they did not change since they were last fetched
+        self.not_modified_urls: List[str] = []
 
-    def build_iterator(self, **kwargs) -> List:
+    def build_iterator(self, conditional_fetch: bool = False, **kwargs) -> List:
+        """
+        For each feed, send an HTTP request to get it and extract its indicators
+        :param conditional_fetch: Whether to skip feeds which did not change since they were last fetched
+        :param kwargs: Arguments to send the request with
+        :return: List of the extracted indicators by the feed name
+        """
         results = []
+        headers = {'Accept-Encoding': ACCEPT_ENCODING}
+        if self.headers:
+            headers.update(self.headers)
         for feed_name, feed in self.feed_name_to_config.items():
+            url = feed.get('url', self.url)
             r = requests.get(
-                url=feed.get('url', self.url),
+                url=url,
                 verify=self.verify,
                 auth=self.auth,
                 cert=self.cert,
-                headers=self.headers,
+                headers=dict(headers, **get_conditional_headers(url)) if conditional_fetch else headers,
                 **kwargs
             )
+            if r.status_code == 304:
+                demisto.debug(f'{feed_name} - {url} was not modified since it was last fetched')
+                self.not_modified_urls.append(url)
+                continue
 
             try:
                 r.raise_for_status()
                 data = r.json()
                 result = jmespath.search(expression=feed.get('extractor'), data=data)
                 results.append({feed_name: result})
+                self.feed_validators[url] = get_response_validators(r)
 
             except ValueError as VE:
                 raise ValueError(f'Could not parse returned data to Json. \n\nError massage: {VE}')
@@ -212,9 +233,11 @@ def feed_main(params, feed_name, prefix):
 
         elif command == 'fetch-indicators':
             indicators = fetch_indicators_command(client, params.get('indicator_type'), feedTags,
-                                                  params.get('auto_detect_type'))
-            for b in batch(indicators, batch_size=2000):
-                demisto.createIndicators(b)
+                                                  params.get('auto_detect_type'),
+                                                  conditional_fetch=is_conditional_fetch_enabled())
+            # the indicators of unchanged feeds which were not fetched are missing, so their fingerprints are kept
+            create_indicators_delta(indicators, full_feed=not client.not_modified_urls)
+            save_feed_validators(client.feed_validators)
 
         elif command == f'{prefix}get-indicators':
             # dummy command for testing
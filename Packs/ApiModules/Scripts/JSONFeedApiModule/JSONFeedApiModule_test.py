@@ -121,3 +121,31 @@ def test_list_of_indicators_with_no_json_object():
         assert indicators[0].get('value') == '1.1.1.1'
         assert indicators[0].get('type') == 'IP'
         assert indicators[1].get('rawJSON') == {'indicator': '2.2.2.2'}
+
+
+def test_json_feed_not_modified(mocker):
+    """
+    Given
+    - A JSON feed which did not change since it was last fetched.
+
+    When
+    - Fetching indicators with conditional fetching.
+
+    Then
+    - Ensure the feed validators are sent with the request and no indicators are returned.
+    """
+    url = 'https://ip-ranges.amazonaws.com/ip-ranges.json'
+    mocker.patch.object(demisto, 'getIntegrationContext', return_value={'feed_validators': {
+        url: {'last_modified': 'Thu, 06 Aug 2020 18:00:00 GMT'}
+    }})
+
+    with requests_mock.Mocker() as m:
+        m.get(url, status_code=304)
+        client = Client(url=url, extractor="prefixes[?service=='AMAZON']", indicator='ip_prefix')
+
+        indicators = fetch_indicators_command(client=client, indicator_type='CIDR', feedTags=['test'],
+                                              auto_detect=False, conditional_fetch=True)
+
+        assert m.last_request.headers['If-Modified-Since'] == 'Thu, 06 Aug 2020 18:00:00 GMT'
+    assert indicators == []
+    assert client.feed_validators == {}
@@ -2,11 +2,13 @@ import demistomock as demisto
 from CommonServerPython import *
 from CommonServerUserPython import *
 
-from typing import Union, Optional, List, Dict, Tuple
+from typing import Union, Optional, List, Dict, Tuple, Iterator
 from requests.sessions import merge_setting, CaseInsensitiveDict
 import re
 import copy
 import types
+import functools
+import concurrent.futures
 import urllib3
 from taxii2client import v20, v21
 from taxii2client.common import TokenAuth, _HTTPConnection
@@ -24,39 +26,40 @@ HEADER_USERNAME = "_header:"
 
 ERR_NO_COLL = "No collection is available for this user, please make sure you entered the configuration correctly"
 
-# Pattern Regexes - used to extract indicator type and value
-INDICATOR_OPERATOR_VAL_FORMAT_PATTERN = r"(\w.*?{value}{operator})'(.*?)'"
-INDICATOR_EQUALS_VAL_PATTERN = INDICATOR_OPERATOR_VAL_FORMAT_PATTERN.format(
-    value="value", operator="="
-)
-CIDR_ISSUBSET_VAL_PATTERN = INDICATOR_OPERATOR_VAL_FORMAT_PATTERN.format(
-    value="value", operator="ISSUBSET"
-)
-CIDR_ISUPPERSET_VAL_PATTERN = INDICATOR_OPERATOR_VAL_FORMAT_PATTERN.format(
-    value="value", operator="ISUPPERSET"
-)
-HASHES_EQUALS_VAL_PATTERN = INDICATOR_OPERATOR_VAL_FORMAT_PATTERN.format(
-    value=r"hashes\..*?", operator="="
+# Pattern Regex - scans a stix pattern for its `object-type:object.path OPERATOR 'value'` comparisons in a single pass
+STIX_COMPARISON_PATTERN = re.compile(
+    r"(?<![a-z0-9-])(?P<object_type>[a-z0-9-]+):(?P<object_path>[\w-]+(?:\.(?:[\w-]+|'[^']*')|\[[^\]]*\])*)"
+    r"\s*(?P<operator>=|ISSUBSET|ISUPPERSET)\s*'(?P<value>(?:[^'\\]|\\.)*)'"
 )
+STIX_STRING_ESCAPE_PATTERN = re.compile(r"\\(.)")
 
 TAXII_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
 TAXII_TIME_FORMAT_NO_MS = "%Y-%m-%dT%H:%M:%SZ"
+# Objects of a page usually share a few timestamps, so their parsed datetimes are cached
+STIX_TIME_CACHE_SIZE = 1024
 
+# (stix object type, first property of the object path) -> cortex type of the compared value
 STIX_2_TYPES_TO_CORTEX_TYPES = {
-    "ipv4-addr": FeedIndicatorType.IP,
-    "ipv6-addr": FeedIndicatorType.IPv6,
-    "domain": FeedIndicatorType.Domain,
-    "domain-name": FeedIndicatorType.Domain,
-    "url": FeedIndicatorType.URL,
-    "md5": FeedIndicatorType.File,
-    "sha-1": FeedIndicatorType.File,
-    "sha-256": FeedIndicatorType.File,
-    "file:hashes": FeedIndicatorType.File,
+    ("ipv4-addr", "value"): FeedIndicatorType.IP,
+    ("ipv6-addr", "value"): FeedIndicatorType.IPv6,
+    ("domain", "value"): FeedIndicatorType.Domain,
+    ("domain-name", "value"): FeedIndicatorType.Domain,
+    ("url", "value"): FeedIndicatorType.URL,
+    ("md5", "value"): FeedIndicatorType.File,
+    ("sha-1", "value"): FeedIndicatorType.File,
+    ("sha-256", "value"): FeedIndicatorType.File,
+    ("file", "hashes"): FeedIndicatorType.File,
 }
 
 STIX_2_TYPES_TO_CORTEX_CIDR_TYPES = {
-    "ipv4-addr": FeedIndicatorType.CIDR,
-    "ipv6-addr": FeedIndicatorType.IPv6CIDR,
+    ("ipv4-addr", "value"): FeedIndicatorType.CIDR,
+    ("ipv6-addr", "value"): FeedIndicatorType.IPv6CIDR,
+}
+
+STIX_2_OPERATORS_TO_CORTEX_TYPES = {
+    "=": STIX_2_TYPES_TO_CORTEX_TYPES,
+    "ISSUBSET": STIX_2_TYPES_TO_CORTEX_CIDR_TYPES,
+    "ISUPPERSET": STIX_2_TYPES_TO_CORTEX_CIDR_TYPES,
 }
 
 
@@ -121,14 +124,6 @@ class Taxii2FeedClient:
 
         self.field_map = field_map if field_map else {}
         self.tags = tags if tags else []
-        self.indicator_regexes = [
-            re.compile(INDICATOR_EQUALS_VAL_PATTERN),
-            re.compile(HASHES_EQUALS_VAL_PATTERN),
-        ]
-        self.cidr_regexes = [
-            re.compile(CIDR_ISSUBSET_VAL_PATTERN),
-            re.compile(CIDR_ISUPPERSET_VAL_PATTERN),
-        ]
 
     def init_server(self, version=TAXII_VER_2_0):
         """
@@ -218,6 +213,18 @@ class Taxii2FeedClient:
         :param limit: max amount of indicators to fetch
         :return: Cortex indicators list
         """
+        indicators: List[Dict[str, str]] = []
+        for page_indicators in self.poll_indicator_pages(limit, **kwargs):
+            indicators.extend(page_indicators)
+        return indicators
+
+    def poll_indicator_pages(self, limit: int = -1, **kwargs) -> Iterator[List[Dict[str, str]]]:
+        """
+        Polls the taxii server and yields the cortex indicators of each page of the result, while the next page is
+        fetched
+        :param limit: max amount of indicators to fetch
+        :return: Generator of the cortex indicators of each page
+        """
         if not isinstance(self.collection_to_fetch, (v20.Collection, v21.Collection)):
             raise DemistoException(
                 "Could not find a collection to fetch from. "
@@ -228,10 +235,9 @@ class Taxii2FeedClient:
 
         page_size = self.get_page_size(limit, limit)
         if page_size <= 0:
-            return []
+            return
         envelope = self.poll_collection(page_size, **kwargs)
-        indicators = self.extract_indicators_from_envelope_and_parse(envelope, limit)
-        return indicators
+        yield from self.parse_envelope_pages(envelope, limit)
 
     def extract_indicators_from_envelope_and_parse(
         self, envelope: Union[types.GeneratorType, Dict[str, str]], limit: int = -1
@@ -243,59 +249,83 @@ class Taxii2FeedClient:
         :param limit: max amount of indicators to fetch
         :return: Cortex indicators list
         """
-        indicators = []
+        indicators: List[Dict[str, str]] = []
+        for page_indicators in self.parse_envelope_pages(envelope, limit):
+            indicators.extend(page_indicators)
+        return indicators
+
+    def parse_envelope_pages(
+        self, envelope: Union[types.GeneratorType, Dict[str, str]], limit: int = -1
+    ) -> Iterator[List[Dict[str, str]]]:
+        """
+        Extract indicators from each page of an 2.0 envelope generator, or 2.1 envelope (which then polls the next
+        pages) and parses them as cortex indicators.
+        Once a page is yielded, last_fetched_indicator__modified covers all of its indicators, so a poll stopped
+        after the page can resume from it as `added_after`.
+        :param envelope: envelope containing stix objects
+        :param limit: max amount of indicators to fetch
+        :return: Generator of the cortex indicators of each page
+        """
+        indicators_cnt = 0
         obj_cnt = 0
-        # TAXII 2.0
-        if isinstance(envelope, types.GeneratorType):
-            for sub_envelope in envelope:
-                stix_objects = sub_envelope.get("objects")
-                if not stix_objects:
-                    # no fetched objects
-                    break
+        try:
+            for page in self.iter_envelope_pages(envelope, limit):
+                stix_objects = page.get("objects") or []
                 obj_cnt += len(stix_objects)
-                indicators.extend(
-                    self.parse_indicators_list(
-                        self.extract_indicators_from_stix_objects(stix_objects)
-                    )
+                indicators = self.parse_indicators_list(
+                    self.extract_indicators_from_stix_objects(stix_objects)
                 )
-                if 0 < limit <= len(indicators):
+                if limit > -1:
+                    indicators = indicators[:limit - indicators_cnt]
+                indicators_cnt += len(indicators)
+                yield indicators
+                if 0 < limit <= indicators_cnt:
                     break
-        # TAXII 2.1
-        elif isinstance(envelope, Dict):
-            cur_limit = limit
-            stix_objects = envelope.get("objects")
-            obj_cnt += len(stix_objects)
-            indicators_list = self.extract_indicators_from_stix_objects(stix_objects)
-            indicators = self.parse_indicators_list(indicators_list)
-            while envelope.get("more", False):
-                page_size = self.get_page_size(limit, cur_limit)
-                envelope = self.collection_to_fetch.get_objects(
-                    limit=page_size, next=envelope.get("next", "")
-                )
-                if isinstance(envelope, Dict):
-                    stix_objects = envelope.get("objects")
-                    obj_cnt += len(stix_objects)
-                    extracted_iocs = self.extract_indicators_from_stix_objects(
-                        stix_objects
-                    )
-                    parsed_iocs = self.parse_indicators_list(extracted_iocs)
-                    indicators.extend(parsed_iocs)
+        finally:
+            demisto.debug(
+                f"TAXII 2 Feed has extracted {indicators_cnt} indicators / {obj_cnt} stix objects"
+            )
 
-                    if limit > -1:
-                        cur_limit -= len(envelope)  # type: ignore
-                        if cur_limit < 0:
-                            break
-                else:
-                    raise DemistoException(
-                        "Error: TAXII 2 client received the following response while requesting "
-                        f"indicators: {str(envelope)}\n\nExpected output is json"
-                    )
-        demisto.debug(
-            f"TAXII 2 Feed has extracted {len(indicators)} indicators / {obj_cnt} stix objects"
-        )
-        if limit > -1:
-            return indicators[:limit]
-        return indicators
+    def iter_envelope_pages(
+        self, envelope: Union[types.GeneratorType, Dict[str, str]], limit: int = -1
+    ) -> Iterator[Dict[str, str]]:
+        """
+        Iterates the pages of an 2.0 envelope generator, or of a 2.1 envelope (polling the next pages).
+        The next page is requested in the background while the current one is processed.
+        :param envelope: envelope containing stix objects
+        :param limit: max amount of indicators to fetch, to size the requested pages
+        :return: Generator of the page envelopes
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            # TAXII 2.0
+            if isinstance(envelope, types.GeneratorType):
+                next_page = executor.submit(next, envelope, None)
+                while True:
+                    page = next_page.result()
+                    if not page or not page.get("objects"):
+                        # no fetched objects
+                        break
+                    next_page = executor.submit(next, envelope, None)
+                    yield page
+            # TAXII 2.1
+            elif isinstance(envelope, Dict):
+                page_size = self.get_page_size(limit, limit)
+                page = envelope
+                while True:
+                    more = page.get("more", False)
+                    if more:
+                        next_page = executor.submit(
+                            self.collection_to_fetch.get_objects, limit=page_size, next=page.get("next", "")
+                        )
+                    yield page
+                    if not more:
+                        break
+                    page = next_page.result()
+                    if not isinstance(page, Dict):
+                        raise DemistoException(
+                            "Error: TAXII 2 client received the following response while requesting "
+                            f"indicators: {str(page)}\n\nExpected output is json"
+                        )
 
     def poll_collection(
         self, page_size: int, **kwargs
@@ -373,68 +403,13 @@ class Taxii2FeedClient:
         :param indicator_obj: indicator object
         :return: list of indicators extracted from the object in cortex format
         """
-        field_map = self.field_map if self.field_map else {}
         pattern = indicator_obj.get("pattern")
-        indicators = []
-        if pattern:
-            # this is done in case the server doesn't properly space the operator,
-            # supported indicators have no spaces, so this action shouldn't affect extracted values
-            trimmed_pattern = pattern.replace(" ", "")
-
-            indicator_groups = self.extract_indicator_groups_from_pattern(
-                trimmed_pattern, self.indicator_regexes
-            )
-            indicators.extend(
-                self.get_indicators_from_indicator_groups(
-                    indicator_groups,
-                    indicator_obj,
-                    STIX_2_TYPES_TO_CORTEX_TYPES,
-                    field_map,
-                )
-            )
-
-            cidr_groups = self.extract_indicator_groups_from_pattern(
-                trimmed_pattern, self.cidr_regexes
-            )
-            indicators.extend(
-                self.get_indicators_from_indicator_groups(
-                    cidr_groups,
-                    indicator_obj,
-                    STIX_2_TYPES_TO_CORTEX_CIDR_TYPES,
-                    field_map,
-                )
-            )
-
-        return indicators
-
-    def get_indicators_from_indicator_groups(
-        self,
-        indicator_groups: List[Tuple[str, str]],
-        indicator_obj: Dict[str, str],
-        indicator_types: Dict[str, str],
-        field_map: Dict[str, str],
-    ) -> List[Dict[str, str]]:
-        """
-        Get indicators from indicator regex groups
-        :param indicator_groups: caught regex group in pattern of: [`type`, `indicator`]
-        :param indicator_obj: taxii indicator object
-        :param indicator_types: supported indicator types -> cortex types
-        :param field_map: map used to create fields entry ({field_name: field_value})
-        :return: Indicators list
-        """
-        indicators = []
-        if indicator_groups:
-            for term in indicator_groups:
-                for taxii_type in indicator_types.keys():
-                    # term should be list with 2 argument parsed with regex - [`type`, `indicator`]
-                    if len(term) == 2 and taxii_type in term[0]:
-                        type_ = indicator_types[taxii_type]
-                        value = term[1]
-                        indicator = self.create_indicator(
-                            indicator_obj, type_, value, field_map
-                        )
-                        indicators.append(indicator)
-                        break
+        if not pattern:
+            return []
+        indicators = [
+            self.create_indicator(indicator_obj, type_, value, self.field_map)
+            for type_, value in self.extract_indicator_values_from_pattern(pattern)
+        ]
         if self.skip_complex_mode and len(indicators) > 1:
             # we managed to pull more than a single indicator - indicating complex relationship
             return []
@@ -485,23 +460,24 @@ class Taxii2FeedClient:
         return indicator
 
     @staticmethod
-    def extract_indicator_groups_from_pattern(
-        pattern: str, regexes: List
-    ) -> List[Tuple[str, str]]:
+    def extract_indicator_values_from_pattern(pattern: str) -> List[Tuple[str, str]]:
         """
-        Extracts indicator [`type`, `indicator`] groups from pattern
+        Extracts the supported indicators from a stix pattern, scanning its comparisons once
         :param pattern: stix pattern
-        :param regexes: regexes to run to pattern
-        :return: extracted indicators list from pattern
+        :return: [`cortex type`, `indicator`] of each supported comparison in the pattern
         """
-        groups: List[Tuple[str, str]] = []
-        for regex in regexes:
-            find_result = regex.findall(pattern)
-            if find_result:
-                groups.extend(find_result)
-        return groups
+        values = []
+        for match in STIX_COMPARISON_PATTERN.finditer(pattern):
+            object_type, object_path, operator, value = match.groups()
+            type_ = STIX_2_OPERATORS_TO_CORTEX_TYPES[operator].get(
+                (object_type, object_path.split(".", 1)[0])
+            )
+            if type_:
+                values.append((type_, STIX_STRING_ESCAPE_PATTERN.sub(r"\1", value)))
+        return values
 
     @staticmethod
+    @functools.lru_cache(maxsize=STIX_TIME_CACHE_SIZE)
     def stix_time_to_datetime(s_time):
         """
         Converts datetime to str in "%Y-%m-%dT%H:%M:%S.%fZ" format
@@ -1,6 +1,7 @@
 from CommonServerPython import *
 from TAXII2ApiModule import Taxii2FeedClient, TAXII_VER_2_1, HEADER_USERNAME
 from taxii2client import v20, v21
+from collections import Counter
 import pytest
 import json
 
@@ -13,6 +14,9 @@ with open('test_data/stix_envelope_17-19.json', 'r') as f:
 with open('test_data/stix_envelope_complex_20-19.json', 'r') as f:
     STIX_ENVELOPE_20_IOCS_19_OBJS = json.load(f)
 
+with open('test_data/stix_envelope_pattern_benchmark_600.json', 'r') as f:
+    STIX_ENVELOPE_PATTERN_BENCHMARK = json.load(f)
+
 with open('test_data/cortex_parsed_indicators_17-19.json', 'r') as f:
     CORTEX_17_IOCS_19_OBJS = json.load(f)
 
@@ -320,3 +324,127 @@ class TestExtractIndicatorsAndParse:
 
         assert len(actual) == 14
         assert actual == expected
+
+
+class TestPollIndicatorPages:
+    """
+    Scenario: Poll the indicators page by page
+    """
+    def test_21_pages(self, mocker):
+        """
+        Scenario: Poll a 2.1 collection with two pages
+
+        Given:
+        - A 2.1 collection, where the first page has more objects after it
+
+        When:
+        - poll_indicator_pages is called
+
+        Then:
+        - Ensure the next page is requested with the `next` of the first page
+        - Ensure the indicators of each page are yielded separately
+        """
+        first_page = dict(STIX_ENVELOPE_17_IOCS_19_OBJS, more=True, next='page2')
+        mock_client = Taxii2FeedClient(url='', collection_to_fetch=None, proxies=[], verify=False)
+        mocker.patch.object(mock_client, 'collection_to_fetch', spec=v21.Collection)
+        mock_client.collection_to_fetch.get_objects.side_effect = [first_page, STIX_ENVELOPE_17_IOCS_19_OBJS]
+
+        pages = list(mock_client.poll_indicator_pages())
+
+        assert pages == [CORTEX_17_IOCS_19_OBJS, CORTEX_17_IOCS_19_OBJS]
+        assert mock_client.collection_to_fetch.get_objects.call_args_list[1][1] == {'limit': 100, 'next': 'page2'}
+        assert mock_client.last_fetched_indicator__modified is not None
+
+    def test_21_pages_limit(self, mocker):
+        """
+        Scenario: Poll a 2.1 collection with a limit smaller than the first page
+
+        Given:
+        - A 2.1 collection, where the first page has 17 indicators and more objects after it
+        - Limit is 10
+
+        When:
+        - build_iterator is called
+
+        Then:
+        - Ensure only the first 10 indicators are returned
+        """
+        first_page = dict(STIX_ENVELOPE_17_IOCS_19_OBJS, more=True, next='page2')
+        mock_client = Taxii2FeedClient(url='', collection_to_fetch=None, proxies=[], verify=False)
+        mocker.patch.object(mock_client, 'collection_to_fetch', spec=v21.Collection)
+        mock_client.collection_to_fetch.get_objects.side_effect = [first_page, STIX_ENVELOPE_17_IOCS_19_OBJS]
+
+        iocs = mock_client.build_iterator(limit=10)
+
+        assert iocs == CORTEX_17_IOCS_19_OBJS[:10]
+
+    def test_20_pages(self):
+        """
+        Scenario: Parse the pages of a 2.0 envelope generator
+
+        Given:
+        - A 2.0 envelope generator with two pages of objects, followed by an empty page
+
+        When:
+        - parse_envelope_pages is called
+
+        Then:
+        - Ensure the indicators of the two pages are yielded, and the pages after the empty page are not requested
+        """
+        envelope = (page for page in [STIX_ENVELOPE_17_IOCS_19_OBJS, STIX_ENVELOPE_17_IOCS_19_OBJS,
+                                      {'objects': []}, STIX_ENVELOPE_17_IOCS_19_OBJS])
+        mock_client = Taxii2FeedClient(url='', collection_to_fetch=None, proxies=[], verify=False)
+
+        pages = list(mock_client.parse_envelope_pages(envelope))
+
+        assert pages == [CORTEX_17_IOCS_19_OBJS, CORTEX_17_IOCS_19_OBJS]
+
+
+class TestExtractIndicatorValuesFromPattern:
+    """
+    Scenario: Extract the indicators of stix patterns
+    """
+    @pytest.mark.parametrize('pattern, expected', [
+        ("[ipv4-addr:value = '1.1.1.1']", [('IP', '1.1.1.1')]),
+        ("[ipv4-addr:value='1.1.1.1']AND[domain-name:value='a.com']", [('IP', '1.1.1.1'), ('Domain', 'a.com')]),
+        ("[ipv6-addr:value ISSUBSET '2001:db8::/32']", [('IPv6CIDR', '2001:db8::/32')]),
+        ("[file:hashes.'SHA-256' = 'abc' OR file:hashes.MD5 = 'def']", [('File', 'abc'), ('File', 'def')]),
+        ("[url:value = 'http://a.com/it\\'s a path']", [('URL', "http://a.com/it's a path")]),
+        ("[email-addr:value = 'a@a.com' AND network-traffic:dst_ref.value = '1.1.1.1']", []),
+        ("[ipv4-addr:value != '1.1.1.1']", []),
+    ])
+    def test_patterns(self, pattern, expected):
+        """
+        Given:
+        - A stix pattern
+
+        When:
+        - extract_indicator_values_from_pattern is called
+
+        Then:
+        - Ensure the type and value of each supported comparison are extracted, in the order of the pattern
+        """
+        assert Taxii2FeedClient.extract_indicator_values_from_pattern(pattern) == expected
+
+    @pytest.mark.parametrize('skip_complex_mode, expected_count', [(False, 600), (True, 400)])
+    def test_benchmark_corpus(self, skip_complex_mode, expected_count):
+        """
+        Given:
+        - The pattern benchmark corpus, with 600 indicators of 12 pattern kinds - 100 of them are complex patterns
+          with 2 supported comparisons, and 100 have no supported comparison
+
+        When:
+        - extract_indicators_from_envelope_and_parse is called
+
+        Then:
+        - Ensure the indicators of each type are extracted from the corpus
+        """
+        mock_client = Taxii2FeedClient(url='', collection_to_fetch='', proxies=[], verify=False,
+                                       skip_complex_mode=skip_complex_mode)
+        indicators = mock_client.extract_indicators_from_envelope_and_parse(STIX_ENVELOPE_PATTERN_BENCHMARK)
+
+        assert len(indicators) == expected_count
+        if not skip_complex_mode:
+            assert Counter(indicator['type'] for indicator in indicators) == {
+                'IP': 100, 'IPv6': 50, 'Domain': 100, 'URL': 100, 'File': 200, 'CIDR': 50
+            }
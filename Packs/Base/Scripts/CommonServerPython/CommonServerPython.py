@@ -6,6 +6,7 @@ Note that adding code to CommonServerUserPython can override functions in Common
 from __future__ import print_function
 
 import base64
+import hashlib
 import json
 import logging
 import os
@@ -4033,5 +4034,242 @@ def update_integration_context(context, object_keys=None, sync=True):
     return integration_context, version
 
 
+INDICATORS_DELTA_CONTEXT_KEY = 'indicators_delta'
+INDICATORS_FULL_SUBMISSION_HOURS = 24
+# Feed expiration policies which expire indicators that are not submitted again by the next fetches
+RESUBMISSION_EXPIRATION_POLICIES = ('suddenDeath', 'interval')
+FEED_VALIDATORS_CONTEXT_KEY = 'feed_validators'
+
+
+class IndicatorsDelta(object):
+    """
+    Keeps a fingerprint of each indicator a feed submitted, to find the indicators which are new or changed since the
+    last fetch.
+
+    :type integration_context: ``dict``
+    :param integration_context: The integration context to keep the fingerprints in.
+
+    :type full_submission_hours: ``int``
+    :param full_submission_hours: The hours after which all the indicators are submitted again, to refresh them.
+
+    :return: The IndicatorsDelta object
+    :rtype: ``IndicatorsDelta``
+    """
+
+    def __init__(self, integration_context, full_submission_hours=INDICATORS_FULL_SUBMISSION_HOURS):
+        self.integration_context = integration_context
+        self.full_submission_hours = full_submission_hours
+        delta = integration_context.get(INDICATORS_DELTA_CONTEXT_KEY) or {}
+        self.fingerprints = delta.get('fingerprints', {})
+        self.full_submission_time = delta.get('full_submission_time', 0)
+
+    @staticmethod
+    def _digest(obj):
+        return hashlib.sha256(json.dumps(obj, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def get_key(indicator):
+        """
+        Gets the fingerprint key of an indicator, by its value and type.
+
+        :type indicator: ``dict``
+        :param indicator: The indicator.
+
+        :return: The indicator key.
+        :rtype: ``str``
+        """
+        return IndicatorsDelta._digest([indicator.get('type'), indicator.get('value')])
+
+    @staticmethod
+    def get_fingerprint(indicator):
+        """
+        Gets the fingerprint of an indicator, by all its fields.
+
+        :type indicator: ``dict``
+        :param indicator: The indicator.
+
+        :return: The indicator fingerprint.
+        :rtype: ``str``
+        """
+        return IndicatorsDelta._digest(indicator)
+
+    def is_full_submission_due(self):
+        """
+        Checks whether all the indicators should be submitted, since the last full submission was more than
+        full_submission_hours ago.
+
+        :return: True if all the indicators should be submitted.
+        :rtype: ``bool``
+        """
+        return time.time() - self.full_submission_time >= self.full_submission_hours * 3600
+
+    def get_delta(self, indicators, full_feed=True):
+        """
+        Gets the indicators which are new or changed since they were last submitted, and updates the fingerprints.
+
+        :type indicators: ``list``
+        :param indicators: The fetched indicators.
+
+        :type full_feed: ``bool``
+        :param full_feed: Whether the indicators are the full feed. If so, the fingerprints of indicators which were
+            removed from the feed are dropped. Otherwise, they are kept until the next full submission.
+
+        :return: The indicators to submit, and the number of indicators removed from the feed.
+        :rtype: ``tuple``
+        """
+        full_submission = self.is_full_submission_due()
+        fingerprints = {} if full_feed or full_submission else self.fingerprints
+        previous_fingerprints = self.fingerprints
+        delta = []
+        for indicator in indicators:
+            key = self.get_key(indicator)
+            fingerprint = self.get_fingerprint(indicator)
+            if full_submission or previous_fingerprints.get(key) != fingerprint:
+                delta.append(indicator)
+            fingerprints[key] = fingerprint
+
+        removed = len(previous_fingerprints) - sum(1 for key in previous_fingerprints if key in fingerprints)
+        self.fingerprints = fingerprints
+        if full_submission and delta:
+            self.full_submission_time = int(time.time())
+
+        return delta, removed
+
+    def update_context(self):
+        """
+        Sets the fingerprints to the integration context. The integration context should then be saved by the caller.
+        """
+        self.integration_context[INDICATORS_DELTA_CONTEXT_KEY] = {
+            'fingerprints': self.fingerprints,
+            'full_submission_time': self.full_submission_time
+        }
+
+
+def create_indicators_delta(indicators, full_feed=True, batch_size=2000, integration_context=None,
+                            full_submission_hours=INDICATORS_FULL_SUBMISSION_HOURS):
+    """
+    Submits the fetched indicators of a feed in batches, skipping the indicators which were already submitted
+    unchanged by a previous fetch.
+    All the indicators are submitted every full_submission_hours, and on every fetch if the feed expiration policy
+    expires indicators which are not submitted again.
+
+    :type indicators: ``list``
+    :param indicators: The fetched indicators.
+
+    :type full_feed: ``bool``
+    :param full_feed: Whether the indicators are the full feed, or only part of it - e.g. the ones added since the
+        last fetch, or when some of the feed URLs were not fetched since they did not change.
+
+    :type batch_size: ``int``
+    :param batch_size: The number of indicators to submit at once.
+
+    :type integration_context: ``dict``
+    :param integration_context: The integration context to keep the indicators fingerprints in. If given, it is
+        updated and should be saved by the caller. Otherwise, the integration context is read and saved here.
+
+    :type full_submission_hours: ``int``
+    :param full_submission_hours: The hours after which all the indicators are submitted again, to refresh them.
+
+    :return: The number of submitted indicators.
+    :rtype: ``int``
+    """
+    save_context = False
+    if demisto.params().get('feedExpirationPolicy') in RESUBMISSION_EXPIRATION_POLICIES:
+        delta = indicators
+    else:
+        save_context = integration_context is None
+        if save_context:
+            integration_context = demisto.getIntegrationContext() or {}
+        indicators_delta = IndicatorsDelta(integration_context, full_submission_hours)
+        delta, removed = indicators_delta.get_delta(indicators, full_feed)
+        indicators_delta.update_context()
+        demisto.debug('Submitting {} new or changed indicators out of {} fetched, {} indicators were removed from '
+                      'the feed.'.format(len(delta), len(indicators), removed))
+
+    for i in range(0, len(delta), batch_size):
+        demisto.createIndicators(delta[i:i + batch_size])
+
+    if save_context:
+        demisto.setIntegrationContext(integration_context)
+
+    return len(delta)
+
+
+def is_conditional_fetch_enabled():
+    """
+    Checks whether feeds which did not change since their last fetch can be skipped.
+    The indicators of a skipped feed are not submitted again, so feeds are skipped only when their indicators do not
+    expire by not being submitted, and not when all the indicators are due to be submitted again.
+
+    :return: True if unchanged feeds can be skipped.
+    :rtype: ``bool``
+    """
+    if demisto.params().get('feedExpirationPolicy') in RESUBMISSION_EXPIRATION_POLICIES:
+        return False
+    return not IndicatorsDelta(demisto.getIntegrationContext() or {}).is_full_submission_due()
+
+
+def get_conditional_headers(url):
+    """
+    Gets the headers making the feed server respond with 304 Not Modified if the feed did not change since it was
+    last fetched.
+
+    :type url: ``str``
+    :param url: The feed URL.
+
+    :return: The If-None-Match and If-Modified-Since headers, according to the feed validators.
+    :rtype: ``dict``
+    """
+    validators = (demisto.getIntegrationContext() or {}).get(FEED_VALIDATORS_CONTEXT_KEY, {}).get(url, {})
+    headers = {}
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+    return headers
+
+
+def get_response_validators(response):
+    """
+    Gets the validators of a feed response, to be sent with the next request for the feed.
+
+    :type response: ``requests.Response``
+    :param response: The feed response.
+
+    :return: The ETag and Last-Modified headers of the response.
+    :rtype: ``dict``
+    """
+    validators = {}
+    if response.headers.get('ETag'):
+        validators['etag'] = response.headers['ETag']
+    if response.headers.get('Last-Modified'):
+        validators['last_modified'] = response.headers['Last-Modified']
+    return validators
+
+
+def save_feed_validators(feed_validators):
+    """
+    Saves the validators of the fetched feeds to the integration context.
+    Should be called only after the indicators of the feeds were submitted.
+
+    :type feed_validators: ``dict``
+    :param feed_validators: The validators of each fetched feed, by the feed URL.
+
+    :return: No data returned.
+    :rtype: ``None``
+    """
+    if not feed_validators:
+        return
+    integration_context = demisto.getIntegrationContext() or {}
+    validators = integration_context.get(FEED_VALIDATORS_CONTEXT_KEY, {})
+    for url, url_validators in feed_validators.items():
+        if url_validators:
+            validators[url] = url_validators
+        else:
+            validators.pop(url, None)
+    integration_context[FEED_VALIDATORS_CONTEXT_KEY] = validators
+    demisto.setIntegrationContext(integration_context)
+
+
 class DemistoException(Exception):
     pass
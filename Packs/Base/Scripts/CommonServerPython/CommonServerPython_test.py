@@ -5,6 +5,7 @@ import json
 import re
 import os
 import sys
+import time
 import requests
 from pytest import raises, mark
 import pytest
@@ -2274,3 +2275,150 @@ def test_set_latest_integration_context_fail(mocker):
 
     # Assert
     assert int_context_calls == CommonServerPython.CONTEXT_UPDATE_RETRY_TIMES
+
+
+class TestCreateIndicatorsDelta:
+    INDICATORS = [
+        {'value': '1.1.1.1', 'type': 'IP', 'rawJSON': {'value': '1.1.1.1'}, 'fields': {'tags': ['a']}},
+        {'value': '2.2.2.2', 'type': 'IP', 'rawJSON': {'value': '2.2.2.2'}, 'fields': {'tags': ['a']}},
+        {'value': 'example.com', 'type': 'Domain', 'rawJSON': {'value': 'example.com'}, 'fields': {}}
+    ]
+
+    @staticmethod
+    def mock_demisto(mocker, integration_context, params=None):
+        mocker.patch.object(demisto, 'params', return_value=params or {})
+        mocker.patch.object(demisto, 'createIndicators')
+        mocker.patch.object(demisto, 'getIntegrationContext', side_effect=lambda: dict(integration_context))
+        mocker.patch.object(demisto, 'setIntegrationContext', side_effect=integration_context.update)
+
+    def test_create_indicators_delta(self, mocker):
+        """
+        Given
+        - Indicators which were submitted by a previous fetch.
+
+        When
+        - Fetching the indicators again, with one of them changed, one removed and one added.
+
+        Then
+        - Ensure all the indicators are submitted by the first fetch.
+        - Ensure only the changed and added indicators are submitted by the second fetch.
+        """
+        from CommonServerPython import create_indicators_delta
+        integration_context = {}
+        self.mock_demisto(mocker, integration_context)
+        create_indicators_delta(self.INDICATORS)
+        changed_indicator = dict(self.INDICATORS[0], fields={'tags': ['a', 'b']})
+        new_indicator = {'value': '3.3.3.3', 'type': 'IP', 'rawJSON': {'value': '3.3.3.3'}, 'fields': {}}
+
+        submitted = create_indicators_delta([changed_indicator, self.INDICATORS[1], new_indicator], batch_size=1)
+
+        batches = [call[0][0] for call in demisto.createIndicators.call_args_list]
+        assert batches[0] == self.INDICATORS
+        assert submitted == 2
+        assert batches[1:] == [[changed_indicator], [new_indicator]]
+        assert len(integration_context['indicators_delta']['fingerprints']) == 3
+
+    def test_create_indicators_delta_full_submission(self, mocker):
+        """
+        Given
+        - Indicators which were submitted unchanged more than a day ago, or with a sudden death expiration policy.
+
+        When
+        - Fetching the indicators again.
+
+        Then
+        - Ensure all the indicators are submitted.
+        """
+        from CommonServerPython import create_indicators_delta, IndicatorsDelta
+        integration_context = {}
+        indicators_delta = IndicatorsDelta(integration_context)
+        indicators_delta.get_delta(self.INDICATORS)
+        indicators_delta.update_context()
+
+        integration_context['indicators_delta']['full_submission_time'] -= 24 * 3600
+        self.mock_demisto(mocker, integration_context)
+        assert create_indicators_delta(self.INDICATORS) == 3
+
+        self.mock_demisto(mocker, integration_context, {'feedExpirationPolicy': 'suddenDeath'})
+        assert create_indicators_delta(self.INDICATORS) == 3
+
+        self.mock_demisto(mocker, integration_context)
+        assert create_indicators_delta(self.INDICATORS) == 0
+
+    def test_feed_validators(self, mocker):
+        """
+        Given
+        - A feed response with ETag and Last-Modified headers.
+
+        When
+        - Saving the response validators, and getting the conditional headers of the next fetch.
+
+        Then
+        - Ensure the conditional headers match the saved validators.
+        - Ensure conditional fetching is disabled when indicators expire by not being submitted again, or when all
+          the indicators are due to be submitted again.
+        """
+        from CommonServerPython import get_conditional_headers, get_response_validators, save_feed_validators, \
+            is_conditional_fetch_enabled
+        integration_context = {'indicators_delta': {'fingerprints': {}, 'full_submission_time': int(time.time())}}
+        self.mock_demisto(mocker, integration_context)
+        response = mocker.Mock(headers={'ETag': '"abc"', 'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+
+        save_feed_validators({'https://feed.example.com': get_response_validators(response)})
+
+        assert is_conditional_fetch_enabled()
+        assert get_conditional_headers('https://feed.example.com') == {
+            'If-None-Match': '"abc"', 'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT'}
+        assert get_conditional_headers('https://other.example.com') == {}
+        self.mock_demisto(mocker, integration_context, {'feedExpirationPolicy': 'suddenDeath'})
+        assert not is_conditional_fetch_enabled()
+        self.mock_demisto(mocker, {})
+        assert not is_conditional_fetch_enabled()
+
+    def test_get_delta_incremental_feed(self):
+        """
+        Given
+        - Indicators which were submitted by a previous fetch of a feed which returns only the indicators added
+          since the last fetch.
+
+        When
+        - Getting the delta of the next fetch.
+
+        Then
+        - Ensure the fingerprints of the previous indicators are kept.
+        """
+        from CommonServerPython import IndicatorsDelta
+        indicators_delta = IndicatorsDelta({})
+        indicators_delta.get_delta(self.INDICATORS[:2], full_feed=False)
+
+        delta, removed = indicators_delta.get_delta(self.INDICATORS[1:], full_feed=False)
+
+        assert delta == self.INDICATORS[2:]
+        assert removed == 0
+        assert len(indicators_delta.fingerprints) == 3
+
+    def test_get_delta_full_submission(self):
+        """
+        Given
+        - Fingerprints of an incremental feed, whose last full submission was more than a day ago.
+
+        When
+        - Getting the delta of a fetch with no indicators, and then of a fetch with indicators.
+
+        Then
+        - Ensure the full submission time is not updated when nothing was submitted.
+        - Ensure all the fetched indicators are submitted, and the older fingerprints are dropped.
+        """
+        from CommonServerPython import IndicatorsDelta
+        indicators_delta = IndicatorsDelta({})
+        indicators_delta.get_delta(self.INDICATORS[:2], full_feed=False)
+        indicators_delta.full_submission_time -= 24 * 3600
+        full_submission_time = indicators_delta.full_submission_time
+
+        indicators_delta.get_delta([], full_feed=False)
+        assert indicators_delta.full_submission_time == full_submission_time
+
+        delta, _ = indicators_delta.get_delta(self.INDICATORS[1:], full_feed=False)
+        assert delta == self.INDICATORS[1:]
+        assert indicators_delta.full_submission_time > full_submission_time
+        assert len(indicators_delta.fingerprints) == 2
@@ -1,19 +1,33 @@
 import demistomock as demisto
 from CommonServerPython import *
 from CommonServerUserPython import *
+import base64
 import hashlib
+import heapq
+import itertools
 import secrets
 import string
-import tempfile
+import zlib
 from datetime import timezone
-from typing import Dict, Optional, List, Tuple, Union
+from typing import Dict, Optional, List, Tuple, Union, Iterable, Iterator, Set
 from dateutil.parser import parse
 from urllib3 import disable_warnings
-from math import ceil
 
 
 disable_warnings()
 DEMISTO_TIME_FORMAT: str = '%Y-%m-%dT%H:%M:%SZ'
+# searchIndicators page sizes, the page size grows from the initial to the max size while pages come back full
+INITIAL_PAGE_SIZE: int = 200
+MAX_PAGE_SIZE: int = 3200
+# size of the uncompressed multipart body chunks that are compressed and sent
+UPLOAD_CHUNK_SIZE: int = 64 * 1024
+# integration context key of the {value digest: XDR IOC digest} ledger of what XDR already has
+LEDGER_KEY: str = 'ledger'
+LEDGER_KEY_SIZE: int = 8
+LEDGER_DIGEST_SIZE: int = 4
+LEDGER_RECORD_SIZE: int = LEDGER_KEY_SIZE + LEDGER_DIGEST_SIZE
+# the most IOCs the ledger holds, about 4MB in the integration context
+LEDGER_MAX_SIZE: int = 250000
 xdr_types_to_demisto: Dict = {
     "DOMAIN_NAME": 'Domain',
     "HASH": 'File',
@@ -53,9 +67,10 @@ class Client:
 
     def http_request(self, url_suffix: str, requests_kwargs) -> Dict:
         url: str = f'{self._base_url}{url_suffix}'
+        headers: Dict = dict(self._headers, **requests_kwargs.pop('headers', {}))
         res = requests.post(url=url,
                             verify=self._verify_cert,
-                            headers=self._headers,
+                            headers=headers,
                             **requests_kwargs)
 
         if res.status_code in self.error_codes:
@@ -87,15 +102,44 @@ def get_headers(params: Dict) -> Dict:
     return headers
 
 
-def get_requests_kwargs(_json=None, file_path: Optional[str] = None) -> Dict:
+def get_requests_kwargs(_json=None, lines: Optional[Iterable[str]] = None) -> Dict:
     if _json is not None:
         return {'data': json.dumps({"request_data": _json})}
-    elif file_path is not None:
-        return {'files': [('file', ('iocs.json', open(file_path, 'rb'), 'application/json'))]}
+    elif lines is not None:
+        boundary: str = secrets.token_hex(16)
+        return {'data': stream_multipart_file(lines, boundary),
+                'headers': {'Content-Type': f'multipart/form-data; boundary={boundary}', 'Content-Encoding': 'gzip'}}
     else:
         return {}
 
 
+def stream_multipart_file(lines: Iterable[str], boundary: str) -> Iterator[bytes]:
+    """
+    Yields a gzip compressed multipart/form-data body with the lines as the 'iocs.json' file, compressed in chunks of
+    UPLOAD_CHUNK_SIZE, so the upload is sent while the IOCs are still being searched and the body is never held in
+    memory nor on disk.
+    requests sends a generator body with 'Transfer-Encoding: chunked', there is no Content-Length as the compressed
+    size is known only once the IOCs search ends.
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)  # gzip container, as declared by Content-Encoding
+    chunk: List[bytes] = [(f'--{boundary}\r\n'
+                           'Content-Disposition: form-data; name="file"; filename="iocs.json"\r\n'
+                           'Content-Type: application/json\r\n\r\n').encode()]
+    chunk_size: int = len(chunk[0])
+    for line in lines:
+        data = line.encode()
+        chunk.append(data)
+        chunk_size += len(data)
+        if chunk_size >= UPLOAD_CHUNK_SIZE:
+            compressed = compressor.compress(b''.join(chunk))
+            if compressed:
+                yield compressed
+            chunk = []
+            chunk_size = 0
+    chunk.append(f'\r\n--{boundary}--\r\n'.encode())
+    yield compressor.compress(b''.join(chunk)) + compressor.flush()
+
+
 def prepare_get_changes(time_stamp: int) -> Tuple[str, Dict]:
     url_suffix: str = 'get_changes'
     _json: Dict = {'last_update_ts': time_stamp}
@@ -114,31 +158,132 @@ def prepare_disable_iocs(iocs: str) -> Tuple[str, List]:
     return url_suffix, _json
 
 
-def create_file_iocs_to_keep(file_path, batch_size: int = 200):
-    with open(file_path, 'a') as _file:
-        total_size: int = get_iocs_size()
-        for i in range(0, ceil(total_size / batch_size)):
-            iocs: List = get_iocs(page=i, size=batch_size)
-            for ios in map(lambda x: x.get('value', ''), iocs):
-                _file.write(ios + '\n')
+def iocs_to_keep_lines(ledger: Optional['Ledger'] = None, kept_keys: Optional[Set[bytes]] = None) -> Iterator[str]:
+    """
+    Yields the value of every IOC to keep in XDR, adding its ledger key to kept_keys if it's in the ledger.
+    """
+    for iocs in get_iocs_pages():
+        for value in map(lambda x: x.get('value', ''), iocs):
+            if ledger is not None and kept_keys is not None:
+                key: bytes = get_ledger_key(value)
+                if key in ledger:
+                    kept_keys.add(key)
+            yield value + '\n'
+
+
+def iocs_to_sync_lines(ledger: Optional['Ledger'] = None) -> Iterator[str]:
+    """
+    Yields every IOC to sync in the XDR format, recording it in the ledger.
+    """
+    for iocs in get_iocs_pages():
+        for ioc in map(lambda x: demisto_ioc_to_xdr(x), iocs):
+            if ioc:
+                if ledger is not None:
+                    ledger[get_ledger_key(ioc['indicator'])] = get_ledger_digest(ioc)
+                yield json.dumps(ioc) + '\n'
+
+
+def get_iocs(page=0, size=INITIAL_PAGE_SIZE, query=None) -> List:
+    return demisto.searchIndicators(query=query if query else Client.query, page=page, size=size).get('iocs', [])
 
 
-def create_file_sync(file_path, batch_size: int = 200):
-    with open(file_path, 'a') as _file:
-        total_size: int = get_iocs_size()
-        for i in range(0, ceil(total_size / batch_size)):
-            iocs: List = get_iocs(page=i, size=batch_size)
-            for ioc in map(lambda x: demisto_ioc_to_xdr(x), iocs):
-                if ioc:
-                    _file.write(json.dumps(ioc) + '\n')
+def get_iocs_pages(query=None) -> Iterator[List]:
+    """
+    Yields the IOCs matching the query a page at a time, until a page comes back short.
+    After every second full page the page size is doubled up to MAX_PAGE_SIZE, which keeps the page
+    aligned with the search offset while cutting the number of searches on large syncs.
+    """
+    page: int = 0
+    size: int = INITIAL_PAGE_SIZE
+    while True:
+        iocs: List = get_iocs(page=page, size=size, query=query)
+        if iocs:
+            yield iocs
+        if len(iocs) < size:
+            return
+        page += 1
+        if page % 2 == 0 and size < MAX_PAGE_SIZE:
+            page //= 2
+            size *= 2
 
 
-def get_iocs_size(query=None) -> int:
-    return demisto.searchIndicators(query=query if query else Client.query, page=0, size=1).get('total', 0)
+def get_ledger_key(value: str) -> bytes:
+    return hashlib.blake2b(value.encode(), digest_size=LEDGER_KEY_SIZE).digest()
 
 
-def get_iocs(page=0, size=200, query=None) -> List:
-    return demisto.searchIndicators(query=query if query else Client.query, page=page, size=size).get('iocs', [])
+def get_ledger_digest(xdr_ioc: Dict) -> bytes:
+    return hashlib.blake2b(json.dumps(xdr_ioc, sort_keys=True).encode(), digest_size=LEDGER_DIGEST_SIZE).digest()
+
+
+class Ledger:
+    """
+    The {value key: XDR IOC digest} ledger of what XDR already has.
+    It's kept in the integration context as a base64 string of fixed size records sorted by key, which is looked up
+    by binary search, so a push neither parses nor rebuilds a dict of the whole ledger.
+    Holds up to LEDGER_MAX_SIZE IOCs. IOCs which are not in the ledger are pushed whether they changed or not.
+    """
+
+    def __init__(self, packed: Optional[str] = None):
+        # ledgers saved in an older format are dropped, which only means their IOCs are pushed once more
+        self._records: bytes = base64.b64decode(packed) if isinstance(packed, str) else b''
+        self._updates: Dict[bytes, bytes] = {}
+        self._size: int = len(self._records) // LEDGER_RECORD_SIZE
+
+    def _find(self, key: bytes) -> Optional[bytes]:
+        low, high = 0, len(self._records) // LEDGER_RECORD_SIZE
+        while low < high:
+            middle = (low + high) // 2
+            offset = middle * LEDGER_RECORD_SIZE
+            record_key = self._records[offset:offset + LEDGER_KEY_SIZE]
+            if record_key == key:
+                return self._records[offset + LEDGER_KEY_SIZE:offset + LEDGER_RECORD_SIZE]
+            if record_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        if key in self._updates:
+            return self._updates[key]
+        return self._find(key)
+
+    def __contains__(self, key: bytes) -> bool:
+        return self.get(key) is not None
+
+    def __setitem__(self, key: bytes, digest: bytes):
+        # once the ledger is full only IOCs already in it are updated, so it never keeps an outdated digest
+        if key in self._updates or self._find(key) is not None:
+            self._updates[key] = digest
+        elif self._size < LEDGER_MAX_SIZE:
+            self._updates[key] = digest
+            self._size += 1
+
+    def items(self) -> Iterator[Tuple[bytes, bytes]]:
+        """
+        Yields the ledger records sorted by key, up to LEDGER_MAX_SIZE of them.
+        """
+        records: Iterator[Tuple[bytes, bytes]] = (
+            (self._records[offset:offset + LEDGER_KEY_SIZE],
+             self._records[offset + LEDGER_KEY_SIZE:offset + LEDGER_RECORD_SIZE])
+            for offset in range(0, len(self._records), LEDGER_RECORD_SIZE)
+        )
+        kept_records = ((key, digest) for key, digest in records if key not in self._updates)
+        return itertools.islice(heapq.merge(sorted(self._updates.items()), kept_records), LEDGER_MAX_SIZE)
+
+    def __len__(self) -> int:
+        return min(self._size, LEDGER_MAX_SIZE)
+
+    def dump(self, keys: Optional[Set[bytes]] = None) -> str:
+        """
+        Packs the ledger to be saved in the integration context.
+        :param keys: the keys of the records to keep, all of them if not given
+        """
+        if keys is None and not self._updates:
+            return base64.b64encode(self._records).decode()
+        return base64.b64encode(b''.join(
+            key + digest for key, digest in self.items() if keys is None or key in keys
+        )).decode()
 
 
 def demisto_expiration_to_xdr(expiration) -> int:
@@ -210,31 +355,30 @@ def demisto_ioc_to_xdr(ioc: Dict) -> Dict:
         return {}
 
 
-def get_temp_file() -> str:
-    temp_file = tempfile.mkstemp()
-    return temp_file[1]
-
-
 def sync(client: Client):
-    temp_file_path: str = get_temp_file()
-    create_file_sync(temp_file_path)
-    requests_kwargs: Dict = get_requests_kwargs(file_path=temp_file_path)
+    ledger: Ledger = Ledger()
+    requests_kwargs: Dict = get_requests_kwargs(lines=iocs_to_sync_lines(ledger))
     path: str = 'sync_tim_iocs'
     client.http_request(path, requests_kwargs)
     demisto.setIntegrationContext({'ts': int(datetime.now(timezone.utc).timestamp() * 1000),
                                    'time': datetime.now(timezone.utc).strftime(DEMISTO_TIME_FORMAT),
-                                   'iocs_to_keep_time': create_iocs_to_keep_time()})
+                                   'iocs_to_keep_time': create_iocs_to_keep_time(),
+                                   LEDGER_KEY: ledger.dump()})
     return_outputs('sync with XDR completed.')
 
 
 def iocs_to_keep(client: Client):
     if not datetime.utcnow().hour in range(1, 3):
         raise DemistoException('iocs_to_keep runs only between 01:00 and 03:00.')
-    temp_file_path: str = get_temp_file()
-    create_file_iocs_to_keep(temp_file_path)
-    requests_kwargs: Dict = get_requests_kwargs(file_path=temp_file_path)
+    integration_context: Dict = demisto.getIntegrationContext()
+    ledger: Ledger = Ledger(integration_context.get(LEDGER_KEY))
+    kept_keys: Set[bytes] = set()
+    requests_kwargs: Dict = get_requests_kwargs(lines=iocs_to_keep_lines(ledger, kept_keys))
     path = 'iocs_to_keep'
     client.http_request(path, requests_kwargs)
+    # XDR drops every IOC which was not kept, so they must be pushed again if they return
+    integration_context[LEDGER_KEY] = ledger.dump(kept_keys)
+    demisto.setIntegrationContext(integration_context)
     return_outputs('sync with XDR completed.')
 
 
@@ -242,17 +386,9 @@ def create_last_iocs_query(from_date, to_date):
     return f'modified:>={from_date} and modified:<{to_date} and ({Client.query})'
 
 
-def get_last_iocs(batch_size=200) -> List:
-    current_run: str = datetime.utcnow().strftime(DEMISTO_TIME_FORMAT)
-    last_run: Dict = demisto.getIntegrationContext()
+def get_last_iocs_pages(last_run: Dict, current_run: str) -> Iterator[List]:
     query = create_last_iocs_query(from_date=last_run['time'], to_date=current_run)
-    total_size = get_iocs_size(query)
-    iocs: List = []
-    for i in range(0, ceil(total_size / batch_size)):
-        iocs.extend(get_iocs(query=query, page=i, size=batch_size))
-    last_run['time'] = current_run
-    demisto.setIntegrationContext(last_run)
-    return iocs
+    return get_iocs_pages(query)
 
 
 def get_indicators(indicators: str) -> List:
@@ -272,16 +408,45 @@ def get_indicators(indicators: str) -> List:
     return []
 
 
+def get_changed_xdr_iocs(iocs: List, ledger: Ledger, only_changed: bool) -> List[Dict]:
+    """
+    Converts the IOCs to the XDR format and records them in the ledger.
+    When only_changed is set, IOCs which XDR already has in the same form are left out.
+    """
+    xdr_iocs: List[Dict] = []
+    for xdr_ioc in map(lambda ioc: demisto_ioc_to_xdr(ioc), iocs):
+        if not xdr_ioc:
+            continue
+        key: bytes = get_ledger_key(xdr_ioc['indicator'])
+        digest: bytes = get_ledger_digest(xdr_ioc)
+        if only_changed and ledger.get(key) == digest:
+            continue
+        ledger[key] = digest
+        xdr_iocs.append(xdr_ioc)
+    return xdr_iocs
+
+
 def tim_insert_jsons(client: Client):
     indicators = demisto.args().get('indicator', '')
+    integration_context: Dict = demisto.getIntegrationContext()
+    ledger: Ledger = Ledger(integration_context.get(LEDGER_KEY))
+    current_run: str = datetime.utcnow().strftime(DEMISTO_TIME_FORMAT)
     if not indicators:
-        iocs = get_last_iocs()
+        pages: Iterable[List] = get_last_iocs_pages(integration_context, current_run)
     else:
-        iocs = get_indicators(indicators)
-    if iocs:
-        path = 'tim_insert_jsons/'
-        requests_kwargs: Dict = get_requests_kwargs(_json=list(map(lambda ioc: demisto_ioc_to_xdr(ioc), iocs)))
-        client.http_request(url_suffix=path, requests_kwargs=requests_kwargs)
+        pages = [get_indicators(indicators) or []]
+    path = 'tim_insert_jsons/'
+    for iocs in pages:
+        xdr_iocs: List[Dict] = get_changed_xdr_iocs(iocs, ledger, only_changed=not indicators)
+        if xdr_iocs:
+            requests_kwargs: Dict = get_requests_kwargs(_json=xdr_iocs)
+            client.http_request(url_suffix=path, requests_kwargs=requests_kwargs)
+    if not indicators:
+        integration_context['time'] = current_run
+    # the ledger is kept only once XDR was synced, an empty context means a sync is still required
+    if integration_context:
+        integration_context[LEDGER_KEY] = ledger.dump()
+        demisto.setIntegrationContext(integration_context)
     return_outputs('push done.')
 
 
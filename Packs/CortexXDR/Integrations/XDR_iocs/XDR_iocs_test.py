@@ -94,22 +94,28 @@ class TestHttpRequest:
 
 class TestGetRequestsKwargs:
 
-    def test_with_file(self, mocker):
+    def test_with_lines(self, mocker):
         """
             Given:
-                - file to upload
+                - lines to upload as a file
 
             Then:
-                - Verify output format.
-        """
-        def override_open(open_path, *_other):
-            return open_path
-
-        mocker.patch('builtins.open', side_effect=override_open)
-        path = '/Users/some_user/some_dir/some_file.file'
-        output = get_requests_kwargs(file_path=path)
-        expected_output = {'files': [('file', ('iocs.json', path, 'application/json'))]}
-        assert output == expected_output, f'get_requests_kwargs(file_path={path})\n\treturns: {output}\n\t instead: {expected_output}'  # noqa: E501
+                - Verify the streamed body is the gzip compressed multipart body requests builds for the file.
+                - Verify the body is streamed in chunks.
+        """
+        import gzip
+        import hashlib
+        from urllib3.filepost import encode_multipart_formdata
+        mocker.patch('secrets.token_hex', return_value='boundary')
+        mocker.patch('XDR_iocs.UPLOAD_CHUNK_SIZE', 10)
+        lines = [f'{hashlib.sha256(str(i).encode()).hexdigest()}\n' for i in range(10000)]
+        output = get_requests_kwargs(lines=iter(lines))
+        body, content_type = encode_multipart_formdata([('file', ('iocs.json', ''.join(lines), 'application/json'))],
+                                                       boundary='boundary')
+        assert output['headers'] == {'Content-Type': content_type, 'Content-Encoding': 'gzip'}
+        chunks = list(output['data'])
+        assert len(chunks) > 2, 'the body is not streamed in chunks'
+        assert gzip.decompress(b''.join(chunks)) == body
 
     def test_with_json(self):
         """
@@ -166,8 +172,7 @@ class TestPrepareCommands:
         assert iocs == ['8.8.8.8', 'domain.com']
 
 
-class TestCreateFile:
-    path = 'test_data/sync_file_test.json'
+class TestCreateLines:
     data_test_create_file_sync = [
         ('Domain_iocs', 'Domain_sync_file'),
         ('IP_iocs', 'IP_sync_file'),
@@ -179,15 +184,6 @@ class TestCreateFile:
         ('File_iocs', 'File_iocs_to_keep_file')
     ]
 
-    def setup(self):
-        # creates the file
-        with open(TestCreateFile.path, 'w') as _file:
-            _file.write('')
-
-    def teardown(self):
-        # removes the file when done
-        os.remove(TestCreateFile.path)
-
     @staticmethod
     def get_file(path):
         with open(path, 'r') as _file:
@@ -199,16 +195,16 @@ class TestCreateFile:
         total = 0
         data = []
         for in_iocs, out_iocs in go_over:
-            ioc = json.loads(TestCreateFile.get_file(f'test_data/{in_iocs}.json'))
+            ioc = json.loads(TestCreateLines.get_file(f'test_data/{in_iocs}.json'))
             iocs.extend(ioc['iocs'])
             total += ioc['total']
-            data.append(TestCreateFile.get_file(f'test_data/{out_iocs}.{extension}'))
+            data.append(TestCreateLines.get_file(f'test_data/{out_iocs}.{extension}'))
 
         all_iocs = {'iocs': iocs, 'total': total}
         all_data = ''.join(data)
         return all_iocs, all_data
 
-    def test_create_file_sync_without_iocs(self, mocker):
+    def test_iocs_to_sync_lines_without_iocs(self, mocker):
         """
             Given:
                 - Sync command
@@ -217,16 +213,15 @@ class TestCreateFile:
                 - there is no iocs
 
             Then:
-                - Verify sync file data.
+                - Verify sync lines data.
         """
         mocker.patch.object(demisto, 'searchIndicators', return_value={})
-        create_file_sync(TestCreateFile.path)
-        data = self.get_file(TestCreateFile.path)
+        data = ''.join(iocs_to_sync_lines())
         expected_data = ''
-        assert data == expected_data, f'create_file_sync with no iocs\n\tcreates: {data}\n\tinstead: {expected_data}'
+        assert data == expected_data, f'iocs_to_sync_lines with no iocs\n\tcreates: {data}\n\tinstead: {expected_data}'
 
     @pytest.mark.parametrize('in_iocs, out_iocs', data_test_create_file_sync)
-    def test_create_file_sync(self, in_iocs, out_iocs, mocker):
+    def test_iocs_to_sync_lines(self, in_iocs, out_iocs, mocker):
         """
             Given:
                 - Sync command
@@ -235,15 +230,14 @@ class TestCreateFile:
                 - iocs type is a specific type.
 
             Then:
-                - Verify sync file data.
+                - Verify sync lines data.
         """
         mocker.patch.object(demisto, 'searchIndicators', return_value=json.loads(self.get_file(f'test_data/{in_iocs}.json')))  # noqa: E501
-        create_file_sync(TestCreateFile.path)
-        data = self.get_file(TestCreateFile.path)
+        data = ''.join(iocs_to_sync_lines())
         expected_data = self.get_file(f'test_data/{out_iocs}.json')
-        assert data == expected_data, f'create_file_sync with {in_iocs} iocs\n\tcreates: {data}\n\tinstead: {expected_data}'
+        assert data == expected_data, f'iocs_to_sync_lines with {in_iocs} iocs\n\tcreates: {data}\n\tinstead: {expected_data}'
 
-    def test_create_file_sync_all_types(self, mocker):
+    def test_iocs_to_sync_lines_all_types(self, mocker):
         """
             Given:
                 - Sync command
@@ -252,13 +246,12 @@ class TestCreateFile:
                 - iocs as all types
 
             Then:
-                - Verify sync file data.
+                - Verify sync lines data.
         """
         all_iocs, expected_data = self.get_all_iocs(self.data_test_create_file_sync, 'json')
         mocker.patch.object(demisto, 'searchIndicators', return_value=all_iocs)
-        create_file_sync(TestCreateFile.path)
-        data = self.get_file(TestCreateFile.path)
-        assert data == expected_data, f'create_file_sync with all iocs\n\tcreates: {data}\n\tinstead: {expected_data}'
+        data = ''.join(iocs_to_sync_lines())
+        assert data == expected_data, f'iocs_to_sync_lines with all iocs\n\tcreates: {data}\n\tinstead: {expected_data}'
 
     data_test_create_file_with_empty_indicators = [
         {},
@@ -267,7 +260,7 @@ class TestCreateFile:
     ]
 
     @pytest.mark.parametrize('defective_indicator', data_test_create_file_with_empty_indicators)
-    def test_create_file_sync_with_empty_indicators(self, defective_indicator, mocker):
+    def test_iocs_to_sync_lines_with_empty_indicators(self, defective_indicator, mocker):
         """
             Given:
                 - Sync command
@@ -276,21 +269,20 @@ class TestCreateFile:
                 - a part iocs dont have all required data
 
             Then:
-                - Verify sync file data.
+                - Verify sync lines data.
         """
         all_iocs, expected_data = self.get_all_iocs(self.data_test_create_file_sync, 'json')
         all_iocs['iocs'].append(defective_indicator)
         all_iocs['total'] += 1
         mocker.patch.object(demisto, 'searchIndicators', return_value=all_iocs)
         warnings = mocker.patch.object(demisto, 'debug')
-        create_file_sync(TestCreateFile.path)
-        data = self.get_file(TestCreateFile.path)
-        assert data == expected_data, f'create_file_sync with all iocs\n\tcreates: {data}\n\tinstead: {expected_data}'
+        data = ''.join(iocs_to_sync_lines())
+        assert data == expected_data, f'iocs_to_sync_lines with all iocs\n\tcreates: {data}\n\tinstead: {expected_data}'
         error_msg = warnings.call_args.args[0]
-        assert error_msg.startswith("unexpected IOC format in key: '"), f"create_file_sync empty message\n\tstarts: {error_msg}\n\tinstead: unexpected IOC format in key: '"    # noqa: E501
-        assert error_msg.endswith(f"', {str(defective_indicator)}"), f"create_file_sync empty message\n\tends: {error_msg}\n\tinstead: ', {str(defective_indicator)}"     # noqa: E501
+        assert error_msg.startswith("unexpected IOC format in key: '"), f"iocs_to_sync_lines empty message\n\tstarts: {error_msg}\n\tinstead: unexpected IOC format in key: '"    # noqa: E501
+        assert error_msg.endswith(f"', {str(defective_indicator)}"), f"iocs_to_sync_lines empty message\n\tends: {error_msg}\n\tinstead: ', {str(defective_indicator)}"     # noqa: E501
 
-    def test_create_file_iocs_to_keep_without_iocs(self, mocker):
+    def test_iocs_to_keep_lines_without_iocs(self, mocker):
         """
             Given:
                 - iocs to keep command
@@ -299,17 +291,16 @@ class TestCreateFile:
                 - there is no iocs
 
             Then:
-                - Verify iocs to keep file data.
+                - Verify iocs to keep lines data.
         """
 
         mocker.patch.object(demisto, 'searchIndicators', return_value={})
-        create_file_iocs_to_keep(TestCreateFile.path)
-        data = self.get_file(TestCreateFile.path)
+        data = ''.join(iocs_to_keep_lines())
         expected_data = ''
-        assert data == expected_data, f'create_file_iocs_to_keep with no iocs\n\tcreates: {data}\n\tinstead: {expected_data}'
+        assert data == expected_data, f'iocs_to_keep_lines with no iocs\n\tcreates: {data}\n\tinstead: {expected_data}'
 
     @pytest.mark.parametrize('in_iocs, out_iocs', data_test_create_file_iocs_to_keep)
-    def test_create_file_iocs_to_keep(self, in_iocs, out_iocs, mocker):
+    def test_iocs_to_keep_lines(self, in_iocs, out_iocs, mocker):
         """
             Given:
                 - iocs to keep command
@@ -318,16 +309,15 @@ class TestCreateFile:
                 - iocs type is a specific type.
 
             Then:
-                - Verify iocs to keep file data.
+                - Verify iocs to keep lines data.
         """
         mocker.patch.object(demisto, 'searchIndicators', return_value=json.loads(
             self.get_file(f'test_data/{in_iocs}.json')))
-        create_file_iocs_to_keep(TestCreateFile.path)
-        data = self.get_file(TestCreateFile.path)
+        data = ''.join(iocs_to_keep_lines())
         expected_data = self.get_file(f'test_data/{out_iocs}.txt')
-        assert data == expected_data, f'create_file_iocs_to_keep with {in_iocs} iocs\n\tcreates: {data}\n\tinstead: {expected_data}'    # noqa: E501
+        assert data == expected_data, f'iocs_to_keep_lines with {in_iocs} iocs\n\tcreates: {data}\n\tinstead: {expected_data}'    # noqa: E501
 
-    def test_create_file_iocs_to_keep_all_types(self, mocker):
+    def test_iocs_to_keep_lines_all_types(self, mocker):
         """
             Given:
                 - iocs to keep command
@@ -336,13 +326,12 @@ class TestCreateFile:
                 - iocs as all types
 
             Then:
-                - Verify iocs to keep file data.
+                - Verify iocs to keep lines data.
         """
         all_iocs, expected_data = self.get_all_iocs(self.data_test_create_file_iocs_to_keep, 'txt')
         mocker.patch.object(demisto, 'searchIndicators', return_value=all_iocs)
-        create_file_iocs_to_keep(TestCreateFile.path)
-        data = self.get_file(TestCreateFile.path)
-        assert data == expected_data, f'create_file_iocs_to_keep with all iocs\n\tcreates: {data}\n\tinstead: {expected_data}'
+        data = ''.join(iocs_to_keep_lines())
+        assert data == expected_data, f'iocs_to_keep_lines with all iocs\n\tcreates: {data}\n\tinstead: {expected_data}'
 
 
 class TestDemistoIOCToXDR:
@@ -648,7 +637,7 @@ class TestCommands:
 
     def test_sync(self, mocker):
         http_request = mocker.patch.object(Client, 'http_request')
-        iocs, data = TestCreateFile.get_all_iocs(TestCreateFile.data_test_create_file_sync, 'json')
+        iocs, data = TestCreateLines.get_all_iocs(TestCreateLines.data_test_create_file_sync, 'json')
         mocker.patch.object(demisto, 'searchIndicators', returnvalue=iocs)
         mocker.patch('XDR_iocs.return_outputs')
         sync(client)
@@ -657,7 +646,7 @@ class TestCommands:
     @freeze_time('2020-06-03T02:00:00Z')
     def test_iocs_to_keep(self, mocker):
         http_request = mocker.patch.object(Client, 'http_request')
-        iocs, data = TestCreateFile.get_all_iocs(TestCreateFile.data_test_create_file_iocs_to_keep, 'txt')
+        iocs, data = TestCreateLines.get_all_iocs(TestCreateLines.data_test_create_file_iocs_to_keep, 'txt')
         mocker.patch.object(demisto, 'searchIndicators', returnvalue=iocs)
         mocker.patch('XDR_iocs.return_outputs')
         iocs_to_keep(client)
@@ -666,7 +655,7 @@ class TestCommands:
     def test_tim_insert_jsons(self, mocker):
         http_request = mocker.patch.object(Client, 'http_request')
         mocker.patch.object(demisto, 'getIntegrationContext', return_value={'time': '2020-06-03T00:00:00Z'})
-        iocs, _ = TestCreateFile.get_all_iocs(TestCreateFile.data_test_create_file_sync, 'json')
+        iocs, _ = TestCreateLines.get_all_iocs(TestCreateLines.data_test_create_file_sync, 'json')
         mocker.patch.object(demisto, 'searchIndicators', return_value=iocs)
         mocker.patch('XDR_iocs.return_outputs')
         tim_insert_jsons(client)
@@ -680,3 +669,172 @@ class TestCommands:
         mocker.patch.object(Client, 'http_request', return_value=xdr_res)
         get_changes(client)
         xdr_ioc_to_timeline(list(map(lambda x: str(x[0].get('RULE_INDICATOR')), TestXDRIOCToDemisto.data_test_xdr_ioc_to_demisto)))    # noqa: E501
+
+
+class TestGetIocsPages:
+
+    def test_page_size_grows(self, mocker):
+        """
+            Given:
+                - 20,000 IOCs matching the query
+
+            When:
+                - paging over them
+
+            Then:
+                - Verify every IOC is returned exactly once.
+                - Verify the page size grows up to the max page size, aligned with the search offset.
+        """
+        total = 20000
+
+        def search_indicators(query, page, size):
+            return {'iocs': [{'value': str(i)} for i in range(page * size, min((page + 1) * size, total))]}
+
+        search = mocker.patch.object(demisto, 'searchIndicators', side_effect=search_indicators)
+        values = [ioc['value'] for iocs in get_iocs_pages() for ioc in iocs]
+        assert values == [str(i) for i in range(total)]
+        sizes = [call.kwargs['size'] for call in search.call_args_list]
+        assert sizes == sorted(sizes)
+        assert sizes[0] == INITIAL_PAGE_SIZE and sizes[-1] == MAX_PAGE_SIZE
+        assert search.call_count < total / INITIAL_PAGE_SIZE / 4
+
+
+class TestLedger:
+    xdr_iocs_context = {'ts': 1591142400000, 'time': '2020-06-03T00:00:00Z'}
+
+    def test_sync_creates_ledger(self, mocker):
+        """
+            Given:
+                - IOCs to sync
+
+            When:
+                - running sync
+
+            Then:
+                - Verify the ledger holds every synced IOC.
+        """
+        iocs, _ = TestCreateLines.get_all_iocs(TestCreateLines.data_test_create_file_sync, 'json')
+        mocker.patch.object(demisto, 'searchIndicators', return_value=iocs)
+        mocker.patch.object(Client, 'http_request', side_effect=lambda _, kwargs: b''.join(kwargs['data']))
+        set_context = mocker.patch.object(demisto, 'setIntegrationContext')
+        mocker.patch('XDR_iocs.return_outputs')
+        sync(client)
+        ledger = Ledger(set_context.call_args.args[0][LEDGER_KEY])
+        assert {key for key, _ in ledger.items()} == {get_ledger_key(ioc['value']) for ioc in iocs['iocs']}
+
+    def test_tim_insert_jsons_pushes_only_changed(self, mocker):
+        """
+            Given:
+                - modified IOCs, only one of them changed since it was synced to XDR
+
+            When:
+                - pushing the last modified IOCs
+
+            Then:
+                - Verify only the changed IOC is pushed.
+                - Verify the ledger is updated with the change.
+        """
+        iocs, _ = TestCreateLines.get_all_iocs(TestCreateLines.data_test_create_file_sync, 'json')
+        ledger = Ledger()
+        get_changed_xdr_iocs(iocs['iocs'], ledger, only_changed=False)
+        changed_ioc = dict(iocs['iocs'][0], score=1)
+        mocker.patch.object(demisto, 'searchIndicators', return_value={'iocs': [changed_ioc] + iocs['iocs'][1:]})
+        mocker.patch.object(demisto, 'getIntegrationContext', return_value=dict(self.xdr_iocs_context, ledger=ledger.dump()))
+        set_context = mocker.patch.object(demisto, 'setIntegrationContext')
+        mocker.patch.object(demisto, 'args', return_value={})
+        http_request = mocker.patch.object(Client, 'http_request')
+        mocker.patch('XDR_iocs.return_outputs')
+        tim_insert_jsons(client)
+        pushed = json.loads(http_request.call_args.kwargs['requests_kwargs']['data'])['request_data']
+        assert [ioc['indicator'] for ioc in pushed] == [changed_ioc['value']]
+        new_ledger = Ledger(set_context.call_args.args[0][LEDGER_KEY])
+        key = get_ledger_key(changed_ioc['value'])
+        assert new_ledger.get(key) != ledger.get(key)
+        assert new_ledger.get(key) == get_ledger_digest(demisto_ioc_to_xdr(changed_ioc))
+
+    def test_tim_insert_jsons_nothing_changed(self, mocker):
+        """
+            Given:
+                - modified IOCs which XDR already has in the same form
+
+            When:
+                - pushing the last modified IOCs
+
+            Then:
+                - Verify nothing is pushed.
+        """
+        iocs, _ = TestCreateLines.get_all_iocs(TestCreateLines.data_test_create_file_sync, 'json')
+        ledger = Ledger()
+        get_changed_xdr_iocs(iocs['iocs'], ledger, only_changed=False)
+        mocker.patch.object(demisto, 'searchIndicators', return_value=iocs)
+        mocker.patch.object(demisto, 'getIntegrationContext', return_value=dict(self.xdr_iocs_context, ledger=ledger.dump()))
+        mocker.patch.object(demisto, 'setIntegrationContext')
+        mocker.patch.object(demisto, 'args', return_value={})
+        http_request = mocker.patch.object(Client, 'http_request')
+        mocker.patch('XDR_iocs.return_outputs')
+        tim_insert_jsons(client)
+        assert http_request.call_count == 0
+
+    @freeze_time('2020-06-03T02:00:00Z')
+    def test_iocs_to_keep_prunes_ledger(self, mocker):
+        """
+            Given:
+                - a ledger with an IOC which is no longer in the sync query
+
+            When:
+                - running iocs to keep
+
+            Then:
+                - Verify the IOC is removed from the ledger, so it is pushed again if it returns.
+        """
+        iocs, _ = TestCreateLines.get_all_iocs(TestCreateLines.data_test_create_file_sync, 'json')
+        ledger = Ledger()
+        get_changed_xdr_iocs(iocs['iocs'], ledger, only_changed=False)
+        mocker.patch.object(demisto, 'searchIndicators', return_value={'iocs': iocs['iocs'][1:]})
+        mocker.patch.object(demisto, 'getIntegrationContext', return_value=dict(self.xdr_iocs_context, ledger=ledger.dump()))
+        set_context = mocker.patch.object(demisto, 'setIntegrationContext')
+        mocker.patch.object(Client, 'http_request', side_effect=lambda _, kwargs: b''.join(kwargs['data']))
+        mocker.patch('XDR_iocs.return_outputs')
+        iocs_to_keep(client)
+        new_ledger = Ledger(set_context.call_args.args[0][LEDGER_KEY])
+        assert get_ledger_key(iocs['iocs'][0]['value']) not in new_ledger
+        assert len(new_ledger) == len(ledger) - 1
+
+    def test_ledger_is_capped(self, mocker):
+        """
+            Given:
+                - a full ledger
+
+            When:
+                - recording new IOCs and changes to IOCs already in the ledger
+
+            Then:
+                - Verify the new IOCs are not recorded, so they are pushed every time.
+                - Verify the changes are recorded.
+                - Verify the packed ledger is sorted and looked up as recorded.
+        """
+        mocker.patch('XDR_iocs.LEDGER_MAX_SIZE', 3)
+        ledger = Ledger()
+        for value in ('b', 'a', 'c', 'd'):
+            ledger[get_ledger_key(value)] = b'1111'
+        ledger = Ledger(ledger.dump())
+        assert len(ledger) == 3
+        keys = [key for key, _ in ledger.items()]
+        assert keys == sorted(keys)
+        full_key = keys[0]
+        new_key = next(get_ledger_key(value) for value in ('a', 'b', 'c', 'd') if get_ledger_key(value) not in ledger)
+        ledger[full_key] = b'2222'
+        ledger[new_key] = b'2222'
+        ledger = Ledger(ledger.dump())
+        assert ledger.get(full_key) == b'2222'
+        assert new_key not in ledger
+
+    def test_ledger_from_dict(self):
+        """
+            Given:
+                - a ledger saved as a dict by an older version
+
+            Then:
+                - Verify it is read as empty, so its IOCs are pushed again.
+        """
+        assert len(Ledger({'0011': '22'})) == 0
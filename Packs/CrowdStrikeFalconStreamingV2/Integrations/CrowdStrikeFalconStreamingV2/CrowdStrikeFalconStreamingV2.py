@@ -4,10 +4,11 @@ from CommonServerUserPython import *  # noqa: E402 lgtm [py/polluting-import]
 
 import requests
 import traceback
-from asyncio import Event, create_task, sleep, run
+from asyncio import Event, Queue, QueueFull, Task, FIRST_COMPLETED, create_task, get_event_loop, sleep, run, wait, wait_for
+from asyncio import TimeoutError as AsyncTimeoutError
 from contextlib import asynccontextmanager
 from aiohttp import ClientSession, TCPConnector
-from typing import Dict, AsyncGenerator, AsyncIterator
+from typing import Dict, AsyncGenerator, AsyncIterator, List
 from collections import deque
 
 requests.packages.urllib3.disable_warnings()
@@ -19,6 +20,9 @@ MINUTES_30 = 30 * 60
 TIME_BUFFER_1_MINUTE = 1 * 60
 CREATED_STATUS_CODE = 201
 TOO_MANY_REQUESTS_STATUS_CODE = 429
+EVENTS_QUEUE_SIZE = 2000
+INCIDENTS_BATCH_SIZE = 200
+INCIDENTS_BATCH_LINGER_SECONDS = 1
 
 
 class Client(BaseClient):
@@ -307,6 +311,139 @@ async def init_refresh_token(
     task.cancel()
 
 
+class IncidentsFlusher:
+    """Creates incidents from the events queued by the stream reader in batches.
+
+    A batch is created once it reaches the batch size, or once the linger time has passed since its first event.
+    The offset to store is advanced only after the incidents of a batch were created.
+
+    Args:
+        queue (Queue): Queue of events fetched from the stream.
+        incident_type (str): Type of incident to create.
+        offset (int): Stream offset the fetch started from.
+        store_samples (bool): Whether to store sample events in the integration context or not.
+        batch_size (int): Maximum number of incidents to create at once.
+        linger_time (float): Maximum number of seconds to wait for a batch to fill up.
+
+    Returns:
+        None: No data returned.
+    """
+
+    def __init__(self, queue: Queue, incident_type: str, offset: int, store_samples: bool = False,
+                 batch_size: int = INCIDENTS_BATCH_SIZE, linger_time: float = INCIDENTS_BATCH_LINGER_SECONDS) -> None:
+        self.queue = queue
+        self.incident_type = incident_type
+        self.offset_to_store = offset
+        self.store_samples = store_samples
+        self.batch_size = batch_size
+        self.linger_time = linger_time
+        self.batch: List[Dict] = []
+        self.sample_events_to_store = deque(maxlen=20)  # type: ignore[var-annotated]
+        self.last_integration_context_set = datetime.utcnow()
+        self.incidents_created = 0
+        self.last_stats_print = datetime.utcnow()
+
+    async def flush_loop(self) -> None:
+        while True:
+            await self.fill_batch()
+            self.create_incidents(self.batch)
+            self.batch = []
+
+    async def fill_batch(self) -> None:
+        """Waits for a batch of events to be fetched from the stream.
+
+        The events are kept in the batch attribute, so they are not lost if the flusher is cancelled while waiting.
+        """
+        self.batch.append(await self.queue.get())
+        loop = get_event_loop()
+        deadline = loop.time() + self.linger_time
+        while len(self.batch) < self.batch_size:
+            if not self.queue.empty():
+                self.batch.append(self.queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                self.batch.append(await wait_for(self.queue.get(), timeout))
+            except AsyncTimeoutError:
+                break
+
+    def flush_queue(self) -> None:
+        """Creates incidents from the events of the current batch and the events left in the queue."""
+        while not self.queue.empty():
+            self.batch.append(self.queue.get_nowait())
+            if len(self.batch) == self.batch_size:
+                self.create_incidents(self.batch)
+                self.batch = []
+        if self.batch:
+            self.create_incidents(self.batch)
+            self.batch = []
+
+    def create_incidents(self, events: List[Dict]) -> None:
+        incidents = []
+        for event in events:
+            event_metadata = event.get('metadata', {})
+            event_type = event_metadata.get('eventType', '')
+            event_offset = event_metadata.get('offset', '')
+            incident_name = f'{event_type} - offset {event_offset}'
+            event_dump = json.dumps(event)
+            incidents.append({
+                'name': incident_name,
+                'details': event_dump,
+                'rawJSON': event_dump,
+                'type': self.incident_type
+            })
+        demisto.createIncidents(incidents)
+        last_offset = events[-1].get('metadata', {}).get('offset', '')
+        demisto.info(f'Created {len(incidents)} incidents up to offset: {last_offset}')
+        self.offset_to_store = int(last_offset) + 1
+        self.incidents_created += len(incidents)
+        if self.store_samples:
+            self.sample_events_to_store.extend(events)
+        if self.last_stats_print + timedelta(minutes=1) <= datetime.utcnow():
+            elapsed = (datetime.utcnow() - self.last_stats_print).total_seconds()
+            demisto.info(f'Created {self.incidents_created} incidents in the last minute'
+                         f' ({self.incidents_created / elapsed:.2f} events per second).')
+            self.incidents_created = 0
+            self.last_stats_print = datetime.utcnow()
+        if self.last_integration_context_set + timedelta(minutes=1) <= datetime.utcnow():
+            self.store_offset()
+
+    def store_offset(self) -> None:
+        integration_context = demisto.getIntegrationContext()
+        integration_context['offset'] = self.offset_to_store
+        if self.store_samples and self.sample_events_to_store:
+            try:
+                demisto.debug(f'Storing new {len(self.sample_events_to_store)} sample events')
+                sample_events = deque(json.loads(integration_context.get('sample_events', '[]')), maxlen=20)
+                sample_events += self.sample_events_to_store
+                integration_context['sample_events'] = json.dumps(list(sample_events))
+                self.sample_events_to_store.clear()
+            except Exception as e:
+                demisto.error(f'Failed storing sample events - {e}')
+        demisto.debug(f'Storing offset {self.offset_to_store}')
+        demisto.setIntegrationContext(integration_context)
+        self.last_integration_context_set = datetime.utcnow()
+
+
+async def queue_event(queue: Queue, event: Dict, flush_task: Task) -> None:
+    """Queues an event for the incidents flusher, waiting for room in the queue if it is full.
+
+    Raises:
+        Exception: The error the incidents flusher failed on, if it did.
+    """
+    try:
+        queue.put_nowait(event)
+    except QueueFull:
+        put_task = create_task(queue.put(event))
+        await wait({put_task, flush_task}, return_when=FIRST_COMPLETED)
+        if not put_task.done():
+            put_task.cancel()
+    if flush_task.done():
+        flush_task.result()
+
+
 async def long_running_loop(
         base_url: str,
         client_id: str,
@@ -336,49 +473,29 @@ async def long_running_loop(
     Returns:
         None: No data returned.
     """
+    queue: Queue = Queue(maxsize=EVENTS_QUEUE_SIZE)
+    flusher = IncidentsFlusher(queue, incident_type, offset, store_samples)
+    flush_task = None
     try:
-        offset_to_store = offset
-        sample_events_to_store = deque(maxlen=20)  # type: ignore[var-annotated]
-        last_integration_context_set = datetime.utcnow()
         async with init_refresh_token(base_url, client_id, client_secret, verify_ssl, proxy) as refresh_token:
             stream.set_refresh_token(refresh_token)
+            flush_task = create_task(flusher.flush_loop())
             async for event in stream.fetch_event(initial_offset=offset, event_type=event_type):
-                event_metadata = event.get('metadata', {})
-                event_type = event_metadata.get('eventType', '')
-                event_offset = event_metadata.get('offset', '')
-                demisto.info(f'Fetching event with offset: {event_offset}')
-                incident_name = f'{event_type} - offset {event_offset}'
-                event_dump = json.dumps(event)
-                incident = [{
-                    'name': incident_name,
-                    'details': event_dump,
-                    'rawJSON': event_dump,
-                    'type': incident_type
-                }]
-                demisto.createIncidents(incident)
-                offset_to_store = int(event_offset) + 1
-                if last_integration_context_set + timedelta(minutes=1) <= datetime.utcnow():
-                    integration_context = demisto.getIntegrationContext()
-                    integration_context['offset'] = offset_to_store
-                    if store_samples:
-                        try:
-                            sample_events_to_store.append(event)
-                            demisto.debug(f'Storing new {len(sample_events_to_store)} sample events')
-                            sample_events = deque(json.loads(integration_context.get('sample_events', '[]')), maxlen=20)
-                            sample_events += sample_events_to_store
-                            integration_context['sample_events'] = json.dumps(list(sample_events))
-                        except Exception as e:
-                            demisto.error(f'Failed storing sample events - {e}')
-                    demisto.debug(f'Storing offset {offset_to_store}')
-                    demisto.setIntegrationContext(integration_context)
-                    last_integration_context_set = datetime.utcnow()
+                demisto.debug(f'Fetched event with offset: {event.get("metadata", {}).get("offset", "")}')
+                await queue_event(queue, event, flush_task)
     except Exception as e:
         demisto.error(f'An error occurred in the long running loop: {e}')
     finally:
+        if flush_task:
+            flush_task.cancel()
+            # create incidents from the events already fetched, unless creating incidents is what failed
+            if not flush_task.done() or flush_task.cancelled():
+                try:
+                    flusher.flush_queue()
+                except Exception as e:
+                    demisto.error(f'Failed creating incidents from the remaining fetched events: {e}')
         # store latest fetched event offset in case the loop crashes and we did not reach the 1 minute to store it
-        integration_context = demisto.getIntegrationContext()
-        integration_context['offset'] = offset_to_store
-        demisto.setIntegrationContext(integration_context)
+        flusher.store_offset()
 
 
 async def test_module(base_url: str, client_id: str, client_secret: str, verify_ssl: bool, proxy: bool) -> None:
@@ -1,6 +1,10 @@
 import json
 import demistomock as demisto
-from CrowdStrikeFalconStreamingV2 import get_sample_events
+import pytest
+from asyncio import sleep
+from contextlib import asynccontextmanager
+import CrowdStrikeFalconStreamingV2
+from CrowdStrikeFalconStreamingV2 import get_sample_events, long_running_loop
 
 
 def test_get_sample_events_with_results(mocker):
@@ -134,3 +138,78 @@ def test_get_sample_events_integration_param(mocker):
     results = demisto.results.call_args[0][0]
     assert results == 'No sample events found. The "Store sample events for mapping" integration parameter need to ' \
                       'be enabled for this command to return results.'
+
+
+class FakeEventStream:
+    """Streams the given number of events, yielding control to the event loop between them, and then disconnects"""
+
+    def __init__(self, events_count):
+        self.events_count = events_count
+
+    def set_refresh_token(self, refresh_token):
+        pass
+
+    async def fetch_event(self, initial_offset=0, event_type=''):
+        for offset in range(initial_offset, initial_offset + self.events_count):
+            await sleep(0)
+            yield {'metadata': {'eventType': 'DetectionSummaryEvent', 'offset': offset}}
+        raise ConnectionError('Stream disconnected')
+
+
+@asynccontextmanager
+async def fake_init_refresh_token(*_):
+    yield None
+
+
+@pytest.mark.asyncio
+async def test_long_running_loop_creates_incidents_in_batches(mocker):
+    """
+    Given:
+     - A stream of 1000 events.
+
+    When:
+     - Running the long running loop.
+
+    Then:
+     - Ensure an incident is created for each event, in order and in batches of at most the batch size.
+     - Verify the offset stored is the one following the last event.
+    """
+    mocker.patch.object(CrowdStrikeFalconStreamingV2, 'init_refresh_token', side_effect=fake_init_refresh_token)
+    mocker.patch.object(demisto, 'getIntegrationContext', return_value={})
+    set_integration_context = mocker.patch.object(demisto, 'setIntegrationContext')
+    create_incidents = mocker.patch.object(demisto, 'createIncidents')
+    mocker.patch.object(demisto, 'error')
+
+    await long_running_loop('url', 'id', 'secret', FakeEventStream(1000), 0, '', True, False, 'type')
+
+    batches = [call[0][0] for call in create_incidents.call_args_list]
+    assert all(len(batch) <= CrowdStrikeFalconStreamingV2.INCIDENTS_BATCH_SIZE for batch in batches)
+    assert len(batches) < 1000
+    assert [incident['name'] for batch in batches for incident in batch] == \
+        [f'DetectionSummaryEvent - offset {offset}' for offset in range(1000)]
+    assert set_integration_context.call_args[0][0] == {'offset': 1000}
+
+
+@pytest.mark.asyncio
+async def test_long_running_loop_stops_when_creating_incidents_fails(mocker):
+    """
+    Given:
+     - A stream of events, and incidents creation which fails.
+
+    When:
+     - Running the long running loop.
+
+    Then:
+     - Ensure the loop stops and the stored offset is not advanced past the events which were not created.
+    """
+    mocker.patch.object(CrowdStrikeFalconStreamingV2, 'init_refresh_token', side_effect=fake_init_refresh_token)
+    mocker.patch.object(demisto, 'getIntegrationContext', return_value={})
+    set_integration_context = mocker.patch.object(demisto, 'setIntegrationContext')
+    create_incidents = mocker.patch.object(demisto, 'createIncidents', side_effect=Exception('Server error'))
+    error = mocker.patch.object(demisto, 'error')
+
+    await long_running_loop('url', 'id', 'secret', FakeEventStream(10000), 5, '', True, False, 'type')
+
+    assert create_incidents.call_count == 1
+    assert 'Server error' in error.call_args[0][0]
+    assert set_integration_context.call_args[0][0] == {'offset': 5}
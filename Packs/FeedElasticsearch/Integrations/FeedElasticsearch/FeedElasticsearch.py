@@ -26,6 +26,7 @@ HTTP_ERRORS = {
 
 '''VARIABLES FOR FETCH INDICATORS'''
 FETCH_SIZE = 50
+FETCH_PAGE_SIZE = 2000
 API_KEY_PREFIX = '_api_key_id:'
 MODULE_TO_FEEDMAP_KEY = 'moduleToFeedMap'
 FEED_TYPE_GENERIC = 'Generic Feed'
@@ -194,36 +195,59 @@ def get_demisto_indicators(search, tags):
     return ioc_lst, ioc_enrch_lst
 
 
-def fetch_indicators_command(client, feed_type, src_val, src_type, default_type, last_fetch):
-    """Implements fetch-indicators command"""
+def fetch_indicators_command(client, feed_type, src_val, src_type, default_type, last_fetch, search_after=None):
+    """Implements fetch-indicators command
+
+    Hits are read a page at a time and each page is submitted before the next one is requested, so only one page is
+    held in memory. The position of the last submitted page is saved in last run, so an interrupted fetch resumes
+    after it instead of starting over.
+    """
     last_fetch_timestamp = get_last_fetch_timestamp(last_fetch, client.time_method, client.fetch_time)
     now = datetime.now()
-    ioc_lst: list = []
-    ioc_enrch_lst: list = []
     if FEED_TYPE_GENERIC not in feed_type:
         # Insight is the name of the indicator object as it's saved into the database
         search = get_scan_insight_format(client, now, last_fetch_timestamp, feed_type)
-        for hit in search.scan():
-            hit_lst, hit_enrch_lst = extract_indicators_from_insight_hit(hit, tags=client.tags)
-            ioc_lst.extend(hit_lst)
-            ioc_enrch_lst.extend(hit_enrch_lst)
     else:
         search = get_scan_generic_format(client, now, last_fetch_timestamp)
-        for hit in search.scan():
-            ioc_lst.extend(extract_indicators_from_generic_hit(hit, src_val, src_type, default_type, client.tags))
-
-    if ioc_lst:
-        for b in batch(ioc_lst, batch_size=2000):
-            demisto.createIndicators(b)
-    if ioc_enrch_lst:
-        ioc_enrch_batches = create_enrichment_batches(ioc_enrch_lst)
-        for enrch_batch in ioc_enrch_batches:
-            # ensure batch sizes don't exceed 2000
-            for b in batch(enrch_batch, batch_size=2000):
-                demisto.createIndicators(b)
+
+    sort_fields = [client.time_field, '_id'] if client.time_field else ['_id']
+    for hits, page_search_after in get_search_pages(search, sort_fields, search_after, FETCH_PAGE_SIZE):
+        if FEED_TYPE_GENERIC not in feed_type:
+            ioc_lst: list = []
+            ioc_enrch_lst: list = []
+            for hit in hits:
+                hit_lst, hit_enrch_lst = extract_indicators_from_insight_hit(hit, tags=client.tags)
+                ioc_lst.extend(hit_lst)
+                ioc_enrch_lst.extend(hit_enrch_lst)
+        else:
+            ioc_lst = [ioc for hit in hits
+                       for ioc in extract_indicators_from_generic_hit(hit, src_val, src_type, default_type, client.tags)]
+            ioc_enrch_lst = []
+        if ioc_lst:
+            demisto.createIndicators(ioc_lst)
+        for enrch_batch in create_enrichment_batches(ioc_enrch_lst):
+            demisto.createIndicators(enrch_batch)
+        # the time range of an interrupted fetch is kept, and the next fetch continues after the last page
+        demisto.setLastRun({'time': last_fetch, 'search_after': page_search_after})
     demisto.setLastRun({'time': now.timestamp() * 1000})
 
 
+def get_search_pages(search, sort_fields, search_after=None, page_size=FETCH_PAGE_SIZE):
+    """
+    Yields the search hits a page at a time with search_after, along with the sort values to continue after the page
+    """
+    search = search.sort(*sort_fields).extra(size=page_size)
+    while True:
+        page_search = search.extra(search_after=search_after) if search_after else search
+        hits = page_search.execute().hits
+        if not hits:
+            return
+        search_after = list(hits[-1].meta.sort)
+        yield hits, search_after
+        if len(hits) < page_size:
+            return
+
+
 def get_last_fetch_timestamp(last_fetch, time_method, fetch_time):
     """Get the last fetch timestamp"""
     if last_fetch:
@@ -360,13 +384,15 @@ def main():
         src_val = params.get('src_val')
         src_type = params.get('src_type')
         default_type = params.get('default_type')
-        last_fetch = demisto.getLastRun().get('time')
+        last_run = demisto.getLastRun()
+        last_fetch = last_run.get('time')
 
         if demisto.command() == 'test-module':
             test_command(client, feed_type, src_val, src_type, default_type, time_method, time_field, fetch_time, query,
                          username, password, api_key, api_id)
         elif demisto.command() == 'fetch-indicators':
-            fetch_indicators_command(client, feed_type, src_val, src_type, default_type, last_fetch)
+            fetch_indicators_command(client, feed_type, src_val, src_type, default_type, last_fetch,
+                                     last_run.get('search_after'))
         elif demisto.command() == 'es-get-indicators':
             get_indicators_command(client, feed_type, src_val, src_type, default_type)
     except Exception as e:
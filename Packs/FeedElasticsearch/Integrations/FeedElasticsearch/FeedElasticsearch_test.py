@@ -1,11 +1,45 @@
+import demistomock as demisto
+
+
 class MockHit:
-    def __init__(self, hit_val):
+    def __init__(self, hit_val, sort=None):
         self._hit_val = hit_val
+        self.meta = MockMeta(sort)
 
     def to_dict(self):
         return self._hit_val
 
 
+class MockMeta:
+    def __init__(self, sort):
+        self.sort = sort
+
+
+class MockSearch:
+    """Serves sorted hits a page at a time, like a search with size and search_after"""
+
+    def __init__(self, hits, params=None):
+        self._hits = hits
+        self.params = params or {}
+        self.executed_params = []
+
+    def sort(self, *fields):
+        return MockSearch(self._hits, dict(self.params, sort=fields))
+
+    def extra(self, **kwargs):
+        search = MockSearch(self._hits, dict(self.params, **kwargs))
+        search.executed_params = self.executed_params
+        return search
+
+    def execute(self):
+        self.executed_params.append(self.params)
+        search_after = self.params.get('search_after')
+        hits = [hit for hit in self._hits if not search_after or hit.meta.sort > search_after]
+        response = MockMeta(None)
+        response.hits = hits[:self.params['size']]
+        return response
+
+
 """MOCKED RESPONSES"""
 
 CUSTOM_VAL_KEY = 'indicatorValue'
@@ -267,3 +301,45 @@ def test_extract_api_from_username_password_username_api_key():
     import FeedElasticsearch as esf
     username = esf.API_KEY_PREFIX + 'api_id'
     assert esf.extract_api_from_username_password(username, 'api_key') == ('api_id', 'api_key')
+
+
+def generic_hits(count):
+    return [MockHit({CUSTOM_VAL_KEY: f'1.1.1.{i}', CUSTOM_TYPE_KEY: 'IP'}, sort=[i, str(i)]) for i in range(count)]
+
+
+def test_get_search_pages():
+    import FeedElasticsearch as esf
+    search = MockSearch(generic_hits(5))
+    pages = list(esf.get_search_pages(search, ['time', '_id'], page_size=2))
+    assert [len(hits) for hits, _ in pages] == [2, 2, 1]
+    assert [search_after for _, search_after in pages] == [[1, '1'], [3, '3'], [4, '4']]
+
+    pages = list(esf.get_search_pages(search, ['time', '_id'], search_after=[2, '2'], page_size=2))
+    assert [len(hits) for hits, _ in pages] == [2]
+
+
+def test_fetch_indicators_resumes_after_last_page(mocker):
+    """
+    Given:
+        - A generic feed whose previous fetch was interrupted after its first page
+    When:
+        - Fetching indicators
+    Then:
+        - Only the hits after the saved position are submitted, a page at a time
+        - The position is saved after each page and the fetch time is updated at the end
+    """
+    import FeedElasticsearch as esf
+    mocker.patch.object(esf, 'FETCH_PAGE_SIZE', 2)
+    mocker.patch.object(esf.ElasticsearchClient, '_elasticsearch_builder')
+    client = esf.ElasticsearchClient(time_field='time', time_method='Timestamp - Milliseconds', fetch_time='3 days')
+    mocker.patch.object(esf, 'get_scan_generic_format', return_value=MockSearch(generic_hits(5)))
+    create_indicators = mocker.patch.object(demisto, 'createIndicators')
+    set_last_run = mocker.patch.object(demisto, 'setLastRun')
+
+    esf.fetch_indicators_command(client, esf.FEED_TYPE_GENERIC, CUSTOM_VAL_KEY, CUSTOM_TYPE_KEY, None, 1000,
+                                 search_after=[1, '1'])
+
+    submitted = [[ioc['value'] for ioc in call[0][0]] for call in create_indicators.call_args_list]
+    assert submitted == [['1.1.1.2', '1.1.1.3'], ['1.1.1.4']]
+    assert set_last_run.call_args_list[0][0][0] == {'time': 1000, 'search_after': [3, '3']}
+    assert 'search_after' not in set_last_run.call_args[0][0]
@@ -3,14 +3,18 @@ from CommonServerPython import *
 import urllib3
 import csv
 import requests
+import functools
 import itertools
 import traceback
 import urllib.parse
-from typing import Tuple, Optional, List
+from typing import Tuple, Optional, List, Dict, Iterable, Iterator
 
 # Disable insecure warnings
 urllib3.disable_warnings()
 INTEGRATION_NAME = 'Recorded Future'
+# the number of indicators submitted at once, fetched indicators are never held in memory beyond a batch
+BATCH_SIZE = 2000
+STREAM_CHUNK_SIZE = 1024 * 1024
 
 # taken from recorded future docs
 RF_CRITICALITY_LABELS = {
@@ -64,6 +68,8 @@ class Client(BaseClient):
         self.indicator_type = indicator_type
         self.threshold = int(threshold)
         self.tags = tags
+        # The validators of the risklists fetched by the client, to be saved once their indicators are submitted
+        self.feed_validators: Dict[str, dict] = {}
         super().__init__(self.BASE_URL, proxy=proxy, verify=not insecure)
 
     def _build_request(self, service, indicator_type):
@@ -104,17 +110,20 @@ class Client(BaseClient):
             raise DemistoException(f'Service unknown: {service}')
         return response.prepare()
 
-    def build_iterator(self, service, indicator_type):
+    def build_iterator(self, service, indicator_type, conditional_fetch: bool = False):
         """Retrieves all entries from the feed.
         Args:
             service (str): The service from recorded future. Can be 'connectApi' or 'fusion'
             indicator_type (str) The indicator type. Can be 'domain', 'ip', 'hash' or 'url'
+            conditional_fetch (bool): Whether to skip the risklist if it did not change since it was last fetched
 
         Returns:
-            csv.DictReader: Iterates the csv returned from the api request
+            csv.DictReader: Iterates the csv returned from the api request, while it is being downloaded
         """
         _session = requests.Session()
         prepared_request = self._build_request(service, indicator_type)
+        if conditional_fetch:
+            prepared_request.headers.update(get_conditional_headers(prepared_request.url))
         # this is to honour the proxy environment variables
         rkwargs = _session.merge_environment_settings(
             prepared_request.url,
@@ -139,9 +148,12 @@ class Client(BaseClient):
                 return_error(
                     '{} - exception in request: {} {}'.format(self.SOURCE_NAME, response.status_code, response.content))
 
-        data = response.text.split('\n')
+        if response.status_code == 304:
+            demisto.debug(f'The {service} {indicator_type} risklist was not modified since it was last fetched')
+            return []
+        self.feed_validators[prepared_request.url] = get_response_validators(response)
 
-        csvreader = csv.DictReader(data)
+        csvreader = csv.DictReader(iter_response_lines(response))
 
         return csvreader
 
@@ -192,6 +204,38 @@ class Client(BaseClient):
         )
 
 
+def iter_response_lines(response: requests.Response) -> Iterator[str]:
+    """Yields the lines of a streamed response as they are downloaded.
+    Unlike response.iter_lines, lines are split only on '\\n', as in the csv module.
+    Args:
+        response (requests.Response): The streamed response
+    Returns:
+        Iterator. The lines of the response
+    """
+    if response.encoding is None:
+        response.encoding = 'utf-8'
+    pending = ''
+    for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE, decode_unicode=True):
+        lines = (pending + chunk).split('\n')
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def save_full_submission_time():
+    """
+    Saves the time all the risklists were fetched and submitted, so unchanged risklists are skipped until the next
+    full submission is due.
+    Risklist indicators are submitted as they are streamed, so unlike create_indicators_delta no fingerprints are kept.
+    """
+    integration_context = demisto.getIntegrationContext() or {}
+    indicators_delta = IndicatorsDelta(integration_context)
+    indicators_delta.full_submission_time = int(time.time())
+    indicators_delta.update_context()
+    demisto.setIntegrationContext(integration_context)
+
+
 def is_valid_risk_rule(client: Client, risk_rule):
     """Checks if the risk rule is valid by requesting from RF a list of all available rules.
     Returns:
@@ -291,18 +335,40 @@ def format_risk_string(risk_string):
     return f'{splitted_risk_string[0]} of {splitted_risk_string[1]} Risk Rules Triggered'
 
 
-def fetch_indicators_command(client, indicator_type, limit: Optional[int] = None) -> List[dict]:
-    """Fetches indicators from the Recorded Future feeds.
+@functools.lru_cache(maxsize=64)
+def lower_case_keys(keys: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Lower cases the keys of an evidence details rule. The rules share a handful of key sets, so this is cached.
+    Args:
+        keys(tuple): The keys of the rule
+    Returns:
+        tuple. The lower cased keys, in the same order
+    """
+    return tuple(key.lower() for key in keys)
+
+
+def lower_case_evidence_details(evidence_details: List[dict]) -> List[dict]:
+    """Lower cases the keys of every rule of the evidence details, for the recordedfutureevidencedetails field.
+    Args:
+        evidence_details(list): The evidence details rules from the feed
+    Returns:
+        list. The rules with lower cased keys
+    """
+    return [dict(zip(lower_case_keys(tuple(rule)), rule.values())) for rule in evidence_details]
+
+
+def iter_indicators(client, indicator_type, limit: Optional[int] = None,
+                    conditional_fetch: bool = False) -> Iterator[dict]:
+    """Yields the indicators of the Recorded Future feeds, while the risklists are being downloaded.
     Args:
         client(Client): Recorded Future Feed client.
         indicator_type(str): The indicator type
-        limit(int): Optional. The number of the indicators to fetch
+        limit(int): Optional. The number of the indicators to fetch from each service
+        conditional_fetch(bool): Whether to skip risklists which did not change since they were last fetched
     Returns:
-        list. List of indicators from the feed
+        Iterator. The indicators from the feed
     """
-    indicators = []
     for service in client.services:
-        iterator = client.build_iterator(service, indicator_type)
+        iterator = client.build_iterator(service, indicator_type, conditional_fetch=conditional_fetch)
         for item in itertools.islice(iterator, limit):  # if limit is None the iterator will iterate all of the items.
             raw_json = dict(item)
             raw_json['value'] = value = item.get('Name')
@@ -312,17 +378,15 @@ def fetch_indicators_command(client, indicator_type, limit: Optional[int] = None
             if isinstance(risk, str) and risk.isdigit():
                 raw_json['score'] = score = client.calculate_indicator_score(risk)
                 raw_json['Criticality Label'] = calculate_recorded_future_criticality_label(risk)
-            lower_case_evidence_details_keys = []
-            evidence_details = json.loads(item.get('EvidenceDetails', '{}')).get('EvidenceDetails', [])
+            lower_case_evidence_details_keys: List[dict] = []
+            evidence_details = json.loads(item.get('EvidenceDetails') or '{}').get('EvidenceDetails', [])
             if evidence_details:
                 raw_json['EvidenceDetails'] = evidence_details
-                for rule in evidence_details:
-                    rule = dict((key.lower(), value) for key, value in rule.items())
-                    lower_case_evidence_details_keys.append(rule)
+                lower_case_evidence_details_keys = lower_case_evidence_details(evidence_details)
             risk_string = item.get('RiskString')
             if isinstance(risk_string, str):
                 raw_json['RiskString'] = format_risk_string(risk_string)
-            indicators.append({
+            yield {
                 'value': value,
                 'type': raw_json['type'],
                 'rawJSON': raw_json,
@@ -331,9 +395,37 @@ def fetch_indicators_command(client, indicator_type, limit: Optional[int] = None
                     'tags': client.tags
                 },
                 'score': score
-            })
+            }
+
+
+def fetch_indicators_command(client, indicator_type, limit: Optional[int] = None) -> List[dict]:
+    """Fetches indicators from the Recorded Future feeds.
+    Args:
+        client(Client): Recorded Future Feed client.
+        indicator_type(str): The indicator type
+        limit(int): Optional. The number of the indicators to fetch
+    Returns:
+        list. List of indicators from the feed
+    """
+    return list(iter_indicators(client, indicator_type, limit))
 
-    return indicators
+
+def submit_indicators(indicators: Iterable[dict], batch_size: int = BATCH_SIZE) -> int:
+    """Submits the indicators in batches, as they are fetched.
+    Args:
+        indicators(Iterable): The fetched indicators
+        batch_size(int): The number of indicators to submit at once
+    Returns:
+        int. The number of submitted indicators
+    """
+    submitted = 0
+    indicators = iter(indicators)
+    while True:
+        indicators_batch = list(itertools.islice(indicators, batch_size))
+        if not indicators_batch:
+            return submitted
+        demisto.createIndicators(indicators_batch)
+        submitted += len(indicators_batch)
 
 
 def get_indicators_command(client, args) -> Tuple[str, dict, dict]:
@@ -392,10 +484,13 @@ def main():
     }
     try:
         if demisto.command() == 'fetch-indicators':
-            indicators = fetch_indicators_command(client, client.indicator_type)
+            conditional_fetch = is_conditional_fetch_enabled()
+            indicators = iter_indicators(client, client.indicator_type, conditional_fetch=conditional_fetch)
             # we submit the indicators in batches
-            for b in batch(indicators, batch_size=2000):
-                demisto.createIndicators(b)
+            submit_indicators(indicators)
+            save_feed_validators(client.feed_validators)
+            if not conditional_fetch:
+                save_full_submission_time()
         else:
             readable_output, outputs, raw_response = commands[command](client, demisto.args())  # type:ignore
             return_outputs(readable_output, outputs, raw_response)
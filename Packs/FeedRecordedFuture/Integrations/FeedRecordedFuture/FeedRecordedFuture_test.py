@@ -1,3 +1,4 @@
+import json
 import pytest
 from collections import OrderedDict
 from FeedRecordedFuture import get_indicator_type, get_indicators_command, Client, fetch_indicators_command
@@ -153,3 +154,140 @@ def test_feed_tags(mocker, tags):
     )
     indicators = fetch_indicators_command(client, 'ip')
     assert tags == indicators[0]['fields']['tags']
+
+
+def test_fetch_indicators_submitted_in_bounded_batches(mocker):
+    """
+    Given:
+     - A synthetic risklist of 5,001 rows, produced lazily
+
+    When:
+     - Fetching indicators
+
+    Then:
+     - Verify the indicators are submitted in batches of at most 2,000 indicators.
+     - Verify no more than a batch of rows is read before the batch is submitted.
+    """
+    import csv
+    import demistomock as demisto
+    from FeedRecordedFuture import iter_indicators, submit_indicators
+    rows_read = []
+    evidence_details = '{""EvidenceDetails"": [{""Rule"": ""Threat Researcher"", ""Criticality"": 1.0}]}'
+
+    def risklist():
+        yield 'Name,Risk,RiskString,EvidenceDetails'
+        for i in range(5001):
+            rows_read.append(i)
+            yield f'"10.0.{i // 256}.{i % 256}","{i % 100}","1/52","{evidence_details}"'
+
+    client = Client(indicator_type='ip', api_token='dummytoken', services=['connectApi'])
+    mocker.patch.object(Client, 'build_iterator', return_value=csv.DictReader(risklist()))
+    batches = []
+    mocker.patch.object(demisto, 'createIndicators', side_effect=lambda b: batches.append((len(b), len(rows_read))))
+    assert submit_indicators(iter_indicators(client, 'ip')) == 5001
+    assert [size for size, _ in batches] == [2000, 2000, 1001]
+    assert all(read <= 2000 * (i + 1) + 1 for i, (_, read) in enumerate(batches))
+
+
+def test_evidence_details_keys_lower_cased(mocker):
+    """
+    Given:
+     - A risklist row with evidence details
+
+    When:
+     - Fetching indicators
+
+    Then:
+     - Verify the raw JSON keeps the evidence details as is, and the field has them with lower cased keys.
+    """
+    client = Client(indicator_type='ip', api_token='dummytoken', services=['connectApi'])
+    evidence_details = [{'Rule': 'Threat Researcher', 'CriticalityLabel': 'Unusual', 'Criticality': 1.0},
+                        {'Rule': 'Recent C&C Server', 'CriticalityLabel': 'Malicious', 'Criticality': 3.0}]
+    mocker.patch.object(Client, 'build_iterator', return_value=[
+        {'Name': '192.168.1.1', 'Risk': '89', 'EvidenceDetails': json.dumps({'EvidenceDetails': evidence_details})}
+    ])
+    indicator = fetch_indicators_command(client, 'ip')[0]
+    assert indicator['rawJSON']['EvidenceDetails'] == evidence_details
+    assert indicator['fields']['recordedfutureevidencedetails'] == [
+        {'rule': 'Threat Researcher', 'criticalitylabel': 'Unusual', 'criticality': 1.0},
+        {'rule': 'Recent C&C Server', 'criticalitylabel': 'Malicious', 'criticality': 3.0}
+    ]
+
+
+def test_build_iterator_streams_lines(mocker, requests_mock):
+    """
+    Given:
+     - A risklist response read in chunks which split its lines
+
+    When:
+     - Iterating the risklist
+
+    Then:
+     - Verify every row is parsed as a whole.
+    """
+    mocker.patch('FeedRecordedFuture.STREAM_CHUNK_SIZE', 5)
+    client = Client(indicator_type='ip', api_token='dummytoken', services=['connectApi'])
+    requests_mock.get('https://api.recordedfuture.com/v2/ip/risklist',
+                      text='Name,Risk\r\n1.1.1.1,89\r\n2.2.2.2,5\r\n')
+    rows = list(client.build_iterator('connectApi', 'ip'))
+    assert rows == [{'Name': '1.1.1.1', 'Risk': '89'}, {'Name': '2.2.2.2', 'Risk': '5'}]
+
+
+def test_build_iterator_conditional_fetch(mocker, requests_mock):
+    """
+    Given:
+     - A risklist which was fetched before, with an ETag
+
+    When:
+     - Fetching the risklist again, and it was not modified
+
+    Then:
+     - Verify the validators of the first fetch are saved and sent with the second request.
+     - Verify the unchanged risklist is skipped.
+    """
+    import demistomock as demisto
+    from CommonServerPython import save_feed_validators
+    integration_context = {}
+    mocker.patch.object(demisto, 'getIntegrationContext', side_effect=lambda: integration_context)
+    mocker.patch.object(demisto, 'setIntegrationContext', side_effect=integration_context.update)
+    url = 'https://api.recordedfuture.com/v2/ip/risklist'
+    requests_mock.get(url, [{'text': 'Name,Risk\n1.1.1.1,89\n', 'headers': {'ETag': '"v1"'}},
+                            {'status_code': 304}])
+    client = Client(indicator_type='ip', api_token='dummytoken', services=['connectApi'])
+    assert len(list(client.build_iterator('connectApi', 'ip', conditional_fetch=True))) == 1
+    save_feed_validators(client.feed_validators)
+    assert list(client.build_iterator('connectApi', 'ip', conditional_fetch=True)) == []
+    assert requests_mock.request_history[1].headers['If-None-Match'] == '"v1"'
+
+
+def test_fetch_indicators_conditional_fetch_after_full_submission(mocker, requests_mock):
+    """
+    Given:
+     - A risklist which was never fetched, and an expiration policy which keeps unchanged indicators
+
+    When:
+     - Running fetch-indicators twice, and the risklist was not modified the second time
+
+    Then:
+     - Verify the first fetch is unconditional, and its time is saved as the full submission time.
+     - Verify the second fetch sends the saved validators and submits nothing.
+    """
+    import demistomock as demisto
+    from FeedRecordedFuture import main
+    integration_context = {}
+    mocker.patch.object(demisto, 'getIntegrationContext', side_effect=lambda: integration_context)
+    mocker.patch.object(demisto, 'setIntegrationContext', side_effect=integration_context.update)
+    mocker.patch.object(demisto, 'params', return_value={'indicator_type': 'ip', 'api_token': 'dummytoken',
+                                                         'services': ['connectApi'], 'polling_timeout': '20', 'threshold': '65',
+                                                         'feedExpirationPolicy': 'never'})
+    mocker.patch.object(demisto, 'command', return_value='fetch-indicators')
+    create_indicators = mocker.patch.object(demisto, 'createIndicators')
+    url = 'https://api.recordedfuture.com/v2/ip/risklist'
+    requests_mock.get(url, [{'text': 'Name,Risk\n1.1.1.1,89\n', 'headers': {'ETag': '"v1"'}},
+                            {'status_code': 304}])
+    main()
+    assert 'If-None-Match' not in requests_mock.request_history[0].headers
+    assert integration_context['indicators_delta']['full_submission_time'] > 0
+    main()
+    assert requests_mock.request_history[1].headers['If-None-Match'] == '"v1"'
+    assert create_indicators.call_count == 1
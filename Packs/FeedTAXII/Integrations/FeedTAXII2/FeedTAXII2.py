@@ -2,7 +2,7 @@ import demistomock as demisto
 from CommonServerPython import *
 from CommonServerUserPython import *
 
-from typing import Any, Tuple, Optional
+from typing import Any, Tuple, Optional, Iterator
 
 """ CONSTANT VARIABLES """
 
@@ -44,23 +44,24 @@ def module_test_command(client, limit, fetch_full_feed):
         return_error("Could not connect to server")
 
 
-def fetch_indicators_command(
+def fetch_indicator_pages(
     client,
     initial_interval,
     limit,
     last_run_ctx,
     fetch_full_feed: bool = False,
     filter_args: Optional[dict] = None,
-) -> Tuple[list, dict]:
+) -> Iterator[list]:
     """
-    Fetch indicators from TAXII 2 server
+    Fetch indicators from TAXII 2 server, page by page
+    Once a page is yielded, last_run_ctx is updated to resume the fetch after it.
     :param client: Taxii2FeedClient
     :param initial_interval: initial interval in parse_date_range format
     :param limit: upper limit of indicators to fetch
     :param last_run_ctx: last run dict with {collection_id: last_run_time string}
     :param fetch_full_feed: when set to true, will ignore last run, and try to fetch the entire feed
     :param filter_args: filter args requested by the user
-    :return: indicators in cortex TIM format
+    :return: generator of the indicators of each page in cortex TIM format
     """
     if initial_interval:
         initial_interval, _ = parse_date_range(
@@ -68,40 +69,58 @@ def fetch_indicators_command(
         )
     if filter_args is None:
         filter_args = {}
-    last_fetch_time = (
-        last_run_ctx.get(client.collection_to_fetch.id)
-        if client.collection_to_fetch
-        else None
-    )
-    filter_args["added_after"] = get_added_after(
-        fetch_full_feed, initial_interval, last_fetch_time, filter_args
-    )
 
     if client.collection_to_fetch is None:
         # fetch all collections
         if client.collections is None:
             raise DemistoException(ERR_NO_COLL)
-        indicators: list = []
-        for collection in client.collections:
-            client.collection_to_fetch = collection
-            filter_args["added_after"] = get_added_after(
-                fetch_full_feed, initial_interval, last_run_ctx.get(collection.id)
-            )
-            fetched_iocs = client.build_iterator(limit, **filter_args)
-            indicators.extend(fetched_iocs)
-            if limit >= 0:
-                limit -= len(fetched_iocs)
-                if limit <= 0:
-                    break
-            last_run_ctx[collection.id] = client.last_fetched_indicator__modified
+        collections = client.collections
+        user_filter_args = None
     else:
         # fetch from a single collection
-        indicators = client.build_iterator(limit, **filter_args)
-        last_run_ctx[client.collection_to_fetch.id] = (
-            client.last_fetched_indicator__modified
-            if client.last_fetched_indicator__modified
-            else filter_args.get("added_after")
+        collections = [client.collection_to_fetch]
+        user_filter_args = filter_args
+
+    for collection in collections:
+        client.collection_to_fetch = collection
+        client.last_fetched_indicator__modified = None
+        filter_args["added_after"] = get_added_after(
+            fetch_full_feed, initial_interval, last_run_ctx.get(collection.id), user_filter_args
         )
+        last_run_ctx[collection.id] = filter_args["added_after"]
+        for page_indicators in client.poll_indicator_pages(limit, **filter_args):
+            if client.last_fetched_indicator__modified:
+                last_run_ctx[collection.id] = client.last_fetched_indicator__modified
+            if limit >= 0:
+                limit -= len(page_indicators)
+            yield page_indicators
+        if limit == 0:
+            break
+
+
+def fetch_indicators_command(
+    client,
+    initial_interval,
+    limit,
+    last_run_ctx,
+    fetch_full_feed: bool = False,
+    filter_args: Optional[dict] = None,
+) -> Tuple[list, dict]:
+    """
+    Fetch indicators from TAXII 2 server
+    :param client: Taxii2FeedClient
+    :param initial_interval: initial interval in parse_date_range format
+    :param limit: upper limit of indicators to fetch
+    :param last_run_ctx: last run dict with {collection_id: last_run_time string}
+    :param fetch_full_feed: when set to true, will ignore last run, and try to fetch the entire feed
+    :param filter_args: filter args requested by the user
+    :return: indicators in cortex TIM format
+    """
+    indicators: list = []
+    for page_indicators in fetch_indicator_pages(
+        client, initial_interval, limit, last_run_ctx, fetch_full_feed, filter_args
+    ):
+        indicators.extend(page_indicators)
     return indicators, last_run_ctx
 
 
@@ -280,16 +299,20 @@ def main():
             if fetch_full_feed:
                 limit = -1
             integration_ctx = demisto.getIntegrationContext() or {}
-            (indicators, integration_ctx) = fetch_indicators_command(
+            # each page is submitted as it's fetched, so the fingerprints of indicators removed from a full feed
+            # are dropped only on the daily full submission
+            for indicators in fetch_indicator_pages(
                 client,
                 initial_interval,
                 limit,
                 integration_ctx,
                 fetch_full_feed,
                 filter_args,
-            )
-            for iter_ in batch(indicators, batch_size=2000):
-                demisto.createIndicators(iter_)
+            ):
+                create_indicators_delta(indicators, full_feed=False, integration_context=integration_ctx)
+                if not fetch_full_feed:
+                    # checkpoint the last run, so a fetch which fails midway resumes after the submitted pages
+                    demisto.setIntegrationContext(integration_ctx)
 
             demisto.setIntegrationContext(integration_ctx)
         else:
@@ -42,9 +42,9 @@ class TestFetchIndicators:
         mock_client.collections = [MockCollection(default_id, 'default'), MockCollection(nondefault_id, 'not_default')]
 
         mock_client.collection_to_fetch = mock_client.collections[0]
-        mocker.patch.object(mock_client, 'build_iterator', return_value=RESULTS_JSON)
+        mocker.patch.object(mock_client, 'poll_indicator_pages', return_value=iter([[RESULTS_JSON]]))
         indicators, last_run = fetch_indicators_command(mock_client, '1 day', -1, {})
-        assert indicators == RESULTS_JSON
+        assert indicators == [RESULTS_JSON]
         assert mock_client.collection_to_fetch.id in last_run
 
     def test_single_with_context(self, mocker):
@@ -71,9 +71,9 @@ class TestFetchIndicators:
 
         mock_client.collection_to_fetch = mock_client.collections[0]
         last_run = {mock_client.collections[1]: 'test'}
-        mocker.patch.object(mock_client, 'build_iterator', return_value=RESULTS_JSON)
+        mocker.patch.object(mock_client, 'poll_indicator_pages', return_value=iter([[RESULTS_JSON]]))
         indicators, last_run = fetch_indicators_command(mock_client, '1 day', -1, last_run)
-        assert indicators == RESULTS_JSON
+        assert indicators == [RESULTS_JSON]
         assert mock_client.collection_to_fetch.id in last_run
         assert last_run.get(mock_client.collections[1]) == 'test'
 
@@ -99,7 +99,8 @@ class TestFetchIndicators:
         nondefault_id = 2
         mock_client.collections = [MockCollection(default_id, 'default'), MockCollection(nondefault_id, 'not_default')]
 
-        mocker.patch.object(mock_client, 'build_iterator', side_effect=[CORTEX_IOCS_1, CORTEX_IOCS_2])
+        mocker.patch.object(mock_client, 'poll_indicator_pages',
+                            side_effect=[iter([CORTEX_IOCS_1]), iter([CORTEX_IOCS_2])])
         indicators, last_run = fetch_indicators_command(mock_client, '1 day', -1, {})
         assert len(indicators) == 14
         assert mock_client.collection_to_fetch.id in last_run
@@ -127,12 +128,56 @@ class TestFetchIndicators:
         mock_client.collections = [MockCollection(id_1, 'a'), MockCollection(id_2, 'b')]
 
         last_run = {mock_client.collections[1]: 'test'}
-        mocker.patch.object(mock_client, 'build_iterator', side_effect=[CORTEX_IOCS_1, CORTEX_IOCS_2])
+        mocker.patch.object(mock_client, 'poll_indicator_pages',
+                            side_effect=[iter([CORTEX_IOCS_1]), iter([CORTEX_IOCS_2])])
         indicators, last_run = fetch_indicators_command(mock_client, '1 day', len(CORTEX_IOCS_1), last_run)
         assert len(indicators) == len(CORTEX_IOCS_1)
         assert last_run.get(mock_client.collections[1]) == 'test'
 
 
+def test_fetch_indicators_checkpoint_each_page(mocker):
+    """
+    Scenario: Test the fetch submits and checkpoints each page
+
+    Given:
+    - collection to fetch is set to 'default', with no integration context
+    - the collection has 2 pages of indicators, and fetching the second page fails
+
+    When:
+    - fetching indicators
+
+    Then:
+    - the first page is submitted
+    - the last run saved after the failure resumes after the first page
+    """
+    import FeedTAXII2
+    mock_client = Taxii2FeedClient(url='', collection_to_fetch='default', proxies=[], verify=False)
+    mock_client.collections = [MockCollection(1, 'default')]
+
+    def poll_indicator_pages(limit, **kwargs):
+        mock_client.last_fetched_indicator__modified = '2020-01-01T00:00:00.000Z'
+        yield CORTEX_IOCS_1
+        raise DemistoException('Failed to fetch the second page')
+
+    integration_context: dict = {}
+    mocker.patch.object(demisto, 'params', return_value={'initial_interval': '1 day'})
+    mocker.patch.object(demisto, 'command', return_value='fetch-indicators')
+    mocker.patch.object(demisto, 'createIndicators')
+    mocker.patch.object(demisto, 'getIntegrationContext', side_effect=lambda: dict(integration_context))
+    mocker.patch.object(demisto, 'setIntegrationContext', side_effect=integration_context.update)
+    mocker.patch.object(FeedTAXII2, 'return_error')
+    mocker.patch.object(Taxii2FeedClient, 'initialise')
+    mocker.patch.object(FeedTAXII2, 'Taxii2FeedClient', return_value=mock_client)
+    mock_client.collection_to_fetch = mock_client.collections[0]
+    mocker.patch.object(mock_client, 'poll_indicator_pages', side_effect=poll_indicator_pages)
+
+    FeedTAXII2.main()
+
+    assert demisto.createIndicators.call_args[0][0] == CORTEX_IOCS_1
+    assert integration_context[1] == '2020-01-01T00:00:00.000Z'
+    assert FeedTAXII2.return_error.called
+
+
 class TestHelperFunctions:
     def test_try_parse_integer(self):
         assert try_parse_integer(None, '') is None
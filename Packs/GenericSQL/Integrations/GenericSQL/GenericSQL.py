@@ -21,6 +21,15 @@ pymysql.install_as_MySQLdb()
 
 GLOBAL_CACHE_ATTR = '_generic_sql_engine_cache'
 DEFAULT_POOL_TTL = 600
+# dialects supporting a "LIMIT <limit> OFFSET <skip>" clause, used to page select queries on the server side
+LIMIT_OFFSET_DIALECTS = ('MySQL', 'PostgreSQL')
+# dialects whose drivers support server side cursors (stream_results)
+STREAM_RESULTS_DIALECTS = ('MySQL', 'PostgreSQL')
+SELECT_QUERY_PREFIXES = ('select', 'with')
+# clauses which a LIMIT/OFFSET clause can't simply be appended after
+NON_PAGINATED_CLAUSES_REGEX = re.compile(r'\b(limit|offset|fetch|for|lock|into|procedure)\b', re.IGNORECASE)
+# a clause appended after a line comment would be commented out, so queries with comments are paged by the client
+SQL_COMMENT_TOKENS = ('--', '#', '/*')
 
 
 class Client:
@@ -30,7 +39,8 @@ class Client:
     """
 
     def __init__(self, dialect: str, host: str, username: str, password: str, port: str,
-                 database: str, connect_parameters: str, ssl_connect: bool, use_pool=False, pool_ttl=DEFAULT_POOL_TTL):
+                 database: str, connect_parameters: str, ssl_connect: bool, use_pool=False, pool_ttl=DEFAULT_POOL_TTL,
+                 stream_results=False):
         self.dialect = dialect
         self.host = host
         self.username = username
@@ -41,6 +51,7 @@ class Client:
         self.ssl_connect = ssl_connect
         self.use_pool = use_pool
         self.pool_ttl = pool_ttl
+        self.stream_results = stream_results and dialect in STREAM_RESULTS_DIALECTS
         self.connection = self._create_engine_and_connect()
 
     @staticmethod
@@ -111,17 +122,26 @@ class Client:
                                               poolclass=sqlalchemy.pool.NullPool)
         return engine.connect()
 
-    def sql_query_execute_request(self, sql_query: str, bind_vars: Any) -> Tuple[Dict, List]:
+    def sql_query_execute_request(self, sql_query: str, bind_vars: Any, fetch_limit: int = 0) -> Tuple[List, List]:
         """Execute query in DB via engine
         :param bind_vars: in case there are names and values - a bind_var dict, in case there are only values - list
         :param sql_query: the SQL query
+        :param fetch_limit: the maximum number of rows to fetch, 0 fetches all of them
         :return: results of query, table headers
         """
         if type(bind_vars) is dict:
             sql_query = text(sql_query)
 
-        result = self.connection.execute(sql_query, bind_vars)
-        results = result.fetchall()
+        connection = self.connection
+        if fetch_limit and self.stream_results:
+            # fetch only the needed rows over a server side cursor instead of buffering the whole result set
+            connection = connection.execution_options(stream_results=True)
+        result = connection.execute(sql_query, bind_vars)
+        if fetch_limit:
+            results = result.fetchmany(fetch_limit)
+            result.close()
+        else:
+            results = result.fetchall()
         headers = []
         if results:
             # if the table isn't empty
@@ -129,6 +149,26 @@ class Client:
         return results, headers
 
 
+def build_paginated_query(dialect: str, sql_query: str, skip: int, limit: int) -> str:
+    """
+    Appends a LIMIT/OFFSET clause to a select query so the database returns only the requested page, when the
+    dialect supports it. The query isn't wrapped in a subquery, as MySQL rejects derived tables with duplicate column
+    names (e.g. joins selecting "*"), so queries which already limit their results or end with a clause that must
+    come after LIMIT are left as is, as are queries with comments, which the appended clause could end up inside.
+    :param dialect: sql db type
+    :param sql_query: the SQL query
+    :param skip: the offset at which to start the results
+    :param limit: the maximum number of results
+    :return: the paginated query, or an empty string if it can't be paginated on the server side
+    """
+    query = sql_query.strip().rstrip(';').rstrip()
+    if dialect not in LIMIT_OFFSET_DIALECTS or not query.lower().startswith(SELECT_QUERY_PREFIXES) or ';' in query:
+        return ''
+    if NON_PAGINATED_CLAUSES_REGEX.search(query) or any(token in query for token in SQL_COMMENT_TOKENS):
+        return ''
+    return f'{query} LIMIT {int(limit)} OFFSET {int(skip)}'
+
+
 def generate_default_port_by_dialect(dialect: str) -> str:
     """
     In case no port was chosen, a default port will be chosen according to the SQL db type. Only return a port for
@@ -186,12 +226,16 @@ def sql_query_execute(client: Client, args: dict, *_) -> Tuple[str, Dict[str, An
         bind_variables_values = args.get('bind_variables_values', "")
         bind_variables = generate_bind_vars(bind_variables_names, bind_variables_values)
 
-        result, headers = client.sql_query_execute_request(sql_query, bind_variables)
+        paginated_query = build_paginated_query(client.dialect, sql_query, skip, limit)
+        if paginated_query:
+            result, headers = client.sql_query_execute_request(paginated_query, bind_variables, limit)
+        else:
+            result, headers = client.sql_query_execute_request(sql_query, bind_variables, skip + limit)
+            result = result[skip:skip + limit]
         # converting an sqlalchemy object to a table
         converted_table = [dict(row) for row in result]
         # converting b'' and datetime objects to readable ones
         table = [{str(key): str(value) for key, value in dictionary.items()} for dictionary in converted_table]
-        table = table[skip:skip + limit]
         human_readable = tableToMarkdown(name="Query result:", t=table, headers=headers,
                                          removeNull=True)
         context = {
@@ -248,11 +292,13 @@ def main():
         pool_ttl = int(params.get('pool_ttl') or DEFAULT_POOL_TTL)
         if pool_ttl <= 0:
             pool_ttl = DEFAULT_POOL_TTL
+        stream_results = params.get('stream_results', False)
         command = demisto.command()
         LOG(f'Command being called in SQL is: {command}')
         client = Client(dialect=dialect, host=host, username=user, password=password,
                         port=port, database=database, connect_parameters=connect_parameters,
-                        ssl_connect=ssl_connect, use_pool=use_pool, pool_ttl=pool_ttl)
+                        ssl_connect=ssl_connect, use_pool=use_pool, pool_ttl=pool_ttl,
+                        stream_results=stream_results)
         commands: Dict[str, Callable[[Client, Dict[str, str], str], Tuple[str, Dict[Any, Any], List[Any]]]] = {
             'test-module': test_module,
             'query': sql_query_execute,
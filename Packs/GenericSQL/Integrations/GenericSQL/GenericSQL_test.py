@@ -1,4 +1,4 @@
-from GenericSQL import Client, sql_query_execute, generate_default_port_by_dialect
+from GenericSQL import Client, sql_query_execute, generate_default_port_by_dialect, build_paginated_query
 import pytest
 import sqlalchemy
 import os
@@ -11,6 +11,12 @@ class ResultMock:
     def fetchall(self):
         return []
 
+    def fetchmany(self, size):
+        return []
+
+    def close(self):
+        pass
+
 
 ARGS1 = {
     'query': "select Name from city",
@@ -221,6 +227,83 @@ def test_sql_queries_with_empty_table(mocker):
     assert EMPTY_OUTPUT == result[1]  # entry context is found in the 2nd place in the result of the command
 
 
+@pytest.mark.parametrize('dialect, query, expected_query', [
+    ('MySQL', 'select Name from city;', 'select Name from city LIMIT 5 OFFSET 10'),
+    ('PostgreSQL', ' WITH c AS (select Name from city) select * from c ',
+     'WITH c AS (select Name from city) select * from c LIMIT 5 OFFSET 10'),
+    # duplicate column names, which can't be selected from a derived table in MySQL
+    ('MySQL', 'select * from city join country on city.id = country.id',
+     'select * from city join country on city.id = country.id LIMIT 5 OFFSET 10'),
+    # already limited
+    ('MySQL', 'select Name from city limit 100', ''),
+    ('PostgreSQL', 'select Name from city fetch first 100 rows only', ''),
+    # a clause which must come after LIMIT
+    ('MySQL', 'select Name from city for update', ''),
+    # not a select query
+    ('MySQL', 'delete from city', ''),
+    # multiple statements
+    ('MySQL', 'select 1; select 2', ''),
+    # comments, which the appended clause could end up inside
+    ('MySQL', 'select Name from city -- all cities', ''),
+    ('MySQL', 'select Name from city # all cities', ''),
+    ('PostgreSQL', 'select /* all */ Name from city', ''),
+    # no LIMIT/OFFSET support
+    ('Oracle', 'select Name from city', ''),
+])
+def test_build_paginated_query(dialect, query, expected_query):
+    assert build_paginated_query(dialect, query, skip=10, limit=5) == expected_query
+
+
+def create_sqlite_client(mocker, dialect):
+    # sqlite isn't a dialect of the integration, it stands in for the dialects supporting LIMIT/OFFSET
+    mocker.patch('GenericSQL.LIMIT_OFFSET_DIALECTS', ('sqlite',))
+    connection = sqlalchemy.create_engine('sqlite://').connect()
+    connection.execute('create table city (id integer, Name text)')
+    connection.execute('insert into city values ' + ','.join(f"({i}, 'city{i}')" for i in range(1000)))
+    mocker.patch.object(Client, '_create_engine_and_connect', return_value=connection)
+    return Client(dialect, 'server_url', 'username', 'password', 'port', 'database', "", False)
+
+
+@pytest.mark.parametrize('dialect', ['sqlite', 'Oracle'])
+def test_sql_query_execute_page(dialect, mocker):
+    """Unit test
+    Given
+    - a table of 1000 rows
+    When
+    - querying a page of it, paginated on the server side (sqlite) or not (Oracle)
+    Then
+    - only the requested page is returned
+    - rows are fetched only up to the end of the page
+    """
+    client = create_sqlite_client(mocker, dialect)
+    execute_request = mocker.spy(client, 'sql_query_execute_request')
+    args = {'query': 'select * from city order by id', 'limit': 5, 'skip': 10}
+    _, _, table = sql_query_execute(client, args)
+    assert table == [{'id': str(i), 'Name': f'city{i}'} for i in range(10, 15)]
+    if dialect == 'sqlite':
+        assert 'LIMIT 5 OFFSET 10' in execute_request.call_args[0][0]
+        assert execute_request.call_args[0][2] == 5
+    else:
+        assert execute_request.call_args[0][2] == 15
+
+
+def test_sql_query_execute_page_commented_query(mocker):
+    """Unit test
+    Given
+    - a table of 1000 rows
+    When
+    - querying a page of it with a query ending with a line comment, on a dialect supporting LIMIT/OFFSET
+    Then
+    - the query is paged by the client and the requested page is returned
+    """
+    client = create_sqlite_client(mocker, 'sqlite')
+    execute_request = mocker.spy(client, 'sql_query_execute_request')
+    args = {'query': 'select * from city order by id -- page of cities', 'limit': 3, 'skip': 10}
+    _, _, table = sql_query_execute(client, args)
+    assert table == [{'id': str(i), 'Name': f'city{i}'} for i in range(10, 13)]
+    assert execute_request.call_args[0][0] == args['query']
+
+
 def test_mysql_integration():
     """Test actual connection to mysql. Will be skipped unless MYSQL_HOST is set.
     Can be used to do local debuging of connecting to MySQL by set env var MYSQL_HOST or changing the code below.
@@ -2,7 +2,9 @@ from CommonServerPython import *
 
 ''' IMPORTS '''
 from collections import defaultdict
-from typing import Any, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, Optional
+import threading
 import httplib2
 import urllib.parse
 from oauth2client import service_account
@@ -18,6 +20,13 @@ SCOPES = ['https://www.googleapis.com/auth/chronicle-backstory']
 
 BACKSTORY_API_V1_URL = 'https://backstory.googleapis.com/v1'
 
+# number of artifacts looked up in parallel by the reputation commands
+REPUTATION_CONCURRENCY = 5
+
+REPUTATION_CACHE_KEY = 'reputation_cache'
+REPUTATION_CACHE_MAX_SIZE = 500
+DEFAULT_CACHE_TTL_MINUTES = '60'
+
 ISO_DATE_REGEX = (r'^(-?(?:[1-9][0-9]*)?[0-9]{4})-(1[0-2]|0[1-9])-(3[01]|0[1-9]|[12][0-9])T(2[0-3]|[01][0-9]):'
                   r'([0-5][0-9]):([0-5][0-9])(\.[0-9]+)?Z$')
 
@@ -101,9 +110,76 @@ class Client:
     def __init__(self, params: Dict[str, Any], proxy, disable_ssl):
         encoded_service_account = str(params.get('service_account_credential'))
         service_account_credential = json.loads(encoded_service_account, strict=False)
-        credentials = service_account.ServiceAccountCredentials.from_json_keyfile_dict(service_account_credential,
-                                                                                       scopes=SCOPES)
-        self.http_client = credentials.authorize(get_http_client(proxy, disable_ssl))
+        self.credentials = service_account.ServiceAccountCredentials.from_json_keyfile_dict(service_account_credential,
+                                                                                            scopes=SCOPES)
+        self.proxy = proxy
+        self.disable_ssl = disable_ssl
+        self._local = threading.local()
+        # authorize the client of the main thread upfront, so proxy configuration errors are raised here
+        self._local.http_client = self.credentials.authorize(get_http_client(proxy, disable_ssl))
+
+    @property
+    def http_client(self):
+        """
+        The authorized HTTP client of the current thread. httplib2 clients are not thread safe, so each thread making
+        requests gets its own client, authorized with the same credentials.
+        """
+        http_client = getattr(self._local, 'http_client', None)
+        if http_client is None:
+            http_client = self.credentials.authorize(get_http_client(self.proxy, self.disable_ssl))
+            self._local.http_client = http_client
+        return http_client
+
+
+class ReputationCache:
+    """
+    Caches the IoC details responses by their request URL, for the configured TTL
+    """
+
+    def __init__(self):
+        self.ttl = 0
+        self.lock = threading.Lock()
+        self.responses = {}  # type: Dict[str, Dict[str, Any]]
+        self.modified = False
+
+    def load(self, ttl_minutes: int):
+        """
+        Loads the responses which did not expire from the integration context
+
+        :param ttl_minutes: the minutes a response is reused for, 0 disables the cache
+        """
+        self.ttl = ttl_minutes * 60
+        if self.ttl > 0:
+            now = time.time()
+            responses = demisto.getIntegrationContext().get(REPUTATION_CACHE_KEY) or {}
+            self.responses = {url: entry for url, entry in responses.items() if entry['time'] + self.ttl > now}
+
+    def save(self):
+        """
+        Saves the most recent responses to the integration context, if new responses were cached
+        """
+        if not self.modified:
+            return
+        responses = sorted(self.responses.items(), key=lambda item: item[1]['time'], reverse=True)
+        integration_context = demisto.getIntegrationContext() or {}
+        integration_context[REPUTATION_CACHE_KEY] = dict(responses[:REPUTATION_CACHE_MAX_SIZE])
+        demisto.setIntegrationContext(integration_context)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        entry = self.responses.get(url)
+        if entry is not None and entry['time'] + self.ttl > time.time():
+            return entry['response']
+        return None
+
+    def set(self, url: str, response: Dict[str, Any]):
+        if self.ttl <= 0:
+            return
+        with self.lock:
+            self.responses[url] = {'response': response, 'time': int(time.time())}
+            self.modified = True
+
+
+reputation_cache = ReputationCache()
 
 
 ''' HELPER FUNCTIONS '''
@@ -139,6 +215,7 @@ def get_http_client(proxy, disable_ssl):
 def validate_response(client, url, method='GET'):
     """
     Get response from Chronicle Search API and validate it.
+    Errors are raised rather than returned, since it's also called by the reputation commands worker threads.
 
     :param client: object of client class
     :type client: object of client class
@@ -159,11 +236,11 @@ def validate_response(client, url, method='GET'):
         if raw_response[0].status == 500:
             raise ValueError('Internal server error occurred, please try again later')
         if raw_response[0].status == 429:
-            demisto.debug('API Rate limit exceeded. Retrying in {} seconds...'.format(1))
+            # API rate limit exceeded, retrying in 1 second
             time.sleep(1)
             continue
         if raw_response[0].status != 200:
-            return_error(
+            raise ValueError(
                 'Status code: {}\nError: {}'.format(raw_response[0].status, parse_error_message(raw_response[1])))
         try:
             response = json.loads(raw_response[1])
@@ -173,6 +250,25 @@ def validate_response(client, url, method='GET'):
     raise ValueError('API rate limit exceeded. Try again later.')
 
 
+def get_ioc_details(client, request_url):
+    """
+    Get the IoC details response of an artifact, from the reputation cache if it was looked up recently.
+
+    :param client: object of client class
+    :type client: object of client class
+
+    :param request_url: listiocdetails url of the artifact
+    :type request_url: str
+
+    :return: response
+    """
+    response = reputation_cache.get(request_url)
+    if response is None:
+        response = validate_response(client, request_url)
+        reputation_cache.set(request_url, response)
+    return response
+
+
 def get_params_for_reputation_command():
     """
     This function gets the Demisto parameters related to reputation command
@@ -235,6 +331,7 @@ def validate_configuration_parameters(param: Dict[str, Any]):
     service_account_json = param.get('service_account_credential', '')
     fetch_days = param.get('first_fetch_time_interval_days', '3 days').lower()
     page_size = param.get('fetch_limit', '10')
+    cache_ttl = param.get('cache_ttl', DEFAULT_CACHE_TTL_MINUTES)
 
     try:
         # validate service_account_credential configuration parameter
@@ -244,6 +341,10 @@ def validate_configuration_parameters(param: Dict[str, Any]):
         if not page_size.isdigit():
             raise ValueError('Incidents fetch limit must be a number')
 
+        # validate cache_ttl configuration parameter
+        if not str(cache_ttl).isdigit():
+            raise ValueError('Reputation cache TTL must be a number')
+
         # validate first_fetch_time_interval_days parameter
         range_split = fetch_days.split(' ')
         if len(range_split) != 2:
@@ -522,9 +623,6 @@ def parse_error_message(error):
     try:
         json_error = json.loads(error)
     except json.decoder.JSONDecodeError:
-        demisto.debug(
-            'Invalid response received from Chronicle Search API. Response not in JSON format. Response - {}'.format(
-                error))
         raise ValueError('Invalid response received from Chronicle Search API. Response not in JSON format.')
 
     if json_error.get('error', {}).get('code') == 403:
@@ -565,7 +663,7 @@ def get_informal_time(date):
     return 'a year ago' if total_time == 1 else str(total_time) + ' years ago'
 
 
-def parse_list_ioc_response(ioc_matches):
+def parse_list_ioc_response(ioc_matches, include_hr=True):
     """
     Parse response of list iocs within the specified time range.
     Constructs the Domain Standard context, Human readable and EC.
@@ -573,6 +671,9 @@ def parse_list_ioc_response(ioc_matches):
     :type ioc_matches: List
     :param ioc_matches: it is list of iocs
 
+    :type include_hr: bool
+    :param include_hr: whether to construct the human readable, which is not needed when fetching incidents
+
     :return: gives dict that contain hr_ioc_matches dict for human readable,domain_std_context and contexts dict for
         context data
     :rtype: Dict
@@ -594,16 +695,17 @@ def parse_list_ioc_response(ioc_matches):
             category = ioc_rep_source.get('category', '')
 
             # prepare normalized dict for human readable
-            hr_ioc_matches.append({
-                'Domain': '[{}]({})'.format(domain, ioc_match.get('uri', [''])[0]),
-                'Category': category,
-                'Source': source,
-                'Confidence': confidence,
-                'Severity': severity,
-                'IOC ingest time': get_informal_time(ingest_time),
-                'First seen': get_informal_time(first_seen_time),
-                'Last seen': get_informal_time(last_seen_time),
-            })
+            if include_hr:
+                hr_ioc_matches.append({
+                    'Domain': '[{}]({})'.format(domain, ioc_match.get('uri', [''])[0]),
+                    'Category': category,
+                    'Source': source,
+                    'Confidence': confidence,
+                    'Severity': severity,
+                    'IOC ingest time': get_informal_time(ingest_time),
+                    'First seen': get_informal_time(first_seen_time),
+                    'Last seen': get_informal_time(last_seen_time),
+                })
 
             sources.append({
                 'Category': category,
@@ -888,7 +990,7 @@ def get_ioc_domain_matches(client_obj, start_time, fetch_limit):
 
     response_body = validate_response(client_obj, request_url)
     ioc_matches = response_body.get('response', {}).get('matches', [])
-    parsed_ioc = parse_list_ioc_response(ioc_matches)
+    parsed_ioc = parse_list_ioc_response(ioc_matches, include_hr=False)
     return parsed_ioc['context']
 
 
@@ -904,11 +1006,24 @@ def get_gcb_alerts(client_obj, start_time, end_time, fetch_limit, filter_severit
 
     return events - list of dict representing events
     """
+    return list(iter_gcb_alerts(client_obj, start_time, end_time, fetch_limit, filter_severity))
+
+
+def iter_gcb_alerts(client_obj, start_time, end_time, fetch_limit, filter_severity) -> Iterator[Dict[str, Any]]:
+    """
+    Calls list alert API with :start_time, :end_time and :fetch_limit, and yields the parsed alerts one at a time.
+    :param client_obj perform API request
+    :param start_time
+    :param end_time
+    :param fetch_limit: the page size of the request, Backstory returns no more alerts than it
+    :param filter_severity
+
+    return events - iterator of dict representing events
+    """
     request_url = '{}/alert/listalerts?start_time={}&end_time={}&page_size={}'.format(BACKSTORY_API_V1_URL, start_time,
                                                                                       end_time, fetch_limit)
     json_response = validate_response(client_obj, request_url)
 
-    alerts = []
     for alert in json_response.get('alerts', []):
         # parsing each alert infos
         alert_info, alert_count = parse_alert_info(alert['alertInfos'], filter_severity)
@@ -917,13 +1032,11 @@ def get_gcb_alerts(client_obj, start_time, end_time, fetch_limit, filter_severit
         if alert_count == 0 and not alert_info:
             continue
 
-        asset_alert = {
+        yield {
             'AssetName': list(alert['asset'].values())[0],
             'AlertCounts': alert_count,
             'AlertInfo': alert_info
         }
-        alerts.append(asset_alert)
-    return alerts
 
 
 def reputation_operation_command(client_obj, indicator, reputation_function):
@@ -938,11 +1051,15 @@ def reputation_operation_command(client_obj, indicator, reputation_function):
     :return: output of all value according to specified function.
     """
     artifacts = argToList(indicator, ',')
-    for artifact in artifacts:
-        return_outputs(*reputation_function(client_obj, artifact))
+    max_workers = max(min(REPUTATION_CONCURRENCY, len(artifacts)), 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(reputation_function, client_obj, artifact) for artifact in artifacts]
+    # the workers only raise errors, the outputs and the first error are returned here in the order of the artifacts
+    for future in futures:
+        return_outputs(*future.result())
 
 
-def group_infos_by_alert_asset_name(asset_alerts):
+def group_infos_by_alert_asset_name(asset_alerts, include_hr=True):
     """
     this method converts assets with multiple alerts into assets per asset_alert and
         returns both human readable and context.
@@ -950,6 +1067,7 @@ def group_infos_by_alert_asset_name(asset_alerts):
     Returns human readable and context data.
 
     :param asset_alerts: normalized asset alerts returned by Backstory.
+    :param include_hr: whether to construct the human readable, which is not needed when fetching incidents
     :return: both human readable and context format having asset per alerts object
     """
 
@@ -962,36 +1080,42 @@ def group_infos_by_alert_asset_name(asset_alerts):
             asset_alert_hr = unique_asset_alerts_hr.get(asset_alert_key, {})
             asset_alert_ctx = unique_asset_alert_ctx.get(asset_alert_key, {})
 
-            if asset_alert_hr:
+            if asset_alert_ctx:
                 # Re calculate First and Last seen time
-                if info['Timestamp'] >= asset_alert_hr['Last Seen Ago']:
-                    asset_alert_hr['Last Seen Ago'] = info['Timestamp']
-                    asset_alert_hr['Last Seen'] = get_informal_time(info['Timestamp'])
+                if info['Timestamp'] >= asset_alert_ctx['LastSeen']:
                     asset_alert_ctx['LastSeen'] = info['Timestamp']
-                elif info['Timestamp'] <= asset_alert_hr['First Seen Ago']:
-                    asset_alert_hr['First Seen Ago'] = info['Timestamp']
-                    asset_alert_hr['First Seen'] = get_informal_time(info['Timestamp'])
+                    if include_hr:
+                        asset_alert_hr['Last Seen Ago'] = info['Timestamp']
+                        asset_alert_hr['Last Seen'] = get_informal_time(info['Timestamp'])
+                elif info['Timestamp'] <= asset_alert_ctx['FirstSeen']:
                     asset_alert_ctx['FirstSeen'] = info['Timestamp']
+                    if include_hr:
+                        asset_alert_hr['First Seen Ago'] = info['Timestamp']
+                        asset_alert_hr['First Seen'] = get_informal_time(info['Timestamp'])
             else:
-                asset_alert_hr['First Seen Ago'] = info['Timestamp']
-                asset_alert_hr['First Seen'] = get_informal_time(info['Timestamp'])
-                asset_alert_hr['Last Seen Ago'] = info['Timestamp']
-                asset_alert_hr['Last Seen'] = get_informal_time(info['Timestamp'])
-
                 asset_alert_ctx['FirstSeen'] = info['Timestamp']
                 asset_alert_ctx['LastSeen'] = info['Timestamp']
+                if include_hr:
+                    asset_alert_hr['First Seen Ago'] = info['Timestamp']
+                    asset_alert_hr['First Seen'] = get_informal_time(info['Timestamp'])
+                    asset_alert_hr['Last Seen Ago'] = info['Timestamp']
+                    asset_alert_hr['Last Seen'] = get_informal_time(info['Timestamp'])
 
             asset_alert_ctx.setdefault('Occurrences', []).append(info['Timestamp'])
-            asset_alert_ctx['Alerts'] = asset_alert_hr['Alerts'] = asset_alert_ctx.get('Alerts', 0) + 1
+            asset_alert_ctx['Alerts'] = asset_alert_ctx.get('Alerts', 0) + 1
             asset_alert_ctx['Asset'] = asset_alert['AssetName']
-            asset_alert_ctx['AlertName'] = asset_alert_hr['Alert Names'] = info['Name']
-            asset_alert_ctx['Severities'] = asset_alert_hr['Severities'] = info['Severity']
-            asset_alert_ctx['Sources'] = asset_alert_hr['Sources'] = info['SourceProduct']
-
-            asset_alert_hr['Asset'] = '[{}]({})'.format(asset_alert['AssetName'], info.get('Uri'))
-
+            asset_alert_ctx['AlertName'] = info['Name']
+            asset_alert_ctx['Severities'] = info['Severity']
+            asset_alert_ctx['Sources'] = info['SourceProduct']
             unique_asset_alert_ctx[asset_alert_key] = asset_alert_ctx
-            unique_asset_alerts_hr[asset_alert_key] = asset_alert_hr
+
+            if include_hr:
+                asset_alert_hr['Alerts'] = asset_alert_ctx['Alerts']
+                asset_alert_hr['Alert Names'] = info['Name']
+                asset_alert_hr['Severities'] = info['Severity']
+                asset_alert_hr['Sources'] = info['SourceProduct']
+                asset_alert_hr['Asset'] = '[{}]({})'.format(asset_alert['AssetName'], info.get('Uri'))
+                unique_asset_alerts_hr[asset_alert_key] = asset_alert_hr
 
     return unique_asset_alerts_hr, unique_asset_alert_ctx
 
@@ -1232,7 +1356,7 @@ def gcb_ioc_details_command(client_obj, args: Dict[str, str]):
 
     request_url = '{}/artifact/listiocdetails?artifact.{}={}'.format(BACKSTORY_API_V1_URL, artifact_type,
                                                                      urllib.parse.quote(artifact_value))
-    response = validate_response(client_obj, request_url)
+    response = get_ioc_details(client_obj, request_url)
 
     ec = {}  # type: Dict[str, Any]
     hr = ''
@@ -1287,7 +1411,7 @@ def ip_command(client_obj, ip_address: str):
     request_url = '{}/artifact/listiocdetails?artifact.destination_ip_address={}'.format(
         BACKSTORY_API_V1_URL, ip_address)
 
-    response = validate_response(client_obj, request_url)
+    response = get_ioc_details(client_obj, request_url)
 
     ec = {}  # type: Dict[str, Any]
     hr = ''
@@ -1343,7 +1467,7 @@ def domain_command(client_obj, domain_name: str):
     """
     request_url = '{}/artifact/listiocdetails?artifact.domain_name={}'.format(BACKSTORY_API_V1_URL,
                                                                               urllib.parse.quote(domain_name))
-    response = validate_response(client_obj, request_url)
+    response = get_ioc_details(client_obj, request_url)
 
     ec = {}  # type: Dict[str, Any]
     hr = ''
@@ -1410,9 +1534,9 @@ def fetch_incidents(client_obj, params: Dict[str, Any]):
 
     incidents = []
     if 'ioc domain matches' != backstory_alert_type.lower():
-        events = get_gcb_alerts(client_obj, start_time, end_time, fetch_limit, filter_severity)
+        events = iter_gcb_alerts(client_obj, start_time, end_time, fetch_limit, filter_severity)
 
-        _, contexts = group_infos_by_alert_asset_name(events)
+        _, contexts = group_infos_by_alert_asset_name(events, include_hr=False)
 
         # Converts event alerts into  actionable incidents
         for event in list(contexts.values()):
@@ -1570,12 +1694,15 @@ def main():
             test_function(client_obj, demisto.args())
         elif command == 'fetch-incidents':
             fetch_incidents(client_obj, demisto.params())
-        elif command == 'ip':
-            ip = demisto.args()['ip']
-            reputation_operation_command(client_obj, ip, ip_command)
-        elif command == 'domain':
-            domain = demisto.args()['domain']
-            reputation_operation_command(client_obj, domain, domain_command)
+        elif command in ('ip', 'domain', 'gcb-ioc-details'):
+            reputation_cache.load(int(demisto.params().get('cache_ttl', DEFAULT_CACHE_TTL_MINUTES)))
+            if command == 'ip':
+                reputation_operation_command(client_obj, demisto.args()['ip'], ip_command)
+            elif command == 'domain':
+                reputation_operation_command(client_obj, demisto.args()['domain'], domain_command)
+            else:
+                return_outputs(*gcb_ioc_details_command(client_obj, demisto.args()))
+            reputation_cache.save()
         elif command in chronicle_commands:
             return_outputs(*chronicle_commands[command](client_obj, demisto.args()))
 
@@ -2093,3 +2093,133 @@ def test_list_events_command(client):
     hr, ec, json_data = gcb_list_events_command(client, {})
     assert ec == {}
     assert hr == 'No Events Found'
+
+
+def test_reputation_operation_command_concurrent(client):
+    """
+    When multiple comma separated arguments are passed then the artifacts should be looked up in parallel and the
+    outputs should be returned in the order of the arguments
+    """
+    import threading
+    import time
+    from GoogleChronicleBackstory import reputation_operation_command
+    in_flight = []
+    max_in_flight = []
+    lock = threading.Lock()
+
+    def reputation_function(_, artifact):
+        with lock:
+            in_flight.append(artifact)
+            max_in_flight.append(len(in_flight))
+        time.sleep(0.3 if artifact == '1.1.1.1' else 0.1)
+        with lock:
+            in_flight.remove(artifact)
+        return artifact, {}, {}
+
+    with mock.patch('GoogleChronicleBackstory.return_outputs') as mock_return_outputs:
+        reputation_operation_command(client, '1.1.1.1,2.2.2.2,3.3.3.3', reputation_function)
+
+    assert max(max_in_flight) == 3
+    assert [call[0][0] for call in mock_return_outputs.call_args_list] == ['1.1.1.1', '2.2.2.2', '3.3.3.3']
+
+
+def test_reputation_operation_command_error(mocker, client):
+    """
+    When the lookup of one of multiple comma separated arguments fails then the outputs of the preceding arguments
+    should be returned and the error should be raised on the calling thread, after all the lookups are done
+    """
+    from GoogleChronicleBackstory import reputation_operation_command, validate_response
+    mock_return_error = mocker.patch('GoogleChronicleBackstory.return_error')
+    done = []
+
+    def reputation_function(client_obj, artifact):
+        if artifact == '2.2.2.2':
+            client_obj.http_client.request.return_value = (Response(dict(status=403)),
+                                                           b'{"error": { "code": 403 } }')
+            validate_response(client_obj, 'url')
+        done.append(artifact)
+        return artifact, {}, {}
+
+    with mock.patch('GoogleChronicleBackstory.return_outputs') as mock_return_outputs:
+        with pytest.raises(ValueError) as error:
+            reputation_operation_command(client, '1.1.1.1,2.2.2.2,3.3.3.3', reputation_function)
+
+    assert str(error.value) == 'Status code: 403\nError: Permission denied'
+    assert mock_return_error.call_count == 0
+    assert sorted(done) == ['1.1.1.1', '3.3.3.3']
+    assert [call[0][0] for call in mock_return_outputs.call_args_list] == ['1.1.1.1']
+
+
+def test_reputation_cache(mocker, client):
+    """
+    When an artifact is looked up again within the cache TTL then the cached IoC details should be used, and when the
+    cached IoC details expired then they should be requested again
+    """
+    from GoogleChronicleBackstory import ip_command, reputation_cache, REPUTATION_CACHE_KEY
+    mocker.patch.object(demisto, 'params', return_value=PARAMS)
+    with open("./TestData/list_ioc_details_response.json", "r") as f:
+        dummy_response = f.read()
+    client.http_client.request.return_value = (Response(dict(status=200)), dummy_response)
+    integration_context = {}
+    mocker.patch.object(demisto, 'getIntegrationContext', side_effect=lambda: integration_context)
+    mocker.patch.object(demisto, 'setIntegrationContext', side_effect=integration_context.update)
+    mocker.patch.object(reputation_cache, 'responses', {})
+
+    reputation_cache.load(60)
+    first_ec = ip_command(client, ARGS['ip'])[1]
+    reputation_cache.save()
+    reputation_cache.load(60)
+    assert ip_command(client, ARGS['ip'])[1] == first_ec
+    assert client.http_client.request.call_count == 1
+
+    for entry in integration_context[REPUTATION_CACHE_KEY].values():
+        entry['time'] -= 3600
+    reputation_cache.load(60)
+    assert ip_command(client, ARGS['ip'])[1] == first_ec
+    assert client.http_client.request.call_count == 2
+    reputation_cache.load(0)
+
+
+def test_client_http_client_per_thread():
+    """
+    When requests are made from multiple threads then each thread should use its own authorized http client
+    """
+    import threading
+    from GoogleChronicleBackstory import Client
+    client_obj = Client.__new__(Client)
+    client_obj.credentials = mock.Mock()
+    client_obj.credentials.authorize.side_effect = lambda http: mock.Mock()
+    client_obj.proxy = False
+    client_obj.disable_ssl = False
+    client_obj._local = threading.local()
+
+    http_clients = []
+    threads = [threading.Thread(target=lambda: http_clients.extend([client_obj.http_client, client_obj.http_client]))
+               for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert http_clients[0] is http_clients[1]
+    assert http_clients[2] is http_clients[3]
+    assert http_clients[0] is not http_clients[2]
+
+
+def test_group_infos_by_alert_asset_name_without_hr(client):
+    """
+    When the human readable is not needed then the context should be the same as with the human readable
+    """
+    from GoogleChronicleBackstory import group_infos_by_alert_asset_name, get_gcb_alerts
+    from CommonServerPython import datetime
+
+    with open("./TestData/gcb_alerts_human_readable.txt") as f:
+        gcb_alert_sample = f.read()
+
+    client.http_client.request.return_value = (Response(dict(status=200)), gcb_alert_sample)
+    events = get_gcb_alerts(client, datetime.utcnow(), datetime.utcnow(), 20, None)
+    hr, ctx = group_infos_by_alert_asset_name(events)
+    no_hr, no_hr_ctx = group_infos_by_alert_asset_name(events, include_hr=False)
+
+    assert no_hr == {}
+    assert no_hr_ctx == ctx
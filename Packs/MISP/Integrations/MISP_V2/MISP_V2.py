@@ -1,6 +1,9 @@
 # type: ignore
 
+import concurrent.futures
+import itertools
 import logging
+import time
 import warnings
 from typing import Union, List, Any, Tuple, Dict
 from urllib.parse import urlparse
@@ -35,6 +38,8 @@ proxies = handle_proxy()  # type: ignore
 MISP_PATH = 'MISP.Event(obj.ID === val.ID)'
 MISP = ExpandedPyMISP(url=MISP_URL, key=MISP_KEY, ssl=USE_SSL, proxies=proxies)  # type: ExpandedPyMISP
 DATA_KEYS_TO_SAVE = demisto.params().get('context_select', [])
+FEED_MAX_WORKERS = 10
+FEED_UUID_SEARCH_CHUNK = 500
 
 """
 dict format :
@@ -983,48 +988,149 @@ def test():
         return_error('MISP has not connected.')
 
 
+def get_feed_session(max_workers: int) -> requests.Session:
+    """Creates a keep-alive session whose connection pool is sized to the feed import workers.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Accept': 'application/json'})
+    session.verify = USE_SSL
+    session.proxies = proxies
+    return session
+
+
+def get_existing_feed_events(uuids: List[str]) -> Dict[str, Dict[str, str]]:
+    """Looks up which of the given event UUIDs already exist in MISP.
+
+    Args:
+        uuids: event UUIDs taken from a feed manifest.
+
+    Returns:
+        dict: event UUID to {'id': MISP event ID, 'timestamp': last modification timestamp}.
+    """
+    existing_events = {}  # type: Dict[str, Dict[str, str]]
+    for i in range(0, len(uuids), FEED_UUID_SEARCH_CHUNK):
+        response = MISP.search(controller='events', uuid=uuids[i:i + FEED_UUID_SEARCH_CHUNK], metadata=True)
+        for event in response or []:
+            event = event.get('Event', event)
+            existing_events[event.get('uuid')] = {'id': event.get('id'), 'timestamp': event.get('timestamp')}
+    return existing_events
+
+
+def get_feed_events_to_import(manifest: dict, existing_events: Dict[str, Dict[str, str]],
+                              limit: int = 0) -> Tuple[List[Tuple[str, Union[str, None]]], int]:
+    """Compares the feed manifest against the events already in MISP (delta import).
+
+    Args:
+        manifest: the feed manifest, event UUID to event metadata.
+        existing_events: output of get_existing_feed_events.
+        limit: maximum number of events to import, 0 for no limit.
+
+    Returns:
+        tuple: (event UUID, MISP event ID to update or None for a new event) pairs,
+            and the number of events skipped as already up to date.
+    """
+    events_to_import = []  # type: List[Tuple[str, Union[str, None]]]
+    skipped = 0
+    for uuid, metadata in manifest.items():
+        existing_event = existing_events.get(uuid)
+        if existing_event:
+            feed_timestamp = int((metadata or {}).get('timestamp') or 0)
+            if int(existing_event.get('timestamp') or 0) >= feed_timestamp:
+                skipped += 1
+                continue
+            events_to_import.append((uuid, existing_event.get('id')))
+        else:
+            events_to_import.append((uuid, None))
+        if limit and len(events_to_import) == limit:
+            break
+    return events_to_import, skipped
+
+
+def import_feed_event(session: requests.Session, url: str, uuid: str, event_id: Union[str, None] = None) -> dict:
+    """Downloads a single feed event and adds it to MISP, or updates it if it already exists.
+    """
+    event = session.get(f'{url}/{uuid}.json').json()
+    if event_id:
+        return MISP.update_event(event, event_id=event_id)
+    return MISP.add_event(event)
+
+
 def add_events_from_feed():
     """Gets an OSINT feed from url and publishing them to MISP
     urls with feeds for example: `https://www.misp-project.org/feeds/`
     feed format must be MISP.
+    Events already in MISP are skipped unless the feed holds a newer version of them,
+    the rest are downloaded and added concurrently.
     """
-    headers = {'Accept': 'application/json'}
     url = demisto.getArg('feed')  # type: str
     url = url[:-1] if url.endswith('/') else url
     if PREDEFINED_FEEDS.get(url):
         url = PREDEFINED_FEEDS[url].get('url')  # type: ignore
     limit = demisto.getArg('limit')  # type: str
     limit_int = int(limit) if limit.isdigit() else 0
+    max_workers = demisto.getArg('max_workers') or str(FEED_MAX_WORKERS)  # type: str
+    max_workers_int = int(max_workers) if max_workers.isdigit() and int(max_workers) > 0 else FEED_MAX_WORKERS
 
     osint_url = f'{url}/manifest.json'
     not_added_counter = 0
+    start_time = time.time()
+    session = get_feed_session(max_workers_int)
     try:
-        uri_list = requests.get(osint_url, verify=USE_SSL, headers=headers, proxies=proxies).json()
-        events_numbers = list()  # type: List[Dict[str, int]]
-        for num, uri in enumerate(uri_list, 1):
-            req = requests.get(f'{url}/{uri}.json', verify=USE_SSL, headers=headers, proxies=proxies).json()
-            event = MISP.add_event(req)
-            if 'id' in event:
-                events_numbers.append({'ID': event['id']})
-            else:
-                not_added_counter += 1
-            # If limit exists
-            if limit_int == num:
-                break
-
-        entry_context = {MISP_PATH: events_numbers}
-        human_readable = tableToMarkdown(
-            f'Total of {len(events_numbers)} events was added to MISP.',
-            events_numbers,
-            headers='Event IDs'
-        )
-        if not_added_counter:
-            human_readable = f'{human_readable}\n' \
-                             f'{not_added_counter} events were not added. Might already been added earlier.'
-
-        return_outputs(human_readable, outputs=entry_context)
+        manifest = session.get(osint_url).json()
     except ValueError:
+        manifest = None
+    if not isinstance(manifest, dict):
+        session.close()
         return_error(f'URL [{url}] is not a valid MISP feed')
+        return
+
+    existing_events = get_existing_feed_events(list(manifest))
+    events_to_import, skipped_counter = get_feed_events_to_import(manifest, existing_events, limit_int)
+    events_numbers = list()  # type: List[Dict[str, int]]
+    updated_counter = 0
+
+    with session, concurrent.futures.ThreadPoolExecutor(max_workers=max_workers_int) as executor:
+        # keep a bounded number of events in flight so downloaded events are not piled up in memory
+        events_iter = iter(events_to_import)
+        pending = {executor.submit(import_feed_event, session, url, uuid, event_id): event_id
+                   for uuid, event_id in itertools.islice(events_iter, max_workers_int * 2)}
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                updated_event_id = pending.pop(future)
+                try:
+                    event = future.result()
+                except Exception as e:
+                    demisto.debug(f'Failed to import a feed event: {e}')
+                    event = {}
+                event = event.get('Event', event) if isinstance(event, dict) else {}
+                if 'id' in event:
+                    events_numbers.append({'ID': event['id']})
+                    updated_counter += 1 if updated_event_id else 0
+                else:
+                    not_added_counter += 1
+            for uuid, event_id in itertools.islice(events_iter, len(done)):
+                pending[executor.submit(import_feed_event, session, url, uuid, event_id)] = event_id
+
+    elapsed = max(time.time() - start_time, 0.001)
+    entry_context = {MISP_PATH: events_numbers}
+    human_readable = tableToMarkdown(
+        f'Total of {len(events_numbers)} events was added to MISP.',
+        events_numbers,
+        headers='Event IDs'
+    )
+    human_readable = f'{human_readable}\n' \
+                     f'{updated_counter} of the events were updated, {skipped_counter} events were already up to date.\n' \
+                     f'Imported {len(events_numbers)} events in {elapsed:.2f} seconds ' \
+                     f'({len(events_numbers) / elapsed:.2f} events per second).'
+    if not_added_counter:
+        human_readable = f'{human_readable}\n' \
+                         f'{not_added_counter} events were not added. Might already been added earlier.'
+
+    return_outputs(human_readable, outputs=entry_context)
 
 
 def add_object(event_id: str, obj: MISPObject):
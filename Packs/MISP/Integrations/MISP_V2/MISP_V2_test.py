@@ -166,3 +166,64 @@ def test_data_filtering(mocker):
     full_response = test_constants.full_response_before_filtering
     filtered_response = test_constants.response_after_filtering_category_eventid_uuid
     assert build_context(full_response) == filtered_response
+
+
+def test_get_feed_events_to_import(mocker):
+    """
+    Given:
+        - A feed manifest with a new event, an outdated event and an up to date event.
+    When:
+        - Comparing it against the events already in MISP.
+    Then:
+        - Ensure only the new and outdated events are imported, and the up to date one is skipped.
+    """
+    mock_misp(mocker)
+    from MISP_V2 import get_feed_events_to_import
+    manifest = {
+        'new': {'timestamp': '100'},
+        'outdated': {'timestamp': '200'},
+        'up-to-date': {'timestamp': '300'},
+    }
+    existing_events = {
+        'outdated': {'id': '1', 'timestamp': '150'},
+        'up-to-date': {'id': '2', 'timestamp': '300'},
+    }
+    events, skipped = get_feed_events_to_import(manifest, existing_events)
+    assert events == [('new', None), ('outdated', '1')]
+    assert skipped == 1
+
+    events, _ = get_feed_events_to_import(manifest, existing_events, limit=1)
+    assert events == [('new', None)]
+
+
+def test_add_events_from_feed(mocker, requests_mock):
+    """
+    Given:
+        - A MISP feed with three events, one of them already in MISP and up to date.
+    When:
+        - Running the misp-add-events-from-feed command.
+    Then:
+        - Ensure only the two missing events are downloaded and added to MISP.
+    """
+    mock_misp(mocker)
+    import demistomock as demisto
+    import MISP_V2
+    feed_url = 'https://feed.example.com'
+    args = {'feed': feed_url, 'limit': '0', 'max_workers': '2'}
+    mocker.patch.object(demisto, 'getArg', side_effect=lambda name: args.get(name))
+    manifest = {uuid: {'timestamp': '100'} for uuid in ('a', 'b', 'c')}
+    requests_mock.get(f'{feed_url}/manifest.json', json=manifest)
+    for uuid in ('a', 'c'):
+        requests_mock.get(f'{feed_url}/{uuid}.json', json={'Event': {'uuid': uuid}})
+    mocker.patch.object(MISP_V2.MISP, 'search', create=True,
+                        return_value=[{'Event': {'uuid': 'b', 'id': '2', 'timestamp': '100'}}])
+    add_event = mocker.patch.object(MISP_V2.MISP, 'add_event', create=True,
+                                    side_effect=lambda event: {'Event': {'id': event['Event']['uuid']}})
+    return_outputs = mocker.patch.object(MISP_V2, 'return_outputs')
+
+    MISP_V2.add_events_from_feed()
+
+    assert add_event.call_count == 2
+    human_readable, outputs = return_outputs.call_args[0][0], return_outputs.call_args[1]['outputs']
+    assert sorted(e['ID'] for e in outputs[MISP_V2.MISP_PATH]) == ['a', 'c']
+    assert '1 events were already up to date' in human_readable
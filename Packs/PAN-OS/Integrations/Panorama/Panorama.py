@@ -5,6 +5,9 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 import uuid
 import json
+import io
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 import requests
 
 # disable insecure warnings
@@ -19,6 +22,9 @@ API_KEY = str(demisto.params().get('key'))
 USE_SSL = not demisto.params().get('insecure')
 USE_URL_FILTERING = demisto.params().get('use_url_filtering')
 
+# number of log query jobs polled in parallel, also the size of the session connection pool
+LOGS_POLL_CONCURRENCY = 4
+
 # determine a vsys or a device-group
 VSYS = demisto.params().get('vsys')
 if demisto.args() and demisto.args().get('device-group', None):
@@ -109,12 +115,75 @@ class PAN_OS_Not_Found(Exception):
         pass
 
 
+def create_session() -> requests.Session:
+    """
+    Creates a session which keeps the connections to the PAN-OS API open between calls
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=LOGS_POLL_CONCURRENCY)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+SESSION = create_session()
+
+
+def parse_xml_response(xml_content: bytes) -> Dict:
+    """
+    Parses a PAN-OS XML response into the same dictionary structure as json.loads(xml2json(...)),
+    without the intermediate JSON string. Elements are cleared as soon as their parent ends, so large
+    responses (e.g. many log <entry> elements) are not kept in memory twice.
+    """
+    # every open element holds its attributes/children dict and its finished children
+    stack: List[Tuple[Dict, List[Tuple[str, Dict, Optional[str], Any]]]] = []
+    root: Dict = {}
+    for event, elem in ET.iterparse(io.BytesIO(xml_content), events=('start', 'end')):
+        if event == 'start':
+            stack.append(({'@' + key: value for key, value in elem.attrib.items()}, []))
+            continue
+
+        node, children = stack.pop()
+        # a child's tail is only known once its parent has ended
+        for child_tag, child_node, child_text, child in children:
+            value = finalize_xml_node(child_node, child_text, child.tail)
+            child.clear()
+            if child_tag in node:
+                if isinstance(node[child_tag], list):
+                    node[child_tag].append(value)
+                else:
+                    node[child_tag] = [node[child_tag], value]
+            else:
+                node[child_tag] = value
+        tag = strip_tag(elem.tag)
+        if stack:
+            stack[-1][1].append((tag, node, elem.text, elem))
+        else:
+            root = {tag: finalize_xml_node(node, elem.text, None)}
+    return root
+
+
+def finalize_xml_node(node: Dict, text: Optional[str], tail: Optional[str]) -> Any:
+    """
+    Returns the value of a parsed element, following the xml2json conventions for text and tail
+    """
+    text = text.strip() if text else text
+    tail = tail.strip() if tail else tail
+    if tail:
+        node['#tail'] = tail
+    if node:
+        if text:
+            node['#text'] = text
+        return node
+    return text or None
+
+
 def http_request(uri: str, method: str, headers: Dict = {},
                  body: Dict = {}, params: Dict = {}, files=None) -> Any:
     """
     Makes an API call with the given arguments
     """
-    result = requests.request(
+    result = SESSION.request(
         method,
         uri,
         headers=headers,
@@ -132,7 +201,7 @@ def http_request(uri: str, method: str, headers: Dict = {},
     if params.get('type') == 'export':
         return result
 
-    json_result = json.loads(xml2json(result.text))
+    json_result = parse_xml_response(result.content)
 
     # handle non success
     if json_result['response']['@status'] != 'success':
@@ -3091,7 +3160,7 @@ def panorama_list_pcaps_command():
         raise Exception('can not provide dlp-pcap without password')
 
     result = http_request(URL, 'GET', params=params)
-    json_result = json.loads(xml2json(result.text))['response']
+    json_result = parse_xml_response(result.content)['response']
     if json_result['@status'] != 'success':
         raise Exception('Request to get list of Pcaps Failed.\nStatus code: ' + str(
             json_result['response']['@code']) + '\nWith message: ' + str(json_result['response']['msg']['line']))
@@ -4365,8 +4434,10 @@ def prettify_logs(logs):
 def panorama_get_logs_command():
     ignore_auto_extract = demisto.args().get('ignore_auto_extract') == 'true'
     job_ids = argToList(demisto.args().get('job_id'))
-    for job_id in job_ids:
-        result = panorama_get_traffic_logs(job_id)
+    # poll all the jobs in parallel, the results keep the order of the given job IDs
+    with ThreadPoolExecutor(max_workers=LOGS_POLL_CONCURRENCY) as executor:
+        results = list(executor.map(panorama_get_traffic_logs, job_ids))
+    for job_id, result in zip(job_ids, results):
         log_type_dt = demisto.dt(demisto.context(), f'Panorama.Monitor(val.JobID === "{job_id}").LogType')
         if isinstance(log_type_dt, list):
             log_type = log_type_dt[0]
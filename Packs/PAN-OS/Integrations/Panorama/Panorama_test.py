@@ -245,3 +245,64 @@ def test_validate_search_time():
     with pytest.raises(Exception):
         assert validate_search_time('219/12/26 00:00:00')
         assert validate_search_time('219/10/35')
+
+
+@pytest.mark.parametrize('xml_response', [
+    '<response status="success"><result><job><status>FIN</status></job><log><logs count="2" progress="100">'
+    '<entry logid="1"><src>1.1.1.1</src></entry><entry logid="2"><src>2.2.2.2</src><dst/></entry>'
+    '</logs></log></result></response>',
+    '<?xml version="1.0" encoding="UTF-8"?>\n<response status = "success">\n  <result>\n  <a>  text </a>\n'
+    '  <a attr="1">t2</a> tail1 <b/> tail2\n  <ns:c xmlns:ns="urn:x">v</ns:c>\n  </result>\n</response>\n',
+    '<response status="error" code="7"><msg><line>No such node</line></msg></response>',
+])
+def test_parse_xml_response(xml_response):
+    """
+    Given:
+        - PAN-OS XML responses with attributes, repeated tags, empty elements, tails and namespaces.
+    When:
+        - Parsing them with parse_xml_response.
+    Then:
+        - The result is identical to converting them with xml2json and loading the JSON.
+    """
+    import json
+    from CommonServerPython import xml2json
+    from Panorama import parse_xml_response
+    expected = json.loads(xml2json(xml_response.encode('utf-8')))
+    assert parse_xml_response(xml_response.encode('utf-8')) == expected
+
+
+def test_panorama_get_logs_command_concurrent_polling(mocker):
+    """
+    Given:
+        - Three log query job IDs, where the first job takes the longest to return.
+    When:
+        - Running panorama-get-logs.
+    Then:
+        - The jobs are polled in parallel.
+        - The results are returned in the order of the given job IDs.
+    """
+    import threading
+    import time
+    import Panorama
+    mocker.patch.object(demisto, 'args', return_value={'job_id': '1,2,3'})
+    mocker.patch.object(demisto, 'context', return_value={})
+    mocker.patch.object(demisto, 'dt', return_value='traffic')
+    results = mocker.patch.object(demisto, 'results')
+    in_flight = []
+    max_in_flight = []
+    lock = threading.Lock()
+
+    def get_traffic_logs(job_id):
+        with lock:
+            in_flight.append(job_id)
+            max_in_flight.append(len(in_flight))
+        time.sleep(0.3 if job_id == '1' else 0.1)
+        with lock:
+            in_flight.remove(job_id)
+        return {'response': {'@status': 'success', 'result': {'job': {'status': 'ACT'}}}}
+
+    mocker.patch.object(Panorama, 'panorama_get_traffic_logs', side_effect=get_traffic_logs)
+    Panorama.panorama_get_logs_command()
+    assert max(max_in_flight) == 3
+    assert [call[0][0]['EntryContext']['Panorama.Monitor(val.JobID == obj.JobID)']['JobID']
+            for call in results.call_args_list] == ['1', '2', '3']
@@ -514,10 +514,17 @@ def fetch_incidents():
         # then start binary search back until you find the end of the list and finally return
         # `offensesPerCall` from the end.
     demisto.debug('QRadarMsg - Fetching {}'.format(fetch_query))
-    raw_offenses = get_offenses(_range='0-{0}'.format(OFFENSES_PER_CALL), _filter=fetch_query)
-    demisto.debug('QRadarMsg - Fetched {} successfully'.format(fetch_query))
-    if len(raw_offenses) >= OFFENSES_PER_CALL:
-        last_offense_pos = find_last_page_pos(fetch_query)
+    last_offense_pos = None
+    expected_last_page_pos = last_run.get('last_page_pos') if last_run else None
+    if expected_last_page_pos and validate_last_page_pos(fetch_query, expected_last_page_pos):
+        # the previous fetch left a backlog and its end is still where we expected it, skip the search
+        last_offense_pos = expected_last_page_pos
+    else:
+        raw_offenses = get_offenses(_range='0-{0}'.format(OFFENSES_PER_CALL), _filter=fetch_query)
+        demisto.debug('QRadarMsg - Fetched {} successfully'.format(fetch_query))
+        if len(raw_offenses) >= OFFENSES_PER_CALL:
+            last_offense_pos = find_last_page_pos(fetch_query)
+    if last_offense_pos is not None:
         raw_offenses = get_offenses(_range='{0}-{1}'.format(last_offense_pos - OFFENSES_PER_CALL + 1, last_offense_pos),
                                     _filter=fetch_query)
     raw_offenses = unicode_to_str_recur(raw_offenses)
@@ -529,10 +536,19 @@ def fetch_incidents():
     for offense in raw_offenses:
         offense_id = max(offense_id, offense['id'])
         incidents.append(create_incident_from_offense(offense))
-    demisto.setLastRun({'id': offense_id})
+    new_last_run = {'id': offense_id}
+    if raw_offenses and last_offense_pos is not None and last_offense_pos - OFFENSES_PER_CALL >= OFFENSES_PER_CALL:
+        # the offenses we just fetched are the last page, so the next fetch should find its end one page earlier
+        new_last_run['last_page_pos'] = last_offense_pos - OFFENSES_PER_CALL
+    demisto.setLastRun(new_last_run)
     return incidents
 
 
+# Checks with a single request that pos is the last position for QRadar query that receives a range parameter
+def validate_last_page_pos(fetch_query, pos):
+    return len(get_offenses(_range='{0}-{1}'.format(pos, pos + 1), _filter=fetch_query)) == 1
+
+
 # Finds the last page position for QRadar query that receives a range parameter
 def find_last_page_pos(fetch_query):
     # Make sure it wasn't a fluke we have exactly OFFENSES_PER_CALL results
@@ -663,8 +679,9 @@ def populate_src_and_dst_dicts_with_single_offense(offense, src_ids, dst_ids):
 # Helper method: Enriches the source addresses ids dictionary with the source addresses values corresponding to the ids
 def enrich_source_addresses_dict(src_adrs):
     src_ids_str = dict_values_to_comma_separated_string(src_adrs)
-    source_url = '{0}/api/siem/source_addresses?filter=id in ({1})'.format(SERVER, src_ids_str)
-    src_res = send_request('GET', source_url, AUTH_HEADERS)
+    source_url = '{0}/api/siem/source_addresses'.format(SERVER)
+    params = {'filter': 'id in ({0})'.format(src_ids_str), 'fields': 'id,source_ip'}
+    src_res = send_request('GET', source_url, AUTH_HEADERS, params)
     for src_adr in src_res:
         src_adrs[src_adr['id']] = convert_to_str(src_adr['source_ip'])
     return src_adrs
@@ -674,8 +691,9 @@ def enrich_source_addresses_dict(src_adrs):
 # the ids
 def enrich_destination_addresses_dict(dst_adrs):
     dst_ids_str = dict_values_to_comma_separated_string(dst_adrs)
-    destination_url = '{0}/api/siem/local_destination_addresses?filter=id in ({1})'.format(SERVER, dst_ids_str)
-    dst_res = send_request('GET', destination_url, AUTH_HEADERS)
+    destination_url = '{0}/api/siem/local_destination_addresses'.format(SERVER)
+    params = {'filter': 'id in ({0})'.format(dst_ids_str), 'fields': 'id,local_destination_ip'}
+    dst_res = send_request('GET', destination_url, AUTH_HEADERS, params)
     for dst_adr in dst_res:
         dst_adrs[dst_adr['id']] = convert_to_str(dst_adr['local_destination_ip'])
     return dst_adrs
@@ -279,6 +279,66 @@ def test_upload_indicators_command_no_indicators_found(mocker):
     assert res == "No indicators found, Reference set test_ref_set didn't change"
 
 
+def mock_offenses_api(mocker, qradar, offenses_count, min_id=0):
+    """
+    Mocks get_offenses with offenses sorted desc on id like QRadar does, and returns the mock to count the calls
+    """
+    def get_offenses(_range, _filter='', _fields=''):
+        offense_id = int(_filter.split('>')[1].split()[0])
+        ids = [i for i in range(min_id + offenses_count, min_id, -1) if i > offense_id]
+        start, end = [int(pos) for pos in _range.split('-')]
+        return [{'id': i, 'description': 'offense', 'start_time': 0} for i in ids[start:end + 1]]
+    mocker.patch.object(qradar, 'create_incident_from_offense', side_effect=lambda offense: offense)
+    return mocker.patch.object(qradar, 'get_offenses', side_effect=get_offenses)
+
+
+def test_fetch_incidents_saves_last_page_pos(mocker):
+    """
+    Given:
+        - There are more offenses to fetch than fit in a single fetch
+    When:
+        - I fetch incidents twice
+    Then:
+        - The first fetch searches for the last page and saves where the next fetch should find it
+        - The second fetch validates the saved position and skips the search
+    """
+    import QRadar as qradar
+    mocker.patch.object(demisto, 'getLastRun', return_value={'id': 0})
+    set_last_run = mocker.patch.object(demisto, 'setLastRun')
+    get_offenses = mock_offenses_api(mocker, qradar, 500)
+
+    incidents = qradar.fetch_incidents()
+    assert [incident['id'] for incident in incidents] == list(range(50, 0, -1))
+    assert set_last_run.call_args[0][0] == {'id': 50, 'last_page_pos': 449}
+
+    get_offenses.reset_mock()
+    mocker.patch.object(demisto, 'getLastRun', return_value=set_last_run.call_args[0][0])
+    incidents = qradar.fetch_incidents()
+    assert [incident['id'] for incident in incidents] == list(range(100, 50, -1))
+    assert set_last_run.call_args[0][0] == {'id': 100, 'last_page_pos': 399}
+    # one request to validate the saved position and one to fetch the page
+    assert get_offenses.call_count == 2
+
+
+def test_fetch_incidents_invalid_last_page_pos(mocker):
+    """
+    Given:
+        - The saved last page position is no longer valid, as new offenses were created since the last fetch
+    When:
+        - I fetch incidents
+    Then:
+        - The last page is searched again and the oldest offenses are fetched
+    """
+    import QRadar as qradar
+    mocker.patch.object(demisto, 'getLastRun', return_value={'id': 50, 'last_page_pos': 449})
+    set_last_run = mocker.patch.object(demisto, 'setLastRun')
+    mock_offenses_api(mocker, qradar, 600)
+
+    incidents = qradar.fetch_incidents()
+    assert [incident['id'] for incident in incidents] == list(range(100, 50, -1))
+    assert set_last_run.call_args[0][0] == {'id': 100, 'last_page_pos': 499}
+
+
 """ CONSTANTS """
 REQUEST_HEADERS = {'Content-Type': 'application/json', 'SEC': 'token'}
 NON_URL_SAFE_MSG = 'non-safe/;/?:@=&"<>#%{}|\\^~[] `'
@@ -9,6 +9,7 @@ import traceback
 from distutils.util import strtobool
 from typing import Any, Dict, List, Optional, Tuple, Union
 
+import aiohttp
 import requests
 import slack
 import urllib3
@@ -53,9 +54,18 @@ DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 OBJECTS_TO_KEYS = {
     'mirrors': 'investigation_id',
     'questions': 'entitlement',
-    'users': 'id'
+    'users': 'id',
+    'conversations': 'id'
 }
 SYNC_CONTEXT = True
+ANSWERS_POLL_CONCURRENCY = 10
+DIRECTORY_TTL_MINUTES = 60
+DIRECTORY_SYNC_KEYS = {
+    'users': 'users_synced',
+    'conversations': 'conversations_synced'
+}
+ANSWERS_POLL_TIMEOUT_SECONDS = 30
+CONVERSATION_ID_REGEX = re.compile(r'^[CDG][A-Z0-9]{8,}$')
 
 ''' GLOBALS '''
 
@@ -78,6 +88,10 @@ BOT_NAME: str
 BOT_ICON_URL: str
 MAX_LIMIT_TIME: int
 PAGINATED_COUNT: int
+# Integration info headers sent to the answers endpoint, fetched once per process
+INFO_HEADERS: Dict[str, str] = {}
+# Lookup indexes of the users and conversations in the integration context, with the context value they were built from
+DIRECTORY_INDEXES: Dict[str, Tuple[str, Dict[str, dict]]] = {}
 
 ''' HELPER FUNCTIONS '''
 
@@ -123,56 +137,254 @@ def get_current_utc_time() -> datetime:
     return datetime.utcnow()
 
 
-def get_user_by_name(user_to_search: str, add_to_context: bool = True) -> dict:
+def get_user_index_keys(user: dict) -> Tuple[list, list]:
     """
-    Gets a slack user by a user name
+    Gets the keys a slack user is looked up by.
+
+    Args:
+        user: The slack user
+
+    Returns:
+        The unique keys of the user (ID, name and email), and the keys which may be shared with other users.
+    """
+    profile = user.get('profile') or {}
+    unique_keys = [user.get('id'), user.get('name'), profile.get('email')]
+    shared_keys = [user.get('real_name'), profile.get('real_name'), profile.get('display_name')]
+    return unique_keys, shared_keys
+
+
+def get_conversation_index_keys(conversation: dict) -> Tuple[list, list]:
+    """
+    Gets the keys a slack conversation is looked up by.
+
+    Args:
+        conversation: The slack conversation
+
+    Returns:
+        The unique keys of the conversation (ID and name), and the keys which may be shared with other conversations.
+    """
+    return [conversation.get('id'), conversation.get('name')], []
+
+
+DIRECTORY_INDEX_KEYS = {
+    'users': get_user_index_keys,
+    'conversations': get_conversation_index_keys
+}
+
+
+def build_directory_index(objects: list, get_keys) -> Dict[str, dict]:
+    """
+    Builds a lookup index of slack objects by their lower cased keys.
+    Unique keys take precedence over shared keys, and earlier objects over later ones.
+
+    Args:
+        objects: The slack objects
+        get_keys: A function returning the unique and shared keys of an object
+
+    Returns:
+        The objects by their keys
+    """
+    index: Dict[str, dict] = {}
+    object_keys = [(slack_object, get_keys(slack_object)) for slack_object in objects]
+    for position in range(2):
+        for slack_object, keys in object_keys:
+            for key in keys[position]:
+                if key:
+                    index.setdefault(key.lower(), slack_object)
+
+    return index
+
+
+def get_directory_index(integration_context: dict, directory: str) -> Dict[str, dict]:
+    """
+    Gets the lookup index of a directory (users or conversations) in the integration context.
+    The index is rebuilt only when the directory changed since it was last built.
+
+    Args:
+        integration_context: The integration context
+        directory: The directory key in the integration context
+
+    Returns:
+        The directory objects by their lower cased keys
+    """
+    raw_directory = integration_context.get(directory) or ''
+    cached = DIRECTORY_INDEXES.get(directory)
+    if cached and cached[0] == raw_directory:
+        return cached[1]
+
+    objects = json.loads(raw_directory) if raw_directory else []
+    index = build_directory_index(objects, DIRECTORY_INDEX_KEYS[directory])
+    DIRECTORY_INDEXES[directory] = (raw_directory, index)
+
+    return index
+
+
+def is_directory_stale(integration_context: dict, directory: str) -> bool:
+    """
+    Checks whether a directory in the integration context was not fully synced in the last DIRECTORY_TTL_MINUTES.
+
+    Args:
+        integration_context: The integration context
+        directory: The directory key in the integration context
+
+    Returns:
+        True if the directory should be synced
+    """
+    synced = integration_context.get(DIRECTORY_SYNC_KEYS[directory])
+    if not synced:
+        return True
+    synced_time = datetime.strptime(json.loads(synced), DATE_FORMAT)
+
+    return get_current_utc_time() - synced_time > timedelta(minutes=DIRECTORY_TTL_MINUTES)
+
+
+def get_user_directory_entry(user: dict) -> dict:
+    """
+    Gets the fields of a slack user which are kept in the users directory.
+
+    Args:
+        user: The slack user
+
+    Returns:
+        The user directory entry
+    """
+    profile = user.get('profile') or {}
+    entry = {key: user[key] for key in ('id', 'name', 'real_name', 'deleted', 'is_bot') if key in user}
+    entry['profile'] = {key: profile[key] for key in ('email', 'real_name', 'real_name_normalized', 'display_name')
+                        if key in profile}
+
+    return entry
+
+
+def sync_directory(directory: str, method: str, response_key: str, body: dict) -> Dict[str, dict]:
+    """
+    Lists all the objects of a directory through the API cursor and merges them into the directory in the
+    integration context, keeping objects which were added to it otherwise (e.g. mirrored conversations).
+
+    Args:
+        directory: The directory key in the integration context
+        method: The API method listing the directory
+        response_key: The key of the objects in the API response
+        body: The request body
+
+    Returns:
+        The listed objects by their lower cased keys
+    """
+    objects: list = []
+    body = body.copy()
+    body['limit'] = PAGINATED_COUNT
+    response = send_slack_request_sync(CLIENT, method, http_verb='GET', body=body)
+    while True:
+        objects.extend(response[response_key] if response and response.get(response_key) else [])
+        cursor = response.get('response_metadata', {}).get('next_cursor')
+        if not cursor:
+            break
+        body = body.copy()
+        body.update({'cursor': cursor})
+        response = send_slack_request_sync(CLIENT, method, http_verb='GET', body=body)
+
+    if directory == 'users':
+        objects = [get_user_directory_entry(user) for user in objects]
+    synced = datetime.strftime(get_current_utc_time(), DATE_FORMAT)
+    set_to_integration_context_with_retries({directory: objects, DIRECTORY_SYNC_KEYS[directory]: synced},
+                                            OBJECTS_TO_KEYS, SYNC_CONTEXT)
+
+    return build_directory_index(objects, DIRECTORY_INDEX_KEYS[directory])
+
+
+def add_to_directory(directory: str, slack_object: dict):
+    """
+    Adds a slack object which was looked up through the API to a directory in the integration context.
+
+    Args:
+        directory: The directory key in the integration context
+        slack_object: The slack object
+    """
+    if not slack_object.get('id'):
+        return
+    if directory == 'users':
+        slack_object = get_user_directory_entry(slack_object)
+    set_to_integration_context_with_retries({directory: [slack_object]}, OBJECTS_TO_KEYS, SYNC_CONTEXT)
+
+
+def search_directory(directory: str, method: str, response_key: str, body: dict, key: str) -> dict:
+    """
+    Lists the objects of a directory through the API cursor until an object with the given key is found,
+    and adds it to the directory in the integration context.
+
+    Args:
+        directory: The directory key in the integration context
+        method: The API method listing the directory
+        response_key: The key of the objects in the API response
+        body: The request body
+        key: The lower cased key to search
+
+    Returns:
+        The slack object, or an empty dict if it wasn't found
+    """
+    get_keys = DIRECTORY_INDEX_KEYS[directory]
+    body = body.copy()
+    body['limit'] = PAGINATED_COUNT
+    response = send_slack_request_sync(CLIENT, method, http_verb='GET', body=body)
+    while True:
+        for slack_object in response[response_key] if response and response.get(response_key) else []:
+            unique_keys, shared_keys = get_keys(slack_object)
+            if key in {object_key.lower() for object_key in unique_keys + shared_keys if object_key}:
+                add_to_directory(directory, slack_object)
+                return slack_object
+        cursor = response.get('response_metadata', {}).get('next_cursor')
+        if not cursor:
+            return {}
+        body = body.copy()
+        body.update({'cursor': cursor})
+        response = send_slack_request_sync(CLIENT, method, http_verb='GET', body=body)
+
+
+def lookup_user(user_to_search: str) -> dict:
+    """
+    Looks up a slack user which is not in the users directory, and adds it to the directory.
+    Emails are looked up directly, other names by listing the users until the user is found.
 
     Args:
-        user_to_search: The user name or email
-        add_to_context: Whether to update the integration context
+        user_to_search: The lower cased user name, display name or email
 
     Returns:
         A slack user object
     """
+    if '@' in user_to_search:
+        try:
+            body = {
+                'email': user_to_search
+            }
+            user = send_slack_request_sync(CLIENT, 'users.lookupByEmail', http_verb='GET', body=body).get('user', {})
+            add_to_directory('users', user)
+            return user
+        except SlackApiError as e:
+            if str(e).find('users_not_found') != -1:
+                return {}
+            demisto.debug(f'Could not look up the user by email, listing the users instead: {e}')
 
-    user: dict = {}
-    users: list = []
-    integration_context = get_integration_context(SYNC_CONTEXT)
+    return search_directory('users', 'users.list', 'members', {}, user_to_search)
+
+
+def get_user_by_name(user_to_search: str) -> dict:
+    """
+    Gets a slack user by a user name
+
+    Args:
+        user_to_search: The user name, display name or email
 
+    Returns:
+        A slack user object
+    """
     user_to_search = user_to_search.lower()
-    if integration_context.get('users'):
-        users = json.loads(integration_context['users'])
-        users_filter = list(filter(lambda u: u.get('name', '').lower() == user_to_search
-                                             or u.get('profile', {}).get('email', '').lower() == user_to_search
-                                             or u.get('real_name', '').lower() == user_to_search, users))
-        if users_filter:
-            user = users_filter[0]
+    integration_context = get_integration_context(SYNC_CONTEXT)
+    user = get_directory_index(integration_context, 'users').get(user_to_search, {})
     if not user:
-        body = {
-            'limit': PAGINATED_COUNT
-        }
-        response = send_slack_request_sync(CLIENT, 'users.list', http_verb='GET', body=body)
-        while True:
-            workspace_users = response['members'] if response and response.get('members', []) else []
-            cursor = response.get('response_metadata', {}).get('next_cursor')
-            users_filter = list(filter(lambda u: u.get('name', '').lower() == user_to_search
-                                                 or u.get('profile', {}).get('email', '').lower() == user_to_search
-                                                 or u.get('real_name', '').lower() == user_to_search, workspace_users))
-            if users_filter:
-                break
-            if not cursor:
-                break
-            body = body.copy()
-            body.update({'cursor': cursor})
-            response = send_slack_request_sync(CLIENT, 'users.list', http_verb='GET', body=body)
-
-        if users_filter:
-            user = users_filter[0]
-            if add_to_context:
-                users.append(user)
-                set_to_integration_context_with_retries({'users': users}, OBJECTS_TO_KEYS, SYNC_CONTEXT)
+        if is_directory_stale(integration_context, 'users'):
+            user = sync_directory('users', 'users.list', 'members', {}).get(user_to_search, {})
         else:
-            return {}
+            user = lookup_user(user_to_search)
 
     return user
 
@@ -351,12 +563,7 @@ async def get_slack_name(slack_id: str, client) -> str:
 
     if prefix in ['C', 'D', 'G']:
         slack_id = slack_id.split('|')[0]
-        conversation: dict = {}
-        if integration_context.get('conversations'):
-            conversations = list(filter(lambda c: c['id'] == slack_id,
-                                        json.loads(integration_context['conversations'])))
-            if conversations:
-                conversation = conversations[0]
+        conversation = get_directory_index(integration_context, 'conversations').get(slack_id.lower(), {})
         if not conversation:
             body = {
                 'channel': slack_id
@@ -366,11 +573,7 @@ async def get_slack_name(slack_id: str, client) -> str:
                                                            body=body)).get('channel', {})
         slack_name = conversation.get('name', '')
     elif prefix == 'U':
-        user: dict = {}
-        if integration_context.get('users'):
-            users = list(filter(lambda u: u['id'] == slack_id, json.loads(integration_context['users'])))
-            if users:
-                user = users[0]
+        user = get_directory_index(integration_context, 'users').get(slack_id.lower(), {})
         if not user:
             body = {
                 'user': slack_id
@@ -597,15 +800,18 @@ def mirror_investigation():
     demisto.results(f'Investigation mirrored successfully, channel: {conversation_name}')
 
 
-def long_running_loop():
+def long_running_loop(loop: Optional[asyncio.AbstractEventLoop] = None):
     """
     Runs in a long running container - checking for newly mirrored investigations and answered questions.
+
+    Args:
+        loop: The event loop the answers are polled on, if already running in another thread.
     """
     while True:
         error = ''
         try:
             check_for_mirrors()
-            check_for_answers()
+            check_for_answers(loop)
         except requests.exceptions.ConnectionError as e:
             error = f'Could not connect to the Slack endpoint: {str(e)}'
         except Exception as e:
@@ -617,31 +823,36 @@ def long_running_loop():
             time.sleep(5)
 
 
-def check_for_answers():
+def check_for_answers(loop: Optional[asyncio.AbstractEventLoop] = None):
     """
     Checks for answered questions
+
+    Args:
+        loop: The event loop to poll for the answers on. If not given, a dedicated loop is used.
     """
 
     integration_context = get_integration_context(SYNC_CONTEXT)
     questions = integration_context.get('questions', [])
-    users = integration_context.get('users', [])
     if questions:
         questions = json.loads(questions)
-    if users:
-        users = json.loads(users)
+    users: list = []
     now = get_current_utc_time()
     now_string = datetime.strftime(now, DATE_FORMAT)
     updated_questions = []
+    questions_to_poll = []
 
     for question in questions:
+        if question.get('remove'):
+            # Already answered, will be removed on the next context update
+            continue
+        if question.get('expiry'):
+            # Check if the question expired - if it did, answer it with the default response and remove it
+            expiry = datetime.strptime(question['expiry'], DATE_FORMAT)
+            if expiry < now:
+                answer_question(question.get('default_response'), question)
+                updated_questions.append(question)
+                continue
         if question.get('last_poll_time'):
-            if question.get('expiry'):
-                # Check if the question expired - if it did, answer it with the default response and remove it
-                expiry = datetime.strptime(question['expiry'], DATE_FORMAT)
-                if expiry < now:
-                    answer_question(question.get('default_response'), question)
-                    updated_questions.append(question)
-                    continue
             # Check if it has been enough time(determined by the POLL_INTERVAL_MINUTES parameter)
             # since the last polling time. if not, continue to the next question until it has.
             last_poll_time = datetime.strptime(question['last_poll_time'], DATE_FORMAT)
@@ -652,28 +863,20 @@ def check_for_answers():
 
             if minutes < poll_time_minutes:
                 continue
-        entitlement = question.get('entitlement', '')
-        demisto.info(f'Slack - polling for an answer for entitlement {entitlement}')
+        demisto.info(f'Slack - polling for an answer for entitlement {question.get("entitlement", "")}')
         question['last_poll_time'] = now_string
         updated_questions.append(question)
+        questions_to_poll.append(question)
 
+    polls = []
+    for question in questions_to_poll:
         headers = {'Accept': 'application/json', 'Content-Type': 'application/json'}
         add_info_headers(headers, question.get('expiry'))
+        polls.append((question.get('entitlement', ''), headers))
+    answers = run_answers_poll(polls, loop) if polls else []
+    users_index = get_directory_index(integration_context, 'users') if answers else {}
 
-        body = {
-            'entitlement': entitlement
-        }
-        res = requests.post(ENDPOINT_URL, data=json.dumps(body), headers=headers, proxies=PROXIES, verify=VERIFY_CERT)
-        if res.status_code != 200:
-            demisto.error(f'Slack - failed to poll for answers: {res.content!r}, status code: {res.status_code!r}')
-            continue
-        answer: dict = {}
-        try:
-            answer = res.json()
-        except Exception:
-            demisto.info(f'Slack - Could not parse response for entitlement {entitlement!r}: {res.content!r}')
-        if not answer:
-            continue
+    for question, answer in zip(questions_to_poll, answers):
         payload_json: str = answer.get('payload', '')
         if not payload_json:
             continue
@@ -681,17 +884,16 @@ def check_for_answers():
 
         actions = payload.get('actions', [])
         if actions:
-            demisto.info(f'Slack - received answer from user for entitlement {entitlement}.')
+            demisto.info(f'Slack - received answer from user for entitlement {question.get("entitlement", "")}.')
             user_id = payload.get('user', {}).get('id')
-            user_filter = list(filter(lambda u: u['id'] == user_id, users))
-            if user_filter:
-                user = user_filter[0]
-            else:
+            user = users_index.get((user_id or '').lower(), {})
+            if not user:
                 body = {
                     'user': user_id
                 }
                 user = send_slack_request_sync(CLIENT, 'users.info', http_verb='GET', body=body).get('user', {})
-                users.append(user)
+                if user:
+                    users.append(user)
 
             answer_question(actions[0].get('text', {}).get('text'), question, user.get('profile', {}).get('email'))
 
@@ -699,6 +901,82 @@ def check_for_answers():
         set_to_integration_context_with_retries({'users': users, 'questions': questions}, OBJECTS_TO_KEYS, SYNC_CONTEXT)
 
 
+def run_answers_poll(polls: List[Tuple[str, dict]], loop: Optional[asyncio.AbstractEventLoop] = None) -> List[dict]:
+    """
+    Polls the answers endpoint for all the given entitlements concurrently.
+
+    Args:
+        polls: Pairs of entitlement and the headers to send with its request.
+        loop: A running event loop to schedule the requests on. If not given, a dedicated loop is used.
+
+    Returns:
+        The answers, in the order of the given entitlements.
+    """
+    if loop and loop.is_running():
+        return asyncio.run_coroutine_threadsafe(poll_for_answers(polls), loop).result()
+
+    poll_loop = asyncio.new_event_loop()
+    try:
+        return poll_loop.run_until_complete(poll_for_answers(polls))
+    finally:
+        poll_loop.close()
+
+
+async def poll_for_answers(polls: List[Tuple[str, dict]]) -> List[dict]:
+    """
+    Polls the answers endpoint for the given entitlements over a single session.
+
+    Args:
+        polls: Pairs of entitlement and the headers to send with its request.
+
+    Returns:
+        The answers, in the order of the given entitlements.
+    """
+    semaphore = asyncio.Semaphore(ANSWERS_POLL_CONCURRENCY)
+    timeout = aiohttp.ClientTimeout(total=ANSWERS_POLL_TIMEOUT_SECONDS)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        return await asyncio.gather(*[poll_for_answer(session, semaphore, entitlement, headers)
+                                      for entitlement, headers in polls])
+
+
+async def poll_for_answer(session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, entitlement: str,
+                          headers: dict) -> dict:
+    """
+    Polls the answers endpoint for a single entitlement.
+
+    Args:
+        session: The HTTP session to send the request with.
+        semaphore: Bounds the number of requests in flight.
+        entitlement: The entitlement of the question.
+        headers: The request headers.
+
+    Returns:
+        The answer, or an empty dict if there is none.
+    """
+    body = {
+        'entitlement': entitlement
+    }
+    async with semaphore:
+        try:
+            async with session.post(ENDPOINT_URL, data=json.dumps(body), headers=headers, proxy=PROXY_URL,
+                                    ssl=SSL_CONTEXT) as res:
+                status = res.status
+                content = await res.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            demisto.error(f'Slack - failed to poll for answers for entitlement {entitlement!r}: {str(e)}')
+            return {}
+
+    if status != 200:
+        demisto.error(f'Slack - failed to poll for answers: {content!r}, status code: {status!r}')
+        return {}
+    answer: dict = {}
+    try:
+        answer = json.loads(content)
+    except Exception:
+        demisto.info(f'Slack - Could not parse response for entitlement {entitlement!r}: {content!r}')
+    return answer if isinstance(answer, dict) else {}
+
+
 def get_poll_minutes(current_time: datetime, sent: Optional[str]) -> float:
     """
     Get the interval to wait before polling again in minutes.
@@ -728,20 +1006,23 @@ def get_poll_minutes(current_time: datetime, sent: Optional[str]) -> float:
 def add_info_headers(headers, expiry):
     # pylint: disable=no-member
     try:
-        calling_context = demisto.callingContext.get('context', {})  # type: ignore[attr-defined]
-        brand_name = calling_context.get('IntegrationBrand', '')
-        instance_name = calling_context.get('IntegrationInstance', '')
-        auth = send_slack_request_sync(CLIENT, 'auth.test')
-        team_name = auth.get('team', '')
-        team_id = auth.get('team_id', '')
-        headers['X-Content-Version'] = CONTENT_RELEASE_VERSION
-        headers['X-Content-Name'] = brand_name or instance_name or 'Name not found'
-        headers['X-Content-TeamName'] = team_name
-        headers['X-Content-TeamID'] = team_id
-        headers['X-Content-LicenseID'] = demisto.getLicenseID()  # type: ignore[attr-defined]
+        if not INFO_HEADERS:
+            calling_context = demisto.callingContext.get('context', {})  # type: ignore[attr-defined]
+            brand_name = calling_context.get('IntegrationBrand', '')
+            instance_name = calling_context.get('IntegrationInstance', '')
+            auth = send_slack_request_sync(CLIENT, 'auth.test')
+            info_headers = {
+                'X-Content-Version': CONTENT_RELEASE_VERSION,
+                'X-Content-Name': brand_name or instance_name or 'Name not found',
+                'X-Content-TeamName': auth.get('team', ''),
+                'X-Content-TeamID': auth.get('team_id', ''),
+                'X-Content-LicenseID': demisto.getLicenseID()  # type: ignore[attr-defined]
+            }
+            if hasattr(demisto, 'demistoVersion'):
+                info_headers['X-Content-Server-Version'] = demisto.demistoVersion().get('version')
+            INFO_HEADERS.update(info_headers)
+        headers.update(INFO_HEADERS)
         headers['X-Content-Expiry'] = expiry if expiry else 'No expiry'
-        if hasattr(demisto, 'demistoVersion'):
-            headers['X-Content-Server-Version'] = demisto.demistoVersion().get('version')
     except Exception as e:
         demisto.error(f'Failed getting integration info: {str(e)}')
 
@@ -764,7 +1045,6 @@ def check_for_mirrors():
     if integration_context.get('mirrors'):
         mirrors = json.loads(integration_context['mirrors'])
         updated_mirrors = []
-        updated_users = []
         for mirror in mirrors:
             if not mirror['mirrored']:
                 investigation_id = mirror['investigation_id']
@@ -780,8 +1060,7 @@ def check_for_mirrors():
                     users: List[Dict] = demisto.mirrorInvestigation(investigation_id,
                                                                     f'{mirror_type}:{direction}', auto_close)
                     if mirror_type != 'none':
-                        invited_users = invite_to_mirrored_channel(channel_id, users)
-                        updated_users.extend(invited_users)
+                        invite_to_mirrored_channel(channel_id, users)
 
                     mirror['mirrored'] = True
                     updated_mirrors.append(mirror)
@@ -789,11 +1068,7 @@ def check_for_mirrors():
                     demisto.info(f'Could not mirror {investigation_id}')
 
         if updated_mirrors:
-            context = {'mirrors': updated_mirrors}
-            if updated_users:
-                context['users'] = updated_users
-
-            set_to_integration_context_with_retries(context, OBJECTS_TO_KEYS, SYNC_CONTEXT)
+            set_to_integration_context_with_retries({'mirrors': updated_mirrors}, OBJECTS_TO_KEYS, SYNC_CONTEXT)
 
 
 def invite_to_mirrored_channel(channel_id: str, users: List[Dict]) -> list:
@@ -813,11 +1088,11 @@ def invite_to_mirrored_channel(channel_id: str, users: List[Dict]) -> list:
         user_email = user.get('email', '')
         user_name = user.get('username', '')
         if user_email:
-            slack_user = get_user_by_name(user_email, False)
+            slack_user = get_user_by_name(user_email)
         if not slack_user:
             # Try to invite by Demisto user name
             if user_name:
-                slack_user = get_user_by_name(user_name, False)
+                slack_user = get_user_by_name(user_name)
         if slack_user:
             slack_users.append(slack_user)
         else:
@@ -908,7 +1183,7 @@ async def start_listening():
     """
     executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
     loop = asyncio.get_running_loop()
-    loop.run_in_executor(executor, long_running_loop)
+    loop.run_in_executor(executor, long_running_loop, loop)
     await slack_loop()
 
 
@@ -1158,21 +1433,14 @@ async def get_user_by_id_async(client: slack.WebClient, user_id: str) -> dict:
     Returns:
         The slack user.
     """
-    user: dict = {}
-    users: list = []
     integration_context = get_integration_context(SYNC_CONTEXT)
-    if integration_context.get('users'):
-        users = json.loads(integration_context['users'])
-        user_filter = list(filter(lambda u: u['id'] == user_id, users))
-        if user_filter:
-            user = user_filter[0]
+    user = get_directory_index(integration_context, 'users').get(user_id.lower(), {})
     if not user:
         body = {
             'user': user_id
         }
         user = (await send_slack_request_async(client, 'users.info', http_verb='GET', body=body)).get('user', {})
-        users.append(user)
-        set_to_integration_context_with_retries({'users': users}, OBJECTS_TO_KEYS, SYNC_CONTEXT)
+        set_to_integration_context_with_retries({'users': [user]}, OBJECTS_TO_KEYS, SYNC_CONTEXT)
 
     return user
 
@@ -1251,53 +1519,27 @@ def get_conversation_by_name(conversation_name: str) -> dict:
     Returns:
         The slack conversation
     """
-    integration_context = get_integration_context(SYNC_CONTEXT)
-
     conversation_to_search = conversation_name.lower()
-    # Find conversation in the cache
-    conversations = integration_context.get('conversations')
-    if conversations:
-        conversations = json.loads(conversations)
-        conversation_filter = list(
-            filter(
-                lambda c: conversation_to_search == c.get('name', '').lower(),
-                conversations
-            )
-        )
-        if conversation_filter:
-            return conversation_filter[0]
-
-    # If not found in cache, search for it
-    body = {
-        'types': 'private_channel,public_channel',
-        'limit': PAGINATED_COUNT
-    }
-    response = send_slack_request_sync(CLIENT, 'conversations.list', http_verb='GET', body=body)
-    conversation: dict = {}
-    while True:
-        conversations = response['channels'] if response and response.get('channels') else []
-        cursor = response.get('response_metadata', {}).get('next_cursor')
-        conversation_filter = list(filter(lambda c: c.get('name') == conversation_name, conversations))
-        if conversation_filter:
-            break
-        if not cursor:
-            break
-        body = body.copy()
-        body.update({'cursor': cursor})
-        response = send_slack_request_sync(CLIENT, 'conversations.list', http_verb='GET', body=body)
-
-    if conversation_filter:
-        conversation = conversation_filter[0]
-
-    # Save conversations to cache
+    integration_context = get_integration_context(SYNC_CONTEXT)
+    conversation = get_directory_index(integration_context, 'conversations').get(conversation_to_search, {})
     if conversation:
-        conversations = integration_context.get('conversations')
-        if conversations:
-            conversations = json.loads(conversations)
-            conversations.append(conversation)
-        else:
-            conversations = [conversation]
-        set_to_integration_context_with_retries({'conversations': conversations}, OBJECTS_TO_KEYS, SYNC_CONTEXT)
+        return conversation
+
+    body = {'types': 'private_channel,public_channel'}
+    if is_directory_stale(integration_context, 'conversations'):
+        conversation = sync_directory('conversations', 'conversations.list', 'channels',
+                                      body).get(conversation_to_search, {})
+    elif CONVERSATION_ID_REGEX.match(conversation_name):
+        try:
+            conversation = send_slack_request_sync(CLIENT, 'conversations.info', http_verb='GET',
+                                                   body={'channel': conversation_name}).get('channel', {})
+            add_to_directory('conversations', conversation)
+        except SlackApiError as e:
+            if str(e).find('channel_not_found') == -1:
+                raise
+    else:
+        conversation = search_directory('conversations', 'conversations.list', 'channels', body,
+                                        conversation_to_search)
 
     return conversation
 
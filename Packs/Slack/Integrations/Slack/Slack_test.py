@@ -593,6 +593,204 @@ def test_get_user_by_name(mocker):
     assert slack.WebClient.api_call.call_count == 3
 
 
+def test_get_user_by_name_synced_directory(mocker):
+    """
+    Given:
+        - A users directory which was synced in the last hour.
+    When:
+        - Getting users by their display name, and users which are not in the directory by name and by email.
+    Then:
+        - Ensure the user in the directory is found by the display name, with no API call.
+        - Ensure the users which are not in the directory are looked up by email, or listed until found by name.
+        - Ensure the looked up users are added to the directory, and the directory sync time is not updated.
+    """
+    import Slack
+
+    # Set
+    new_users = [{
+        'id': 'U012B3CUI',
+        'name': 'perikles',
+        'profile': {'email': 'perikles@acropoli.com'}
+    }, {
+        'id': 'U248918AB',
+        'name': 'alexios',
+        'profile': {'email': 'alexios@acropoli.com'}
+    }]
+
+    def api_call(method: str, http_verb: str = 'POST', file: str = None, params=None, json=None, data=None):
+        if method == 'users.lookupByEmail':
+            return {'user': [user for user in new_users if user['profile']['email'] == params['email']][0]}
+        if 'cursor' not in params:
+            return {'members': js.loads(USERS), 'response_metadata': {'next_cursor': 'dGVhbTpDQ0M3UENUTks='}}
+        return {'members': new_users, 'response_metadata': {'next_cursor': ''}}
+
+    mocker.patch.object(Slack, 'get_current_utc_time', return_value=datetime.datetime(2019, 9, 26, 18, 38, 25))
+    mocker.patch.object(demisto, 'getIntegrationContext', side_effect=get_integration_context)
+    mocker.patch.object(demisto, 'setIntegrationContext', side_effect=set_integration_context)
+    mocker.patch.object(slack.WebClient, 'api_call', side_effect=api_call)
+    integration_context = get_integration_context()
+    integration_context['users_synced'] = js.dumps('2019-09-26 18:00:00')
+    set_integration_context(integration_context)
+
+    # Arrange
+    user = Slack.get_user_by_name('Spengler')
+    api_calls_for_directory_user = slack.WebClient.api_call.call_count
+    user_by_email = Slack.get_user_by_name('perikles@acropoli.com')
+    user_by_name = Slack.get_user_by_name('alexios')
+
+    # Assert
+    new_context = demisto.getIntegrationContext()
+    directory_ids = {u['id'] for u in js.loads(new_context['users'])}
+    methods = [call[0][0] for call in slack.WebClient.api_call.call_args_list]
+    assert user['id'] == 'U012A3CDE'
+    assert api_calls_for_directory_user == 0
+    assert user_by_email['id'] == 'U012B3CUI'
+    assert user_by_name['id'] == 'U248918AB'
+    assert methods == ['users.lookupByEmail', 'users.list', 'users.list']
+    assert {'U012A3CDE', 'U012B3CUI', 'U248918AB'}.issubset(directory_ids)
+    assert js.loads(new_context['users_synced']) == '2019-09-26 18:00:00'
+
+
+def test_sync_conversations_directory_keeps_mirrored_conversations(mocker):
+    """
+    Given:
+        - A conversations directory with a conversation created by a mirror, which is not listed by the API.
+    When:
+        - Syncing the conversations directory.
+    Then:
+        - Ensure the listed conversations are merged into the directory, keeping the mirrored conversation.
+    """
+    import Slack
+
+    # Set
+    mocker.patch.object(Slack, 'get_current_utc_time', return_value=datetime.datetime(2019, 9, 26, 18, 38, 25))
+    mocker.patch.object(demisto, 'getIntegrationContext', side_effect=get_integration_context)
+    mocker.patch.object(demisto, 'setIntegrationContext', side_effect=set_integration_context)
+    mocker.patch.object(slack.WebClient, 'api_call', return_value={'channels': [{'id': 'C248918AB', 'name': 'lulz'}]})
+    integration_context = get_integration_context()
+    integration_context['conversations'] = js.dumps([{'id': 'C0R2D2C3PO', 'name': 'incident-681'}])
+    set_integration_context(integration_context)
+
+    # Arrange
+    conversation = Slack.get_conversation_by_name('lulz')
+
+    # Assert
+    conversations = js.loads(demisto.getIntegrationContext()['conversations'])
+    assert conversation['id'] == 'C248918AB'
+    assert {c['id'] for c in conversations} == {'C0R2D2C3PO', 'C248918AB'}
+
+
+def test_get_conversation_by_id_synced_directory(mocker):
+    """
+    Given:
+        - A conversations directory which was synced in the last hour.
+    When:
+        - Getting a conversation which is not in the directory by its ID.
+    Then:
+        - Ensure the conversation is looked up by its ID and added to the directory.
+    """
+    import Slack
+
+    # Set
+    mocker.patch.object(Slack, 'get_current_utc_time', return_value=datetime.datetime(2019, 9, 26, 18, 38, 25))
+    mocker.patch.object(demisto, 'getIntegrationContext', side_effect=get_integration_context)
+    mocker.patch.object(demisto, 'setIntegrationContext', side_effect=set_integration_context)
+    mocker.patch.object(slack.WebClient, 'api_call', return_value={'channel': {'id': 'C248918AB', 'name': 'lulz'}})
+    integration_context = get_integration_context()
+    integration_context['conversations_synced'] = js.dumps('2019-09-26 18:00:00')
+    set_integration_context(integration_context)
+
+    # Arrange
+    conversation = Slack.get_conversation_by_name('C248918AB')
+
+    # Assert
+    conversations = js.loads(demisto.getIntegrationContext()['conversations'])
+    assert conversation['name'] == 'lulz'
+    assert slack.WebClient.api_call.call_args[0][0] == 'conversations.info'
+    assert 'C248918AB' in {c['id'] for c in conversations}
+
+
+def test_get_user_by_name_stale_directory(mocker):
+    """
+    Given:
+        - A users directory which was synced more than an hour ago.
+    When:
+        - Getting a user which is not in the directory.
+    Then:
+        - Ensure all the users are listed and saved to the directory, with only the looked up fields.
+        - Ensure the directory sync time is updated.
+    """
+    import Slack
+
+    # Set
+    mocker.patch.object(Slack, 'get_current_utc_time', return_value=datetime.datetime(2019, 9, 26, 18, 38, 25))
+    mocker.patch.object(demisto, 'getIntegrationContext', side_effect=get_integration_context)
+    mocker.patch.object(demisto, 'setIntegrationContext', side_effect=set_integration_context)
+    new_user = {
+        'id': 'U012B3CUI',
+        'name': 'perikles',
+        'color': '9f69e7',
+        'profile': {
+            'email': 'perikles@acropoli.com',
+            'display_name': 'Perikles',
+            'image_24': 'https://acropoli.com/perikles.jpg'
+        }
+    }
+    mocker.patch.object(slack.WebClient, 'api_call', return_value={'members': [new_user]})
+    integration_context = get_integration_context()
+    integration_context['users_synced'] = js.dumps('2019-09-26 17:00:00')
+    set_integration_context(integration_context)
+
+    # Arrange
+    user = Slack.get_user_by_name('perikles@acropoli.com')
+
+    # Assert
+    new_context = demisto.getIntegrationContext()
+    directory_user = [u for u in js.loads(new_context['users']) if u['id'] == 'U012B3CUI'][0]
+    assert user['id'] == 'U012B3CUI'
+    assert slack.WebClient.api_call.call_count == 1
+    assert directory_user == {
+        'id': 'U012B3CUI',
+        'name': 'perikles',
+        'profile': {
+            'email': 'perikles@acropoli.com',
+            'display_name': 'Perikles'
+        }
+    }
+    assert js.loads(new_context['users_synced']) == '2019-09-26 18:38:25'
+
+
+def test_build_directory_index():
+    """
+    Given:
+        - Users whose real name is the same as the user name of another user.
+    When:
+        - Building the users lookup index.
+    Then:
+        - Ensure the users are indexed by their lower cased ID, name, email and display name.
+        - Ensure a user name takes precedence over a real name of another user.
+    """
+    from Slack import build_directory_index, get_user_index_keys
+
+    # Set
+    users = [{
+        'id': 'U1',
+        'name': 'alexios',
+        'real_name': 'perikles',
+        'profile': {'email': 'Alexios@Acropoli.com', 'display_name': 'Alex'}
+    }, {
+        'id': 'U2',
+        'name': 'perikles'
+    }]
+
+    # Arrange
+    index = build_directory_index(users, get_user_index_keys)
+
+    # Assert
+    assert index['u1'] == index['alexios'] == index['alexios@acropoli.com'] == index['alex'] == users[0]
+    assert index['u2'] == index['perikles'] == users[1]
+
+
 def test_get_user_by_name_paging(mocker):
     from Slack import get_user_by_name
     # Set
@@ -1274,7 +1472,8 @@ def test_check_for_mirrors(mocker):
     assert len(invite_call) == 2
     assert invited_users == ['U012A3CDE', 'U012B3CUI']
     assert channel == ['new_group', 'new_group']
-    assert demisto.setIntegrationContext.call_count == 1
+    # The users directory sync and the mirrors update
+    assert demisto.setIntegrationContext.call_count == 2
     assert len(our_mirror_filter) == 1
     assert our_mirror == new_mirror
     assert len(our_user_filter) == 1
@@ -1353,7 +1552,8 @@ def test_check_for_mirrors_email_user_not_matching(mocker):
 
     invited_users = [c[1]['json']['users'] for c in invite_call]
     channel = [c[1]['json']['channel'] for c in invite_call]
-    assert demisto.setIntegrationContext.call_count == 1
+    # The users directory sync and the mirrors update
+    assert demisto.setIntegrationContext.call_count == 2
 
     # Assert
     assert len(users_call) == 1
@@ -1421,7 +1621,8 @@ def test_check_for_mirrors_email_not_matching(mocker):
     assert len(invite_call) == 2
     assert invited_users == ['U012A3CDE', 'U012B3CUI']
     assert channel == ['new_group', 'new_group']
-    assert demisto.setIntegrationContext.call_count == 1
+    # The users directory sync and the mirrors update
+    assert demisto.setIntegrationContext.call_count == 2
 
 
 def test_check_for_mirrors_user_email_not_matching(mocker):
@@ -1482,8 +1683,10 @@ def test_check_for_mirrors_user_email_not_matching(mocker):
     error_results = demisto.results.call_args_list[0][0]
 
     # Assert
-    assert demisto.setIntegrationContext.call_count == 1
+    # The users directory sync and the mirrors update
+    assert demisto.setIntegrationContext.call_count == 2
     assert error_results[0]['Contents'] == 'User 123 not found in Slack'
+    # The users directory is synced for the email, and listed again until the user name is found
     assert len(users_call) == 2
     assert len(invite_call) == 1
     assert invited_users == ['U012A3CDE']
@@ -1980,7 +2183,51 @@ async def test_handle_text(mocker):
     assert entry_args['footer'] == '\n**From Slack**'
 
 
-def test_check_for_answers_no_proxy(mocker, requests_mock):
+class AnswerResponseMock:
+    def __init__(self, status, body):
+        self.status = status
+        self.body = js.dumps(body).encode()
+
+    async def read(self):
+        return self.body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+class AnswersSessionMock:
+    """
+    Mocks the aiohttp session the answers endpoint is polled with.
+    Responses are (status, body) pairs - either one for all requests or a dict of them by entitlement.
+    """
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+
+    def post(self, url, data=None, headers=None, proxy=None, ssl=None):
+        entitlement = js.loads(data)['entitlement']
+        self.requests.append({'url': url, 'entitlement': entitlement, 'headers': headers, 'proxy': proxy, 'ssl': ssl})
+        status, body = self.responses[entitlement] if isinstance(self.responses, dict) else self.responses
+        return AnswerResponseMock(status, body)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+def mock_answers_endpoint(mocker, responses):
+    import Slack
+    session = AnswersSessionMock(responses)
+    mocker.patch.object(Slack.aiohttp, 'ClientSession', return_value=session)
+    return session
+
+
+def test_check_for_answers_no_proxy(mocker):
     import Slack
 
     # Set
@@ -1990,10 +2237,7 @@ def test_check_for_answers_no_proxy(mocker, requests_mock):
     mocker.patch.object(demisto, 'setIntegrationContext', side_effect=set_integration_context)
     mocker.patch.object(Slack, 'get_current_utc_time', return_value=datetime.datetime(2019, 9, 26, 18, 38, 25))
     mocker.patch.object(Slack, 'add_info_headers')
-    requests_mock.post(
-        'https://oproxy.demisto.ninja/slack-poll',
-        json={'payload': PAYLOAD_JSON}
-    )
+    session = mock_answers_endpoint(mocker, (200, {'payload': PAYLOAD_JSON}))
 
     integration_context = get_integration_context()
     integration_context['questions'] = js.dumps([{
@@ -2016,7 +2260,7 @@ def test_check_for_answers_no_proxy(mocker, requests_mock):
     # Assert
     assert demisto.handleEntitlementForUser.call_count == 1
     assert demisto.setIntegrationContext.call_count == 1
-    assert requests_mock._adapter.last_request.proxies == OrderedDict()
+    assert session.requests[-1]['proxy'] is None
     assert result_args[0] == '22'
     assert result_args[1] == 'e95cb5a1-e394-4bc5-8ce0-508973aaf298'
     assert result_args[2] == 'spengler@ghostbusters.example.com'
@@ -2027,24 +2271,18 @@ def test_check_for_answers_no_proxy(mocker, requests_mock):
     assert demisto.getIntegrationContext()['questions'] == js.dumps([])
 
 
-def test_check_for_answers_proxy(mocker, requests_mock):
+def test_check_for_answers_proxy(mocker):
     import Slack
 
     # Set
     mocker.patch.object(Slack, 'handle_proxy', return_value={'https': 'https_proxy', 'http': 'http_proxy'})
     Slack.init_globals()
-    proxy_dict = OrderedDict()
-    proxy_dict['https'] = 'https_proxy'
-    proxy_dict['http'] = 'http_proxy'
     mocker.patch.object(demisto, 'handleEntitlementForUser')
     mocker.patch.object(demisto, 'getIntegrationContext', side_effect=get_integration_context)
     mocker.patch.object(demisto, 'setIntegrationContext', side_effect=set_integration_context)
     mocker.patch.object(Slack, 'add_info_headers')
     mocker.patch.object(Slack, 'get_current_utc_time', return_value=datetime.datetime(2019, 9, 26, 18, 38, 25))
-    requests_mock.post(
-        'https://oproxy.demisto.ninja/slack-poll',
-        json={'payload': PAYLOAD_JSON}
-    )
+    session = mock_answers_endpoint(mocker, (200, {'payload': PAYLOAD_JSON}))
 
     integration_context = get_integration_context()
     integration_context['questions'] = js.dumps([{
@@ -2067,7 +2305,7 @@ def test_check_for_answers_proxy(mocker, requests_mock):
     # Assert
     assert demisto.handleEntitlementForUser.call_count == 1
     assert demisto.setIntegrationContext.call_count == 1
-    assert requests_mock._adapter.last_request.proxies == proxy_dict
+    assert session.requests[-1]['proxy'] == 'http_proxy'
     assert result_args[0] == '22'
     assert result_args[1] == 'e95cb5a1-e394-4bc5-8ce0-508973aaf298'
     assert result_args[2] == 'spengler@ghostbusters.example.com'
@@ -2078,7 +2316,7 @@ def test_check_for_answers_proxy(mocker, requests_mock):
     assert demisto.getIntegrationContext()['questions'] == js.dumps([])
 
 
-def test_check_for_answers_continue(mocker, requests_mock):
+def test_check_for_answers_continue(mocker):
     import Slack
 
     # Set
@@ -2088,13 +2326,11 @@ def test_check_for_answers_continue(mocker, requests_mock):
     mocker.patch.object(demisto, 'setIntegrationContext', side_effect=set_integration_context)
     mocker.patch.object(Slack, 'add_info_headers')
     mocker.patch.object(Slack, 'get_current_utc_time', return_value=datetime.datetime(2019, 9, 26, 18, 38, 25))
-    requests_mock.post(
-        'https://oproxy.demisto.ninja/slack-poll',
-        [{'json': {}, 'status_code': 200},
-         {'json': 'error', 'status_code': 401},
-         {'json': {'payload': PAYLOAD_JSON}, 'status_code': 200}]
-
-    )
+    mock_answers_endpoint(mocker, {
+        '4404dae8-2d45-46bd-85fa-64779c12abe8@30|44': (200, {}),
+        '4404dae8-2d45-46bd-85fa-64779c12abe7@30|44': (401, 'error'),
+        'e95cb5a1-e394-4bc5-8ce0-508973aaf298@22|43': (200, {'payload': PAYLOAD_JSON})
+    })
 
     integration_context = get_integration_context()
     integration_context['questions'] = js.dumps([{
@@ -2176,7 +2412,7 @@ def test_get_poll_minutes(sent, expected_minutes):
     assert minutes == expected_minutes
 
 
-def test_check_for_answers_no_answer(mocker, requests_mock):
+def test_check_for_answers_no_answer(mocker):
     import Slack
 
     # Set
@@ -2185,10 +2421,7 @@ def test_check_for_answers_no_answer(mocker, requests_mock):
     mocker.patch.object(demisto, 'setIntegrationContext', side_effect=set_integration_context)
     mocker.patch.object(Slack, 'add_info_headers')
     mocker.patch.object(Slack, 'get_current_utc_time', return_value=datetime.datetime(2019, 9, 26, 18, 38, 25))
-    requests_mock.post(
-        'https://oproxy.demisto.ninja/slack-poll',
-        json={}
-    )
+    mock_answers_endpoint(mocker, (200, {}))
 
     integration_context = get_integration_context()
     integration_context['questions'] = js.dumps([{
@@ -2239,7 +2472,7 @@ def test_check_for_answers_no_answer(mocker, requests_mock):
     }])
 
 
-def test_check_for_answers_no_polling(mocker, requests_mock):
+def test_check_for_answers_no_polling(mocker):
     import Slack
 
     # Set
@@ -2248,10 +2481,7 @@ def test_check_for_answers_no_polling(mocker, requests_mock):
     mocker.patch.object(demisto, 'setIntegrationContext', side_effect=set_integration_context)
     mocker.patch.object(Slack, 'add_info_headers')
     mocker.patch.object(Slack, 'get_current_utc_time', return_value=datetime.datetime(2019, 9, 26, 18, 38, 25))
-    requests_mock.post(
-        'https://oproxy.demisto.ninja/slack-poll',
-        json={}
-    )
+    session = mock_answers_endpoint(mocker, (200, {}))
 
     integration_context = get_integration_context()
     integration_context['questions'] = js.dumps([{
@@ -2282,6 +2512,7 @@ def test_check_for_answers_no_polling(mocker, requests_mock):
     assert demisto.handleEntitlementForUser.call_count == 0
     assert demisto.setIntegrationContext.call_count == 0
     assert demisto.getIntegrationContext.call_count == 1
+    assert session.requests == []
 
     # Should not delete the question
     assert demisto.getIntegrationContext()['questions'] == js.dumps([{
@@ -2303,7 +2534,7 @@ def test_check_for_answers_no_polling(mocker, requests_mock):
     }])
 
 
-def test_check_for_answers_no_answer_expires(mocker, requests_mock):
+def test_check_for_answers_no_answer_expires(mocker):
     import Slack
 
     # Set
@@ -2312,10 +2543,7 @@ def test_check_for_answers_no_answer_expires(mocker, requests_mock):
     mocker.patch.object(demisto, 'setIntegrationContext', side_effect=set_integration_context)
     mocker.patch.object(Slack, 'add_info_headers')
     mocker.patch.object(Slack, 'get_current_utc_time', return_value=datetime.datetime(2019, 9, 26, 18, 38, 25))
-    requests_mock.post(
-        'https://oproxy.demisto.ninja/slack-poll',
-        json={}
-    )
+    session = mock_answers_endpoint(mocker, (200, {}))
 
     integration_context = get_integration_context()
     integration_context['questions'] = js.dumps([{
@@ -2344,6 +2572,8 @@ def test_check_for_answers_no_answer_expires(mocker, requests_mock):
     # Assert
     assert demisto.handleEntitlementForUser.call_count == 1
     assert demisto.setIntegrationContext.call_count == 1
+    assert [request['entitlement'] for request in session.requests] == [
+        'e95cb5a1-e394-4bc5-8ce0-508973aaf298@22|43']
     assert result_args[0] == '30'
     assert result_args[1] == '4404dae8-2d45-46bd-85fa-64779c12abe8'
     assert result_args[2] == ''
@@ -2361,7 +2591,7 @@ def test_check_for_answers_no_answer_expires(mocker, requests_mock):
     }])
 
 
-def test_check_for_answers_error(mocker, requests_mock):
+def test_check_for_answers_error(mocker):
     import Slack
 
     # Set
@@ -2371,11 +2601,7 @@ def test_check_for_answers_error(mocker, requests_mock):
     mocker.patch.object(demisto, 'error')
     mocker.patch.object(Slack, 'add_info_headers')
     mocker.patch.object(Slack, 'get_current_utc_time', return_value=datetime.datetime(2019, 9, 26, 18, 38, 25))
-    requests_mock.post(
-        'https://oproxy.demisto.ninja/slack-poll',
-        json='error',
-        status_code=401
-    )
+    session = mock_answers_endpoint(mocker, (401, 'error'))
 
     integration_context = get_integration_context()
     integration_context['questions'] = js.dumps([{
@@ -2400,6 +2626,7 @@ def test_check_for_answers_error(mocker, requests_mock):
     assert demisto.handleEntitlementForUser.call_count == 0
     assert demisto.setIntegrationContext.call_count == 1
     assert demisto.error.call_count == 2
+    assert len(session.requests) == 2
 
     # Should not delete the question
     assert demisto.getIntegrationContext()['questions'] == js.dumps([{
@@ -2417,7 +2644,7 @@ def test_check_for_answers_error(mocker, requests_mock):
     }])
 
 
-def test_check_for_answers_handle_entitlement_error(mocker, requests_mock):
+def test_check_for_answers_handle_entitlement_error(mocker):
     import Slack
 
     # Set
@@ -2427,11 +2654,7 @@ def test_check_for_answers_handle_entitlement_error(mocker, requests_mock):
     mocker.patch.object(demisto, 'error')
     mocker.patch.object(Slack, 'add_info_headers')
     mocker.patch.object(Slack, 'get_current_utc_time', return_value=datetime.datetime(2019, 9, 26, 18, 38, 25))
-    requests_mock.post(
-        'https://oproxy.demisto.ninja/slack-poll',
-        json={'payload': PAYLOAD_JSON},
-        status_code=200
-    )
+    mock_answers_endpoint(mocker, (200, {'payload': PAYLOAD_JSON}))
 
     integration_context = get_integration_context()
     integration_context['questions'] = js.dumps([{
@@ -2456,6 +2679,120 @@ def test_check_for_answers_handle_entitlement_error(mocker, requests_mock):
     assert demisto.getIntegrationContext()['questions'] == js.dumps([])
 
 
+def test_check_for_answers_skips_answered(mocker):
+    """
+    Given:
+        - An answered question which was not yet removed from the context and an expired question.
+    When:
+        - Checking for answers.
+    Then:
+        - Ensure neither of the questions is polled for an answer.
+        - Ensure the expired question is answered with the default response.
+    """
+    import Slack
+
+    # Set
+    mocker.patch.object(demisto, 'handleEntitlementForUser')
+    mocker.patch.object(demisto, 'getIntegrationContext', side_effect=get_integration_context)
+    mocker.patch.object(demisto, 'setIntegrationContext', side_effect=set_integration_context)
+    mocker.patch.object(Slack, 'add_info_headers')
+    mocker.patch.object(Slack, 'get_current_utc_time', return_value=datetime.datetime(2019, 9, 26, 18, 38, 25))
+    session = mock_answers_endpoint(mocker, (200, {'payload': PAYLOAD_JSON}))
+
+    integration_context = get_integration_context()
+    integration_context['questions'] = js.dumps([{
+        'thread': 'cool',
+        'entitlement': 'e95cb5a1-e394-4bc5-8ce0-508973aaf298@22|43',
+        'expiry': '3000-09-26 18:38:25',
+        'default_response': 'NoResponse',
+        'remove': True
+    }, {
+        'thread': 'notcool',
+        'entitlement': '4404dae8-2d45-46bd-85fa-64779c12abe8@30|44',
+        'expiry': '2019-09-26 18:35:25',
+        'default_response': 'NoResponse'
+    }])
+
+    set_integration_context(integration_context)
+
+    # Arrange
+    Slack.check_for_answers()
+
+    # Assert
+    assert session.requests == []
+    assert demisto.handleEntitlementForUser.call_count == 1
+    assert demisto.handleEntitlementForUser.call_args[0][3] == 'NoResponse'
+    assert demisto.getIntegrationContext()['questions'] == js.dumps([])
+
+
+def test_run_answers_poll_on_running_loop(mocker):
+    """
+    Given:
+        - An event loop running in another thread.
+    When:
+        - Polling for answers from the long running thread.
+    Then:
+        - Ensure the requests are sent on the running loop and the answers are returned in order.
+    """
+    import Slack
+
+    # Set
+    session = mock_answers_endpoint(mocker, {
+        'first': (200, {'payload': 'first_payload'}),
+        'second': (401, 'error')
+    })
+    mocker.patch.object(demisto, 'error')
+    loop = asyncio.new_event_loop()
+    loop_thread = threading.Thread(target=loop.run_forever)
+    loop_thread.start()
+
+    # Arrange
+    try:
+        answers = Slack.run_answers_poll([('first', {}), ('second', {})], loop)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        loop_thread.join()
+        loop.close()
+
+    # Assert
+    assert answers == [{'payload': 'first_payload'}, {}]
+    assert len(session.requests) == 2
+    assert demisto.error.call_count == 1
+
+
+def test_add_info_headers_cached(mocker):
+    """
+    Given:
+        - Several questions to poll answers for.
+    When:
+        - Adding the integration info headers to the requests.
+    Then:
+        - Ensure the bot identity and license are fetched only once.
+        - Ensure the expiry header is set per question.
+    """
+    import Slack
+
+    # Set
+    mocker.patch.object(Slack, 'INFO_HEADERS', {})
+    mocker.patch.object(demisto, 'callingContext', {'context': {'IntegrationBrand': 'Slack v2'}}, create=True)
+    mocker.patch.object(demisto, 'getLicenseID', return_value='license', create=True)
+    mocker.patch.object(Slack, 'send_slack_request_sync', return_value={'team': 'team', 'team_id': 'team_id'})
+    first_headers: dict = {}
+    second_headers: dict = {}
+
+    # Arrange
+    Slack.add_info_headers(first_headers, '3000-09-26 18:38:25')
+    Slack.add_info_headers(second_headers, None)
+
+    # Assert
+    assert Slack.send_slack_request_sync.call_count == 1
+    assert demisto.getLicenseID.call_count == 1
+    assert first_headers['X-Content-TeamID'] == second_headers['X-Content-TeamID'] == 'team_id'
+    assert first_headers['X-Content-LicenseID'] == second_headers['X-Content-LicenseID'] == 'license'
+    assert first_headers['X-Content-Expiry'] == '3000-09-26 18:38:25'
+    assert second_headers['X-Content-Expiry'] == 'No expiry'
+
+
 @pytest.mark.asyncio
 async def test_check_entitlement(mocker):
     from Slack import check_and_handle_entitlement
@@ -13,6 +13,7 @@ import requests
 import urllib3
 import io
 import re
+import heapq
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # Define utf8 as default encoding
@@ -481,14 +482,7 @@ def fetch_incidents(service):
     kwargs_oneshot = {earliest_fetch_time_fieldname: last_run,
                       latest_fetch_time_fieldname: now, "count": FETCH_LIMIT, 'offset': search_offset}
 
-    searchquery_oneshot = demisto.params()['fetchQuery']
-
-    if demisto.get(demisto.params(), 'extractFields'):
-        extractFields = demisto.params()['extractFields']
-        extra_raw_arr = extractFields.split(',')
-        for field in extra_raw_arr:
-            field_trimmed = field.strip()
-            searchquery_oneshot = searchquery_oneshot + ' | eval ' + field_trimmed + '=' + field_trimmed
+    searchquery_oneshot = build_fetch_query()
 
     oneshotsearch_results = service.jobs.oneshot(searchquery_oneshot, **kwargs_oneshot)  # type: ignore
     reader = results.ResultsReader(oneshotsearch_results)
@@ -503,6 +497,88 @@ def fetch_incidents(service):
         demisto.setLastRun({'time': last_run, 'offset': search_offset + FETCH_LIMIT})
 
 
+def build_fetch_query():
+    fetch_query = demisto.params()['fetchQuery']
+
+    if demisto.get(demisto.params(), 'extractFields'):
+        extractFields = demisto.params()['extractFields']
+        extra_raw_arr = extractFields.split(',')
+        for field in extra_raw_arr:
+            field_trimmed = field.strip()
+            fetch_query = fetch_query + ' | eval ' + field_trimmed + '=' + field_trimmed
+
+    return fetch_query
+
+
+def get_notable_id(notable):
+    return notable.get('event_id') or notable.get('_cd') or notable.get('_raw')
+
+
+def stream_notables(service, query, **kwargs):
+    """
+    Runs the query against the streaming export endpoint and yields the notables as they are parsed,
+    without waiting for the search to complete or materialising its results.
+    """
+    if not query.lstrip().startswith(('search', '|')):
+        query = 'search ' + query
+    export_stream = service.jobs.export(query, search_mode='normal', **kwargs)  # type: ignore
+    try:
+        for item in results.ResultsReader(export_stream):
+            if isinstance(item, dict):
+                yield item
+            elif isinstance(item, results.Message):
+                demisto.debug('Splunk export message - {}: {}'.format(item.type, item.message))
+    finally:
+        export_stream.close()
+
+
+def fetch_incidents_export(service):
+    """
+    Fetches notables through the export endpoint. The query is left streaming (no sort), and the oldest FETCH_LIMIT
+    notables of the time window are kept while the export is consumed, so the fetch can be cut at FETCH_LIMIT
+    whatever order the events arrive in. The position is saved as the latest _time fetched and the IDs of the
+    notables fetched at that exact time, which are skipped on the next fetch as its search starts at that time.
+    """
+    last_run = demisto.getLastRun() or {}
+    latest_time = last_run.get('time')
+    fetched_ids = set(last_run.get('found_incidents_ids', []))
+
+    current_time_for_fetch = datetime.utcnow()
+    if demisto.get(demisto.params(), 'timezone'):
+        timezone = demisto.params()['timezone']
+        current_time_for_fetch = current_time_for_fetch + timedelta(minutes=int(timezone))
+
+    now = current_time_for_fetch.strftime(SPLUNK_TIME_FORMAT)
+    if demisto.get(demisto.params(), 'useSplunkTime'):
+        now = get_current_splunk_time(service)
+        current_time_for_fetch = datetime.strptime(now, SPLUNK_TIME_FORMAT)
+
+    if not latest_time:
+        fetch_time_in_minutes = parse_time_to_minutes()
+        start_time_for_fetch = current_time_for_fetch - timedelta(minutes=fetch_time_in_minutes)
+        latest_time = start_time_for_fetch.strftime(SPLUNK_TIME_FORMAT)
+
+    notables = stream_notables(service, build_fetch_query(), earliest_time=latest_time, latest_time=now)
+    new_notables = (notable for notable in notables if get_notable_id(notable) not in fetched_ids)
+    oldest_notables = heapq.nsmallest(FETCH_LIMIT, new_notables, key=lambda notable: notable.get('_time') or '')
+
+    incidents = []
+    latest_time_ids = fetched_ids
+    for notable in oldest_notables:
+        notable_time = notable.get('_time')
+        if notable_time and notable_time != latest_time:
+            latest_time = notable_time
+            latest_time_ids = set()
+        latest_time_ids.add(get_notable_id(notable))
+        incidents.append(notable_to_incident(notable))
+
+    demisto.incidents(incidents)
+    if not incidents:
+        demisto.setLastRun({'time': now, 'found_incidents_ids': []})
+    else:
+        demisto.setLastRun({'time': latest_time, 'found_incidents_ids': list(latest_time_ids)})
+
+
 def parse_time_to_minutes():
     """
     Calculate how much time to fetch back in minutes
@@ -908,7 +984,10 @@ def main():
     if demisto.command() == 'splunk-results':
         splunk_results_command(service)
     if demisto.command() == 'fetch-incidents':
-        fetch_incidents(service)
+        if demisto.params().get('use_export_fetch'):
+            fetch_incidents_export(service)
+        else:
+            fetch_incidents(service)
     if demisto.command() == 'splunk-get-indexes':
         splunk_get_indexes_command(service)
     if demisto.command() == 'splunk-submit-event':
@@ -361,3 +361,71 @@ def test_get_kv_store_config(fields, expected_output, mocker):
     output = splunk.get_kv_store_config(Name())
     expected_output = '{}{}'.format(START_OUTPUT, expected_output)
     assert output == expected_output
+
+
+class ExportStreamMock:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_stream_notables(mocker):
+    """
+    Given:
+        - An export stream with notables and a Splunk message
+    When:
+        - Streaming the notables of a fetch query
+    Then:
+        - Only the notables are yielded, the search is prefixed with the search command and the stream is closed
+    """
+    from splunklib import results
+    service = mocker.Mock()
+    stream = ExportStreamMock()
+    service.jobs.export.return_value = stream
+    mocker.patch.object(results, 'ResultsReader', return_value=iter([
+        results.Message('INFO', 'message'), {'event_id': '1'}, {'event_id': '2'}
+    ]))
+
+    notables = list(splunk.stream_notables(service, 'index=notable', earliest_time='now'))
+
+    assert notables == [{'event_id': '1'}, {'event_id': '2'}]
+    assert service.jobs.export.call_args[0][0] == 'search index=notable'
+    assert stream.closed
+
+
+def test_fetch_incidents_export_cut_at_fetch_limit(mocker):
+    """
+    Given:
+        - More notables than the fetch limit, streamed newest first, some of them fetched in the previous fetch
+    When:
+        - Fetching incidents through the export endpoint
+    Then:
+        - The notables fetched in the previous fetch are skipped
+        - The oldest notables are fetched up to the fetch limit, with no sort in the query
+        - The latest _time and the IDs fetched at that time are saved
+    """
+    import demistomock as demisto
+    notables = [
+        {'event_id': '4', '_time': '2020-01-01T00:00:02.000+00:00'},
+        {'event_id': '3', '_time': '2020-01-01T00:00:01.000+00:00'},
+        {'event_id': '2', '_time': '2020-01-01T00:00:01.000+00:00'},
+        {'event_id': '1', '_time': '2020-01-01T00:00:00.000+00:00'},
+    ]
+    mocker.patch.object(splunk, 'FETCH_LIMIT', 2)
+    mocker.patch.object(demisto, 'params', return_value={'fetchQuery': 'search index=notable'})
+    last_run = {'time': '2020-01-01T00:00:00.000+00:00', 'found_incidents_ids': ['1']}
+    mocker.patch.object(demisto, 'getLastRun', return_value=last_run)
+    stream_notables = mocker.patch.object(splunk, 'stream_notables', return_value=iter(notables))
+    incidents_mock = mocker.patch.object(demisto, 'incidents')
+    set_last_run = mocker.patch.object(demisto, 'setLastRun')
+
+    splunk.fetch_incidents_export(mocker.Mock())
+
+    assert stream_notables.call_args[1]['earliest_time'] == '2020-01-01T00:00:00.000+00:00'
+    assert 'sort' not in stream_notables.call_args[0][1]
+    assert len(incidents_mock.call_args[0][0]) == 2
+    last_run = set_last_run.call_args[0][0]
+    assert last_run['time'] == '2020-01-01T00:00:01.000+00:00'
+    assert sorted(last_run['found_incidents_ids']) == ['2', '3']
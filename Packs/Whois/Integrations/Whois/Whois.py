@@ -7,9 +7,26 @@ import sys
 from codecs import encode, decode
 import socks
 import errno
+import threading
+import time
+try:
+    import queue
+except ImportError:
+    import Queue as queue  # type: ignore
 
 ENTRY_TYPE = entryTypes['error'] if demisto.params().get('with_error', False) else entryTypes['warning']
 
+WHOIS_PORT = 43
+# Domains are looked up concurrently, with a bounded number of spaced out connections to each WHOIS server,
+# so that the servers do not rate limit the lookups
+WHOIS_CONCURRENCY = 10
+WHOIS_SERVER_CONCURRENCY = 4
+WHOIS_SERVER_INTERVAL_SECONDS = 0.1
+# Raw WHOIS responses are cached in the integration context by the query and the server
+WHOIS_CACHE_KEY = 'whois_cache'
+WHOIS_CACHE_MAX_SIZE = 500
+DEFAULT_CACHE_TTL_MINUTES = 60
+
 # flake8: noqa
 
 """
@@ -7125,6 +7142,10 @@ dble_ext_str = "chirurgiens-dentistes.fr,in-addr.arpa,uk.net,za.org,mod.uk,org.z
 dble_ext = dble_ext_str.split(",")
 
 
+referral_server_regex = re.compile("(refer|whois server|referral url|registrar whois(?: server)?):\s*([^\s]+\.[^\s]+)",
+                                   re.IGNORECASE)
+
+
 def get_whois_raw(domain, server="", previous=None, rfc3490=True, never_cut=False, with_server_list=False,
                   server_list=None):
     previous = previous or []
@@ -7202,8 +7223,7 @@ def get_whois_raw(domain, server="", previous=None, rfc3490=True, never_cut=Fals
         new_list = [response] + previous
     server_list.append(target_server)
     for line in [x.strip() for x in response.splitlines()]:
-        match = re.match("(refer|whois server|referral url|registrar whois(?: server)?):\s*([^\s]+\.[^\s]+)", line,
-                         re.IGNORECASE)
+        match = referral_server_regex.match(line)
         if match is not None:
             referal_server = match.group(2)
             if referal_server != server and "://" not in referal_server:  # We want to ignore anything non-WHOIS (eg. HTTP) for now.
@@ -7227,21 +7247,7 @@ def get_root_server(domain):
         try:
             host = entry["host"]
         except KeyError:
-            context = ({
-                outputPaths['domain']: {
-                    'Name': domain,
-                    'Whois': {
-                        'QueryStatus': 'Failed'
-                    }
-                },
-            })
-            demisto.results({
-                'ContentsFormat': 'text',
-                'Type': ENTRY_TYPE,
-                'Contents': 'The domain - {} - is not supported by the Whois service'.format(domain),
-                'EntryContext': context
-            })
-            sys.exit(-1)
+            raise WhoisQueryFailed(domain, 'The domain - {} - is not supported by the Whois service'.format(domain))
 
         return host
 
@@ -7249,29 +7255,24 @@ def get_root_server(domain):
         raise WhoisException("No root WHOIS server found for domain.")
 
 
-def whois_request(domain, server, port=43):
+def whois_request(domain, server, port=None):
+    response = whois_cache.get(domain, server)
+    if response is None:
+        server_throttle.acquire(server)
+        try:
+            response = send_whois_query(domain, server, port or WHOIS_PORT)
+        finally:
+            server_throttle.release(server)
+        whois_cache.set(domain, server, response)
+    return response
+
+
+def send_whois_query(domain, server, port):
     sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     try:
         sock.connect((server, port))
     except Exception as msg:
-        context = ({
-            outputPaths['domain']: {
-                'Name': domain,
-                'Whois': {
-                    'QueryStatus': 'Failed'
-                }
-            },
-        })
-
-        demisto.results(
-            {
-                'ContentsFormat': 'text',
-                'Type': ENTRY_TYPE,
-                'Contents': "Whois returned - Couldn't connect with the socket-server: {}".format(msg),
-                'EntryContext': context
-            }
-        )
-        sys.exit(-1)
+        raise WhoisQueryFailed(domain, "Whois returned - Couldn't connect with the socket-server: {}".format(msg))
 
     else:
         sock.send(("%s\r\n" % domain).encode("utf-8"))
@@ -7303,6 +7304,124 @@ class WhoisException(Exception):
     pass
 
 
+class WhoisQueryFailed(WhoisException):
+    """
+    Raised when a domain can not be queried, to report the domain as failed
+    """
+    def __init__(self, domain, message):
+        super(WhoisQueryFailed, self).__init__(message)
+        self.domain = domain
+
+
+class ServerThrottle(object):
+    """
+    Limits the concurrent connections to each WHOIS server, and spaces out the connections to the same server
+    """
+    def __init__(self, concurrency=WHOIS_SERVER_CONCURRENCY, interval=WHOIS_SERVER_INTERVAL_SECONDS):
+        self.concurrency = concurrency
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.semaphores = {}  # type: dict
+        self.next_connection_times = {}  # type: dict
+
+    def acquire(self, server):
+        with self.lock:
+            semaphore = self.semaphores.setdefault(server, threading.Semaphore(self.concurrency))
+        semaphore.acquire()
+        with self.lock:
+            now = time.time()
+            connection_time = max(now, self.next_connection_times.get(server, 0))
+            self.next_connection_times[server] = connection_time + self.interval
+        if connection_time > now:
+            time.sleep(connection_time - now)
+
+    def release(self, server):
+        self.semaphores[server].release()
+
+
+class WhoisCache(object):
+    """
+    Caches the raw WHOIS responses by the query and the server, for the configured TTL
+    """
+    def __init__(self):
+        self.ttl = 0
+        self.lock = threading.Lock()
+        self.responses = {}  # type: dict
+        self.modified = False
+
+    def load(self, ttl_minutes):
+        """
+        Loads the responses which did not expire from the integration context
+        """
+        self.ttl = ttl_minutes * 60
+        if self.ttl > 0:
+            now = time.time()
+            responses = demisto.getIntegrationContext().get(WHOIS_CACHE_KEY) or {}
+            self.responses = {key: entry for key, entry in responses.items() if entry['time'] + self.ttl > now}
+
+    def save(self):
+        """
+        Saves the most recent responses to the integration context, if new responses were cached
+        """
+        if not self.modified:
+            return
+        responses = sorted(self.responses.items(), key=lambda item: item[1]['time'], reverse=True)
+        integration_context = demisto.getIntegrationContext() or {}
+        integration_context[WHOIS_CACHE_KEY] = dict(responses[:WHOIS_CACHE_MAX_SIZE])
+        demisto.setIntegrationContext(integration_context)
+
+    @staticmethod
+    def get_key(query, server):
+        return '{}|{}'.format(server, query)
+
+    def get(self, query, server):
+        entry = self.responses.get(self.get_key(query, server))
+        if entry is not None and entry['time'] + self.ttl > time.time():
+            return entry['response']
+        return None
+
+    def set(self, query, server, response):
+        if self.ttl <= 0:
+            return
+        with self.lock:
+            self.responses[self.get_key(query, server)] = {'response': response, 'time': int(time.time())}
+            self.modified = True
+
+
+whois_cache = WhoisCache()
+server_throttle = ServerThrottle()
+
+
+def run_concurrently(func, items, concurrency=WHOIS_CONCURRENCY):
+    """
+    Runs func on each of the items, on up to `concurrency` threads
+    :return: The (result, error) of each item, in the order of the items
+    """
+    results = [(None, None)] * len(items)  # type: list
+    items_queue = queue.Queue()  # type: queue.Queue
+    for index, item in enumerate(items):
+        items_queue.put((index, item))
+
+    def worker():
+        while True:
+            try:
+                index, item = items_queue.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                results[index] = (func(item), None)
+            except Exception as e:
+                results[index] = (None, e)
+
+    threads = [threading.Thread(target=worker) for _ in range(min(concurrency, len(items)))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
 def precompile_regexes(source, flags=0):
     return [re.compile(regex, flags) for regex in source]
 
@@ -7654,6 +7773,31 @@ nic_contact_references["tech"] = precompile_regexes(nic_contact_references["tech
 nic_contact_references["admin"] = precompile_regexes(nic_contact_references["admin"])
 nic_contact_references["billing"] = precompile_regexes(nic_contact_references["billing"])
 
+# The special cases of parse_raw_whois, compiled once like the grammar
+whois_com_nameservers_regex = re.compile("^\s?Name\s?[Ss]ervers:?\s*\n((?:\s*.+\n)+?\s?)\n", re.MULTILINE)
+whois_com_nameserver_line_regex = re.compile("[ ]*(.+)\n")
+field_label_regex = re.compile("^[a-zA-Z]+:")
+nominet_registrar_regex = re.compile("    Registrar:\n        (.+)\n")
+nominet_status_regex = re.compile("    Registration status:\n        (.+)\n")
+nominet_nameservers_regex = re.compile("    Name servers:\n([\s\S]*?\n)\n")
+nominet_nameserver_line_regex = re.compile("        (.+)\n")
+janet_registrar_regex = re.compile("Registered By:\n\t(.+)\n")
+janet_creation_date_regex = re.compile("Entry created:\n\t(.+)\n")
+janet_expiration_date_regex = re.compile("Renewal date:\n\t(.+)\n")
+janet_updated_date_regex = re.compile("Entry updated:\n\t(.+)\n")
+janet_nameservers_regex = re.compile("Servers:([\s\S]*?\n)\n")
+janet_nameserver_line_regex = re.compile("\t(.+)\n")
+am_nameservers_regex = re.compile("   DNS servers:([\s\S]*?\n)\n")
+indented_nameserver_line_regex = re.compile("      (.+)\n")
+sidn_registrar_regex = re.compile("Registrar:\n\s+(?:Name:\s*)?(\S.*)")
+sidn_nameservers_regex = re.compile("(?:Domain nameservers|Name servers):([\s\S]*?\n)\n")
+sidn_nameserver_line_regex = re.compile("\s+?(.+)\n")
+ie_status_regex = re.compile('ren-status:\s*(.+)')
+nic_it_registrar_regex = re.compile('Registrar\n  Organization:     (.+)\n')
+hkdnr_nameservers_regex = re.compile("Name Servers Information:\n\n([\s\S]*?\n)\n")
+hkdnr_nameserver_line_regex = re.compile("(.+)\n")
+twnic_nameservers_regex = re.compile("   Domain servers in listed order:\n([\s\S]*?\n)\n")
+
 if sys.version_info < (3, 0):
     def is_string(data):
         """Test for string with support for python 2."""
@@ -7671,11 +7815,12 @@ def parse_raw_whois(raw_data, normalized=None, never_query_handles=True, handle_
     raw_data = [segment.replace("\r", "") for segment in raw_data]  # Carriage returns are the devil
 
     for segment in raw_data:
+        lines = segment.splitlines()
         for rule_key, rule_regexes in grammar['_data'].items():  # type: ignore
             if (rule_key in data) == False:
-                for line in segment.splitlines():
+                for line in lines:
                     for regex in rule_regexes:
-                        result = re.search(regex, line)
+                        result = regex.search(line)
 
                         if result is not None:
                             val = result.group("val").strip()
@@ -7686,72 +7831,72 @@ def parse_raw_whois(raw_data, normalized=None, never_query_handles=True, handle_
                                     data[rule_key] = [val]
 
         # Whois.com is a bit special... Fabulous.com also seems to use this format. As do some others.
-        match = re.search("^\s?Name\s?[Ss]ervers:?\s*\n((?:\s*.+\n)+?\s?)\n", segment, re.MULTILINE)
+        match = whois_com_nameservers_regex.search(segment)
         if match is not None:
             chunk = match.group(1)
-            for match in re.findall("[ ]*(.+)\n", chunk):
+            for match in whois_com_nameserver_line_regex.findall(chunk):
                 if match.strip() != "":  # type: ignore
-                    if not re.match("^[a-zA-Z]+:", match):  # type: ignore
+                    if not field_label_regex.match(match):  # type: ignore
                         try:
                             data["nameservers"].append(match.strip())  # type: ignore
                         except KeyError as e:
                             data["nameservers"] = [match.strip()]  # type: ignore
         # Nominet also needs some special attention
-        match = re.search("    Registrar:\n        (.+)\n", segment)
+        match = nominet_registrar_regex.search(segment)
         if match is not None:
             data["registrar"] = [match.group(1).strip()]
-        match = re.search("    Registration status:\n        (.+)\n", segment)
+        match = nominet_status_regex.search(segment)
         if match is not None:
             data["status"] = [match.group(1).strip()]
-        match = re.search("    Name servers:\n([\s\S]*?\n)\n", segment)
+        match = nominet_nameservers_regex.search(segment)
         if match is not None:
             chunk = match.group(1)
-            for match in re.findall("        (.+)\n", chunk):
+            for match in nominet_nameserver_line_regex.findall(chunk):
                 match = match.split()[0]  # type: ignore
                 try:
                     data["nameservers"].append(match.strip())  # type: ignore
                 except KeyError as e:
                     data["nameservers"] = [match.strip()]  # type: ignore
         # janet (.ac.uk) is kinda like Nominet, but also kinda not
-        match = re.search("Registered By:\n\t(.+)\n", segment)
+        match = janet_registrar_regex.search(segment)
         if match is not None:
             data["registrar"] = [match.group(1).strip()]
-        match = re.search("Entry created:\n\t(.+)\n", segment)
+        match = janet_creation_date_regex.search(segment)
         if match is not None:
             data["creation_date"] = [match.group(1).strip()]
-        match = re.search("Renewal date:\n\t(.+)\n", segment)
+        match = janet_expiration_date_regex.search(segment)
         if match is not None:
             data["expiration_date"] = [match.group(1).strip()]
-        match = re.search("Entry updated:\n\t(.+)\n", segment)
+        match = janet_updated_date_regex.search(segment)
         if match is not None:
             data["updated_date"] = [match.group(1).strip()]
-        match = re.search("Servers:([\s\S]*?\n)\n", segment)
+        match = janet_nameservers_regex.search(segment)
         if match is not None:
             chunk = match.group(1)
-            for match in re.findall("\t(.+)\n", chunk):
+            for match in janet_nameserver_line_regex.findall(chunk):
                 match = match.split()[0]  # type: ignore
                 try:
                     data["nameservers"].append(match.strip())  # type: ignore
                 except KeyError as e:
                     data["nameservers"] = [match.strip()]  # type: ignore
         # .am plays the same game
-        match = re.search("   DNS servers:([\s\S]*?\n)\n", segment)
+        match = am_nameservers_regex.search(segment)
         if match is not None:
             chunk = match.group(1)
-            for match in re.findall("      (.+)\n", chunk):
+            for match in indented_nameserver_line_regex.findall(chunk):
                 match = match.split()[0]  # type: ignore
                 try:
                     data["nameservers"].append(match.strip())  # type: ignore
                 except KeyError as e:
                     data["nameservers"] = [match.strip()]  # type: ignore
         # SIDN isn't very standard either. And EURid uses a similar format.
-        match = re.search("Registrar:\n\s+(?:Name:\s*)?(\S.*)", segment)
+        match = sidn_registrar_regex.search(segment)
         if match is not None:
             data["registrar"].insert(0, match.group(1).strip())
-        match = re.search("(?:Domain nameservers|Name servers):([\s\S]*?\n)\n", segment)
+        match = sidn_nameservers_regex.search(segment)
         if match is not None:
             chunk = match.group(1)
-            for match in re.findall("\s+?(.+)\n", chunk):
+            for match in sidn_nameserver_line_regex.findall(chunk):
                 match = match.split()[0]  # type: ignore
                 # Prevent nameserver aliases from being picked up.
                 if not match.startswith("[") and not match.endswith("]"):  # type: ignore
@@ -7760,28 +7905,28 @@ def parse_raw_whois(raw_data, normalized=None, never_query_handles=True, handle_
                     except KeyError as e:
                         data["nameservers"] = [match.strip()]  # type: ignore
         # The .ie WHOIS server puts ambiguous status information in an unhelpful order
-        match = re.search('ren-status:\s*(.+)', segment)
+        match = ie_status_regex.search(segment)
         if match is not None:
             data["status"].insert(0, match.group(1).strip())
         # nic.it gives us the registrar in a multi-line format...
-        match = re.search('Registrar\n  Organization:     (.+)\n', segment)
+        match = nic_it_registrar_regex.search(segment)
         if match is not None:
             data["registrar"] = [match.group(1).strip()]
         # HKDNR (.hk) provides a weird nameserver format with too much whitespace
-        match = re.search("Name Servers Information:\n\n([\s\S]*?\n)\n", segment)
+        match = hkdnr_nameservers_regex.search(segment)
         if match is not None:
             chunk = match.group(1)
-            for match in re.findall("(.+)\n", chunk):
+            for match in hkdnr_nameserver_line_regex.findall(chunk):
                 match = match.split()[0]  # type: ignore
                 try:
                     data["nameservers"].append(match.strip())  # type: ignore
                 except KeyError as e:
                     data["nameservers"] = [match.strip()]  # type: ignore
         # ... and again for TWNIC.
-        match = re.search("   Domain servers in listed order:\n([\s\S]*?\n)\n", segment)
+        match = twnic_nameservers_regex.search(segment)
         if match is not None:
             chunk = match.group(1)
-            for match in re.findall("      (.+)\n", chunk):
+            for match in indented_nameserver_line_regex.findall(chunk):
                 match = match.split()[0]  # type: ignore
                 try:
                     data["nameservers"].append(match.strip())  # type: ignore
@@ -7903,7 +8048,7 @@ def normalize_data(data, normalized):
                 new_lines = []
                 for i, line in enumerate(lines):
                     for regex in organization_regexes:
-                        if re.search(regex, line):
+                        if regex.search(line):
                             new_lines.append(line)
                             del lines[i]
                             break
@@ -7919,7 +8064,7 @@ def normalize_data(data, normalized):
                 lines = [x.strip() for x in contact["street"].splitlines()]
                 if len(lines) > 1:
                     for regex in organization_regexes:
-                        if re.search(regex, lines[0]):
+                        if regex.search(lines[0]):
                             contact["organization"] = lines[0]
                             contact["street"] = "\n".join(lines[1:])
                             break
@@ -7987,7 +8132,7 @@ def parse_dates(dates):
 
     for date in dates:
         for rule in grammar['_dateformats']:  # type: ignore
-            result = re.match(rule, date)
+            result = rule.match(date)
 
             if result is not None:
                 try:
@@ -8089,28 +8234,28 @@ def parse_registrants(data, never_query_handles=True, handle_server=""):
 
     for segment in data:
         for regex in registrant_regexes:
-            match = re.search(regex, segment)
+            match = regex.search(segment)
             if match is not None:
                 registrant = match.groupdict()
                 break
 
     for segment in data:
         for regex in tech_contact_regexes:
-            match = re.search(regex, segment)
+            match = regex.search(segment)
             if match is not None:
                 tech_contact = match.groupdict()
                 break
 
     for segment in data:
         for regex in admin_contact_regexes:
-            match = re.search(regex, segment)
+            match = regex.search(segment)
             if match is not None:
                 admin_contact = match.groupdict()
                 break
 
     for segment in data:
         for regex in billing_contact_regexes:
-            match = re.search(regex, segment)
+            match = regex.search(segment)
             if match is not None:
                 billing_contact = match.groupdict()
                 break
@@ -8123,7 +8268,7 @@ def parse_registrants(data, never_query_handles=True, handle_server=""):
     for category in nic_contact_references:
         for regex in nic_contact_references[category]:
             for segment in data:
-                match = re.search(regex, segment)
+                match = regex.search(segment)
                 if match is not None:
                     data_reference = match.groupdict()
                     if data_reference["handle"] == "-" or re.match("https?:\/\/", data_reference["handle"]) is not None:
@@ -8243,7 +8388,7 @@ def parse_nic_contact(data):
     handle_contacts = []
     for regex in nic_contact_regexes:
         for segment in data:
-            matches = re.finditer(regex, segment)
+            matches = regex.finditer(segment)
             for match in matches:
                 handle_contacts.append(match.groupdict())
 
@@ -8368,9 +8513,10 @@ def create_outputs(whois_result, domain, query=None):
 
 
 def domain_command():
-    domains = demisto.args().get('domain', [])
-    for domain in argToList(domains):
-        whois_result = get_whois(domain)
+    domains = argToList(demisto.args().get('domain', []))
+    for domain, (whois_result, error) in zip(domains, run_concurrently(get_whois, domains)):
+        if error is not None:
+            raise error
         md, standard_ec, dbot_score = create_outputs(whois_result, domain)
         demisto.results({
             'Type': entryTypes['note'],
@@ -8415,6 +8561,32 @@ def test_command():
         demisto.results('ok')
 
 
+def return_query_failed(error):
+    context = ({
+        outputPaths['domain']: {
+            'Name': error.domain,
+            'Whois': {
+                'QueryStatus': 'Failed'
+            }
+        },
+    })
+    demisto.results({
+        'ContentsFormat': 'text',
+        'Type': ENTRY_TYPE,
+        'Contents': str(error),
+        'EntryContext': context
+    })
+    sys.exit(-1)
+
+
+def get_cache_ttl():
+    cache_ttl = demisto.params().get('cache_ttl')
+    try:
+        return int(cache_ttl) if cache_ttl not in (None, '') else DEFAULT_CACHE_TTL_MINUTES
+    except ValueError:
+        raise ValueError('Please provide an integer value for "Cache TTL (minutes)"')
+
+
 def setup_proxy():
     scheme_to_proxy_type = {
         'socks5': [socks.PROXY_TYPE_SOCKS5, False],
@@ -8455,9 +8627,15 @@ def main():
         if command == 'test-module':
             test_command()
         elif command == 'whois':
+            whois_cache.load(get_cache_ttl())
             whois_command()
+            whois_cache.save()
         elif command == 'domain':
+            whois_cache.load(get_cache_ttl())
             domain_command()
+            whois_cache.save()
+    except WhoisQueryFailed as e:
+        return_query_failed(e)
     except Exception as e:
         LOG(e)
         return_error(str(e))
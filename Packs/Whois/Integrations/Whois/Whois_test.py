@@ -7,6 +7,11 @@ import subprocess
 import time
 import tempfile
 import sys
+import threading
+try:
+    import socketserver
+except ImportError:
+    import SocketServer as socketserver  # type: ignore
 
 
 def assert_results_ok():
@@ -141,3 +146,116 @@ def test_query_result(whois_result, domain, expected):
     from Whois import create_outputs
     md, standard_ec, dbot_score = create_outputs(whois_result, domain)
     assert standard_ec['Whois']['QueryResult'] == expected
+
+
+FAKE_WHOIS_RESPONSE = """Domain Name: {domain}
+Registrar: Fake Registrar, Inc.
+Creation Date: 2020-01-01T00:00:00Z
+Name Server: NS1.{domain}
+"""
+
+
+class FakeWhoisHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        query = self.request.recv(1024).decode('utf-8').strip()
+        with self.server.lock:
+            self.server.queries.append(query)
+            self.server.connections += 1
+            self.server.max_connections = max(self.server.max_connections, self.server.connections)
+        time.sleep(self.server.delay)
+        with self.server.lock:
+            self.server.connections -= 1
+        self.request.sendall(FAKE_WHOIS_RESPONSE.format(domain=query.upper()).encode('utf-8'))
+
+
+class FakeWhoisServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """
+    A local WHOIS server, answering each query with a registry record of the queried domain after a delay
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, delay=0.0):
+        socketserver.TCPServer.__init__(self, ('127.0.0.1', 0), FakeWhoisHandler)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.queries = []  # type: list
+        self.connections = 0
+        self.max_connections = 0
+
+
+@pytest.fixture
+def fake_whois_server(mocker):
+    server = FakeWhoisServer()
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    mocker.patch.object(Whois, 'WHOIS_PORT', server.server_address[1])
+    mocker.patch.object(Whois, 'get_root_server', return_value='127.0.0.1')
+    mocker.patch.object(Whois, 'whois_cache', Whois.WhoisCache())
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_domain_command_concurrent_lookups(mocker, fake_whois_server):
+    """
+    Given
+    - 8 domains whose WHOIS server takes 0.3 seconds to answer, and allows 2 connections at once.
+
+    When
+    - Running the domain command.
+
+    Then
+    - Ensure the domains are looked up concurrently, with no more than 2 connections to the server at once.
+    - Ensure the results are returned in the order of the domains.
+    """
+    domains = ['phish{}.test'.format(i) for i in range(8)]
+    fake_whois_server.delay = 0.3
+    mocker.patch.object(Whois, 'server_throttle', Whois.ServerThrottle(concurrency=2, interval=0))
+    mocker.patch.object(demisto, 'args', return_value={'domain': ','.join(domains)})
+    mocker.patch.object(demisto, 'results')
+
+    start = time.time()
+    Whois.domain_command()
+
+    assert time.time() - start < len(domains) * fake_whois_server.delay
+    assert fake_whois_server.max_connections == 2
+    assert sorted(fake_whois_server.queries) == domains
+    results = [call[0][0] for call in demisto.results.call_args_list]
+    assert [result['EntryContext']['Domain(val.Name && val.Name == obj.Name)']['Name'] for result in results] == domains
+    assert results[0]['EntryContext']['Domain(val.Name && val.Name == obj.Name)']['NameServers'] == ['NS1.PHISH0.TEST']
+
+
+def test_whois_cache(mocker, fake_whois_server):
+    """
+    Given
+    - A domain which was looked up by a previous command.
+
+    When
+    - Looking up the domain again, with and without a cache TTL.
+
+    Then
+    - Ensure the cached WHOIS response is used within the TTL, and the server is queried again without it.
+    """
+    integration_context = {}  # type: dict
+    mocker.patch.object(demisto, 'getIntegrationContext', side_effect=lambda: integration_context)
+    mocker.patch.object(demisto, 'setIntegrationContext', side_effect=integration_context.update)
+    mocker.patch.object(demisto, 'command', return_value='domain')
+    mocker.patch.object(demisto, 'args', return_value={'domain': 'cached.test'})
+    mocker.patch.object(demisto, 'params', return_value={'cache_ttl': '60'})
+    mocker.patch.object(demisto, 'results')
+
+    Whois.main()
+    mocker.patch.object(Whois, 'whois_cache', Whois.WhoisCache())
+    Whois.main()
+
+    assert fake_whois_server.queries == ['cached.test']
+    assert list(integration_context['whois_cache']) == ['127.0.0.1|cached.test']
+
+    mocker.patch.object(demisto, 'params', return_value={'cache_ttl': '0'})
+    mocker.patch.object(Whois, 'whois_cache', Whois.WhoisCache())
+    Whois.main()
+
+    assert fake_whois_server.queries == ['cached.test', 'cached.test']
+    assert demisto.results.call_count == 3
@@ -4,7 +4,7 @@ import os
 import random
 from unittest.mock import mock_open
 from Tests.Marketplace.marketplace_services import Pack, Metadata, input_to_list, get_valid_bool, convert_price, \
-    get_higher_server_version, GCPConfig
+    get_higher_server_version, GCPConfig, LocalStorageClient, PacksCache, ContentItemsCache
 
 
 @pytest.fixture(scope="module")
@@ -813,3 +813,237 @@ class TestSetDependencies:
         p.set_pack_dependencies(metadata, generated_dependencies)
 
         assert metadata['dependencies'] == dependencies
+
+
+class TestLocalStorage:
+    """ Test class for local file system stand-in of gcs.
+
+    """
+
+    def test_upload_and_download_blob(self, tmp_path):
+        """
+           Given:
+               - Local storage bucket.
+           When:
+               - Uploading blobs, listing them by prefix and downloading one of them.
+           Then:
+               - Ensure blobs are listed by prefix and downloaded content is the uploaded content.
+               - Ensure that download fails in case that blob generation was changed.
+       """
+        bucket = LocalStorageClient(str(tmp_path)).bucket("dummy_bucket")
+        index_blob = bucket.blob("content/packs/index.zip")
+        index_blob.reload()
+
+        assert not index_blob.exists()
+        assert index_blob.generation == 0
+
+        index_blob.upload_from_string("index data")
+        bucket.blob("content/packs/TestPack/1.0.0/TestPack.zip").upload_from_string(b"pack data")
+        index_blob.reload()
+        download_path = str(tmp_path / "index.zip")
+        index_blob.download_to_filename(download_path, if_generation_match=index_blob.generation)
+
+        assert [blob.name for blob in bucket.list_blobs(prefix="content/packs/TestPack")] == [
+            "content/packs/TestPack/1.0.0/TestPack.zip"]
+        assert len(bucket.list_blobs()) == 2
+        with open(download_path) as index_file:
+            assert index_file.read() == "index data"
+        with pytest.raises(Exception):
+            index_blob.download_to_filename(download_path, if_generation_match=index_blob.generation - 1)
+
+        index_blob.delete()
+
+        assert not index_blob.exists()
+
+
+class TestPacksCache:
+    """ Test class for content addressed cache of prepared packs.
+
+    """
+
+    @pytest.fixture()
+    def dummy_pack(self, tmp_path):
+        """ dummy pack fixture
+        """
+        pack_path = tmp_path / "TestPack"
+        (pack_path / "Integrations").mkdir(parents=True)
+        (pack_path / "pack_metadata.json").write_text('{"name": "TestPack"}')
+        (pack_path / "Integrations" / "integration-Test.yml").write_text("name: Test")
+
+        return Pack(pack_name="TestPack", pack_path=str(pack_path))
+
+    def test_get_pack_hash(self, tmp_path, dummy_pack):
+        """
+           Given:
+               - Pack source files.
+           When:
+               - Hashing the pack before and after changing build configuration, pack configuration and pack files.
+           Then:
+               - Ensure that hash is stable and is changed on every change.
+       """
+        packs_cache = PacksCache(str(tmp_path / "cache"), {"bucket_name": "dummy_bucket"})
+        pack_hash = packs_cache.get_pack_hash(dummy_pack)
+
+        assert pack_hash == packs_cache.get_pack_hash(dummy_pack)
+        assert pack_hash != PacksCache(str(tmp_path / "cache"), {"bucket_name": "other"}).get_pack_hash(dummy_pack)
+        assert pack_hash != packs_cache.get_pack_hash(dummy_pack, {"dependencies": {"Base": {}}})
+
+        os.rename(os.path.join(dummy_pack.path, "Integrations", "integration-Test.yml"),
+                  os.path.join(dummy_pack.path, "Integrations", "integration-Other.yml"))
+
+        assert pack_hash != packs_cache.get_pack_hash(dummy_pack)
+
+    def test_save_and_load(self, tmp_path, dummy_pack):
+        """
+           Given:
+               - Pack with content item that is deleted while collecting content items, as its to version is old.
+           When:
+               - Saving collected content items to cache and loading them for the same pack extracted again.
+           Then:
+               - Ensure that cached content items are returned and server min version of the pack is set.
+               - Ensure that the old content item is deleted from the loaded pack, as it was deleted by collection.
+               - Ensure that pack is not found in cache by other hash.
+       """
+        old_integration_path = os.path.join(dummy_pack.path, "Integrations", "integration-Old.yml")
+        with open(old_integration_path, "w") as old_integration:
+            old_integration.write("name: Old\ntoversion: 4.5.0")
+        packs_cache = PacksCache(str(tmp_path / "cache"))
+        dummy_pack._sever_min_version = "6.0.0"
+
+        task_status, content_items = dummy_pack.collect_content_items()
+
+        assert task_status
+        assert dummy_pack.deleted_content_items == [os.path.join("Integrations", "integration-Old.yml")]
+        assert packs_cache.save(dummy_pack, "pack_hash", content_items)
+
+        with open(old_integration_path, "w") as old_integration:
+            old_integration.write("name: Old\ntoversion: 4.5.0")
+        loaded_pack = Pack(pack_name="TestPack", pack_path=dummy_pack.path)
+        cached_content_items = packs_cache.load(loaded_pack, "pack_hash")
+
+        assert cached_content_items == content_items
+        assert loaded_pack.server_min_version == "6.0.0"
+        assert not os.path.exists(old_integration_path)
+        assert os.listdir(os.path.join(tmp_path, "cache", "TestPack", "pack_hash")) == [PacksCache.CONTENT_ITEMS]
+        assert packs_cache.load(loaded_pack, "other_hash") is None
+
+
+class TestContentItemsCache:
+    """ Test class for loading content items top level fields.
+
+    """
+    INTEGRATION_YML = """commonfields:
+  id: Test
+  version: -1
+name: Test
+display: Test Integration
+category: Utilities
+description: |-
+  Test integration.
+
+  Second line.
+configuration:
+- display: Server URL
+  name: url
+script:
+  script: |-
+    def main():
+        pass
+
+  type: python
+  commands:
+  - name: test-command
+    description: Test command.
+  runonce: false
+fromversion: 5.0.0
+tags:
+- first
+- second
+"""
+
+    @pytest.mark.parametrize("fields,expected_result", [
+        (["name", "display", "description", "fromversion"],
+         {"name": "Test", "display": "Test Integration", "description": "Test integration.\n\nSecond line.",
+          "fromversion": "5.0.0"}),
+        (["script", "tags"],
+         {"script": {"type": "python", "commands": [{"name": "test-command", "description": "Test command."}],
+                     "runonce": False},
+          "tags": ["first", "second"]}),
+        (["toversion"], {})
+    ])
+    def test_parse_yml(self, fields, expected_result):
+        """
+           Given:
+               - Integration yml.
+           When:
+               - Parsing part of integration top level fields.
+           Then:
+               - Ensure only given fields are parsed and integration code is skipped.
+       """
+        assert ContentItemsCache.parse(self.INTEGRATION_YML, "yml", fields) == expected_result
+
+    def test_parse_yml_not_supported_by_filter(self):
+        """
+           Given:
+               - Yml with document start marker and flow style mapping.
+           When:
+               - Parsing yml top level fields.
+           Then:
+               - Ensure yml is not filtered and the whole yml is parsed.
+       """
+        yml_content = "---\n{name: Test, description: Test playbook, tasks: {}}\n"
+
+        assert ContentItemsCache.filter_yml(yml_content, ["name"]) is None
+        assert ContentItemsCache.parse(yml_content, "yml", ["name"]) == {"name": "Test"}
+
+    def test_load_with_cache(self, tmp_path):
+        """
+           Given:
+               - Content items cache with cache folder.
+           When:
+               - Loading the same fields of content item twice and loading other fields of it.
+           Then:
+               - Ensure that loaded fields are cached by content and fields, and that cached fields are returned.
+       """
+        content_items_cache = ContentItemsCache(str(tmp_path / "cache"))
+        integration_path = str(tmp_path / "integration-Test.yml")
+        with open(integration_path, "w") as integration_file:
+            integration_file.write(self.INTEGRATION_YML)
+
+        assert content_items_cache.load(integration_path, "yml", ["name"]) == {"name": "Test"}
+        assert len(list((tmp_path / "cache").glob("*/*.json"))) == 1
+
+        for cached_item_path in (tmp_path / "cache").glob("*/*.json"):
+            cached_item_path.write_text('{"name": "Cached"}')
+
+        assert content_items_cache.load(integration_path, "yml", ["name"]) == {"name": "Cached"}
+        assert content_items_cache.load(integration_path, "yml", ["display"]) == {"display": "Test Integration"}
+        assert len(list((tmp_path / "cache").glob("*/*.json"))) == 2
+
+    def test_collect_content_items(self, tmp_path):
+        """
+           Given:
+               - Pack with integration and playbook.
+           When:
+               - Collecting pack content items.
+           Then:
+               - Ensure that content items data and pack min server version are collected.
+       """
+        (tmp_path / "TestPack" / "Integrations").mkdir(parents=True)
+        (tmp_path / "TestPack" / "Playbooks").mkdir()
+        (tmp_path / "TestPack" / "Integrations" / "integration-Test.yml").write_text(self.INTEGRATION_YML)
+        (tmp_path / "TestPack" / "Playbooks" / "playbook-Test.yml").write_text(
+            "id: Test\nname: Test Playbook\ndescription: Test playbook.\ntasks:\n  '0':\n    id: '0'\n"
+            "fromversion: 5.5.0\n")
+        dummy_pack = Pack(pack_name="TestPack", pack_path=str(tmp_path / "TestPack"))
+
+        task_status, content_items = dummy_pack.collect_content_items()
+
+        assert task_status
+        assert content_items == {
+            "integration": [{"name": "Test Integration", "description": "Test integration.\n\nSecond line.",
+                             "category": "Utilities",
+                             "commands": [{"name": "test-command", "description": "Test command."}]}],
+            "playbook": [{"name": "Test Playbook", "description": "Test playbook."}]
+        }
+        assert dummy_pack.server_min_version == "5.5.0"
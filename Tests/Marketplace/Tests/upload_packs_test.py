@@ -547,3 +547,260 @@ class TestCleanPacks:
 
         assert not skipped_cleanup
         shutil.rmtree.assert_called_once_with(os.path.join(index_folder_path, invalid_pack))
+
+
+class TestProcessPacks:
+    """ Test for parallel processing of packs, using local storage stand-in instead of gcs.
+    """
+
+    @staticmethod
+    def create_dummy_pack(extract_path, pack_name):
+        import os
+        import json
+
+        pack_path = os.path.join(extract_path, pack_name)
+        os.makedirs(pack_path)
+
+        with open(os.path.join(pack_path, 'pack_metadata.json'), 'w') as user_metadata_file:
+            json.dump({'name': pack_name, 'description': f'{pack_name} description', 'support': 'xsoar',
+                       'currentVersion': '1.0.0', 'author': 'Cortex XSOAR'}, user_metadata_file)
+
+        return pack_path
+
+    def test_process_packs(self, tmp_path):
+        """
+        Scenario: processing packs in parallel and uploading them to local storage
+
+        Given
+        - two valid packs
+        - pack that its folder does not exist
+
+        When
+        - processing packs with two worker processes
+
+        Then
+        - Ensure that valid packs are uploaded to storage and added to index, in the order of the given packs
+        - Ensure that pack without metadata fails in loading user metadata
+        """
+        import os
+        from Tests.Marketplace.upload_packs import process_packs
+        from Tests.Marketplace.marketplace_services import Pack, PackStatus, LocalStorageClient
+
+        storage_bucket = LocalStorageClient(str(tmp_path / 'storage')).bucket('dummy_bucket')
+        extract_path = str(tmp_path / 'extract')
+        index_folder_path = os.path.join(extract_path, 'index')
+        os.makedirs(index_folder_path)
+        packs_list = [Pack(pack_name, self.create_dummy_pack(extract_path, pack_name))
+                      for pack_name in ('FirstPack', 'SecondPack')]
+        packs_list.append(Pack('MissingPack', os.path.join(extract_path, 'MissingPack')))
+
+        processed_packs = process_packs(packs_list, storage_bucket, False, 2, index_folder_path=index_folder_path,
+                                        packs_dependencies_mapping={}, build_number='1',
+                                        current_commit_hash='HEAD', remote_previous_commit_hash='HEAD~1',
+                                        remove_test_playbooks=True, signature_key=None)
+
+        assert [pack.name for pack in processed_packs] == ['FirstPack', 'SecondPack', 'MissingPack']
+        assert [pack.status for pack in processed_packs] == [PackStatus.SUCCESS.name, PackStatus.SUCCESS.name,
+                                                             PackStatus.FAILED_LOADING_USER_METADATA.value]
+        assert [blob.name for blob in storage_bucket.list_blobs()] == [
+            'content/packs/FirstPack/1.0.0/FirstPack.zip', 'content/packs/SecondPack/1.0.0/SecondPack.zip']
+        assert processed_packs[0].public_storage_path == storage_bucket.list_blobs()[0].public_url
+        assert sorted(os.listdir(index_folder_path)) == ['FirstPack', 'SecondPack']
+        assert sorted(os.listdir(os.path.join(index_folder_path, 'FirstPack'))) == [
+            'changelog.json', 'metadata-1.0.0.json', 'metadata.json']
+
+    def test_process_packs_with_cache(self, tmp_path):
+        """
+        Scenario: processing packs twice with packs cache, when one of the packs was changed between the builds
+
+        Given
+        - two valid packs, which were processed and cached in previous build
+        - one of the packs was changed since previous build
+
+        When
+        - processing packs again with override of all packs
+
+        Then
+        - Ensure that both packs are uploaded again, as the zip is built every build
+        - Ensure that the zip of the unchanged pack contains the metadata of the running build
+        - Ensure that cache entry of the unchanged pack is kept and cache entry of the changed pack is replaced
+        - Ensure that only content items are cached
+        """
+        import os
+        import json
+        from zipfile import ZipFile
+        from Tests.Marketplace.upload_packs import process_packs, get_packs_cache
+        from Tests.Marketplace.marketplace_services import Pack, PackStatus, PacksCache, LocalStorageClient
+
+        storage_bucket = LocalStorageClient(str(tmp_path / 'storage')).bucket('dummy_bucket')
+        packs_cache = get_packs_cache(str(tmp_path / 'cache'))
+        index_folder_path = str(tmp_path / 'index')
+        os.makedirs(index_folder_path)
+        build_kwargs = dict(index_folder_path=index_folder_path, packs_dependencies_mapping={},
+                            current_commit_hash='HEAD', remote_previous_commit_hash='HEAD~1',
+                            remove_test_playbooks=True, signature_key=None, packs_cache=packs_cache)
+
+        cache_entries = []
+
+        for build_number in ('1', '2'):
+            extract_path = str(tmp_path / f'extract{build_number}')
+            packs_list = [Pack(pack_name, self.create_dummy_pack(extract_path, pack_name))
+                          for pack_name in ('FirstPack', 'SecondPack')]
+
+            if build_number == '2':
+                with open(os.path.join(extract_path, 'SecondPack', 'README.md'), 'w') as readme_file:
+                    readme_file.write('changed readme')
+
+            processed_packs = process_packs(packs_list, storage_bucket, build_number == '2', 2,
+                                            build_number=build_number, **build_kwargs)
+            cache_entries.append({pack_name: os.listdir(str(tmp_path / 'cache' / pack_name))
+                                  for pack_name in ('FirstPack', 'SecondPack')})
+
+        assert [pack.status for pack in processed_packs] == [PackStatus.SUCCESS.name, PackStatus.SUCCESS.name]
+        assert cache_entries[1]['FirstPack'] == cache_entries[0]['FirstPack']
+        assert len(cache_entries[1]['SecondPack']) == 1
+        assert cache_entries[1]['SecondPack'] != cache_entries[0]['SecondPack']
+        assert os.listdir(str(tmp_path / 'cache' / 'FirstPack' / cache_entries[1]['FirstPack'][0])) == [
+            PacksCache.CONTENT_ITEMS]
+
+        with ZipFile(storage_bucket.blob('content/packs/FirstPack/1.0.0/FirstPack.zip').path) as first_pack_zip:
+            zip_metadata = json.loads(first_pack_zip.read(Pack.METADATA))
+            zip_changelog = json.loads(first_pack_zip.read(Pack.CHANGELOG_JSON))
+
+        assert zip_metadata['versionInfo'] == '2'
+        assert zip_changelog['1.0.0']['displayName'] == '1.0.0 - R2'
+
+    def test_restore_cached_pack(self, tmp_path):
+        """
+        Scenario: restoring pack content items from packs cache
+
+        Given
+        - pack that its content items were cached, while one of its content items was deleted by the collection
+
+        When
+        - restoring the pack before and after it is cached
+
+        Then
+        - Ensure that pack is not restored before it is cached
+        - Ensure that pack is restored with its cached content items and that the deleted content item is deleted
+        """
+        import os
+        from Tests.Marketplace.upload_packs import restore_cached_pack
+        from Tests.Marketplace.marketplace_services import Pack, PacksCache
+
+        packs_cache = PacksCache(str(tmp_path / 'cache'))
+        pack_path = self.create_dummy_pack(str(tmp_path / 'extract'), 'FirstPack')
+        old_script_path = os.path.join(pack_path, 'Scripts', 'script-Old.yml')
+        os.makedirs(os.path.dirname(old_script_path))
+        with open(old_script_path, 'w') as old_script:
+            old_script.write('name: Old')
+        pack = Pack('FirstPack', pack_path)
+
+        pack, user_metadata, pack_content_items, pack_hash = restore_cached_pack(pack, packs_cache)
+        assert user_metadata['name'] == 'FirstPack'
+        assert pack_content_items is None
+        pack.deleted_content_items.append(os.path.join('Scripts', 'script-Old.yml'))
+        packs_cache.save(pack, pack_hash, {'automation': []})
+
+        pack, _, pack_content_items, _ = restore_cached_pack(Pack('FirstPack', pack_path), packs_cache)
+        assert pack_content_items == {'automation': []}
+        assert not os.path.exists(old_script_path)
+
+    def test_process_pack_failed_step(self, mocker):
+        """
+        Scenario: processing pack that fails in collecting its content items
+
+        Given
+        - pack that fails in collecting content items
+
+        When
+        - processing the pack
+
+        Then
+        - Ensure that pack status is set and that next steps are not performed
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from Tests.Marketplace.upload_packs import process_pack
+        from Tests.Marketplace.marketplace_services import Pack, PackStatus
+
+        mocker.patch.object(Pack, 'load_user_metadata', return_value=(True, {}))
+        mocker.patch.object(Pack, 'collect_content_items', return_value=(False, {}))
+        mocker.patch.object(Pack, 'cleanup')
+        upload_integration_images = mocker.patch.object(Pack, 'upload_integration_images')
+        dummy_storage_bucket = mocker.MagicMock()
+
+        with ThreadPoolExecutor(max_workers=1) as packs_pool:
+            pack, skipped_pack_uploading = process_pack(Pack('DummyPack', 'dummy_path'), packs_pool,
+                                                        dummy_storage_bucket, False, {})
+
+        assert pack.status == PackStatus.FAILED_COLLECT_ITEMS.name
+        assert not skipped_pack_uploading
+        assert not upload_integration_images.called
+        assert not dummy_storage_bucket.method_calls
+
+    def test_process_packs_updates_index_after_all_packs(self, mocker):
+        """
+        Scenario: processing packs which read the index folder while they are prepared
+
+        Given
+        - three packs, the first of them is processed first
+
+        When
+        - processing the packs
+
+        Then
+        - Ensure that the index folder is updated only once all packs are processed, in the order of the given packs
+        """
+        import threading
+        from Tests.Marketplace import upload_packs
+        from Tests.Marketplace.marketplace_services import Pack
+
+        events = []
+        lock = threading.Lock()
+        first_pack_processed = threading.Event()
+
+        def process_pack(pack, *args, **kwargs):
+            if pack.name != 'FirstPack':
+                first_pack_processed.wait()
+            with lock:
+                events.append(('processed', pack.name))
+            if pack.name == 'FirstPack':
+                first_pack_processed.set()
+            return pack, False
+
+        mocker.patch.object(upload_packs, 'process_pack', side_effect=process_pack)
+        mocker.patch.object(upload_packs, 'update_pack_index',
+                            side_effect=lambda pack, *args: events.append(('indexed', pack.name)))
+        packs_list = [Pack(pack_name, 'dummy_path') for pack_name in ('FirstPack', 'SecondPack', 'ThirdPack')]
+
+        upload_packs.process_packs(packs_list, None, False, 1, index_folder_path='dummy_index_path')
+
+        assert events[0] == ('processed', 'FirstPack')
+        assert {event[0] for event in events[:3]} == {'processed'}
+        assert events[3:] == [('indexed', 'FirstPack'), ('indexed', 'SecondPack'), ('indexed', 'ThirdPack')]
+
+    def test_update_pack_index_already_exists(self, mocker):
+        """
+        Scenario: updating index with pack that already exists in storage and in index
+
+        Given
+        - pack that its upload was skipped and exists in index
+
+        When
+        - updating the index with the pack
+
+        Then
+        - Ensure that pack is marked as already exists and index folder is not updated
+        """
+        from Tests.Marketplace import upload_packs
+        from Tests.Marketplace.marketplace_services import Pack, PackStatus
+
+        mocker.patch.object(Pack, 'check_if_exists_in_index', return_value=(True, True))
+        mocker.patch.object(Pack, 'cleanup')
+        mocker.patch.object(upload_packs, 'update_index_folder')
+        pack = Pack('DummyPack', 'dummy_path')
+
+        upload_packs.update_pack_index(pack, True, 'dummy_index_path')
+
+        assert pack.status == PackStatus.PACK_ALREADY_EXISTS.name
+        assert not upload_packs.update_index_folder.called
@@ -9,6 +9,7 @@ import google.auth
 from google.cloud import storage
 import enum
 import base64
+import hashlib
 import urllib.parse
 import warnings
 from distutils.util import strtobool
@@ -22,6 +23,9 @@ PACKS_FOLDER = "Packs"  # name of base packs folder inside content repo
 PACKS_FULL_PATH = os.path.join(CONTENT_ROOT_PATH, PACKS_FOLDER)  # full path to Packs folder in content repo
 IGNORED_FILES = ['__init__.py', 'ApiModules', 'NonSupported']  # files to ignore inside Packs folder
 IGNORED_PATHS = [os.path.join(PACKS_FOLDER, p) for p in IGNORED_FILES]
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)  # libyaml based loader is used when it is available
+YML_KEY_REGEX = re.compile(r'^(\s*)([\w-]+):(?:\s|$)')  # plain mapping key at the start of yml line
+YML_SKIPPED_NESTED_KEYS = {'script': {'script'}}  # integration code is never needed for collecting its data
 
 
 class GCPConfig(object):
@@ -144,6 +148,23 @@ class Pack(object):
     AUTHOR_IMAGE_NAME = "Author_image.png"
     EXCLUDE_DIRECTORIES = [PackFolders.TEST_PLAYBOOKS.value]
     RELEASE_NOTES = "ReleaseNotes"
+    # top level fields that are loaded from content items, fields of versions and name are loaded from all items
+    CONTENT_ITEM_BASE_FIELDS = ['toversion', 'toVersion', 'fromversion', 'fromVersion', 'name', 'display', 'id',
+                                'details']
+    CONTENT_ITEM_FIELDS = {
+        PackFolders.SCRIPTS.value: ['comment', 'tags'],
+        PackFolders.PLAYBOOKS.value: ['description'],
+        PackFolders.INTEGRATIONS.value: ['description', 'category', 'script'],
+        PackFolders.INCIDENT_FIELDS.value: ['type', 'description'],
+        PackFolders.INCIDENT_TYPES.value: ['playbookId', 'closureScript', 'hours', 'days', 'weeks'],
+        PackFolders.INDICATOR_FIELDS.value: ['type', 'description'],
+        PackFolders.REPORTS.value: ['description'],
+        PackFolders.INDICATOR_TYPES.value: ['reputationScriptName', 'enhancementScriptNames'],
+        PackFolders.LAYOUTS.value: ['description'],
+        PackFolders.CLASSIFIERS.value: ['description'],
+        PackFolders.WIDGETS.value: ['dataType', 'widgetType']
+    }
+    INTEGRATION_IMAGE_FIELDS = ['display', 'name', 'image']
 
     def __init__(self, pack_name, pack_path):
         self._pack_name = pack_name
@@ -151,6 +172,7 @@ class Pack(object):
         self._status = None
         self._public_storage_path = ""
         self._remove_files_list = []  # tracking temporary files, in order to delete in later step
+        self._deleted_content_items = []  # content items deleted while collecting, relative to pack path
         self._sever_min_version = "1.0.0"  # initialized min version
         self._latest_version = None  # pack latest version found in changelog
         self._support_type = None  # initialized in load_user_metadata function
@@ -274,6 +296,18 @@ class Pack(object):
         else:
             return self._sever_min_version
 
+    @server_min_version.setter
+    def server_min_version(self, server_min_version_value):
+        """ setter of server min version of the pack, e.g when content items are restored from cache.
+        """
+        self._sever_min_version = server_min_version_value
+
+    @property
+    def deleted_content_items(self):
+        """ list: paths of content items that were deleted while collecting content items, relative to pack path.
+        """
+        return self._deleted_content_items
+
     def _get_latest_version(self):
         """ Return latest semantic version of the pack.
 
@@ -589,11 +623,14 @@ class Pack(object):
 
         try:
             if signature_string:
-                with open("keyfile", "wb") as keyfile:
+                # key file is kept per pack, as packs may be signed concurrently
+                keyfile_path = f"{self._pack_path}.keyfile"
+                with open(keyfile_path, "wb") as keyfile:
                     keyfile.write(signature_string.encode())
-                arg = f'./signDirectory {self._pack_path} keyfile base64'
+                arg = f'./signDirectory {self._pack_path} {keyfile_path} base64'
                 signing_process = subprocess.Popen(arg, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True)
                 output, err = signing_process.communicate()
+                os.remove(keyfile_path)
 
                 if err:
                     print_error(f"Failed to sign pack for {self._pack_name} - {str(err)}")
@@ -876,22 +913,27 @@ class Pack(object):
                     if current_directory == PackFolders.INDICATOR_TYPES.value \
                             and not fnmatch.fnmatch(pack_file_name, 'reputation-*.json'):
                         os.remove(pack_file_path)
+                        self._deleted_content_items.append(os.path.relpath(pack_file_path, self._pack_path))
                         print(f"Deleted pack {pack_file_name} reputation file for {self._pack_name} pack")
                         continue
 
-                    with open(pack_file_path, 'r') as pack_file:
-                        if current_directory in PackFolders.yml_supported_folders():
-                            content_item = yaml.safe_load(pack_file)
-                        elif current_directory in PackFolders.json_supported_folders():
-                            content_item = json.load(pack_file)
-                        else:
-                            continue
+                    if current_directory in PackFolders.yml_supported_folders():
+                        file_format = 'yml'
+                    elif current_directory in PackFolders.json_supported_folders():
+                        file_format = 'json'
+                    else:
+                        continue
+
+                    content_item = CONTENT_ITEMS_CACHE.load(
+                        pack_file_path, file_format,
+                        Pack.CONTENT_ITEM_BASE_FIELDS + Pack.CONTENT_ITEM_FIELDS.get(current_directory, []))
 
                     # check if content item has to version
                     to_version = content_item.get('toversion') or content_item.get('toVersion')
 
                     if to_version and LooseVersion(to_version) < LooseVersion(Metadata.SERVER_DEFAULT_MIN_VERSION):
                         os.remove(pack_file_path)
+                        self._deleted_content_items.append(os.path.relpath(pack_file_path, self._pack_path))
                         print(f"{self._pack_name} pack content item {pack_file_name} has to version: {to_version}. "
                               f"{pack_file_name} file was deleted.")
                         continue
@@ -1054,16 +1096,8 @@ class Pack(object):
         try:
             metadata_path = os.path.join(self._pack_path, Pack.METADATA)  # deployed metadata path after parsing
 
-            self.set_pack_dependencies(user_metadata, packs_dependencies_mapping)
-
-            if 'displayedImages' not in user_metadata:
-                user_metadata['displayedImages'] = packs_dependencies_mapping.get(
-                    self._pack_name, {}).get('displayedImages', [])
-                print(f"Adding auto generated display images for {self._pack_name} pack")
-
-            dependencies_data = self._load_pack_dependencies(index_folder_path,
-                                                             user_metadata.get('dependencies', {}),
-                                                             user_metadata.get('displayedImages', []))
+            dependencies_data = self.load_dependencies_data(user_metadata, index_folder_path,
+                                                            packs_dependencies_mapping)
             formatted_metadata = Pack._parse_pack_metadata(user_metadata=user_metadata,
                                                            pack_content_items=pack_content_items,
                                                            pack_id=self._pack_name,
@@ -1084,6 +1118,29 @@ class Pack(object):
         finally:
             return task_status
 
+    def load_dependencies_data(self, user_metadata, index_folder_path, packs_dependencies_mapping):
+        """ Sets pack dependencies and displayed images in user metadata and loads the index metadata of the
+        dependencies and of the packs whose images are displayed.
+
+        Args:
+            user_metadata (dict): user defined pack_metadata, updated with pack dependencies and displayed images.
+            index_folder_path (str): downloaded index folder directory path.
+            packs_dependencies_mapping (dict): all packs dependencies lookup mapping.
+
+        Returns:
+            dict: pack id as key and loaded metadata of packs as value.
+
+        """
+        self.set_pack_dependencies(user_metadata, packs_dependencies_mapping)
+
+        if 'displayedImages' not in user_metadata:
+            user_metadata['displayedImages'] = packs_dependencies_mapping.get(
+                self._pack_name, {}).get('displayedImages', [])
+            print(f"Adding auto generated display images for {self._pack_name} pack")
+
+        return self._load_pack_dependencies(index_folder_path, user_metadata.get('dependencies', {}),
+                                            user_metadata.get('displayedImages', []))
+
     def set_pack_dependencies(self, user_metadata, packs_dependencies_mapping):
         pack_dependencies = packs_dependencies_mapping.get(self._pack_name, {}).get('dependencies', {})
         if 'dependencies' not in user_metadata:
@@ -1151,9 +1208,8 @@ class Pack(object):
             elif pack_file.endswith('_image.png'):
                 image_data['repo_image_path'] = os.path.join(root, pack_file)
             elif pack_file.endswith('.yml'):
-                with open(os.path.join(root, pack_file), 'r') as integration_file:
-                    integration_yml = yaml.safe_load(integration_file)
-                    image_data['display_name'] = integration_yml.get('display', '')
+                integration_yml = CONTENT_ITEMS_CACHE.load(os.path.join(root, pack_file), 'yml', ['display'])
+                image_data['display_name'] = integration_yml.get('display', '')
 
         return image_data
 
@@ -1170,8 +1226,7 @@ class Pack(object):
         image_data = {}
 
         if pack_file_path.endswith('.yml'):
-            with open(pack_file_path, 'r') as integration_file:
-                integration_yml = yaml.safe_load(integration_file)
+            integration_yml = CONTENT_ITEMS_CACHE.load(pack_file_path, 'yml', Pack.INTEGRATION_IMAGE_FIELDS)
 
             image_data['display_name'] = integration_yml.get('display', '')
             # create temporary file of base64 decoded data
@@ -1363,6 +1418,393 @@ class Pack(object):
             print(f"Cleanup {self._pack_name} pack from: {self._pack_path}")
 
 
+class PacksCache(object):
+    """ Content addressed cache of collected pack content items, kept between builds.
+
+    Pack content items are stored under a hash of pack source files and build configuration, so content items of packs
+    that were not changed since the build that filled the cache are not collected again. Pack zip is not cached, as
+    the pack metadata and changelog inside it depend on the running build and on the index, therefore packs are
+    formatted, signed and zipped on every build.
+    Only latest entry of every pack is kept.
+
+    Args:
+        cache_path (str): full path to cache folder.
+        build_config (dict): build configuration that affects collected content items.
+
+    Attributes:
+        VERSION (int): cache version, should be raised when pack preparation steps are changed.
+        CONTENT_ITEMS (str): name of cached file of pack content items.
+        HASH_CHUNK_SIZE (int): size of chunks that pack files are read in while hashing.
+
+    """
+    VERSION = 3
+    CONTENT_ITEMS = "content_items.json"
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, cache_path, build_config=None):
+        self.cache_path = cache_path
+        self.build_config = build_config or {}
+
+    def get_pack_hash(self, pack, pack_config=None):
+        """ Calculates hash of pack source files, build configuration and configuration of the specific pack.
+
+        Args:
+            pack (Pack): pack to hash, prior its preparation.
+            pack_config (dict): pack specific configuration.
+
+        Returns:
+            str: hex digest of pack hash.
+
+        """
+        config = {'version': PacksCache.VERSION, 'build': self.build_config, 'pack': pack_config or {}}
+        pack_hash = hashlib.sha256(json.dumps(config, sort_keys=True).encode())
+
+        for root, dirs, files in os.walk(pack.path):
+            dirs.sort()  # walking in a stable order, so the hash does not depend on file system listing order
+
+            for f in sorted(files):
+                file_path = os.path.join(root, f)
+                relative_file_path = os.path.relpath(file_path, pack.path)
+                pack_hash.update(f"{relative_file_path}\0{os.path.getsize(file_path)}\0".encode())
+
+                with open(file_path, "rb") as pack_file:
+                    for chunk in iter(lambda: pack_file.read(PacksCache.HASH_CHUNK_SIZE), b""):
+                        pack_hash.update(chunk)
+
+        return pack_hash.hexdigest()
+
+    def load(self, pack, pack_hash):
+        """ Loads cached pack content items. Server min version of the pack is set according to the cached content
+        items and content items that were deleted while collecting them are deleted from the pack.
+
+        Args:
+            pack (Pack): pack to load.
+            pack_hash (str): pack hash, calculated prior pack preparation.
+
+        Returns:
+            dict: cached pack content items, None in case that pack was not found in cache.
+
+        """
+        content_items_path = os.path.join(self.cache_path, pack.name, pack_hash, PacksCache.CONTENT_ITEMS)
+
+        if not os.path.exists(content_items_path):
+            return None
+
+        with open(content_items_path, "r") as content_items_file:
+            cached_content_items = json.load(content_items_file)
+
+        pack.server_min_version = cached_content_items['server_min_version']
+
+        for deleted_content_item in cached_content_items['deleted_content_items']:
+            os.remove(os.path.join(pack.path, deleted_content_item))
+
+        print(f"Loaded {pack.name} pack content items from cache entry {pack_hash}")
+
+        return cached_content_items['content_items']
+
+    def save(self, pack, pack_hash, pack_content_items):
+        """ Stores pack content items in cache, replacing previous entry of the pack.
+
+        Args:
+            pack (Pack): pack that its content items were collected.
+            pack_hash (str): pack hash, calculated prior pack preparation.
+            pack_content_items (dict): pack content items.
+
+        Returns:
+            bool: whether the operation succeeded.
+
+        """
+        task_status = False
+
+        try:
+            pack_cache_path = os.path.join(self.cache_path, pack.name)
+            temp_entry_path = os.path.join(pack_cache_path, f".{pack_hash}")
+
+            if os.path.exists(temp_entry_path):
+                shutil.rmtree(temp_entry_path)
+
+            os.makedirs(temp_entry_path)
+
+            with open(os.path.join(temp_entry_path, PacksCache.CONTENT_ITEMS), "w") as content_items_file:
+                json.dump({'content_items': pack_content_items, 'server_min_version': pack.server_min_version,
+                           'deleted_content_items': pack.deleted_content_items}, content_items_file)
+
+            for previous_entry in os.listdir(pack_cache_path):
+                if previous_entry != os.path.basename(temp_entry_path):
+                    shutil.rmtree(os.path.join(pack_cache_path, previous_entry))
+
+            # entry is renamed only when complete, so partially written entries are never loaded
+            os.rename(temp_entry_path, os.path.join(pack_cache_path, pack_hash))
+            task_status = True
+            print(f"Saved {pack.name} pack content items to cache entry {pack_hash}")
+        except Exception as e:
+            print_warning(f"Failed in saving {pack.name} pack to cache. Additional info:\n {e}")
+        finally:
+            return task_status
+
+
+class ContentItemsCache(object):
+    """ Loads top level fields of content items and caches them by hash of content item file and loaded fields.
+
+    Yml files are filtered to the loaded top level fields prior parsing, so big fields such as playbook tasks and
+    integration code are not parsed at all. In case that cache path is set, loaded fields are stored in cache folder,
+    which can be shared between pack preparation processes, build steps and builds.
+
+    Args:
+        cache_path (str): full path to cache folder, None in case that loaded fields should not be cached.
+
+    """
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path
+
+    @staticmethod
+    def filter_yml(yml_content, fields):
+        """ Filters yml content to the given top level fields, without parsing it.
+
+        Args:
+            yml_content (str): yml file content.
+            fields (list): top level fields to keep.
+
+        Returns:
+            str: filtered yml content, None in case that yml structure is not supported by the filter.
+
+        """
+        filtered_lines = []
+        keep_line = False
+        skipped_nested_keys = set()
+        nested_indent = None
+        skipped_nested_indent = None
+
+        for line in yml_content.splitlines(keepends=True):
+            # indented lines and sequence items of indentless sequences belong to the last top level field
+            if not line.strip() or line.startswith((' ', '\t', '- ')) or line.rstrip() == '-':
+                if not keep_line:
+                    continue
+
+                if line.strip() and skipped_nested_keys:
+                    key_match = YML_KEY_REGEX.match(line)
+                    line_indent = len(line) - len(line.lstrip())
+                    nested_indent = nested_indent or line_indent
+
+                    if skipped_nested_indent is not None and line_indent <= skipped_nested_indent:
+                        skipped_nested_indent = None
+
+                    if key_match and line_indent == nested_indent and key_match.group(2) in skipped_nested_keys:
+                        skipped_nested_indent = line_indent
+
+                if skipped_nested_indent is None:
+                    filtered_lines.append(line)
+            elif line.startswith('#'):
+                continue
+            else:
+                key_match = YML_KEY_REGEX.match(line)
+
+                if not key_match or key_match.group(1):
+                    return None  # document markers, flow style or complex keys are parsed as is
+
+                keep_line = key_match.group(2) in fields
+                skipped_nested_keys = YML_SKIPPED_NESTED_KEYS.get(key_match.group(2), set())
+                nested_indent, skipped_nested_indent = None, None
+
+                if keep_line:
+                    filtered_lines.append(line)
+
+        return ''.join(filtered_lines)
+
+    @staticmethod
+    def parse(content, file_format, fields):
+        """ Parses content item and returns its top level fields.
+
+        Args:
+            content (str): content item file content.
+            file_format (str): content item file format, yml or json.
+            fields (list): top level fields to return.
+
+        Returns:
+            dict: parsed content item with the given fields, in case that content item is a mapping.
+
+        """
+        if file_format == 'json':
+            content_item = json.loads(content)
+        else:
+            filtered_content = ContentItemsCache.filter_yml(content, fields)
+            content_item = None
+
+            if filtered_content is not None:
+                try:
+                    content_item = yaml.load(filtered_content, Loader=YAML_LOADER) or {}
+                except yaml.YAMLError:
+                    content_item = None  # e.g aliases to filtered fields, falling back to parsing the whole file
+
+            if not isinstance(content_item, dict):
+                content_item = yaml.load(content, Loader=YAML_LOADER)
+
+        if isinstance(content_item, dict):
+            content_item = {k: v for k, v in content_item.items() if k in fields}
+
+        return content_item
+
+    def load(self, file_path, file_format, fields):
+        """ Loads top level fields of content item file.
+
+        Args:
+            file_path (str): full path to content item file.
+            file_format (str): content item file format, yml or json.
+            fields (list): top level fields to load.
+
+        Returns:
+            dict: loaded content item with the given fields, in case that content item is a mapping.
+
+        """
+        with open(file_path, 'r') as content_item_file:
+            content = content_item_file.read()
+
+        if not self.cache_path:
+            return ContentItemsCache.parse(content, file_format, fields)
+
+        cache_key = hashlib.sha1(json.dumps([file_format, sorted(fields)]).encode() + content.encode()).hexdigest()
+        cached_item_path = os.path.join(self.cache_path, cache_key[:2], f"{cache_key}.json")
+
+        if os.path.exists(cached_item_path):
+            with open(cached_item_path, 'r') as cached_item_file:
+                return json.load(cached_item_file)
+
+        content_item = ContentItemsCache.parse(content, file_format, fields)
+
+        try:
+            os.makedirs(os.path.dirname(cached_item_path), exist_ok=True)
+            temp_item_path = f"{cached_item_path}.{os.getpid()}"
+
+            with open(temp_item_path, 'w') as cached_item_file:
+                json.dump(content_item, cached_item_file, default=str)
+
+            os.replace(temp_item_path, cached_item_path)  # other processes never read partially written items
+        except Exception as e:
+            print_warning(f"Failed in caching content item {file_path}. Additional info:\n {e}")
+
+        return content_item
+
+
+CONTENT_ITEMS_CACHE = ContentItemsCache()
+
+
+class LocalStorageBlob(object):
+    """ Local file system stand-in of google cloud storage blob, for local development and testing.
+
+    Args:
+        bucket (LocalStorageBucket): bucket that holds the blob.
+        name (str): blob path relative to the bucket root.
+
+    """
+
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.cache_control = None
+        self.generation = None
+
+    @property
+    def path(self):
+        """ str: full path of the blob file.
+        """
+        return os.path.join(self.bucket.path, self.name)
+
+    @property
+    def public_url(self):
+        """ str: file url of the blob.
+        """
+        return f"file://{urllib.parse.quote(os.path.abspath(self.path))}"
+
+    def exists(self):
+        return os.path.isfile(self.path)
+
+    def reload(self):
+        """ Updates blob generation, which is 0 in case that blob does not exist, same as gcs precondition value.
+        """
+        self.generation = os.stat(self.path).st_mtime_ns if self.exists() else 0
+
+    def download_to_filename(self, filename, if_generation_match=None):
+        self.reload()
+        if if_generation_match is not None and if_generation_match != self.generation:
+            raise Exception(f"Generation of {self.name} does not match {if_generation_match}")
+
+        shutil.copyfile(self.path, filename)
+
+    def upload_from_file(self, file_obj):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "wb") as blob_file:
+            shutil.copyfileobj(file_obj, blob_file)
+
+    def upload_from_filename(self, filename):
+        with open(filename, "rb") as file_obj:
+            self.upload_from_file(file_obj)
+
+    def upload_from_string(self, data):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "wb") as blob_file:
+            blob_file.write(data.encode() if isinstance(data, str) else data)
+
+    def delete(self):
+        os.remove(self.path)
+
+
+class LocalStorageBucket(object):
+    """ Local file system stand-in of google cloud storage bucket, blobs are stored as files under the bucket folder.
+
+    Args:
+        path (str): full path to the bucket root folder.
+        name (str): bucket name, defaults to the bucket folder name.
+
+    """
+
+    def __init__(self, path, name=None):
+        self.path = path
+        self.name = name or os.path.basename(os.path.normpath(path))
+
+    def blob(self, blob_name):
+        return LocalStorageBlob(self, blob_name)
+
+    def list_blobs(self, prefix=""):
+        """ Lists bucket blobs that their names start with given prefix.
+
+        Args:
+            prefix (str): blob name prefix to filter by.
+
+        Returns:
+            list: sorted list of LocalStorageBlob objects.
+
+        """
+        blob_names = []
+
+        for root, _, files in os.walk(self.path):
+            for f in files:
+                blob_name = os.path.relpath(os.path.join(root, f), self.path).replace(os.sep, "/")
+
+                if blob_name.startswith(prefix):
+                    blob_names.append(blob_name)
+
+        return [self.blob(blob_name) for blob_name in sorted(blob_names)]
+
+
+class LocalStorageClient(object):
+    """ Local file system stand-in of google cloud storage client, every bucket is a sub folder of storage path.
+
+    Args:
+        storage_path (str): full path to the local storage root folder.
+
+    """
+
+    def __init__(self, storage_path):
+        self.storage_path = storage_path
+
+    def bucket(self, bucket_name):
+        bucket_path = os.path.join(self.storage_path, bucket_name)
+        os.makedirs(bucket_path, exist_ok=True)
+
+        return LocalStorageBucket(bucket_path, bucket_name)
+
+
 # HELPER FUNCTIONS
 
 def init_storage_client(service_account=None):
@@ -7,12 +7,18 @@ import uuid
 import prettytable
 import glob
 import git
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from zipfile import ZipFile
 from Tests.Marketplace.marketplace_services import init_storage_client, Pack, PackStatus, GCPConfig, PACKS_FULL_PATH, \
-    IGNORED_FILES, PACKS_FOLDER, IGNORED_PATHS, Metadata, CONTENT_ROOT_PATH
+    IGNORED_FILES, PACKS_FOLDER, IGNORED_PATHS, Metadata, CONTENT_ROOT_PATH, LocalStorageClient, PacksCache, \
+    CONTENT_ITEMS_CACHE
 from demisto_sdk.commands.common.tools import run_command, print_error, print_warning, print_color, LOG_COLORS, str2bool
 
+STORAGE_UPLOAD_WORKERS = 8  # number of packs that are uploaded to storage concurrently
+CONTENT_ITEMS_CACHE_FOLDER = ".content_items"  # cache folder of loaded content items, inside packs cache folder
+
 
 def get_packs_names(target_packs):
     """Detects and returns packs names to upload.
@@ -548,6 +554,325 @@ def check_if_index_is_updated(index_folder_path, content_repo, current_commit_ha
         sys.exit(1)
 
 
+def init_pack_worker(storage_base_path, content_items_cache_path=None):
+    """ Initializes pack preparation worker process with the storage and cache configuration of the main process.
+
+    Args:
+        storage_base_path (str): storage base path of the directory to upload to.
+        content_items_cache_path (str): full path to content items cache folder.
+
+    """
+    GCPConfig.STORAGE_BASE_PATH = storage_base_path
+    CONTENT_ITEMS_CACHE.cache_path = content_items_cache_path
+
+
+@lru_cache()
+def get_worker_content_git_client(content_repo_path):
+    """ Returns content repo client of current worker process, the client is initialized once per process.
+
+    Args:
+        content_repo_path (str): content repo full path
+
+    Returns:
+        git.repo.base.Repo: content repo object.
+
+    """
+    return get_content_git_client(content_repo_path)
+
+
+def restore_cached_pack(pack, packs_cache):
+    """ Loads pack user metadata and restores pack content items from packs cache, in case that pack was not changed
+    since its content items were cached. Runs in pack preparation worker process.
+
+    Args:
+        pack (Pack): pack to restore.
+        packs_cache (PacksCache): cache of collected pack content items.
+
+    Returns:
+        Pack: restored pack, status of the pack is set in case of failure.
+        dict: pack user metadata.
+        dict: cached pack content items, None in case that pack was not found in cache.
+        str: pack hash, None in case that pack could not be hashed.
+
+    """
+    task_status, user_metadata = pack.load_user_metadata()
+    if not task_status:
+        pack.status = PackStatus.FAILED_LOADING_USER_METADATA.value
+        pack.cleanup()
+        return pack, None, None, None
+
+    try:
+        pack_hash = packs_cache.get_pack_hash(pack)
+        pack_content_items = packs_cache.load(pack, pack_hash)
+    except Exception as e:
+        print_warning(f"Failed in restoring {pack.name} pack from cache, skipping packs cache. Additional info:\n {e}")
+        return pack, user_metadata, None, None
+
+    return pack, user_metadata, pack_content_items, pack_hash
+
+
+def load_pack_content(pack):
+    """ Loads pack user metadata and collects pack content items. Runs in pack preparation worker process.
+
+    Args:
+        pack (Pack): pack to load.
+
+    Returns:
+        Pack: loaded pack, status of the pack is set in case of failure.
+        dict: pack user metadata.
+        dict: pack content items.
+
+    """
+    task_status, user_metadata = pack.load_user_metadata()
+    if not task_status:
+        pack.status = PackStatus.FAILED_LOADING_USER_METADATA.value
+        pack.cleanup()
+        return pack, None, None
+
+    task_status, pack_content_items = pack.collect_content_items()
+    if not task_status:
+        pack.status = PackStatus.FAILED_COLLECT_ITEMS.name
+        pack.cleanup()
+        return pack, None, None
+
+    return pack, user_metadata, pack_content_items
+
+
+def build_pack_artifacts(pack, user_metadata, pack_content_items, integration_images, author_image,
+                         index_folder_path, packs_dependencies_mapping, build_number, current_commit_hash,
+                         remote_previous_commit_hash, remove_test_playbooks, signature_key):
+    """ Formats pack metadata and release notes, signs and zips the pack and detects whether it was modified.
+    Runs in pack preparation worker process.
+
+    Args:
+        pack (Pack): pack to build.
+        user_metadata (dict): pack user metadata.
+        pack_content_items (dict): pack content items.
+        integration_images (list): uploaded pack integration images.
+        author_image (str): uploaded pack author image path.
+        index_folder_path (str): index folder full path.
+        packs_dependencies_mapping (dict): packs dependencies mapping.
+        build_number (str): circleCI build number, used as an index revision.
+        current_commit_hash (str): last commit hash of head.
+        remote_previous_commit_hash (str): previous commit of origin/master (origin/master~1)
+        remove_test_playbooks (bool): whether to remove test playbooks from the pack.
+        signature_key (str): base64 encoded signature key used for signing the pack.
+
+    Returns:
+        Pack: built pack, status of the pack is set in case of failure or in case that pack is not updated.
+        str: full path to created pack zip.
+        bool: whether pack was modified and override will be required.
+
+    """
+    task_status = pack.format_metadata(user_metadata=user_metadata, pack_content_items=pack_content_items,
+                                       integration_images=integration_images, author_image=author_image,
+                                       index_folder_path=index_folder_path,
+                                       packs_dependencies_mapping=packs_dependencies_mapping,
+                                       build_number=build_number, commit_hash=current_commit_hash)
+    if not task_status:
+        pack.status = PackStatus.FAILED_METADATA_PARSING.name
+        pack.cleanup()
+        return pack, None, False
+
+    task_status, not_updated_build = pack.prepare_release_notes(index_folder_path, build_number)
+    if not task_status:
+        pack.status = PackStatus.FAILED_RELEASE_NOTES.name
+        pack.cleanup()
+        return pack, None, False
+
+    if not_updated_build:
+        pack.status = PackStatus.PACK_IS_NOT_UPDATED_IN_RUNNING_BUILD.name
+        pack.cleanup()
+        return pack, None, False
+
+    task_status = pack.remove_unwanted_files(remove_test_playbooks)
+    if not task_status:
+        pack.status = PackStatus.FAILED_REMOVING_PACK_SKIPPED_FOLDERS
+        pack.cleanup()
+        return pack, None, False
+
+    task_status = pack.sign_pack(signature_key)
+    if not task_status:
+        pack.status = PackStatus.FAILED_SIGNING_PACKS.name
+        pack.cleanup()
+        return pack, None, False
+
+    task_status, zip_pack_path = pack.zip_pack()
+    if not task_status:
+        pack.status = PackStatus.FAILED_ZIPPING_PACK_ARTIFACTS.name
+        pack.cleanup()
+        return pack, None, False
+
+    content_repo = get_worker_content_git_client(CONTENT_ROOT_PATH)
+    task_status, pack_was_modified = pack.detect_modified(content_repo, index_folder_path, current_commit_hash,
+                                                          remote_previous_commit_hash)
+    if not task_status:
+        pack.status = PackStatus.FAILED_DETECTING_MODIFIED_FILES.name
+        pack.cleanup()
+        return pack, None, False
+
+    return pack, zip_pack_path, pack_was_modified
+
+
+def process_pack(pack, packs_pool, storage_bucket, override_all_packs, packs_dependencies_mapping, packs_cache=None,
+                 **build_kwargs):
+    """ Prepares pack and uploads it to storage. Runs in storage upload thread, the cpu bound steps are submitted to
+    the packs preparation pool and the thread waits for them, so uploads of one pack overlap preparation of others.
+
+    Args:
+        pack (Pack): pack to process.
+        packs_pool (concurrent.futures.Executor): pool where the pack preparation steps are submitted to.
+        storage_bucket (google.cloud.storage.bucket.Bucket): google storage bucket where pack is uploaded.
+        override_all_packs (bool): whether to override existing pack in cloud storage.
+        packs_dependencies_mapping (dict): packs dependencies mapping.
+        packs_cache (PacksCache): cache of collected pack content items, None in case that cache is not used.
+        build_kwargs: build arguments passed to build_pack_artifacts.
+
+    Returns:
+        Pack: processed pack, status of the pack is set in case that one of the steps failed.
+        bool: True in case of pack existence at storage and upload was skipped, otherwise returned False.
+
+    """
+    # only the pack own entry is used by pack preparation, so the whole mapping is not sent to worker processes
+    pack_dependencies = packs_dependencies_mapping.get(pack.name, {})
+    packs_dependencies_mapping = {pack.name: pack_dependencies} if pack_dependencies else {}
+    pack_content_items, pack_hash = None, None
+
+    if packs_cache:
+        pack, user_metadata, pack_content_items, pack_hash = packs_pool.submit(restore_cached_pack, pack,
+                                                                               packs_cache).result()
+        if pack.status:
+            return pack, False
+
+    if pack_content_items is None:
+        pack, user_metadata, pack_content_items = packs_pool.submit(load_pack_content, pack).result()
+        if pack.status:
+            return pack, False
+
+        if packs_cache and pack_hash:
+            packs_cache.save(pack, pack_hash, pack_content_items)
+
+    task_status, integration_images = pack.upload_integration_images(storage_bucket)
+    if not task_status:
+        pack.status = PackStatus.FAILED_IMAGES_UPLOAD.name
+        pack.cleanup()
+        return pack, False
+
+    task_status, author_image = pack.upload_author_image(storage_bucket)
+    if not task_status:
+        pack.status = PackStatus.FAILED_AUTHOR_IMAGE_UPLOAD.name
+        pack.cleanup()
+        return pack, False
+
+    pack, zip_pack_path, pack_was_modified = packs_pool.submit(
+        build_pack_artifacts, pack, user_metadata, pack_content_items, integration_images, author_image,
+        packs_dependencies_mapping=packs_dependencies_mapping, **build_kwargs).result()
+    if pack.status:
+        return pack, False
+
+    task_status, skipped_pack_uploading = pack.upload_to_storage(zip_pack_path, pack.latest_version, storage_bucket,
+                                                                 override_all_packs or pack_was_modified)
+    if not task_status:
+        pack.status = PackStatus.FAILED_UPLOADING_PACK.name
+        pack.cleanup()
+
+    return pack, skipped_pack_uploading
+
+
+def update_pack_index(pack, skipped_pack_uploading, index_folder_path):
+    """ Updates index folder with processed pack and sets the final status of the pack.
+    Index folder is shared between all packs, therefore this step runs serially in the main process, after all packs
+    were processed.
+
+    Args:
+        pack (Pack): pack that was processed and uploaded to storage.
+        skipped_pack_uploading (bool): whether pack upload was skipped because it already exists at storage.
+        index_folder_path (str): index folder full path.
+
+    """
+    task_status, exists_in_index = pack.check_if_exists_in_index(index_folder_path)
+    if not task_status:
+        pack.status = PackStatus.FAILED_SEARCHING_PACK_IN_INDEX.name
+        pack.cleanup()
+        return
+
+    # in case that pack already exist at cloud storage path and in index, skipped further steps
+    if skipped_pack_uploading and exists_in_index:
+        pack.status = PackStatus.PACK_ALREADY_EXISTS.name
+        pack.cleanup()
+        return
+
+    task_status = pack.prepare_for_index_upload()
+    if not task_status:
+        pack.status = PackStatus.FAILED_PREPARING_INDEX_FOLDER.name
+        pack.cleanup()
+        return
+
+    task_status = update_index_folder(index_folder_path=index_folder_path, pack_name=pack.name, pack_path=pack.path,
+                                      pack_version=pack.latest_version, hidden_pack=pack.hidden)
+    if not task_status:
+        pack.status = PackStatus.FAILED_UPDATING_INDEX_FOLDER.name
+        pack.cleanup()
+        return
+
+    pack.status = PackStatus.SUCCESS.name
+
+
+def get_packs_cache(cache_path):
+    """ Initializes packs cache with build configuration that affects collected content items.
+    Build number and commit hash are not part of the configuration, otherwise cache would never be reused.
+
+    Args:
+        cache_path (str): full path to cache folder.
+
+    Returns:
+        PacksCache: initialized packs cache.
+
+    """
+    build_config = {
+        'server_default_min_version': Metadata.SERVER_DEFAULT_MIN_VERSION
+    }
+
+    return PacksCache(cache_path, build_config)
+
+
+def process_packs(packs_list, storage_bucket, override_all_packs, max_workers=None, **build_kwargs):
+    """ Processes packs in parallel. Pack preparation steps run in a process pool, storage uploads run in a thread
+    pool and the index update runs serially, once all packs are processed.
+    Pack preparation reads the metadata of its dependencies from the index folder, therefore the index folder is not
+    updated while any pack is prepared.
+
+    Args:
+        packs_list (list): list of initialized packs.
+        storage_bucket (google.cloud.storage.bucket.Bucket): google storage bucket where packs are uploaded.
+        override_all_packs (bool): whether to override existing packs in cloud storage.
+        max_workers (int): number of pack preparation processes, defaults to number of cpus.
+        build_kwargs: build arguments passed to process_pack.
+
+    Returns:
+        list: processed packs, in the same order of the given packs.
+
+    """
+    index_folder_path = build_kwargs['index_folder_path']
+    max_workers = max_workers or os.cpu_count() or 1
+    # every upload thread waits for its pack preparation, so there are enough threads to keep all processes busy
+    upload_workers = max_workers + STORAGE_UPLOAD_WORKERS
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_pack_worker,
+                             initargs=(GCPConfig.STORAGE_BASE_PATH, CONTENT_ITEMS_CACHE.cache_path)) as packs_pool:
+        with ThreadPoolExecutor(max_workers=upload_workers) as upload_pool:
+            futures = [upload_pool.submit(process_pack, pack, packs_pool, storage_bucket, override_all_packs,
+                                          **build_kwargs) for pack in packs_list]
+
+    for future in futures:
+        pack, skipped_pack_uploading = future.result()
+
+        if not pack.status:
+            update_pack_index(pack, skipped_pack_uploading, index_folder_path)
+
+    return [future.result()[0] for future in futures]
+
+
 def print_packs_summary(packs_list):
     """Prints summary of packs uploaded to gcs.
 
@@ -623,6 +948,18 @@ def option_handler():
                         required=False)
     parser.add_argument('-rt', '--remove_test_playbooks', type=str2bool,
                         help='Should remove test playbooks from content packs or not.', default=True)
+    parser.add_argument('-w', '--max_workers', type=int,
+                        help="Number of processes used to prepare packs. Default is set to number of cpus.",
+                        required=False)
+    parser.add_argument('-c', '--cache_path',
+                        help=("Full path of folder to cache collected pack content items in between builds. "
+                              "Content items of packs that were not changed since they were cached are not collected "
+                              "again."),
+                        required=False)
+    parser.add_argument('-ls', '--local_storage_path',
+                        help=("Full path of local folder to use as storage instead of gcs, for local development. "
+                              "Every bucket is stored as a sub folder of this folder."),
+                        required=False)
     # disable-secrets-detection-end
     return parser.parse_args()
 
@@ -642,9 +979,15 @@ def main():
     packs_dependencies_mapping = load_json(option.pack_dependencies) if option.pack_dependencies else {}
     storage_base_path = option.storage_base_path
     remove_test_playbooks = option.remove_test_playbooks
+    max_workers = option.max_workers
+    local_storage_path = option.local_storage_path
+    cache_path = option.cache_path
 
-    # google cloud storage client initialized
-    storage_client = init_storage_client(service_account)
+    # google cloud storage client initialized, or local storage stand-in in case of local development
+    if local_storage_path:
+        storage_client = LocalStorageClient(local_storage_path)
+    else:
+        storage_client = init_storage_client(service_account)
     storage_bucket = storage_client.bucket(storage_bucket_name)
 
     # content repo client initialized
@@ -678,111 +1021,19 @@ def main():
     # clean index and gcs from non existing or invalid packs
     clean_non_existing_packs(index_folder_path, private_packs, storage_bucket)
 
-    # starting iteration over packs
-    for pack in packs_list:
-        task_status, user_metadata = pack.load_user_metadata()
-        if not task_status:
-            pack.status = PackStatus.FAILED_LOADING_USER_METADATA.value
-            pack.cleanup()
-            continue
-
-        task_status, pack_content_items = pack.collect_content_items()
-        if not task_status:
-            pack.status = PackStatus.FAILED_COLLECT_ITEMS.name
-            pack.cleanup()
-            continue
-
-        task_status, integration_images = pack.upload_integration_images(storage_bucket)
-        if not task_status:
-            pack.status = PackStatus.FAILED_IMAGES_UPLOAD.name
-            pack.cleanup()
-            continue
-
-        task_status, author_image = pack.upload_author_image(storage_bucket)
-        if not task_status:
-            pack.status = PackStatus.FAILED_AUTHOR_IMAGE_UPLOAD.name
-            pack.cleanup()
-            continue
-
-        task_status = pack.format_metadata(user_metadata=user_metadata, pack_content_items=pack_content_items,
-                                           integration_images=integration_images, author_image=author_image,
-                                           index_folder_path=index_folder_path,
-                                           packs_dependencies_mapping=packs_dependencies_mapping,
-                                           build_number=build_number, commit_hash=current_commit_hash)
-        if not task_status:
-            pack.status = PackStatus.FAILED_METADATA_PARSING.name
-            pack.cleanup()
-            continue
-
-        task_status, not_updated_build = pack.prepare_release_notes(index_folder_path, build_number)
-        if not task_status:
-            pack.status = PackStatus.FAILED_RELEASE_NOTES.name
-            pack.cleanup()
-            continue
-
-        if not_updated_build:
-            pack.status = PackStatus.PACK_IS_NOT_UPDATED_IN_RUNNING_BUILD.name
-            pack.cleanup()
-            continue
-
-        task_status = pack.remove_unwanted_files(remove_test_playbooks)
-        if not task_status:
-            pack.status = PackStatus.FAILED_REMOVING_PACK_SKIPPED_FOLDERS
-            pack.cleanup()
-            continue
-
-        task_status = pack.sign_pack(signature_key)
-        if not task_status:
-            pack.status = PackStatus.FAILED_SIGNING_PACKS.name
-            pack.cleanup()
-            continue
-
-        task_status, zip_pack_path = pack.zip_pack()
-        if not task_status:
-            pack.status = PackStatus.FAILED_ZIPPING_PACK_ARTIFACTS.name
-            pack.cleanup()
-            continue
-
-        task_status, pack_was_modified = pack.detect_modified(content_repo, index_folder_path, current_commit_hash,
-                                                              remote_previous_commit_hash)
-        if not task_status:
-            pack.status = PackStatus.FAILED_DETECTING_MODIFIED_FILES.name
-            pack.cleanup()
-            continue
-
-        task_status, skipped_pack_uploading = pack.upload_to_storage(zip_pack_path, pack.latest_version, storage_bucket,
-                                                                     override_all_packs or pack_was_modified)
-        if not task_status:
-            pack.status = PackStatus.FAILED_UPLOADING_PACK.name
-            pack.cleanup()
-            continue
-
-        task_status, exists_in_index = pack.check_if_exists_in_index(index_folder_path)
-        if not task_status:
-            pack.status = PackStatus.FAILED_SEARCHING_PACK_IN_INDEX.name
-            pack.cleanup()
-            continue
-
-        # in case that pack already exist at cloud storage path and in index, skipped further steps
-        if skipped_pack_uploading and exists_in_index:
-            pack.status = PackStatus.PACK_ALREADY_EXISTS.name
-            pack.cleanup()
-            continue
-
-        task_status = pack.prepare_for_index_upload()
-        if not task_status:
-            pack.status = PackStatus.FAILED_PREPARING_INDEX_FOLDER.name
-            pack.cleanup()
-            continue
-
-        task_status = update_index_folder(index_folder_path=index_folder_path, pack_name=pack.name, pack_path=pack.path,
-                                          pack_version=pack.latest_version, hidden_pack=pack.hidden)
-        if not task_status:
-            pack.status = PackStatus.FAILED_UPDATING_INDEX_FOLDER.name
-            pack.cleanup()
-            continue
-
-        pack.status = PackStatus.SUCCESS.name
+    # packs that were not changed since they were cached are restored instead of being prepared again
+    packs_cache = get_packs_cache(cache_path) if cache_path else None
+
+    if cache_path:  # content items of changed packs are loaded from cache in case that they were not changed
+        CONTENT_ITEMS_CACHE.cache_path = os.path.join(cache_path, CONTENT_ITEMS_CACHE_FOLDER)
+
+    # starting parallel processing of packs, only the index update is done serially
+    packs_list = process_packs(packs_list, storage_bucket, override_all_packs, max_workers, packs_cache=packs_cache,
+                               index_folder_path=index_folder_path,
+                               packs_dependencies_mapping=packs_dependencies_mapping, build_number=build_number,
+                               current_commit_hash=current_commit_hash,
+                               remote_previous_commit_hash=remote_previous_commit_hash,
+                               remove_test_playbooks=remove_test_playbooks, signature_key=signature_key)
 
     # upload core packs json to bucket
     upload_core_packs_config(storage_bucket, build_number, index_folder_path)
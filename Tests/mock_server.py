@@ -6,9 +6,13 @@ import json
 import signal
 import string
 import time
+import hashlib
+import argparse
+import contextlib
 import unicodedata
 import urllib3
 import demisto_client.demisto_api
+from concurrent.futures import ProcessPoolExecutor
 from subprocess import call, Popen, PIPE, check_call, check_output, CalledProcessError
 from demisto_sdk.commands.common.tools import print_color, print_error, print_warning, \
     LOG_COLORS
@@ -16,6 +20,11 @@ from demisto_sdk.commands.common.tools import print_color, print_error, print_wa
 VALID_FILENAME_CHARS = '-_.() %s%s' % (string.ascii_letters, string.digits)
 PROXY_PROCESS_INIT_TIMEOUT = 20
 PROXY_PROCESS_INIT_INTERVAL = 1
+MOCK_FILE_SUFFIX = '.mock'
+PROBLEM_KEYS_FILE_NAME = 'problematic_keys.json'
+# not picked up by `git add *` when uploading the mock files
+CLEANED_MOCKS_HASHES_FILE_NAME = '.cleaned_mocks_hashes.json'
+HASH_CHUNK_SIZE = 1024 * 1024
 
 # Disable insecure warnings
 urllib3.disable_warnings()
@@ -71,6 +80,140 @@ def get_folder_path(playbook_id):
     return clean_filename(playbook_id) + '/'
 
 
+def get_file_hash(file_path):
+    """Get the sha256 hash of a file, the file is read in chunks.
+
+    Args:
+        file_path (string): path of the file to hash.
+
+    Returns:
+        string. The hex digest of the file content.
+    """
+    file_hash = hashlib.sha256()
+    with open(file_path, 'rb') as file_to_hash:
+        for chunk in iter(lambda: file_to_hash.read(HASH_CHUNK_SIZE), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def needs_whitewashing(problem_keys):
+    """Whether there is data in the problematic keys dictionary that needs whitewashing"""
+    return any(problem_keys.values())
+
+
+def clean_mock_file_flows(mock_file_path, problem_keys_filepath):
+    """Replace the values of the problematic keys in the requests of a mock file with constant data, like running
+    `mitmdump -ns timestamp_replacer.py --set script_mode=clean` does. The flows are streamed one at a time into the
+    cleaned mock file, which then replaces the mock file.
+
+    Args:
+        mock_file_path (string): path of the mock file to clean.
+        problem_keys_filepath (string): path of the problematic keys file of the mock file.
+
+    Returns:
+        int. The number of flows in the mock file.
+    """
+    # mitmproxy is only installed where the mock files are recorded
+    from mitmproxy import http, io
+    from Tests.timestamp_replacer import TimestampReplacer
+
+    cleaned_mock_file_path = mock_file_path + '.cleaning'
+    flows_count = 0
+    replacer = TimestampReplacer()
+    replacer.bad_keys_filepath = problem_keys_filepath
+    try:
+        with open(os.devnull, 'w') as fnull, contextlib.redirect_stdout(fnull):
+            replacer.load_problematic_keys()
+            with open(mock_file_path, 'rb') as mock_file, open(cleaned_mock_file_path, 'wb') as cleaned_mock_file:
+                flow_writer = io.FlowWriter(cleaned_mock_file)
+                for flow in io.FlowReader(mock_file).stream():
+                    if isinstance(flow, http.HTTPFlow):
+                        replacer.clean_bad_keys(flow.request)
+                    flow_writer.add(flow)
+                    flows_count += 1
+        os.replace(cleaned_mock_file_path, mock_file_path)
+    finally:
+        if os.path.exists(cleaned_mock_file_path):
+            os.remove(cleaned_mock_file_path)
+
+    return flows_count
+
+
+def clean_mock_file_if_changed(mock_file_path, cleaned_hashes=None):
+    """Clean a mock file, unless neither it nor its problematic keys file changed since it was last cleaned.
+
+    Args:
+        mock_file_path (string): path of the mock file to clean.
+        cleaned_hashes (dict): hashes of the mock file and its problematic keys file from when it was last cleaned.
+
+    Returns:
+        tuple. The mock file path, the cleaning status and the hashes of the cleaned files (None if not cleaned).
+    """
+    problem_keys_filepath = os.path.join(os.path.dirname(mock_file_path), PROBLEM_KEYS_FILE_NAME)
+    if not os.path.isfile(problem_keys_filepath):
+        return mock_file_path, 'no problematic keys file', None
+
+    try:
+        with open(problem_keys_filepath, 'r') as problem_keys_file:
+            problem_keys = json.load(problem_keys_file)
+        if not needs_whitewashing(problem_keys):
+            return mock_file_path, 'no data to whitewash', None
+
+        problem_keys_hash = get_file_hash(problem_keys_filepath)
+        if cleaned_hashes == {'mock': get_file_hash(mock_file_path), 'problem_keys': problem_keys_hash}:
+            return mock_file_path, 'unchanged', cleaned_hashes
+
+        flows_count = clean_mock_file_flows(mock_file_path, problem_keys_filepath)
+        return (mock_file_path, f'cleaned {flows_count} flows',
+                {'mock': get_file_hash(mock_file_path), 'problem_keys': problem_keys_hash})
+    except Exception as e:
+        return mock_file_path, f'failed - {e}', None
+
+
+def clean_mock_files(mocks_folder, workers=None, hashes_file_path=None):
+    """Clean timestamp data from all the mock files in the mocks folder, in parallel worker processes.
+    Mock files which, like their problematic keys files, did not change since they were last cleaned are skipped.
+    This is a maintenance tool for re-cleaning a local clone of the mock files, e.g. after problematic keys were
+    changed. It is not run by the nightly build, which cleans every new recording on the AMI with
+    MITMProxy.clean_mock_file, where mitmproxy is installed.
+
+    Args:
+        mocks_folder (string): path of the folder of the mock files, e.g. a clone of the content-test-data repo.
+        workers (int): number of worker processes, defaults to the number of CPUs.
+        hashes_file_path (string): path of the file keeping the hashes of the cleaned mock files.
+
+    Returns:
+        dict. The cleaning status by mock file path.
+    """
+    hashes_file_path = hashes_file_path or os.path.join(mocks_folder, CLEANED_MOCKS_HASHES_FILE_NAME)
+    cleaned_mocks_hashes = {}
+    if os.path.isfile(hashes_file_path):
+        with open(hashes_file_path, 'r') as hashes_file:
+            cleaned_mocks_hashes = json.load(hashes_file)
+
+    mock_files_paths = sorted(os.path.join(dir_path, file_name)
+                              for dir_path, _, files_names in os.walk(mocks_folder)
+                              for file_name in files_names if file_name.endswith(MOCK_FILE_SUFFIX))
+    cleaning_statuses = {}
+    updated_mocks_hashes = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # the hashes are kept by the mock file path relative to the mocks folder
+        cleaning_results = executor.map(clean_mock_file_if_changed, mock_files_paths,
+                                        [cleaned_mocks_hashes.get(os.path.relpath(path, mocks_folder))
+                                         for path in mock_files_paths])
+        for mock_file_path, cleaning_status, cleaned_hashes in cleaning_results:
+            cleaning_statuses[mock_file_path] = cleaning_status
+            if cleaned_hashes:
+                updated_mocks_hashes[os.path.relpath(mock_file_path, mocks_folder)] = cleaned_hashes
+
+    tmp_hashes_file_path = hashes_file_path + '.tmp'
+    with open(tmp_hashes_file_path, 'w') as hashes_file:
+        json.dump(updated_mocks_hashes, hashes_file, indent=4, sort_keys=True)
+    os.replace(tmp_hashes_file_path, hashes_file_path)
+
+    return cleaning_statuses
+
+
 class AMIConnection:
     """Wrapper for AMI communication.
 
@@ -277,13 +420,7 @@ class MITMProxy:
 
         # is there data in problematic_keys.json that needs whitewashing?
         prints_manager.add_print_job('checking if there is data to whitewash', print, thread_index)
-        needs_whitewashing = False
-        for val in problem_keys.values():
-            if val:
-                needs_whitewashing = True
-                break
-
-        if problem_keys and needs_whitewashing:
+        if problem_keys and needs_whitewashing(problem_keys):
             mock_file_path = os.path.join(path, get_mock_file_path(playbook_id))
             cleaned_mock_filepath = mock_file_path.strip('.mock') + '_cleaned.mock'
             # rewrite mock file with problematic key values replaced
@@ -437,3 +574,20 @@ class MITMProxy:
             prints_manager.add_print_job(f'{self.process.stderr.read()}', print, thread_index)
 
         self.process = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Clean timestamp data from the recorded mock files in a folder')
+    parser.add_argument('mocks_folder', help='The folder of the mock files, e.g. a clone of content-test-data')
+    parser.add_argument('-w', '--workers', type=int, help='Number of worker processes, defaults to the number of CPUs')
+    parser.add_argument('--hashes_file', help='Path of the file keeping the hashes of the cleaned mock files')
+    options = parser.parse_args()
+
+    cleaning_statuses = clean_mock_files(options.mocks_folder, options.workers, options.hashes_file)
+    for mock_file_path, cleaning_status in cleaning_statuses.items():
+        print_func = print_error if cleaning_status.startswith('failed') else print
+        print_func(f'{mock_file_path}: {cleaning_status}')
+
+
+if __name__ == '__main__':
+    main()
@@ -13,6 +13,7 @@ import coloredlogs
 import logging
 from distutils.version import LooseVersion
 from copy import deepcopy
+from itertools import chain
 from typing import Dict, Tuple
 from Tests.Marketplace.marketplace_services import IGNORED_FILES
 import demisto_sdk.commands.common.tools as tools
@@ -104,6 +105,98 @@ class TestConf(object):
         return test_playbooks
 
 
+class IdSetIndex(object):
+    """Lookups over the id_set, which holds every content section as a list of single key dicts.
+
+    Entities are indexed by id, name and file path, and reverse edges from a used entity (a script id, a playbook name
+    or a command) to the entities using it are built per section and field on first use. This way the collection
+    traverses the script -> playbook -> test and integration -> command -> playbook graphs instead of rescanning whole
+    sections. All lookups return (entity_id, entity_data) tuples in their id_set order, same as a scan would.
+    """
+
+    def __init__(self, id_set: dict) -> None:
+        self.id_set = id_set
+        self._sections: dict = {}
+        self._edges: dict = {}
+        self._file_paths = None
+
+    def _get_section(self, section):
+        """Returns the section entities, with their positions by entity id and by entity name"""
+        if section not in self._sections:
+            entities, ids, names = [], {}, {}
+            for obj_wrpr in self.id_set.get(section, []):
+                obj_keys = list(obj_wrpr.keys())
+                if not obj_keys:
+                    continue
+                entity_id = obj_keys[0]
+                entity_data = obj_wrpr[entity_id]
+                ids.setdefault(entity_id, []).append(len(entities))
+                names.setdefault(entity_data.get('name'), []).append(len(entities))
+                entities.append((entity_id, entity_data))
+            self._sections[section] = entities, ids, names
+
+        return self._sections[section]
+
+    def _get_entities(self, section, positions):
+        entities = self._get_section(section)[0]
+        return [entities[position] for position in sorted(set(positions))]
+
+    def get_by_ids(self, section, entity_ids):
+        """Returns the entities of the section with one of the given ids"""
+        ids = self._get_section(section)[1]
+        return self._get_entities(section, chain.from_iterable(ids.get(entity_id, []) for entity_id in entity_ids))
+
+    def get_by_names(self, section, names):
+        """Returns the entities of the section with one of the given names"""
+        section_names = self._get_section(section)[2]
+        return self._get_entities(section, chain.from_iterable(section_names.get(name, []) for name in names))
+
+    def get_by_id_or_name(self, section, id_or_name):
+        """Returns the entities of the section with the given id, or with the given name"""
+        _, ids, names = self._get_section(section)
+        return self._get_entities(section, ids.get(id_or_name, []) + names.get(id_or_name, []))
+
+    def get_by_file_paths(self, file_paths):
+        """Returns the entities data of all sections with one of the given file paths"""
+        if self._file_paths is None:
+            self._file_paths = {}
+            for artifacts in self.id_set.values():
+                for artifact_dict in artifacts:
+                    for artifact_details in artifact_dict.values():
+                        self._file_paths.setdefault(artifact_details.get('file_path'), []).append(artifact_details)
+
+        return list(chain.from_iterable(self._file_paths.get(file_path, []) for file_path in file_paths))
+
+    def _get_edges(self, section, field):
+        """Returns the positions of the section entities by the ids they use in the given field.
+
+        The field may hold a list of ids (e.g. implementing_scripts), a dict keyed by ids (command_to_integration)
+        or a single id (api_modules).
+        """
+        if (section, field) not in self._edges:
+            edges: dict = {}
+            for position, (_, entity_data) in enumerate(self._get_section(section)[0]):
+                used = entity_data.get(field) or []
+                if isinstance(used, str):
+                    used = [used]
+                for used_id in set(used):
+                    edges.setdefault(used_id, []).append(position)
+            self._edges[(section, field)] = edges
+
+        return self._edges[(section, field)]
+
+    def get_dependents(self, section, **used_ids_by_field):
+        """Returns the entities of the section that use one of the given ids in the matching field, e.g.
+        get_dependents('playbooks', implementing_scripts=script_ids, implementing_playbooks=playbook_names)
+        """
+        positions = []
+        for field, used_ids in used_ids_by_field.items():
+            edges = self._get_edges(section, field)
+            positions.extend(chain.from_iterable(edges.get(used_id, []) for used_id in used_ids))
+
+        return self._get_entities(section, positions)
+
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 CONTENT_DIR = os.path.abspath(SCRIPT_DIR + '/../..')
 sys.path.append(CONTENT_DIR)
@@ -170,6 +263,8 @@ _FAILED = False
 AMI_BUILDS = {}
 ID_SET = {}
 CONF = {}
+# index of the last id_set the collection ran on, see get_id_set_index
+_ID_SET_INDEX = None
 if os.path.isfile('./Tests/ami_builds.json'):
     with open('./Tests/ami_builds.json', 'r') as ami_builds_file:
         # get versions to check if tests are runnable on those envs
@@ -184,6 +279,15 @@ if os.path.isfile('./Tests/conf.json'):
         CONF = TestConf(json.load(conf_file))
 
 
+def get_id_set_index(id_set):
+    """Returns the index of the id_set, the index is built once and reused as long as the same id_set is given"""
+    global _ID_SET_INDEX
+    if _ID_SET_INDEX is None or _ID_SET_INDEX.id_set is not id_set:
+        _ID_SET_INDEX = IdSetIndex(id_set)
+
+    return _ID_SET_INDEX
+
+
 def is_runnable_in_server_version(from_v, server_v, to_v):
     """
     Checks whether an obj is runnable in a version
@@ -330,14 +434,20 @@ def collect_tests_and_content_packs(
     skipped_tests = conf.get_skipped_tests()
     skipped_integrations = conf.get_skipped_integrations()
 
-    integration_set = id_set['integrations']
-    test_playbooks_set = id_set['TestPlaybooks']
-    integration_to_command, _ = get_integration_commands(integration_ids, integration_set)
+    id_set_index = get_id_set_index(id_set)
+    integration_to_command, _ = get_integration_commands(integration_ids, id_set_index)
+    integrations_by_command: Dict[str, list] = {}
+    for integration_id, integration_commands in integration_to_command.items():
+        for command in integration_commands:
+            integrations_by_command.setdefault(command, []).append(integration_id)
+
+    # only test playbooks using one of the affected entities can detect a usage
+    test_playbooks = id_set_index.get_dependents('TestPlaybooks', implementing_scripts=script_ids,
+                                                 implementing_playbooks=playbook_ids,
+                                                 command_to_integration=integrations_by_command)
 
-    for test_playbook in test_playbooks_set:
+    for test_playbook_id, test_playbook_data in test_playbooks:
         detected_usage = False
-        test_playbook_id = list(test_playbook.keys())[0]
-        test_playbook_data = list(test_playbook.values())[0]
         test_playbook_name = test_playbook_data.get('name')
         for script in test_playbook_data.get('implementing_scripts', []):
             if script in script_ids:
@@ -354,13 +464,12 @@ def collect_tests_and_content_packs(
         if integration_to_command:
             command_to_integration = test_playbook_data.get('command_to_integration', {})
             for command in test_playbook_data.get('command_to_integration', {}).keys():
-                for integration_id, integration_commands in integration_to_command.items():
-                    if command in integration_commands:
-                        if not command_to_integration.get(command) or \
-                                command_to_integration.get(command) == integration_id:
-                            detected_usage = True
-                            tests_set.add(test_playbook_id)
-                            catched_intergrations.add(integration_id)
+                for integration_id in integrations_by_command.get(command, []):
+                    if not command_to_integration.get(command) or \
+                            command_to_integration.get(command) == integration_id:
+                        detected_usage = True
+                        tests_set.add(test_playbook_id)
+                        catched_intergrations.add(integration_id)
 
         if detected_usage and test_playbook_id not in test_ids and test_playbook_id not in skipped_tests:
             caught_missing_test = True
@@ -375,18 +484,14 @@ def collect_tests_and_content_packs(
     missing_ids = missing_ids - set(skipped_integrations)
 
     packs_to_install = set()
-    id_set_test_playbooks = id_set.get('TestPlaybooks', [])
-    for test_playbook in id_set_test_playbooks:
-        test_playbook_id = list(test_playbook.keys())[0]
-        test_playbook_object = test_playbook[test_playbook_id]
-        if test_playbook_id in tests_set:
-            test_playbook_pack = test_playbook_object.get('pack')
-            if test_playbook_pack:
-                logging.info(
-                    f'Found test playbook {test_playbook_id} in pack {test_playbook_pack} - adding to packs to install')
-                packs_to_install.add(test_playbook_pack)
-            else:
-                logging.warning(f'Found test playbook {test_playbook_id} without pack - not adding to packs to install')
+    for test_playbook_id, test_playbook_object in id_set_index.get_by_ids('TestPlaybooks', tests_set):
+        test_playbook_pack = test_playbook_object.get('pack')
+        if test_playbook_pack:
+            logging.info(
+                f'Found test playbook {test_playbook_id} in pack {test_playbook_pack} - adding to packs to install')
+            packs_to_install.add(test_playbook_pack)
+        else:
+            logging.warning(f'Found test playbook {test_playbook_id} without pack - not adding to packs to install')
 
     return test_ids, missing_ids, caught_missing_test, packs_to_install
 
@@ -400,22 +505,19 @@ def update_missing_sets(catched_intergrations, catched_playbooks, catched_script
     return missing_ids
 
 
-def get_integration_commands(integration_ids, integration_set):
+def get_integration_commands(integration_ids, id_set_index):
     integration_to_command = {}
     deprecated_message = ''
     deprecated_commands_string = ''
-    for integration in integration_set:
-        integration_id = list(integration.keys())[0]
-        integration_data = list(integration.values())[0]
-        if integration_id in integration_ids:
-            integration_commands = set(integration_data.get('commands', []))
-            integration_deprecated_commands = set(integration_data.get('deprecated_commands', []))
-            if integration_deprecated_commands:
-                deprecated_names = ', '.join(integration_deprecated_commands)
-                deprecated_commands_string += '{}: {}\n'.format(integration_id, deprecated_names)
-
-            relevant_commands = list(integration_commands - integration_deprecated_commands)
-            integration_to_command[integration_id] = relevant_commands
+    for integration_id, integration_data in id_set_index.get_by_ids('integrations', integration_ids):
+        integration_commands = set(integration_data.get('commands', []))
+        integration_deprecated_commands = set(integration_data.get('deprecated_commands', []))
+        if integration_deprecated_commands:
+            deprecated_names = ', '.join(integration_deprecated_commands)
+            deprecated_commands_string += '{}: {}\n'.format(integration_id, deprecated_names)
+
+        relevant_commands = list(integration_commands - integration_deprecated_commands)
+        integration_to_command[integration_id] = relevant_commands
 
     if deprecated_commands_string:
         deprecated_message = 'The following integration commands are deprecated and are not taken ' \
@@ -431,15 +533,13 @@ def is_integration_fetching_incidents(integration_yml_path):
 
 
 def id_set__get_test_playbook(id_set, test_playbook_id):
-    for test_playbook in id_set.get('TestPlaybooks', []):
-        if test_playbook_id in test_playbook.keys():
-            return test_playbook[test_playbook_id]
+    for _, test_playbook_data in get_id_set_index(id_set).get_by_ids('TestPlaybooks', [test_playbook_id]):
+        return test_playbook_data
 
 
 def id_set__get_integration_file_path(id_set, integration_id):
-    for integration in id_set.get('integrations', []):
-        if integration_id in integration.keys():
-            return integration[integration_id]['file_path']
+    for _, integration_data in get_id_set_index(id_set).get_by_ids('integrations', [integration_id]):
+        return integration_data['file_path']
 
 
 def check_if_fetch_incidents_is_tested(missing_ids, integration_ids, id_set, conf, tests_set):
@@ -524,7 +624,7 @@ def update_with_tests_sections(missing_ids, modified_files, test_ids, tests):
 
 
 def collect_content_packs_to_install(id_set: Dict, integration_ids: set, playbook_names: set, script_names: set) -> set:
-    """Iterates all content entities in the ID set and extract the pack names for the modified ones.
+    """Looks up the modified content entities in the ID set and extract their pack names.
 
     Args:
         id_set (Dict): Structure which holds all content entities to extract pack names from.
@@ -536,57 +636,45 @@ def collect_content_packs_to_install(id_set: Dict, integration_ids: set, playboo
         set. Pack names to install.
     """
     packs_to_install = set()
+    id_set_index = get_id_set_index(id_set)
 
-    id_set_integrations = id_set.get('integrations', [])
-    for integration in id_set_integrations:
-        integration_id = list(integration.keys())[0]
-        integration_object = integration[integration_id]
-        if integration_id in integration_ids:
-            integration_pack = integration_object.get('pack')
-            if integration_pack:
-                logging.info(f'Found integration {integration_id} in pack {integration_pack} - adding to packs to install')
-                packs_to_install.add(integration_object.get('pack'))
-            else:
-                logging.warning(f'Found integration {integration_id} without pack - not adding to packs to install')
+    for integration_id, integration_object in id_set_index.get_by_ids('integrations', integration_ids):
+        integration_pack = integration_object.get('pack')
+        if integration_pack:
+            logging.info(f'Found integration {integration_id} in pack {integration_pack} - adding to packs to install')
+            packs_to_install.add(integration_object.get('pack'))
+        else:
+            logging.warning(f'Found integration {integration_id} without pack - not adding to packs to install')
 
-    id_set_playbooks = id_set.get('playbooks', [])
-    for playbook in id_set_playbooks:
-        playbook_object = list(playbook.values())[0]
+    for _, playbook_object in id_set_index.get_by_names('playbooks', playbook_names):
         playbook_name = playbook_object.get('name')
-        if playbook_name in playbook_names:
-            playbook_pack = playbook_object.get('pack')
-            if playbook_pack:
-                logging.info(f'Found playbook {playbook_name} in pack {playbook_pack} - adding to packs to install')
-                packs_to_install.add(playbook_pack)
-            else:
-                logging.warning(f'Found playbook {playbook_name} without pack - not adding to packs to install')
-
-    id_set_script = id_set.get('scripts', [])
-    for script in id_set_script:
-        script_id = list(script.keys())[0]
-        script_object = script[script_id]
-        if script_id in script_names:
-            script_pack = script_object.get('pack')
-            if script_pack:
-                logging.info(f'Found script {script_id} in pack {script_pack} - adding to packs to install')
-                packs_to_install.add(script_object.get('pack'))
-            else:
-                logging.warning(f'Found script {script_id} without pack - not adding to packs to install')
+        playbook_pack = playbook_object.get('pack')
+        if playbook_pack:
+            logging.info(f'Found playbook {playbook_name} in pack {playbook_pack} - adding to packs to install')
+            packs_to_install.add(playbook_pack)
+        else:
+            logging.warning(f'Found playbook {playbook_name} without pack - not adding to packs to install')
+
+    for script_id, script_object in id_set_index.get_by_ids('scripts', script_names):
+        script_pack = script_object.get('pack')
+        if script_pack:
+            logging.info(f'Found script {script_id} in pack {script_pack} - adding to packs to install')
+            packs_to_install.add(script_object.get('pack'))
+        else:
+            logging.warning(f'Found script {script_id} without pack - not adding to packs to install')
 
     return packs_to_install
 
 
-def get_api_module_integrations(changed_api_modules, integration_set):
+def get_api_module_integrations(changed_api_modules, id_set_index):
     integration_to_version = {}
     integration_ids_to_test = set([])
-    for integration in integration_set:
-        integration_data = list(integration.values())[0]
-        if integration_data.get('api_modules', '') in changed_api_modules:
-            file_path = integration_data.get('file_path')
-            integration_id = tools.get_script_or_integration_id(file_path)
-            integration_ids_to_test.add(integration_id)
-            integration_to_version[integration_id] = (tools.get_from_version(file_path),
-                                                      tools.get_to_version(file_path))
+    for _, integration_data in id_set_index.get_dependents('integrations', api_modules=changed_api_modules):
+        file_path = integration_data.get('file_path')
+        integration_id = tools.get_script_or_integration_id(file_path)
+        integration_ids_to_test.add(integration_id)
+        integration_to_version[integration_id] = (tools.get_from_version(file_path),
+                                                  tools.get_to_version(file_path))
 
     return integration_ids_to_test, integration_to_version
 
@@ -626,33 +714,29 @@ def collect_changed_ids(integration_ids, playbook_names, script_names, modified_
             api_module_name = tools.get_script_or_integration_id(file_path)
             changed_api_modules.add(api_module_name)
 
-    script_set = id_set['scripts']
-    playbook_set = id_set['playbooks']
-    integration_set = id_set['integrations']
+    id_set_index = get_id_set_index(id_set)
 
     if changed_api_modules:
         integration_ids_to_test, integration_to_version_to_add = get_api_module_integrations(changed_api_modules,
-                                                                                             integration_set)
+                                                                                             id_set_index)
         integration_ids = integration_ids.union(integration_ids_to_test)
         integration_to_version = {**integration_to_version, **integration_to_version_to_add}
 
-    deprecated_msgs = exclude_deprecated_entities(script_set, script_names,
-                                                  playbook_set, playbook_names,
-                                                  integration_set, integration_ids)
+    deprecated_msgs = exclude_deprecated_entities(id_set_index, script_names, playbook_names, integration_ids)
 
     for script_id in script_names:
-        enrich_for_script_id(script_id, script_to_version[script_id], script_names, script_set, playbook_set,
-                             playbook_names, updated_script_names, updated_playbook_names, catched_scripts,
-                             catched_playbooks, tests_set)
+        enrich_for_script_id(script_id, script_to_version[script_id], script_names, id_set_index, playbook_names,
+                             updated_script_names, updated_playbook_names, catched_scripts, catched_playbooks,
+                             tests_set)
 
-    integration_to_command, deprecated_commands_message = get_integration_commands(integration_ids, integration_set)
+    integration_to_command, deprecated_commands_message = get_integration_commands(integration_ids, id_set_index)
     for integration_id, integration_commands in integration_to_command.items():
         enrich_for_integration_id(integration_id, integration_to_version[integration_id], integration_commands,
-                                  script_set, playbook_set, playbook_names, script_names, updated_script_names,
+                                  id_set_index, playbook_names, script_names, updated_script_names,
                                   updated_playbook_names, catched_scripts, catched_playbooks, tests_set)
 
     for playbook_id in playbook_names:
-        enrich_for_playbook_id(playbook_id, playbook_to_version[playbook_id], playbook_names, script_set, playbook_set,
+        enrich_for_playbook_id(playbook_id, playbook_to_version[playbook_id], playbook_names, id_set_index,
                                updated_playbook_names, catched_playbooks, tests_set)
 
     for new_script in updated_script_names:
@@ -686,16 +770,12 @@ def collect_changed_ids(integration_ids, playbook_names, script_names, modified_
     return tests_set, catched_scripts, catched_playbooks, packs_to_install
 
 
-def exclude_deprecated_entities(script_set, script_names,
-                                playbook_set, playbook_names,
-                                integration_set, integration_ids):
+def exclude_deprecated_entities(id_set_index, script_names, playbook_names, integration_ids):
     """Removes deprecated entities from the affected entities sets.
 
-    :param script_set: The set of existing scripts within Content repo.
+    :param id_set_index: The index of the existing entities within Content repo.
     :param script_names: The names of the affected scripts in your change set.
-    :param playbook_set: The set of existing playbooks within Content repo.
     :param playbook_names: The ids of the affected playbooks in your change set.
-    :param integration_set: The set of existing integrations within Content repo.
     :param integration_ids: The ids of the affected integrations in your change set.
 
     :return: deprecated_messages_dict - A dict of messages specifying of all the deprecated entities.
@@ -713,18 +793,18 @@ def exclude_deprecated_entities(script_set, script_names,
     }
 
     # Iterates over three types of entities: scripts, playbooks and integrations and removes deprecated entities
-    for entity_set, entity_names, entity_type in [(script_set, script_names, 'scripts'),
-                                                  (playbook_set, playbook_names, 'playbooks'),
-                                                  (integration_set, integration_ids, 'integrations')]:
-        for entity in entity_set:
-            # integrations are defined by their ids while playbooks and scripts and scripts are defined by names
-            if entity_type == 'integrations':
-                entity_name = list(entity.keys())[0]
-            else:
-                entity_name = list(entity.values())[0].get('name', '')
+    for entity_names, entity_type in [(script_names, 'scripts'),
+                                      (playbook_names, 'playbooks'),
+                                      (integration_ids, 'integrations')]:
+        # integrations are defined by their ids while playbooks and scripts and scripts are defined by names
+        if entity_type == 'integrations':
+            entities = id_set_index.get_by_ids(entity_type, entity_names)
+        else:
+            entities = id_set_index.get_by_names(entity_type, entity_names)
 
+        for entity_id, entity_data in entities:
+            entity_name = entity_id if entity_type == 'integrations' else entity_data.get('name', '')
             if entity_name in entity_names:
-                entity_data = list(entity.values())[0]
                 if entity_data.get('deprecated', False):
                     deprecated_entities_strings_dict[entity_type] += entity_name + '\n'
                     entity_names.remove(entity_name)
@@ -738,16 +818,15 @@ def exclude_deprecated_entities(script_set, script_names,
     return deprecated_messages_dict
 
 
-def enrich_for_integration_id(integration_id, given_version, integration_commands, script_set, playbook_set,
-                              playbook_names, script_names, updated_script_names, updated_playbook_names,
-                              catched_scripts, catched_playbooks, tests_set):
+def enrich_for_integration_id(integration_id, given_version, integration_commands, id_set_index, playbook_names,
+                              script_names, updated_script_names, updated_playbook_names, catched_scripts,
+                              catched_playbooks, tests_set):
     """Enrich the list of affected scripts/playbooks by your change set.
 
     :param integration_id: The name of the integration we changed.
     :param given_version: the version of the integration we changed.
     :param integration_commands: The commands of the changed integation
-    :param script_set: The set of existing scripts within Content repo.
-    :param playbook_set: The set of existing playbooks within Content repo.
+    :param id_set_index: The index of the existing entities within Content repo.
     :param playbook_names: The names of the playbooks affected by your changes.
     :param script_names: The names of the scripts affected by your changes.
     :param updated_script_names: The names of scripts we identify as affected to your change set.
@@ -756,8 +835,7 @@ def enrich_for_integration_id(integration_id, given_version, integration_command
     :param catched_playbooks: The names of playbooks we found tests for.
     :param tests_set: The names of the caught tests.
     """
-    for playbook in playbook_set:
-        playbook_data = list(playbook.values())[0]
+    for _, playbook_data in id_set_index.get_dependents('playbooks', command_to_integration=integration_commands):
         if playbook_data.get('deprecated', False):
             continue
         playbook_name = playbook_data.get('name')
@@ -778,11 +856,10 @@ def enrich_for_integration_id(integration_id, given_version, integration_command
 
                         updated_playbook_names.add(playbook_name)
                         new_versions = (playbook_fromversion, playbook_toversion)
-                        enrich_for_playbook_id(playbook_name, new_versions, playbook_names, script_set, playbook_set,
+                        enrich_for_playbook_id(playbook_name, new_versions, playbook_names, id_set_index,
                                                updated_playbook_names, catched_playbooks, tests_set)
 
-    for script in script_set:
-        script_data = list(script.values())[0]
+    for _, script_data in id_set_index.get_dependents('scripts', depends_on=integration_commands):
         if script_data.get('deprecated', False):
             continue
         script_name = script_data.get('name')
@@ -809,15 +886,14 @@ def enrich_for_integration_id(integration_id, given_version, integration_command
 
                         updated_script_names.add(script_name)
                         new_versions = (script_fromversion, script_toversion)
-                        enrich_for_script_id(script_name, new_versions, script_names, script_set, playbook_set,
+                        enrich_for_script_id(script_name, new_versions, script_names, id_set_index,
                                              playbook_names, updated_script_names, updated_playbook_names,
                                              catched_scripts, catched_playbooks, tests_set)
 
 
-def enrich_for_playbook_id(given_playbook_id, given_version, playbook_names, script_set, playbook_set,
+def enrich_for_playbook_id(given_playbook_id, given_version, playbook_names, id_set_index,
                            updated_playbook_names, catched_playbooks, tests_set):
-    for playbook in playbook_set:
-        playbook_data = list(playbook.values())[0]
+    for _, playbook_data in id_set_index.get_dependents('playbooks', implementing_playbooks=[given_playbook_id]):
         if playbook_data.get('deprecated', False):
             continue
         playbook_name = playbook_data.get('name')
@@ -834,14 +910,13 @@ def enrich_for_playbook_id(given_playbook_id, given_version, playbook_names, scr
 
                 updated_playbook_names.add(playbook_name)
                 new_versions = (playbook_fromversion, playbook_toversion)
-                enrich_for_playbook_id(playbook_name, new_versions, playbook_names, script_set, playbook_set,
+                enrich_for_playbook_id(playbook_name, new_versions, playbook_names, id_set_index,
                                        updated_playbook_names, catched_playbooks, tests_set)
 
 
-def enrich_for_script_id(given_script_id, given_version, script_names, script_set, playbook_set, playbook_names,
+def enrich_for_script_id(given_script_id, given_version, script_names, id_set_index, playbook_names,
                          updated_script_names, updated_playbook_names, catched_scripts, catched_playbooks, tests_set):
-    for script in script_set:
-        script_data = list(script.values())[0]
+    for _, script_data in id_set_index.get_dependents('scripts', script_executions=[given_script_id]):
         if script_data.get('deprecated', False):
             continue
         script_name = script_data.get('name')
@@ -862,12 +937,11 @@ def enrich_for_script_id(given_script_id, given_version, script_names, script_se
 
                 updated_script_names.add(script_name)
                 new_versions = (script_fromversion, script_toversion)
-                enrich_for_script_id(script_name, new_versions, script_names, script_set, playbook_set, playbook_names,
+                enrich_for_script_id(script_name, new_versions, script_names, id_set_index, playbook_names,
                                      updated_script_names, updated_playbook_names, catched_scripts, catched_playbooks,
                                      tests_set)
 
-    for playbook in playbook_set:
-        playbook_data = list(playbook.values())[0]
+    for _, playbook_data in id_set_index.get_dependents('playbooks', implementing_scripts=[given_script_id]):
         if playbook_data.get('deprecated', False):
             continue
         playbook_name = playbook_data.get('name')
@@ -882,7 +956,7 @@ def enrich_for_script_id(given_script_id, given_version, script_names, script_se
 
                 updated_playbook_names.add(playbook_name)
                 new_versions = (playbook_fromversion, playbook_toversion)
-                enrich_for_playbook_id(playbook_name, new_versions, playbook_names, script_set, playbook_set,
+                enrich_for_playbook_id(playbook_name, new_versions, playbook_names, id_set_index,
                                        updated_playbook_names, catched_playbooks, tests_set)
 
 
@@ -903,22 +977,9 @@ def get_test_conf_from_conf(test_id, server_version, conf=deepcopy(CONF)):
     return test_conf
 
 
-def extract_matching_object_from_id_set(obj_id, obj_set, server_version='0'):
+def extract_matching_object_from_id_set(obj_id, id_set, obj_type, server_version='0'):
     """Gets first occurrence of object in the object's id_set with matching id/name and valid from/to version"""
-    for obj_wrpr in obj_set:
-        # try to get object by id
-        if obj_id in obj_wrpr:
-            obj = obj_wrpr.get(obj_id)
-
-        # try to get object by name
-        else:
-            obj_keys = list(obj_wrpr.keys())
-            if not obj_keys:
-                continue
-            obj = obj_wrpr[obj_keys[0]]
-            if obj.get('name') != obj_id:
-                continue
-
+    for _, obj in get_id_set_index(id_set).get_by_id_or_name(obj_type, obj_id):
         # check if object is runnable
         fromversion = obj.get('fromversion', '0.0')
         toversion = obj.get('toversion', '99.99.99')
@@ -986,8 +1047,7 @@ def is_test_runnable(test_id, id_set, conf, server_version):
         return False
     conf_fromversion = test_conf.get('fromversion', '0.0')
     conf_toversion = test_conf.get('toversion', '99.99.99')
-    test_playbooks_set = id_set.get('TestPlaybooks', [])
-    test_playbook_obj = extract_matching_object_from_id_set(test_id, test_playbooks_set, server_version)
+    test_playbook_obj = extract_matching_object_from_id_set(test_id, id_set, 'TestPlaybooks', server_version)
 
     # check whether the test is runnable in id_set
     if not test_playbook_obj:
@@ -1018,10 +1078,8 @@ def is_test_integrations_available(server_version, test_conf, conf, id_set):
         if not is_test_uses_active_integration(test_integration_ids, conf):
             return False
         # check if all integration from/toversion is valid with server_version
-        integrations_set = id_set.get('integrations', [])
-        if any(extract_matching_object_from_id_set(integration_id, integrations_set, server_version) is None for
-               integration_id in
-               test_integration_ids):
+        if any(extract_matching_object_from_id_set(integration_id, id_set, 'integrations', server_version) is None
+               for integration_id in test_integration_ids):
             return False
     return True
 
@@ -1067,16 +1125,13 @@ def get_content_pack_name_of_test(tests: set, id_set: Dict = None) -> set:
     """
     content_packs = set()
 
-    for test_playbook_object in id_set.get('TestPlaybooks', []):
-        test_playbook_name = list(test_playbook_object.keys())[0]
-        test_playbook_data = list(test_playbook_object.values())[0]
-        if test_playbook_name in tests:
-            pack_name = test_playbook_data.get('pack')
-            if pack_name:
-                content_packs.add(pack_name)
-                if len(tests) == len(content_packs):
-                    # we found all content packs for all tests we were looking for
-                    break
+    for _, test_playbook_data in get_id_set_index(id_set).get_by_ids('TestPlaybooks', tests):
+        pack_name = test_playbook_data.get('pack')
+        if pack_name:
+            content_packs.add(pack_name)
+            if len(tests) == len(content_packs):
+                # we found all content packs for all tests we were looking for
+                break
 
     return content_packs
 
@@ -1192,16 +1247,13 @@ def get_from_version_and_to_version_bounderies(all_modified_files_paths: set, id
     """
     max_to_version = LooseVersion('0.0.0')
     min_from_version = LooseVersion('99.99.99')
-    for artifacts in id_set.values():
-        for artifact_dict in artifacts:
-            for artifact_details in artifact_dict.values():
-                if artifact_details.get('file_path') in all_modified_files_paths:
-                    from_version = artifact_details.get('fromversion')
-                    to_version = artifact_details.get('toversion')
-                    if from_version:
-                        min_from_version = min(min_from_version, LooseVersion(from_version))
-                    if to_version:
-                        max_to_version = max(max_to_version, LooseVersion(to_version))
+    for artifact_details in get_id_set_index(id_set).get_by_file_paths(all_modified_files_paths):
+        from_version = artifact_details.get('fromversion')
+        to_version = artifact_details.get('toversion')
+        if from_version:
+            min_from_version = min(min_from_version, LooseVersion(from_version))
+        if to_version:
+            max_to_version = max(max_to_version, LooseVersion(to_version))
     if max_to_version.vstring == '0.0.0':
         max_to_version = LooseVersion('99.99.99')
     if min_from_version.vstring == '99.99.99':
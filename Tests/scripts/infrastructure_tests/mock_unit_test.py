@@ -1,6 +1,10 @@
 from __future__ import print_function
+import json
+import os
 from unittest.mock import patch
-from Tests.mock_server import AMIConnection, clean_filename, get_mock_file_path, get_log_file_path, get_folder_path
+import pytest
+from Tests.mock_server import AMIConnection, clean_filename, get_mock_file_path, get_log_file_path, get_folder_path, \
+    clean_mock_files
 
 
 def test_clean_filename():
@@ -21,6 +25,60 @@ def test_get_paths():
     assert get_folder_path(test_playbook_id) == 'test_playbook/'
 
 
+def write_sample_mock(mocks_folder, playbook_id, problem_keys):
+    from mitmproxy import io
+    from mitmproxy.test import tflow
+
+    os.makedirs(os.path.join(mocks_folder, get_folder_path(playbook_id)))
+    with open(os.path.join(mocks_folder, get_mock_file_path(playbook_id)), 'wb') as mock_file:
+        flow_writer = io.FlowWriter(mock_file)
+        for i in range(3):
+            flow = tflow.tflow(resp=True)
+            flow.request.method = 'POST'
+            flow.request.path = f'/api/search?from=2020-01-0{i + 1}T10:00:00Z&q={i}'
+            flow.request.content = json.dumps({'query': {'name': str(i)}, 'ts': 1580000000 + i}).encode()
+            flow_writer.add(flow)
+    with open(os.path.join(mocks_folder, get_folder_path(playbook_id), 'problematic_keys.json'), 'w') as keys_file:
+        json.dump(problem_keys, keys_file)
+
+
+def read_mock_requests(mocks_folder, playbook_id):
+    from mitmproxy import io
+
+    with open(os.path.join(mocks_folder, get_mock_file_path(playbook_id)), 'rb') as mock_file:
+        return [(flow.request.query.get('from'), json.loads(flow.request.content)['ts'])
+                for flow in io.FlowReader(mock_file).stream()]
+
+
+def test_clean_mock_files(tmp_path):
+    """
+    Given
+    - a mock file with problematic keys in its requests, and a mock file with no problematic keys
+
+    When
+    - cleaning the mock files twice
+
+    Then
+    - Ensure the values of the problematic keys are replaced and the other mock file is not changed
+    - Ensure the mock files are skipped on the second cleaning, as they did not change
+    """
+    pytest.importorskip('mitmproxy')
+    mocks_folder = str(tmp_path)
+    write_sample_mock(mocks_folder, 'Dirty_Test', {'keys_to_replace': 'ts', 'server_replay_ignore_params': 'from',
+                                                   'server_replay_ignore_payload_params': ''})
+    write_sample_mock(mocks_folder, 'Clean_Test', {'keys_to_replace': '', 'server_replay_ignore_params': '',
+                                                   'server_replay_ignore_payload_params': ''})
+    clean_requests = read_mock_requests(mocks_folder, 'Clean_Test')
+
+    statuses = clean_mock_files(mocks_folder, workers=1)
+
+    assert statuses == {os.path.join(mocks_folder, get_mock_file_path('Clean_Test')): 'no data to whitewash',
+                        os.path.join(mocks_folder, get_mock_file_path('Dirty_Test')): 'cleaned 3 flows'}
+    assert read_mock_requests(mocks_folder, 'Dirty_Test') == [('constant_value', 'constant_value')] * 3
+    assert read_mock_requests(mocks_folder, 'Clean_Test') == clean_requests
+    assert set(clean_mock_files(mocks_folder, workers=1).values()) == {'no data to whitewash', 'unchanged'}
+
+
 # TODO: Maybe mock subprocess functions??
 with patch('Tests.mock_server.AMIConnection._get_docker_ip') as mock:
     mock.return_value = "2.2.2.2"
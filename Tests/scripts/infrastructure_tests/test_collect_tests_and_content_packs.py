@@ -8,7 +8,7 @@ from ruamel.yaml import YAML
 from Tests.scripts.collect_tests_and_content_packs import (
     RANDOM_TESTS_NUM, TestConf, create_filter_envs_file, get_modified_files_for_testing,
     get_test_list_and_content_packs_to_install, collect_content_packs_to_install,
-    get_from_version_and_to_version_bounderies)
+    get_from_version_and_to_version_bounderies, IdSetIndex, get_id_set_index)
 
 with open('Tests/scripts/infrastructure_tests/tests_data/mock_id_set.json', 'r') as mock_id_set_f:
     MOCK_ID_SET = json.load(mock_id_set_f)
@@ -882,3 +882,88 @@ def test_collect_content_packs_to_install(mocker):
         ])
 
         collect_tests_and_content_packs._FAILED = False
+
+
+class TestIdSetIndex:
+    ID_SET = {
+        'scripts': [
+            {'script_a': {'name': 'script_a', 'file_path': 'Packs/A/Scripts/script_a/script_a.yml'}},
+            {'script_b': {'name': 'script_b', 'script_executions': ['script_a'], 'depends_on': ['cmd-a']}},
+            {'script_c': {'name': 'script_c_name', 'script_executions': ['script_a', 'script_b']}},
+        ],
+        'playbooks': [
+            {'playbook_a': {'name': 'playbook_a', 'implementing_scripts': ['script_a'],
+                            'command_to_integration': {'cmd-a': 'integration_a'}}},
+            {'playbook_b': {'name': 'playbook_b', 'implementing_playbooks': ['playbook_a']}},
+        ],
+        'integrations': [
+            {'integration_a': {'name': 'integration_a', 'api_modules': 'ApiModule_A', 'fromversion': '5.0.0',
+                               'file_path': 'Packs/A/Integrations/integration_a/integration_a.yml'}},
+            {'integration_a': {'name': 'integration_a', 'fromversion': '4.5.0', 'toversion': '4.9.9'}},
+        ],
+    }
+
+    def test_lookups(self):
+        """
+        Given
+        - ID set with scripts, playbooks and integrations
+
+        When
+        - Looking up entities by id, name, id or name and file path
+
+        Then
+        - Ensure the matching entities are returned in their id set order
+        """
+        index = IdSetIndex(self.ID_SET)
+
+        assert [entity_id for entity_id, _ in index.get_by_ids('scripts', {'script_c', 'script_a'})] == \
+            ['script_a', 'script_c']
+        assert [entity_id for entity_id, _ in index.get_by_names('scripts', ['script_c_name'])] == ['script_c']
+        assert index.get_by_ids('scripts', ['script_c_name']) == []
+        assert [data.get('fromversion') for _, data in index.get_by_id_or_name('integrations', 'integration_a')] == \
+            ['5.0.0', '4.5.0']
+        assert index.get_by_file_paths({'Packs/A/Scripts/script_a/script_a.yml'}) == \
+            [self.ID_SET['scripts'][0]['script_a']]
+        assert index.get_by_ids('TestPlaybooks', ['test_a']) == []
+
+    def test_get_dependents(self):
+        """
+        Given
+        - ID set with entities using scripts, playbooks, commands and api modules
+
+        When
+        - Getting the dependents of used entities
+
+        Then
+        - Ensure each dependent is returned once, in its id set order
+        """
+        index = IdSetIndex(self.ID_SET)
+
+        assert [entity_id for entity_id, _ in index.get_dependents('scripts', script_executions=['script_b',
+                                                                                                 'script_a'])] == \
+            ['script_b', 'script_c']
+        assert [entity_id for entity_id, _ in index.get_dependents('playbooks', implementing_scripts=['script_a'],
+                                                                   implementing_playbooks=['playbook_a'])] == \
+            ['playbook_a', 'playbook_b']
+        assert [entity_id for entity_id, _ in index.get_dependents('playbooks', command_to_integration={'cmd-a'})] == \
+            ['playbook_a']
+        assert [entity_id for entity_id, _ in index.get_dependents('integrations', api_modules={'ApiModule_A'})] == \
+            ['integration_a']
+        assert index.get_dependents('scripts', depends_on=['cmd-b']) == []
+
+    def test_get_id_set_index(self):
+        """
+        Given
+        - Two ID sets
+
+        When
+        - Getting the index of each ID set
+
+        Then
+        - Ensure the index is reused for the same ID set and rebuilt for another one
+        """
+        other_id_set = copy.deepcopy(self.ID_SET)
+
+        index = get_id_set_index(self.ID_SET)
+        assert get_id_set_index(self.ID_SET) is index
+        assert get_id_set_index(other_id_set).id_set is other_id_set
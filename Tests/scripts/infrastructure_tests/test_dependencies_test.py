@@ -0,0 +1,98 @@
+import json
+
+from Tests.test_dependencies import get_tests_allocation_for_threads, load_tests_durations, \
+    update_tests_durations_file
+
+TESTS_CONF = {
+    'tests': [
+        {'playbookID': 'EWS-Test', 'integrations': 'EWS v2'},
+        {'playbookID': 'EWS-Mail-Test', 'integrations': ['EWS v2', 'Mail Sender']},
+        {'playbookID': 'Splunk-Test', 'integrations': 'SplunkPy'},
+        {'playbookID': 'Splunk-Search-Test', 'integrations': 'SplunkPy'},
+        {'playbookID': 'HelloWorld-Test', 'integrations': 'HelloWorld'},
+        {'playbookID': 'TestCommonPython'},
+        {'playbookID': 'Independent-1'},
+        {'playbookID': 'Independent-2'},
+        {'playbookID': 'Independent-3'},
+        {'playbookID': 'Independent-4'},
+    ]
+}
+TESTS_DURATIONS = {
+    'EWS-Test': 900,
+    'EWS-Mail-Test': 600,
+    'Splunk-Test': 700,
+    'Splunk-Search-Test': 500,
+    'HelloWorld-Test': 60,
+    'TestCommonPython': 30,
+    'Independent-1': 400,
+    'Independent-2': 300,
+    'Independent-3': 100,
+    'Independent-4': 100,
+}
+
+
+def write_tests_conf(tmp_path):
+    conf_path = tmp_path / 'conf.json'
+    conf_path.write_text(json.dumps(TESTS_CONF))
+    return str(conf_path)
+
+
+def test_tests_allocation_by_durations(tmp_path):
+    """
+    Given
+    - conf.json with two clusters of dependent tests (EWS and Splunk) and independent tests
+    - Recorded durations for all tests
+
+    When
+    - Allocating the tests to 3 instances
+
+    Then
+    - Ensure every test is allocated exactly once
+    - Ensure the tests of each cluster are allocated to the same instance
+    - Ensure the longest instance is not longer than the longest cluster
+    """
+    tests_allocation = get_tests_allocation_for_threads(3, write_tests_conf(tmp_path), TESTS_DURATIONS)
+
+    assert len(tests_allocation) == 3
+    assert sorted(sum(tests_allocation, [])) == sorted(TESTS_DURATIONS)
+    assert any({'EWS-Test', 'EWS-Mail-Test'}.issubset(allocation) for allocation in tests_allocation)
+    assert any({'Splunk-Test', 'Splunk-Search-Test'}.issubset(allocation) for allocation in tests_allocation)
+    assert max(sum(TESTS_DURATIONS[test] for test in allocation) for allocation in tests_allocation) == 1500
+
+
+def test_tests_allocation_without_durations(tmp_path):
+    """
+    Given
+    - conf.json with dependent and independent tests
+    - No recorded durations
+
+    When
+    - Allocating the tests to 4 instances
+
+    Then
+    - Ensure every test is allocated exactly once, balanced by count
+    """
+    tests_allocation = get_tests_allocation_for_threads(4, write_tests_conf(tmp_path))
+
+    assert sorted(sum(tests_allocation, [])) == sorted(TESTS_DURATIONS)
+    assert sorted(len(allocation) for allocation in tests_allocation) == [2, 2, 3, 3]
+
+
+def test_update_tests_durations_file(tmp_path):
+    """
+    Given
+    - No recorded durations file, then a run with new durations
+
+    When
+    - Updating the tests durations file
+
+    Then
+    - Ensure the first durations are recorded as is, and later runs are smoothed into the recorded durations
+    """
+    durations_path = str(tmp_path / 'tests_durations.json')
+    assert load_tests_durations(durations_path) == {}
+
+    update_tests_durations_file(durations_path, {'EWS-Test': 900})
+    update_tests_durations_file(durations_path, {'EWS-Test': 300, 'Splunk-Test': 700})
+
+    assert load_tests_durations(durations_path) == {'EWS-Test': 600, 'Splunk-Test': 700}
@@ -0,0 +1,94 @@
+import json
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# mitmproxy is only used by the addon hooks and type annotations, so the detection logic is tested without it
+MITMPROXY_MODULES = ('mitmproxy', 'mitmproxy.http', 'mitmproxy.script', 'mitmproxy.addons',
+                     'mitmproxy.addons.serverplayback')
+with patch.dict(sys.modules, {module: MagicMock() for module in MITMPROXY_MODULES}):
+    from Tests import timestamp_replacer
+
+
+@pytest.mark.parametrize('value', [
+    '2020-01-01T10:00:00Z',  # ISO-8601
+    '2020-01-01T10:00:00.123+02:00',  # ISO-8601 with milliseconds and offset
+    'Wed, 21 Oct 2015 07:28:00 GMT',  # RFC-1123
+    '20200101',  # compact date
+    '2020-01-01',
+    b'2020-01-01',
+    '10:30 am',
+])
+def test_is_timestamp_string(value):
+    assert timestamp_replacer.is_timestamp_string(value)
+
+
+@pytest.mark.parametrize('value', [
+    '192.168.1.1',  # IP
+    '8.8.8.8',
+    '123e4567-e89b-12d3-a456-426614174000',  # uuid
+    'ab12cd34ef56',  # hex id
+    'INC-123456',
+    '1234567',
+    'user1@example.com',  # email
+    'now',
+    '',
+])
+def test_is_not_timestamp_string(value):
+    assert not timestamp_replacer.is_timestamp_string(value)
+
+
+@pytest.mark.parametrize('value, expected', [
+    (1580000000, True),  # epoch seconds
+    (1580000000.5, True),
+    (1580000000123, True),  # epoch milliseconds
+    (1234, False),
+    (42.5, False),
+])
+def test_is_timestamp_number(value, expected):
+    assert timestamp_replacer.is_timestamp_number(value) is expected
+
+
+def make_flow(query):
+    request = SimpleNamespace(method='GET', raw_content=None, urlencoded_form=None, multipart_form=None,
+                              _get_query=lambda: query)
+    return SimpleNamespace(request=request)
+
+
+def test_request_updates_keys_file_only_with_new_keys(mocker, tmp_path):
+    """
+    Given
+    - timestamp replacer recording a mock with timestamps detection
+
+    When
+    - requests are made, some of them with query parameters that hold timestamps
+
+    Then
+    - Ensure that the problematic keys file is written on the first request
+    - Ensure that the file is written again only when a request adds new problematic keys
+    """
+    ctx = mocker.patch.object(timestamp_replacer, 'ctx')
+    ctx.options.debug = False
+    ctx.options.script_mode = 'record'
+    ctx.options.detect_timestamps = True
+    keys_filepath = tmp_path / 'problematic_keys.json'
+    replacer = timestamp_replacer.TimestampReplacer()
+    replacer.bad_keys_filepath = str(keys_filepath)
+    write_out_problematic_keys = mocker.spy(replacer, 'write_out_problematic_keys')
+
+    replacer.request(make_flow([('q', 'name')]))
+    assert write_out_problematic_keys.call_count == 1
+    assert json.loads(keys_filepath.read_text())['server_replay_ignore_params'] == ''
+
+    replacer.request(make_flow([('q', 'other')]))
+    assert write_out_problematic_keys.call_count == 1
+
+    replacer.request(make_flow([('q', 'name'), ('from', '2020-01-01T10:00:00Z')]))
+    assert write_out_problematic_keys.call_count == 2
+    assert json.loads(keys_filepath.read_text())['server_replay_ignore_params'] == 'from'
+
+    replacer.request(make_flow([('from', '2020-01-02T10:00:00Z')]))
+    assert write_out_problematic_keys.call_count == 2
+    assert replacer.count_problem_keys() == 1
@@ -26,7 +26,8 @@ from slackclient import SlackClient
 
 from Tests.mock_server import MITMProxy, AMIConnection
 from Tests.test_integration import Docker, test_integration, disable_all_integrations
-from Tests.test_dependencies import get_used_integrations, get_tests_allocation_for_threads
+from Tests.test_dependencies import get_used_integrations, get_tests_allocation_for_threads, load_tests_durations, \
+    update_tests_durations_file, TESTS_DURATIONS_PATH
 from demisto_sdk.commands.common.constants import RUN_ALL_TESTS_FORMAT, FILTER_CONF, PB_Status
 from demisto_sdk.commands.common.tools import print_color, print_error, print_warning, \
     LOG_COLORS, str2bool
@@ -69,6 +70,8 @@ def options_handler():
                                                       'tests on(Valid only when using AMI)', default="NonAMI")
     parser.add_argument('-l', '--testsList', help='List of specific, comma separated'
                                                   'tests to run')
+    parser.add_argument('-r', '--testsDurations', help='Path to the recorded tests durations file, used to balance '
+                                                       'the tests between the instances', default=TESTS_DURATIONS_PATH)
 
     options = parser.parse_args()
     tests_settings = TestsSettings(options)
@@ -91,6 +94,7 @@ class TestsSettings:
         self.serverVersion = options.serverVersion
         self.serverNumericVersion = None
         self.specific_tests_to_run = self.parse_tests_list_arg(options.testsList)
+        self.tests_durations_path = options.testsDurations
         self.is_local_run = (self.server is not None)
 
     @staticmethod
@@ -154,6 +158,7 @@ class TestsDataKeeper:
         self.rerecorded_tests = []
         self.empty_files = []
         self.unmockable_integrations = {}
+        self.tests_durations = {}
 
     def add_tests_data(self, succeed_playbooks, failed_playbooks, skipped_tests, skipped_integration,
                        unmockable_integrations):
@@ -176,6 +181,10 @@ class TestsDataKeeper:
         for playbook_id in proxy.empty_files:
             self.empty_files.append(playbook_id)
 
+    def add_tests_durations(self, tests_durations):
+        for playbook_id, duration in tests_durations.items():
+            self.tests_durations[playbook_id] = duration
+
 
 def print_test_summary(tests_data_keeper, is_ami=True):
     succeed_playbooks = tests_data_keeper.succeeded_playbooks
@@ -625,7 +634,8 @@ def run_test_scenario(tests_queue, tests_settings, t, proxy, default_test_timeou
                       skipped_integrations_conf, skipped_integration, is_nightly, run_all_tests, is_filter_configured,
                       filtered_tests, skipped_tests, secret_params, failed_playbooks, playbook_skipped_integration,
                       unmockable_integrations, succeed_playbooks, slack, circle_ci, build_number, server, build_name,
-                      server_numeric_version, demisto_api_key, prints_manager, thread_index=0, is_ami=True):
+                      server_numeric_version, demisto_api_key, prints_manager, thread_index=0, is_ami=True,
+                      tests_durations=None):
     playbook_id = t['playbookID']
     nightly_test = t.get('nightly', False)
     integrations_conf = t.get('integrations', [])
@@ -708,9 +718,14 @@ def run_test_scenario(tests_queue, tests_settings, t, proxy, default_test_timeou
         text = stdout if not stderr else stderr
         send_slack_message(slack, SLACK_MEM_CHANNEL_ID, text, 'Content CircleCI', 'False')
 
+    finished_tests_count = len(succeed_playbooks) + len(failed_playbooks)
+    test_start_time = time.time()
     run_test(t, tests_queue, tests_settings, demisto_api_key, proxy, failed_playbooks, integrations, unmockable_integrations,
              playbook_id, succeed_playbooks, test_message, test_options, slack, circle_ci,
              build_number, server, build_name, prints_manager, is_ami, thread_index=thread_index)
+    # a test that couldn't lock its integrations is put back in the queue without running
+    if tests_durations is not None and len(succeed_playbooks) + len(failed_playbooks) > finished_tests_count:
+        tests_durations[playbook_id] = time.time() - test_start_time
 
 
 def get_server_numeric_version(ami_env, is_local_run=False):
@@ -829,6 +844,7 @@ def execute_testing(tests_settings, server_ip, mockable_tests_names, unmockable_
     skipped_tests = set([])
     skipped_integration = set([])
     playbook_skipped_integration = set([])
+    tests_durations = {}
 
     disable_all_integrations(demisto_api_key, server, prints_manager, thread_index=thread_index)
     prints_manager.execute_thread_prints(thread_index)
@@ -859,7 +875,7 @@ def execute_testing(tests_settings, server_ip, mockable_tests_names, unmockable_
                                   skipped_tests, secret_params, failed_playbooks, playbook_skipped_integration,
                                   unmockable_integrations, succeed_playbooks, slack, circle_ci, build_number, server,
                                   build_name, server_numeric_version, demisto_api_key, prints_manager,
-                                  thread_index=thread_index)
+                                  thread_index=thread_index, tests_durations=tests_durations)
             proxy.configure_proxy_in_demisto(demisto_api_key, server, '')
 
             # reset containers after clearing the proxy server configuration
@@ -879,7 +895,8 @@ def execute_testing(tests_settings, server_ip, mockable_tests_names, unmockable_
                               is_nightly, run_all_tests, is_filter_configured, filtered_tests, skipped_tests,
                               secret_params, failed_playbooks, playbook_skipped_integration, unmockable_integrations,
                               succeed_playbooks, slack, circle_ci, build_number, server, build_name,
-                              server_numeric_version, demisto_api_key, prints_manager, thread_index, is_ami)
+                              server_numeric_version, demisto_api_key, prints_manager, thread_index, is_ami,
+                              tests_durations=tests_durations)
             prints_manager.execute_thread_prints(thread_index)
 
     except Exception as exc:
@@ -892,6 +909,7 @@ def execute_testing(tests_settings, server_ip, mockable_tests_names, unmockable_
     finally:
         tests_data_keeper.add_tests_data(succeed_playbooks, failed_playbooks, skipped_tests,
                                          skipped_integration, unmockable_integrations)
+        tests_data_keeper.add_tests_durations(tests_durations)
         if is_ami:
             tests_data_keeper.add_proxy_related_test_data(proxy)
 
@@ -1008,7 +1026,9 @@ def manage_tests(tests_settings):
         # This is the way we run most tests, including running Circle for PRs and nightly.
         if is_nightly:
             # If the build is a nightly build, run tests in parallel.
-            test_allocation = get_tests_allocation_for_threads(number_of_instances, tests_settings.conf_path)
+            tests_durations = load_tests_durations(tests_settings.tests_durations_path)
+            test_allocation = get_tests_allocation_for_threads(number_of_instances, tests_settings.conf_path,
+                                                               tests_durations)
             current_thread_index = 0
             all_unmockable_tests_list = get_unmockable_tests(tests_settings)
             threads_array = []
@@ -1071,6 +1091,8 @@ def manage_tests(tests_settings):
 
     print_test_summary(tests_data_keeper, tests_settings.isAMI)
     create_result_files(tests_data_keeper)
+    if tests_data_keeper.tests_durations:
+        update_tests_durations_file(tests_settings.tests_durations_path, tests_data_keeper.tests_durations)
 
     if tests_data_keeper.failed_playbooks:
         tests_failed_msg = "Some tests have failed. Not destroying instances."
@@ -1,5 +1,11 @@
+import os
 import json
-import math
+import heapq
+import statistics
+
+TESTS_DURATIONS_PATH = './Tests/tests_durations.json'
+# weight of the latest run when updating the recorded duration of a test
+DURATION_SMOOTHING_FACTOR = 0.5
 
 
 class TestVertex:
@@ -153,54 +159,80 @@ def get_dependent_integrations_clusters_data(tests_file_path, dependent_tests):
     return tests_graph.clusters
 
 
-def get_tests_allocation_for_threads(number_of_instances, tests_file_path):
+def load_tests_durations(durations_file_path):
+    """Loads the recorded tests durations, in seconds by test playbook ID.
+
+    The durations are only an estimate for the tests allocation, so a missing or broken file means no durations.
+    """
+    if not durations_file_path or not os.path.isfile(durations_file_path):
+        return {}
+
+    try:
+        with open(durations_file_path, 'r') as durations_file:
+            return json.load(durations_file)
+    except ValueError:
+        return {}
+
+
+def update_tests_durations_file(durations_file_path, new_tests_durations):
+    """Merges the tests durations of the last run into the recorded tests durations file.
+
+    The recorded duration of a test is smoothed over its runs, so a single slow or fast run doesn't shift its estimate
+    all the way.
+    """
+    tests_durations = load_tests_durations(durations_file_path)
+    for test_name, duration in new_tests_durations.items():
+        recorded_duration = tests_durations.get(test_name)
+        if recorded_duration is None:
+            tests_durations[test_name] = duration
+        else:
+            tests_durations[test_name] = (DURATION_SMOOTHING_FACTOR * duration
+                                          + (1 - DURATION_SMOOTHING_FACTOR) * recorded_duration)
+
+    tmp_durations_file_path = f'{durations_file_path}.tmp'
+    with open(tmp_durations_file_path, 'w') as durations_file:
+        json.dump(tests_durations, durations_file, indent=4, sort_keys=True)
+    os.replace(tmp_durations_file_path, durations_file_path)
+
+    return tests_durations
+
+
+def get_estimated_tests_durations(all_tests, tests_durations):
+    """Estimates the duration of every test, tests with no recorded duration are estimated by the median duration"""
+    recorded_durations = [tests_durations[test_name] for test_name in all_tests if test_name in tests_durations]
+    default_duration = statistics.median(recorded_durations) if recorded_durations else 1
+    return {test_name: tests_durations.get(test_name, default_duration) for test_name in all_tests}
+
+
+def get_tests_allocation_for_threads(number_of_instances, tests_file_path, tests_durations=None):
+    """Allocates the tests to the instances, so that all instances finish at about the same time.
+
+    The tests of a dependent tests cluster must run on the same instance, so every cluster and every independent test
+    is allocated as a whole. Longest first, each is allocated to the instance with the lowest estimated duration so far
+    (longest-processing-time-first). With no recorded durations, the tests are balanced by count.
+
+    Args:
+        number_of_instances (int): The number of instances to allocate the tests to.
+        tests_file_path (str): The path to the conf.json file.
+        tests_durations (dict): The recorded tests durations, in seconds by test playbook ID.
+
+    Returns:
+        list. The tests allocation of every instance.
+    """
     dependent_tests, independent_tests, all_tests = get_test_dependencies(tests_file_path)
     dependent_tests_clusters = get_dependent_integrations_clusters_data(tests_file_path, dependent_tests)
-    dependent_tests_clusters.sort(key=len, reverse=True)  # Sort the clusters from biggest to smallest
-    tests_allocation = []
-    number_of_tests_left = len(all_tests)
-    while number_of_tests_left > 0:
-        allocations_left = number_of_instances - len(tests_allocation)
-        desired_tests_per_allocation = math.ceil(number_of_tests_left / allocations_left)  # We prefer an equal division of tests.
-        current_allocation = []
-
-        # If we have one allocation left, add all tests to it and finish
-        if allocations_left == 1:
-            for tests_cluster in dependent_tests_clusters:
-                current_allocation.extend(tests_cluster)
-            for test_name in independent_tests:
-                current_allocation.append(test_name)
-            tests_allocation.append(current_allocation)
-            break
-
-        if len(dependent_tests_clusters) > 0:
-            # Even if the first cluster is bigger than the desired amount, we have to add it to the allocation.
-            # If we don't, it will not be added to any allocation.
-            first_cluster = dependent_tests_clusters.pop(0)
-            first_cluster_size = len(first_cluster)
-            current_allocation.extend(first_cluster)
-            number_of_tests_left -= first_cluster_size
-
-        if len(current_allocation) >= desired_tests_per_allocation:
-            tests_allocation.append(current_allocation)
-            continue
-
-        clusters_added = 0
-        for cluster in dependent_tests_clusters:
-            cluster_size = len(cluster)
-            if len(current_allocation) + cluster_size > desired_tests_per_allocation:
-                # Will fill the quota from the independent test lists.
-                break
-            current_allocation.extend(cluster)
-            number_of_tests_left -= cluster_size
-            clusters_added += 1
-
-        del dependent_tests_clusters[:clusters_added]
-
-        num_of_tests_to_add = int(desired_tests_per_allocation - len(current_allocation))
-        independent_tests_to_add = independent_tests[:num_of_tests_to_add]
-        current_allocation.extend(independent_tests_to_add)
-        del independent_tests[:num_of_tests_to_add]
-
-        tests_allocation.append(current_allocation)
+    estimated_durations = get_estimated_tests_durations(all_tests, tests_durations or {})
+
+    tests_units = [(sum(estimated_durations[test_name] for test_name in tests_cluster), tests_cluster)
+                   for tests_cluster in dependent_tests_clusters]
+    tests_units.extend((estimated_durations[test_name], [test_name]) for test_name in independent_tests)
+    tests_units.sort(key=lambda tests_unit: tests_unit[0], reverse=True)  # Sort the units from longest to shortest
+
+    tests_allocation = [[] for _ in range(number_of_instances)]
+    allocations_durations = [(0, allocation_index) for allocation_index in range(number_of_instances)]
+    for unit_duration, unit_tests in tests_units:
+        allocation_duration, allocation_index = heapq.heappop(allocations_durations)
+        tests_allocation[allocation_index].extend(unit_tests)
+        heapq.heappush(allocations_durations, (allocation_duration + unit_duration, allocation_index))
+
     return tests_allocation
@@ -1,3 +1,4 @@
+import re
 import json
 import functools
 import urllib
@@ -12,6 +13,76 @@ from mitmproxy.addons.serverplayback import ServerPlayback
 from time import ctime
 from dateutil.parser import parse
 
+# dateutil's parse is slow and raises on most values, so values are only parsed when they may hold a date. A date or
+# time holds a few digits, none of these characters, and is not longer than this.
+MIN_TIMESTAMP_DIGITS = 2
+MAX_TIMESTAMP_LENGTH = 64
+NON_TIMESTAMP_CHARACTERS_REGEX = re.compile(r'[^\w\s\-+:.,;/\'()]|_')
+DIGIT_REGEX = re.compile(r'\d')
+# date (2020-01-01, 01/02/20), time (10:30), compact date or epoch (20200101), am/pm (10am) or month/day name (Nov 15)
+TIMESTAMP_SHAPE_REGEX = re.compile(r'\d[-/.:]\d|\d{4}|\d\s*[ap]\.?m\b|[^\W\d_]{3}', re.IGNORECASE)
+TIMESTAMP_CLASSIFICATIONS_CACHE_SIZE = 65536
+
+
+@functools.lru_cache(maxsize=TIMESTAMP_CLASSIFICATIONS_CACHE_SIZE, typed=True)
+def is_timestamp_string(val: Union[str, bytes]) -> bool:
+    '''Whether the string value is (potentially) timestamp data
+
+    Args:
+        val (Union[str, bytes]): The value to check
+
+    Returns:
+        (bool): True if the value is parsed as a date
+    '''
+    # don't bother trying to interpret an argument less than 4 characters as some type of timestamp
+    if len(val) <= 4 or len(val) > MAX_TIMESTAMP_LENGTH:
+        return False
+    if isinstance(val, bytes):
+        try:
+            val = val.decode()
+        except UnicodeDecodeError:
+            return False
+    if (len(DIGIT_REGEX.findall(val)) < MIN_TIMESTAMP_DIGITS or NON_TIMESTAMP_CHARACTERS_REGEX.search(val)
+            or not TIMESTAMP_SHAPE_REGEX.search(val)):
+        return False
+    try:
+        parse(val)
+        return True
+    except (ValueError, OverflowError):
+        return False
+
+
+@functools.lru_cache(maxsize=TIMESTAMP_CLASSIFICATIONS_CACHE_SIZE, typed=True)
+def is_timestamp_number(val: Union[int, float]) -> bool:
+    '''Whether the number value is (potentially) an epoch timestamp, in seconds or in milliseconds
+
+    Args:
+        val (Union[int, float]): The value to check
+
+    Returns:
+        (bool): True if the value is converted to a date
+    '''
+    if len(str(val)) < 8:
+        return False
+    for_eval = str(val).split('.')[0] if isinstance(val, float) else val
+    try:
+        if len(str(for_eval)) < 13:
+            parse(ctime(val))
+        else:
+            parse(ctime(val / 1000.0))
+        return True
+    except (ValueError, OverflowError):
+        return False
+
+
+def is_timestamp_value(val) -> bool:
+    '''Whether the json value is (potentially) timestamp data'''
+    if isinstance(val, str):
+        return is_timestamp_string(val)
+    if isinstance(val, (int, float)):
+        return is_timestamp_number(val)
+    return False
+
 
 def record_concurrently(replaying: bool = False):
     '''
@@ -49,6 +120,7 @@ class TimestampReplacer:
         self.query_keys = set()
         self.bad_keys_filepath = ''
         self.detect_timestamps = False
+        self.problem_keys_file_updated = False
 
     def load(self, loader):
         loader.add_option(
@@ -122,13 +194,20 @@ class TimestampReplacer:
         req = flow.request
         if ctx.options.script_mode == 'record':
             if ctx.options.detect_timestamps:
+                problem_keys_count = self.count_problem_keys()
                 self.run_all_key_detections(req)
-                print('updating problem_keys file at "{}"'.format(self.bad_keys_filepath))
-                self.update_problem_keys_file()
+                # the file is written once, and then only when new problematic keys are detected
+                if not self.problem_keys_file_updated or self.count_problem_keys() > problem_keys_count:
+                    print('updating problem_keys file at "{}"'.format(self.bad_keys_filepath))
+                    self.update_problem_keys_file()
+                    self.problem_keys_file_updated = True
         elif ctx.options.script_mode in {'clean', 'playback'}:
             print(f'mode={ctx.options.script_mode} cleaning problematic key values from the request')
             self.clean_bad_keys(req)
 
+    def count_problem_keys(self) -> int:
+        return len(self.json_keys) + len(self.form_keys) + len(self.query_keys)
+
     def clean_bad_keys(self, req: HTTPRequest) -> None:
         '''Modify the request so that values of problematic keys are constant data
 
@@ -266,13 +345,8 @@ class TimestampReplacer:
         query_data = req._get_query()
         print('query_data: {}'.format(query_data))
         for key, val in query_data:
-            # don't bother trying to interpret an argument less than 4 characters as some type of timestamp
-            if len(val) > 4:
-                try:
-                    parse(val)
-                    self.query_keys.add(key)
-                except ValueError:
-                    pass
+            if key not in self.query_keys and is_timestamp_string(val):
+                self.query_keys.add(key)
 
     def handle_multipart_form(self, req: HTTPRequest) -> None:
         '''Used when detecting what keys in a multipart form to replace with constants.
@@ -282,13 +356,8 @@ class TimestampReplacer:
         '''
         if req.multipart_form:
             for key, val in req.multipart_form.items(multi=True):
-                # don't bother trying to interpret an argument less than 4 characters as some type of timestamp
-                if len(val) > 4:
-                    try:
-                        parse(val)
-                        self.form_keys.add(key)
-                    except ValueError:
-                        pass
+                if key not in self.form_keys and is_timestamp_string(val):
+                    self.form_keys.add(key)
 
     def handle_urlencoded_form(self, req: HTTPRequest) -> None:
         '''Used when detecting what keys in an url encoded parameters to replace with constants.
@@ -298,13 +367,8 @@ class TimestampReplacer:
         '''
         if req.urlencoded_form:
             for key, val in req.urlencoded_form.items(multi=True):
-                # don't bother trying to interpret an argument less than 4 characters as some type of timestamp
-                if len(val) > 4:
-                    try:
-                        parse(val)
-                        self.form_keys.add(key)
-                    except ValueError:
-                        pass
+                if key not in self.form_keys and is_timestamp_string(val):
+                    self.form_keys.add(key)
 
     def handle_json_body(self, req: HTTPRequest) -> None:
         '''Used when detecting what keys in a request's json body to replace with constants.
@@ -337,57 +401,18 @@ class TimestampReplacer:
         def travel_dict(obj: Union[dict, list], key_path='') -> List[str]:
             bad_key_paths = []
             if isinstance(obj, dict):
-                for key, val in obj.items():
-                    sub_key_path = '{}.{}'.format(key_path, key) if key_path else key
-                    if isinstance(val, (list, dict)):
-                        bad_key_paths.extend(travel_dict(val, sub_key_path))
-                    else:
-                        is_string = isinstance(val, str) and len(val) > 4
-                        possible_timestamp = isinstance(val, (int, float)) and len(str(val)) >= 8
-                        try:
-                            if is_string or possible_timestamp:
-                                for_eval = val
-                                if possible_timestamp:
-                                    if isinstance(for_eval, float):
-                                        digits = str(val).split('.')
-                                        for_eval = digits[0]
-                                    if len(str(for_eval)) < 13:
-                                        parse(ctime(val))
-                                    else:
-                                        parse(ctime(val / 1000.0))
-                                else:
-                                    parse(val)
-                                # if it continues to the next line that means it successfully parsed the object
-                                # and it's some sort of time-related object
-                                bad_key_paths.append(sub_key_path)
-                        except (ValueError, OverflowError):
-                            pass
+                items = obj.items()
             elif isinstance(obj, list):
-                for i, val in enumerate(obj):
-                    sub_key_path = '{}.{}'.format(key_path, i) if key_path else i
-                    if isinstance(val, (list, dict)):
-                        bad_key_paths.extend(travel_dict(val, sub_key_path))
-                    else:
-                        is_string = isinstance(val, str) and len(val) > 4
-                        possible_timestamp = isinstance(val, (int, float)) and len(str(val)) >= 8
-                        try:
-                            if is_string or possible_timestamp:
-                                for_eval = val
-                                if possible_timestamp:
-                                    if isinstance(for_eval, float):
-                                        digits = str(val).split('.')
-                                        for_eval = digits[0]
-                                    if len(str(for_eval)) < 13:
-                                        parse(ctime(val))
-                                    else:
-                                        parse(ctime(val / 1000.0))
-                                else:
-                                    parse(val)
-                                # if it continues to the next line that means it successfully parsed the object
-                                # and it's some sort of time-related object
-                                bad_key_paths.append(sub_key_path)
-                        except (ValueError, OverflowError):
-                            pass
+                items = enumerate(obj)
+            else:
+                return bad_key_paths
+            for key, val in items:
+                sub_key_path = '{}.{}'.format(key_path, key) if key_path else key
+                if isinstance(val, (list, dict)):
+                    bad_key_paths.extend(travel_dict(val, sub_key_path))
+                # keys already known to be problematic don't need to be classified again
+                elif sub_key_path in self.json_keys or is_timestamp_value(val):
+                    bad_key_paths.append(sub_key_path)
             return bad_key_paths
         bad_keys = travel_dict(content)
         return bad_keys